@@ -3,10 +3,16 @@ Pytest configuration for WARIS AI tests
 """
 
 import asyncio
+import sys
 from collections.abc import Generator
+from pathlib import Path
 
 import pytest
 
+# Make the service importable as the ``ai`` package; inference/ uses
+# package-relative imports into models/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
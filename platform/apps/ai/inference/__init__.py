@@ -4,5 +4,28 @@ Provides model loading and prediction capabilities
 """
 
 from .model_service import AIModelService
+from .batching import MicroBatcher, BatchingMetrics
+from .executor import ModelExecutor, ModelTimeoutError, EventLoopLagMonitor
+from .registry import ModelRegistry, ModelRecord
+from .fleet import ModelFleet
+from .forecast_jobs import ForecastJobRunner
+from .feature_store import FeatureStore
+from .analysis_jobs import AnalysisJobRunner
+from .result_cache import ResultCache, CacheMetrics
 
-__all__ = ["AIModelService"]
+__all__ = [
+    "AIModelService",
+    "MicroBatcher",
+    "BatchingMetrics",
+    "ModelExecutor",
+    "ModelTimeoutError",
+    "EventLoopLagMonitor",
+    "ModelRegistry",
+    "ModelRecord",
+    "ModelFleet",
+    "ForecastJobRunner",
+    "FeatureStore",
+    "AnalysisJobRunner",
+    "ResultCache",
+    "CacheMetrics",
+]
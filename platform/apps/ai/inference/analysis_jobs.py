@@ -0,0 +1,453 @@
+"""
+Analysis Job Runner
+Scheduled network-wide DMA analysis with stored per-DMA snapshots
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ..models.base import BaseModel
+from .forecast_jobs import _safe_name
+from .registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Models loaded by each worker process, keyed by (model_dir, type, version)
+_worker_models: Dict[tuple, BaseModel] = {}
+
+
+def generate_recommendations(analysis: Dict) -> List[Dict]:
+    """Generate recommendations based on analysis results"""
+    recommendations = []
+
+    # Check anomalies
+    anomalies = analysis.get("anomalies", [])
+    if anomalies and anomalies[0].get("is_anomaly"):
+        recommendations.append({
+            "type": "anomaly",
+            "priority": "high",
+            "message": "ตรวจพบความผิดปกติในข้อมูล",
+            "message_en": "Anomaly detected in recent data",
+            "action": "ตรวจสอบมิเตอร์และท่อในพื้นที่",
+        })
+
+    # Check classification
+    classification = analysis.get("classification", {})
+    if classification.get("loss_type") == "physical":
+        recommendations.append({
+            "type": "physical_loss",
+            "priority": "medium",
+            "message": "สงสัยน้ำสูญเสียทางกายภาพ",
+            "message_en": "Physical loss suspected",
+            "action": "ตรวจสอบท่อในพื้นที่เพื่อหารอยรั่ว",
+        })
+
+    # Check forecast trend
+    forecast = analysis.get("forecast", {})
+    if forecast.get("predictions"):
+        trend = forecast["predictions"]
+        if len(trend) > 1 and trend[-1] > trend[0] * 1.1:
+            recommendations.append({
+                "type": "trend",
+                "priority": "low",
+                "message": "แนวโน้มน้ำสูญเสียเพิ่มขึ้น",
+                "message_en": "Water loss trend increasing",
+                "action": "วางแผนตรวจสอบเชิงป้องกัน",
+            })
+
+    return recommendations
+
+
+def _load_worker_models(source: Dict[str, Any]) -> Dict[str, BaseModel]:
+    """Load (once per process) the registry versions named in source"""
+    registry = ModelRegistry(source["model_dir"], source["classes"])
+    models = {}
+    for model_type, version in source["versions"].items():
+        key = (source["model_dir"], model_type, version)
+        if key not in _worker_models:
+            _worker_models[key], _ = registry.load(model_type, version)
+        models[model_type] = _worker_models[key]
+    return models
+
+
+def _safe_call(name: str, fn, default):
+    try:
+        return fn()
+    except Exception as e:
+        logger.error(f"Batch {name} error: {e}")
+        return default(str(e))
+
+
+def analyze_frame(
+    frame: pd.DataFrame,
+    models: Dict[str, BaseModel],
+    forecasts: Dict[str, Dict],
+    dma_column: str = "dma_id",
+    pattern_min_rows: int = 10,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze every DMA in frame with one model call per model family
+
+    Produces the same sections as AIModelService.analyze_dma: anomaly
+    detection and classification on each DMA's latest reading, pattern
+    recognition over its rows, the given forecast and recommendations.
+
+    Args:
+        frame: Feature rows of several DMAs, sorted by dma_column then time
+        models: Fitted models by type (missing types are skipped)
+        forecasts: Forecast dict per DMA id
+
+    Returns:
+        Analysis dict per DMA id
+    """
+    groups = frame.groupby(dma_column, sort=False)
+    dma_ids = [str(d) for d in groups.groups]
+    latest = groups.tail(1)
+    records = latest.to_dict("records")
+    n = len(records)
+    now = pd.Timestamp.now().isoformat()
+
+    anomalies: List[Any] = [None] * n
+    if models.get("anomaly") is not None:
+        anomalies = _safe_call(
+            "anomaly detection",
+            lambda: models["anomaly"].detect_batch(records),
+            lambda e: [{"error": e}] * n,
+        )
+
+    classifications: List[Any] = [{}] * n
+    if models.get("classification") is not None:
+        classifications = _safe_call(
+            "classification",
+            lambda: models["classification"].classify_batch(records),
+            lambda e: [{"error": e}] * n,
+        )
+
+    patterns: Dict[str, Dict] = {}
+    if models.get("pattern") is not None:
+        sizes = groups.size()
+        eligible = frame[frame[dma_column].isin(sizes.index[sizes >= pattern_min_rows])]
+        if len(eligible):
+            patterns = _safe_call(
+                "pattern recognition",
+                lambda: _recognize_patterns(models["pattern"], eligible, dma_column),
+                lambda e: {dma_id: {"error": e} for dma_id in eligible[dma_column].unique()},
+            )
+
+    snapshots = {}
+    for i, dma_id in enumerate(dma_ids):
+        analysis = {
+            "dma_id": dma_id,
+            "analysis_timestamp": now,
+            "anomalies": [anomalies[i]] if anomalies[i] is not None else [],
+            "patterns": patterns.get(dma_id, {}),
+            "forecast": forecasts.get(dma_id, {}),
+            "classification": classifications[i],
+            "recommendations": [],
+        }
+        analysis["recommendations"] = generate_recommendations(analysis)
+        snapshots[dma_id] = analysis
+    return snapshots
+
+
+def _recognize_patterns(model: BaseModel, frame: pd.DataFrame, dma_column: str) -> Dict[str, Dict]:
+    """
+    Pattern recognition per DMA
+
+    One predict per DMA rather than per chunk: cluster confidence is
+    relative to the rows predicted together, so a snapshot must not
+    depend on which DMAs share its chunk.
+    """
+    patterns = {}
+    for dma_id, rows in frame.groupby(dma_column, sort=False):
+        result = model.predict(rows)
+        summary = model.get_pattern_summary(rows, result=result)
+        patterns[str(dma_id)] = {
+            "patterns": result.details.get("pattern_labels_th", []),
+            "summary": summary.to_dict("records"),
+            "confidence": result.confidence,
+        }
+    return patterns
+
+
+def _analyze_chunk(job: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze one chunk of DMAs
+
+    Module-level so it can run in a worker process.
+    """
+    models = job["models"] if job["models"] is not None else _load_worker_models(job["model_source"])
+    return analyze_frame(
+        job["frame"],
+        models,
+        job["forecasts"],
+        dma_column=job["dma_column"],
+        pattern_min_rows=job["pattern_min_rows"],
+    )
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class AnalysisJobRunner:
+    """
+    Network-wide DMA analysis job
+
+    ``run`` analyzes every DMA whose data watermark (latest reading
+    timestamp) moved since its last snapshot, or whose snapshot was made
+    with other model versions. DMAs are split into
+    chunks of ``chunk_size``; each chunk makes one batched call per
+    model family (anomaly, classification, pattern) instead of one per
+    DMA. Chunks run across a process pool when the models come from the
+    registry (each worker loads the published versions once, memory
+    mapped), and in-process otherwise.
+
+    Snapshots are stored as JSON and kept in memory, so ``get_snapshot``
+    is a dict lookup. ``get_ranking`` orders DMAs by their stored
+    anomaly and loss results.
+
+    Layout::
+
+        <model_dir>/analysis/index.json
+        <model_dir>/analysis/snapshots/<dma>.json
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(
+        self,
+        model_dir: str,
+        timestamp_column: str = "timestamp",
+        dma_column: str = "dma_id",
+        chunk_size: int = 256,
+        max_workers: Optional[int] = None,
+        pattern_min_rows: int = 10,
+    ):
+        self.root = Path(model_dir) / "analysis"
+        self.timestamp_column = timestamp_column
+        self.dma_column = dma_column
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.pattern_min_rows = pattern_min_rows
+
+        self.index: Dict[str, Dict[str, Any]] = self._read_index()
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"runs": 0, "analyzed": 0, "skipped": 0, "hits": 0, "misses": 0}
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        path = self.root / self.INDEX_NAME
+        if path.exists():
+            return json.loads(path.read_text())
+        return {}
+
+    def _write_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{self.INDEX_NAME}.tmp"
+        tmp.write_text(json.dumps(self.index, indent=2))
+        tmp.replace(self.root / self.INDEX_NAME)
+
+    def _snapshot_path(self, dma_id: str) -> Path:
+        return self.root / "snapshots" / f"{_safe_name(dma_id)}.json"
+
+    def run(
+        self,
+        frame: pd.DataFrame,
+        models: Dict[str, BaseModel],
+        forecasts: Optional[Dict[str, Dict]] = None,
+        model_source: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+        model_versions: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze DMAs whose data moved and store their snapshots
+
+        Args:
+            frame: Feature rows with dma_column and timestamp_column
+            models: Fitted models by type, used in-process
+            forecasts: Forecast dict per DMA id
+            model_source: {"model_dir", "versions", "classes"} of the
+                registry versions of ``models``; enables the process pool
+            force: Re-analyze even if the watermark is unchanged
+            model_versions: Model version string per DMA id; snapshots
+                stored under another version are re-analyzed
+
+        Returns:
+            Snapshots of the DMAs that were analyzed
+        """
+        frame = frame.assign(**{
+            self.timestamp_column: pd.to_datetime(frame[self.timestamp_column]),
+            self.dma_column: frame[self.dma_column].astype(str),
+        })
+        watermarks = frame.groupby(self.dma_column)[self.timestamp_column].max()
+        watermarks = watermarks.map(lambda ts: ts.isoformat())
+
+        model_versions = model_versions or {}
+        stale = [
+            dma_id for dma_id, watermark in watermarks.items()
+            if force or self._is_stale(dma_id, watermark, model_versions.get(dma_id))
+        ]
+        self.stats["runs"] += 1
+        self.stats["skipped"] += len(watermarks) - len(stale)
+        if not stale:
+            return {}
+
+        frame = (
+            frame[frame[self.dma_column].isin(stale)]
+            .sort_values([self.dma_column, self.timestamp_column], kind="stable")
+        )
+        forecasts = forecasts or {}
+        chunks = [stale[i:i + self.chunk_size] for i in range(0, len(stale), self.chunk_size)]
+        parallel = model_source is not None and self.max_workers != 1 and len(chunks) > 1
+        jobs = [{
+            "frame": frame[frame[self.dma_column].isin(chunk)],
+            "models": None if parallel else models,
+            "model_source": model_source,
+            "forecasts": {dma_id: forecasts[dma_id] for dma_id in chunk if dma_id in forecasts},
+            "dma_column": self.dma_column,
+            "pattern_min_rows": self.pattern_min_rows,
+        } for chunk in chunks]
+
+        if parallel:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_analyze_chunk, jobs))
+        else:
+            results = [_analyze_chunk(job) for job in jobs]
+
+        analyzed = {}
+        for snapshots in results:
+            for dma_id, snapshot in snapshots.items():
+                analyzed[dma_id] = self.store(
+                    dma_id, watermarks[dma_id], snapshot,
+                    model_version=model_versions.get(dma_id), write_index=False,
+                )
+        self._write_index()
+        self.stats["analyzed"] += len(analyzed)
+        logger.info(f"Analyzed {len(analyzed)} DMAs in {len(chunks)} chunks")
+        return analyzed
+
+    def store(
+        self,
+        dma_id: str,
+        watermark: str,
+        snapshot: Dict[str, Any],
+        model_version: Optional[str] = None,
+        write_index: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Store a DMA's analysis snapshot for its data watermark and model versions
+
+        Returns:
+            The snapshot as stored (JSON types)
+        """
+        dma_id = str(dma_id)
+        snapshot = json.loads(json.dumps(snapshot, default=_json_default))
+        snapshot["watermark"] = watermark
+        snapshot["model_version"] = model_version
+
+        path = self._snapshot_path(dma_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot, ensure_ascii=False))
+        tmp.replace(path)
+
+        with self._lock:
+            self._snapshots[dma_id] = snapshot
+            self.index[dma_id] = {
+                "watermark": watermark,
+                "model_version": model_version,
+                "analyzed_at": snapshot.get("analysis_timestamp"),
+                **self._summarize(snapshot),
+            }
+        if write_index:
+            self._write_index()
+        return snapshot
+
+    @staticmethod
+    def _summarize(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Ranking fields of a snapshot"""
+        anomaly = (snapshot.get("anomalies") or [{}])[0] or {}
+        classification = snapshot.get("classification") or {}
+        recommendations = snapshot.get("recommendations") or []
+        return {
+            "is_anomaly": bool(anomaly.get("is_anomaly", False)),
+            "anomaly_probability": anomaly.get("probability"),
+            "loss_type": classification.get("loss_type"),
+            "n_high_priority": sum(r.get("priority") == "high" for r in recommendations),
+            "n_recommendations": len(recommendations),
+        }
+
+    def _is_stale(self, dma_id: str, watermark: Optional[str], model_version: Optional[str]) -> bool:
+        entry = self.index.get(dma_id)
+        return (
+            entry is None
+            or (watermark is not None and entry["watermark"] < watermark)
+            or (model_version is not None and entry.get("model_version") != model_version)
+        )
+
+    def get_snapshot(
+        self,
+        dma_id: str,
+        watermark: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Stored snapshot for a DMA
+
+        Args:
+            watermark: Return None if the snapshot is older than this
+            model_version: Return None if the snapshot was made with other models
+
+        Returns:
+            The snapshot, or None if there is no current one
+        """
+        dma_id = str(dma_id)
+        if self._is_stale(dma_id, watermark, model_version):
+            self.stats["misses"] += 1
+            return None
+        entry = self.index[dma_id]
+
+        with self._lock:
+            snapshot = self._snapshots.get(dma_id)
+        if snapshot is None or snapshot.get("watermark") != entry["watermark"]:
+            path = self._snapshot_path(dma_id)
+            if not path.exists():
+                self.stats["misses"] += 1
+                return None
+            snapshot = json.loads(path.read_text())
+            with self._lock:
+                self._snapshots[dma_id] = snapshot
+        self.stats["hits"] += 1
+        return snapshot
+
+    def get_ranking(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        DMAs ordered by stored risk
+
+        High-priority recommendations first, then anomaly probability.
+        """
+        ranking = sorted(
+            ({"dma_id": dma_id, **entry} for dma_id, entry in self.index.items()),
+            key=lambda e: (e.get("n_high_priority", 0), e.get("anomaly_probability") or 0.0),
+            reverse=True,
+        )
+        return ranking[:limit] if limit is not None else ranking
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot count and job statistics"""
+        return {
+            "dmas": len(self.index),
+            **self.stats,
+        }
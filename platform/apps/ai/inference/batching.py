@@ -0,0 +1,156 @@
+"""
+Micro-batching Inference Dispatcher
+Collects concurrent single-row requests into one batched prediction
+"""
+
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchingMetrics:
+    """Counters for a micro-batcher"""
+    requests: int = 0
+    batches: int = 0
+    rows: int = 0
+    errors: int = 0
+    max_batch_size: int = 0
+    queue_delay_ms_total: float = 0.0
+    queue_delay_ms_max: float = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.rows / self.batches if self.batches else 0.0
+
+    @property
+    def fill_rate(self) -> float:
+        """Average batch size as a fraction of the configured maximum"""
+        if not self.max_batch_size:
+            return 0.0
+        return self.avg_batch_size / self.max_batch_size
+
+    @property
+    def avg_queue_delay_ms(self) -> float:
+        return self.queue_delay_ms_total / self.rows if self.rows else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary"""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "errors": self.errors,
+            "avg_batch_size": round(self.avg_batch_size, 2),
+            "fill_rate": round(self.fill_rate, 4),
+            "avg_queue_delay_ms": round(self.avg_queue_delay_ms, 3),
+            "max_queue_delay_ms": round(self.queue_delay_ms_max, 3),
+        }
+
+
+class MicroBatcher:
+    """
+    Micro-batching dispatcher for real-time inference
+
+    Callers ``await submit(item)``. Items are queued until either
+    ``max_batch_size`` items are waiting or the oldest item has waited
+    ``max_latency_ms``; the queued items are then passed as one list to
+    ``predict_batch`` in a worker thread, and each caller receives the
+    result at its own position.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_latency_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+        name: str = "batcher",
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_latency_ms < 0:
+            raise ValueError("max_latency_ms must be >= 0")
+
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.executor = executor
+        self.name = name
+        self.metrics = BatchingMetrics(max_batch_size=max_batch_size)
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue a single item and wait for its prediction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self.metrics.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency_ms / 1000, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Dispatch queued items in batches of at most max_batch_size"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = loop.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Run one batched prediction and fan results out to the callers"""
+        dispatched_at = time.perf_counter()
+        items = [item for item, _, _ in batch]
+
+        self.metrics.batches += 1
+        self.metrics.rows += len(batch)
+        for _, _, queued_at in batch:
+            delay_ms = (dispatched_at - queued_at) * 1000
+            self.metrics.queue_delay_ms_total += delay_ms
+            self.metrics.queue_delay_ms_max = max(self.metrics.queue_delay_ms_max, delay_ms)
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.predict_batch, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"{self.name}: predict_batch returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            logger.error(f"{self.name} batch failed: {e}")
+            self.metrics.errors += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batching metrics and configuration"""
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_latency_ms": self.max_latency_ms,
+            "pending": len(self._pending),
+            **self.metrics.to_dict(),
+        }
@@ -0,0 +1,227 @@
+"""
+Model Execution Layer
+Runs CPU-bound model calls off the asyncio event loop
+"""
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ModelTimeoutError(TimeoutError):
+    """Raised when a model call exceeds its timeout"""
+    pass
+
+
+@dataclass
+class ModelCallStats:
+    """Counters for calls to one model type"""
+    calls: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary"""
+        return {
+            "calls": self.calls,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_ms / self.completed, 3) if self.completed else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class ModelExecutor:
+    """
+    Thread-pool execution layer for model inference
+
+    scikit-learn, XGBoost and NumPy release the GIL in their hot loops, so a
+    thread pool keeps the event loop responsive without copying models into
+    worker processes. Each model type has its own concurrency limit and
+    timeout. A slot is only released when the worker thread actually
+    finishes, so timed-out calls still count against the limit.
+    """
+
+    DEFAULT_CONCURRENCY = {
+        "anomaly": 4,
+        "classification": 4,
+        "pattern": 2,
+        "timeseries": 1,
+        "analysis": 2,
+    }
+
+    DEFAULT_TIMEOUTS = {
+        "anomaly": 5.0,
+        "classification": 5.0,
+        "pattern": 30.0,
+        "timeseries": 60.0,
+        "analysis": 120.0,
+    }
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_concurrency: int = 2,
+        default_timeout: float = 30.0,
+        executor: Optional[Executor] = None,
+    ):
+        self.pool = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="waris-model"
+        )
+        self.concurrency_limits = {**self.DEFAULT_CONCURRENCY, **(concurrency_limits or {})}
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.default_concurrency = default_concurrency
+        self.default_timeout = default_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, ModelCallStats] = {}
+
+    def _semaphore(self, model_type: str) -> asyncio.Semaphore:
+        if model_type not in self._semaphores:
+            limit = self.concurrency_limits.get(model_type, self.default_concurrency)
+            self._semaphores[model_type] = asyncio.Semaphore(limit)
+        return self._semaphores[model_type]
+
+    async def run(
+        self,
+        model_type: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a blocking model call in the pool
+
+        Args:
+            model_type: Key for the concurrency limit and timeout
+            fn: Blocking callable
+            timeout: Override the configured timeout (seconds)
+
+        Raises:
+            ModelTimeoutError: If the call does not finish in time
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(model_type, self.default_timeout)
+
+        stats = self._stats.setdefault(model_type, ModelCallStats())
+        semaphore = self._semaphore(model_type)
+        stats.calls += 1
+
+        await semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        stats.running += 1
+
+        def _finished(_future: asyncio.Future) -> None:
+            stats.running -= 1
+            semaphore.release()
+
+        future = loop.run_in_executor(self.pool, partial(fn, *args, **kwargs))
+        future.add_done_callback(_finished)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.warning(f"{model_type} model call timed out after {timeout}s")
+            raise ModelTimeoutError(f"{model_type} model call timed out after {timeout}s")
+        except Exception:
+            stats.failed += 1
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats.completed += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        return result
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get per-model call statistics and limits"""
+        return {
+            model_type: {
+                "concurrency_limit": self.concurrency_limits.get(model_type, self.default_concurrency),
+                "timeout_s": self.timeouts.get(model_type, self.default_timeout),
+                **stats.to_dict(),
+            }
+            for model_type, stats in self._stats.items()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool"""
+        self.pool.shutdown(wait=wait)
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event-loop lag
+
+    A background task sleeps for ``interval_ms`` and records how much later
+    than scheduled it woke up. Blocking work on the loop shows up directly
+    as lag, so comparing stats before and after moving model calls into
+    ModelExecutor shows the effect.
+    """
+
+    def __init__(self, interval_ms: float = 50.0, max_samples: int = 10_000):
+        self.interval_ms = interval_ms
+        self.max_samples = max_samples
+        self._samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.interval_ms / 1000
+        while True:
+            scheduled = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - scheduled) * 1000)
+            self._samples.append(lag_ms)
+            if len(self._samples) > self.max_samples:
+                del self._samples[: len(self._samples) - self.max_samples]
+
+    def reset(self) -> None:
+        """Clear collected samples"""
+        self._samples = []
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get lag statistics in milliseconds"""
+        if not self._samples:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        samples = np.asarray(self._samples)
+        return {
+            "samples": int(len(samples)),
+            "mean_ms": round(float(samples.mean()), 3),
+            "p99_ms": round(float(np.percentile(samples, 99)), 3),
+            "max_ms": round(float(samples.max()), 3),
+        }
@@ -0,0 +1,374 @@
+"""
+DMA Feature Store
+Precomputed per-reading features keyed by (dma_id, timestamp)
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .forecast_jobs import _safe_name
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+RAW_COLUMNS = ("flow_in", "flow_out", "pressure")
+
+# Rolling windows over the reading timestamps
+ROLLING_WINDOWS = {"24h": pd.Timedelta(hours=24), "7d": pd.Timedelta(days=7)}
+LAGS = {"1h": pd.Timedelta(hours=1), "24h": pd.Timedelta(hours=24), "168h": pd.Timedelta(hours=168)}
+MNF_TREND_DAYS = 7
+
+
+def _trend(values: np.ndarray) -> float:
+    """Least-squares slope per step, ignoring NaN"""
+    x = np.arange(len(values), dtype=np.float64)
+    valid = ~np.isnan(values)
+    if valid.sum() < 3:
+        return np.nan
+    x, y = x[valid], values[valid]
+    x = x - x.mean()
+    return float((x * (y - y.mean())).sum() / (x * x).sum())
+
+
+def compute_features(
+    frame: pd.DataFrame,
+    mnf_hours: tuple = (2, 4),
+) -> pd.DataFrame:
+    """
+    Derive model features for one DMA's readings
+
+    Args:
+        frame: Raw readings (flow_in, flow_out, pressure) on a sorted,
+            unique DatetimeIndex
+        mnf_hours: [start, end) hours of the minimum night flow window
+
+    Returns:
+        Frame on the same index with the raw columns and every feature
+    """
+    out = pd.DataFrame(index=frame.index)
+    for col in RAW_COLUMNS:
+        out[col] = frame[col].astype(np.float64) if col in frame else np.nan
+
+    flow_in = out["flow_in"]
+    out["loss_volume"] = flow_in - out["flow_out"]
+    out["loss_percentage"] = (out["loss_volume"] / flow_in.where(flow_in > 0)).fillna(0.0) * 100
+    out["hour"] = frame.index.hour.astype(np.float64)
+    out["day_of_week"] = frame.index.dayofweek.astype(np.float64)
+    out["is_weekend"] = (frame.index.dayofweek >= 5).astype(np.float64)
+
+    for name, window in ROLLING_WINDOWS.items():
+        for col in ("flow_in", "pressure", "loss_percentage"):
+            rolling = out[col].rolling(window, min_periods=1)
+            out[f"{col}_mean_{name}"] = rolling.mean()
+            out[f"{col}_std_{name}"] = rolling.std()
+
+    out["pressure_delta"] = out["pressure"].diff()
+    for name, lag in LAGS.items():
+        out[f"flow_in_lag_{name}"] = flow_in.reindex(frame.index - lag).to_numpy()
+        out[f"pressure_delta_{name}"] = out["pressure"] - out["pressure"].reindex(frame.index - lag).to_numpy()
+
+    # Minimum night flow: known once the night window has closed
+    start, end = mnf_hours
+    night = flow_in[(frame.index.hour >= start) & (frame.index.hour < end)]
+    daily = night.resample("D").min()
+    if len(daily):
+        daily = daily.reindex(pd.date_range(daily.index[0], daily.index[-1], freq="D"))
+    trend = daily.rolling(MNF_TREND_DAYS, min_periods=1).apply(_trend, raw=True)
+    available = pd.DataFrame({
+        "available_at": daily.index + pd.Timedelta(hours=end),
+        "mnf": daily.to_numpy(),
+        "mnf_trend_7d": trend.to_numpy(),
+    }).dropna(subset=["mnf"])
+    merged = pd.merge_asof(
+        pd.DataFrame({"timestamp": frame.index}),
+        available,
+        left_on="timestamp",
+        right_on="available_at",
+    )
+    out["mnf"] = merged["mnf"].to_numpy(dtype=np.float64)
+    out["mnf_trend_7d"] = merged["mnf_trend_7d"].to_numpy(dtype=np.float64)
+    out["flow_over_mnf"] = flow_in - out["mnf"]
+
+    return out
+
+
+class FeatureStore:
+    """
+    Per-DMA feature store updated incrementally by the ETL pipeline
+
+    ``update`` takes committed readings, computes rolling means and
+    stds, lag features, pressure deltas and minimum night flow (MNF,
+    with its 7-day trend) for the new rows only, using each DMA's hot
+    window as context, and appends them. Model entry points then look
+    features up instead of recomputing them per request.
+
+    The hot window (the most recent ``hot_window`` of rows per DMA) is
+    kept in memory; every update is also written as a columnar part
+    file: Parquet when pyarrow is installed, compressed ``.npz``
+    otherwise. ``compact`` merges a DMA's parts into one file; ``update``
+    does so itself once a DMA has more than ``max_parts`` parts, so cold
+    reads and restarts never scan an unbounded number of files.
+
+    Readings at or before a DMA's latest stored timestamp are ignored.
+
+    Layout::
+
+        <root>/<dma>/part-<first_ns>-<last_ns>.parquet
+    """
+
+    CONTEXT = pd.Timedelta(days=MNF_TREND_DAYS + 1)
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        hot_window: str = "14D",
+        timestamp_column: str = "timestamp",
+        dma_column: str = "dma_id",
+        mnf_hours: tuple = (2, 4),
+        use_parquet: Optional[bool] = None,
+        max_parts: Optional[int] = 16,
+    ):
+        self.root = Path(root)
+        self.hot_window = max(pd.Timedelta(hot_window), self.CONTEXT)
+        self.timestamp_column = timestamp_column
+        self.dma_column = dma_column
+        self.mnf_hours = mnf_hours
+        self.max_parts = max_parts
+        self.use_parquet = HAS_PYARROW if use_parquet is None else use_parquet
+        if self.use_parquet and not HAS_PYARROW:
+            raise ImportError("pyarrow is required for Parquet feature parts")
+
+        self._hot: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.stats = {"rows_written": 0, "rows_skipped": 0, "parts_written": 0, "compactions": 0}
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """Columns stored for every reading"""
+        index = pd.date_range("2000-01-01", periods=1, freq="h")
+        empty = pd.DataFrame({col: [0.0] for col in RAW_COLUMNS}, index=index)
+        return compute_features(empty, self.mnf_hours).columns.tolist()
+
+    def _dma_dir(self, dma_id: str) -> Path:
+        return self.root / _safe_name(dma_id)
+
+    def dma_ids(self) -> List[str]:
+        """DMAs with stored features"""
+        with self._lock:
+            known = set(self._hot)
+        if self.root.exists():
+            known.update(p.name for p in self.root.iterdir() if p.is_dir())
+        return sorted(known)
+
+    def update(self, readings: Union[pd.DataFrame, Sequence[Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Compute and store features for newly committed readings
+
+        Args:
+            readings: Rows with dma_column, timestamp_column and raw columns
+
+        Returns:
+            Rows added per DMA
+        """
+        frame = pd.DataFrame(readings) if not isinstance(readings, pd.DataFrame) else readings
+        if frame.empty:
+            return {}
+        frame = frame.assign(**{
+            self.timestamp_column: pd.to_datetime(frame[self.timestamp_column]),
+            self.dma_column: frame[self.dma_column].astype(str),
+        })
+
+        added = {}
+        for dma_id, group in frame.groupby(self.dma_column, sort=False):
+            with self._lock:
+                n = self._update_dma(dma_id, group)
+            if n:
+                added[dma_id] = n
+        return added
+
+    def _update_dma(self, dma_id: str, group: pd.DataFrame) -> int:
+        raw = (
+            group.set_index(self.timestamp_column)
+            .reindex(columns=list(RAW_COLUMNS))
+            .sort_index()
+        )
+        raw = raw[~raw.index.duplicated(keep="last")]
+
+        hot = self._hot_frame(dma_id)
+        if len(hot):
+            late = raw.index <= hot.index[-1]
+            if late.any():
+                self.stats["rows_skipped"] += int(late.sum())
+                logger.warning(f"Feature store: ignoring {int(late.sum())} late readings for {dma_id}")
+                raw = raw[~late]
+        if raw.empty:
+            return 0
+
+        if len(hot):
+            context = hot.loc[hot.index > raw.index[0] - self.CONTEXT, list(RAW_COLUMNS)]
+            raw = pd.concat([context, raw])
+        else:
+            context = raw.iloc[:0]
+        features = compute_features(raw, self.mnf_hours).iloc[len(context):]
+
+        self._write_part(dma_id, features)
+        if self.max_parts is not None and len(self._parts(dma_id)) > self.max_parts:
+            self._compact_dma(dma_id)
+        combined = pd.concat([hot, features]) if len(hot) else features
+        self._hot[dma_id] = combined[combined.index > combined.index[-1] - self.hot_window]
+        self.stats["rows_written"] += len(features)
+        return len(features)
+
+    def _hot_frame(self, dma_id: str) -> pd.DataFrame:
+        """The DMA's hot window, reloaded from disk after a restart"""
+        hot = self._hot.get(dma_id)
+        if hot is None:
+            parts = self._parts(dma_id)
+            if parts:
+                last_ns = int(parts[-1].stem.split("-")[2])
+                since = pd.Timestamp(last_ns) - self.hot_window
+                hot = self._read_parts(parts, start=since)
+                hot = hot[hot.index > since]
+            else:
+                hot = pd.DataFrame()
+            self._hot[dma_id] = hot
+        return hot
+
+    def _parts(self, dma_id: str) -> List[Path]:
+        directory = self._dma_dir(dma_id)
+        if not directory.exists():
+            return []
+        return sorted(p for p in directory.iterdir() if p.name.startswith("part-"))
+
+    def _write_part(self, dma_id: str, features: pd.DataFrame) -> None:
+        directory = self._dma_dir(dma_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"part-{features.index[0].value:020d}-{features.index[-1].value:020d}"
+        tmp = directory / f".{stem}.tmp"
+
+        if self.use_parquet:
+            features.rename_axis(self.timestamp_column).to_parquet(tmp, engine="pyarrow", index=True)
+            path = directory / f"{stem}.parquet"
+        else:
+            columns = {col: features[col].to_numpy(dtype=np.float64) for col in features.columns}
+            with open(tmp, "wb") as fh:
+                np.savez_compressed(fh, __timestamp__=features.index.as_unit("ns").asi8, **columns)
+            path = directory / f"{stem}.npz"
+        tmp.replace(path)
+        self.stats["parts_written"] += 1
+
+    def _read_part(self, path: Path) -> pd.DataFrame:
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path, engine="pyarrow")
+            frame.index.name = None
+            return frame
+        with np.load(path, allow_pickle=False) as data:
+            index = pd.DatetimeIndex(data["__timestamp__"].astype("datetime64[ns]"))
+            return pd.DataFrame({k: data[k] for k in data.files if k != "__timestamp__"}, index=index)
+
+    def _read_parts(
+        self,
+        parts: List[Path],
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """Concatenate the parts overlapping [start, end] (pruned by file name)"""
+        frames = []
+        for path in parts:
+            _, first_ns, last_ns = path.stem.split("-")
+            if start is not None and int(last_ns) < start.value:
+                continue
+            if end is not None and int(first_ns) > end.value:
+                continue
+            frames.append(self._read_part(path))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames).sort_index()
+
+    def get_features(
+        self,
+        dma_id: str,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Stored features for a DMA between start and end (inclusive)
+
+        Served from the hot window when it covers start; otherwise read
+        from the part files.
+
+        Returns:
+            Frame with timestamp_column, dma_column and the feature columns
+        """
+        dma_id = str(dma_id)
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        with self._lock:
+            hot = self._hot_frame(dma_id)
+        covered = len(hot) and start is not None and start >= hot.index[0] - self._step(hot)
+        frame = hot if covered else self._read_parts(self._parts(dma_id), start, end)
+
+        if len(frame):
+            if start is not None:
+                frame = frame[frame.index >= start]
+            if end is not None:
+                frame = frame[frame.index <= end]
+        if columns is not None:
+            frame = frame.reindex(columns=list(columns))
+
+        frame = frame.rename_axis(self.timestamp_column).reset_index()
+        frame.insert(0, self.dma_column, dma_id)
+        return frame
+
+    @staticmethod
+    def _step(hot: pd.DataFrame) -> pd.Timedelta:
+        """Allowance for a start just before the hot window's first reading"""
+        return hot.index[1] - hot.index[0] if len(hot) > 1 else pd.Timedelta(0)
+
+    def get_latest(self, dma_id: str) -> Optional[Dict[str, Any]]:
+        """Latest feature row for a DMA, or None if it has none"""
+        dma_id = str(dma_id)
+        with self._lock:
+            hot = self._hot_frame(dma_id)
+        if hot.empty:
+            return None
+        row = hot.iloc[-1].to_dict()
+        row[self.timestamp_column] = hot.index[-1]
+        row[self.dma_column] = dma_id
+        return row
+
+    def compact(self, dma_id: Optional[str] = None) -> int:
+        """
+        Merge each DMA's part files into one
+
+        Returns:
+            Number of part files removed
+        """
+        removed = 0
+        for dma in [str(dma_id)] if dma_id is not None else self.dma_ids():
+            with self._lock:
+                removed += self._compact_dma(dma)
+        return removed
+
+    def _compact_dma(self, dma_id: str) -> int:
+        """Merge one DMA's parts (caller holds the lock)"""
+        parts = self._parts(dma_id)
+        if len(parts) < 2:
+            return 0
+        self._write_part(dma_id, self._read_parts(parts))
+        for path in parts:
+            path.unlink()
+        self.stats["compactions"] += 1
+        return len(parts)
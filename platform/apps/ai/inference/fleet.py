@@ -0,0 +1,289 @@
+"""
+Per-DMA Model Fleet
+One anomaly detector and one forecaster per DMA (or DMA cluster)
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import shutil
+import threading
+
+import pandas as pd
+
+from ..models import AnomalyDetector, TimeSeriesForecaster
+from ..models.base import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+def _train_fleet_member(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train and save the models for one fleet key
+
+    Module-level so it can run in a worker process.
+    """
+    frame: pd.DataFrame = job["frame"]
+    target = Path(job["target_dir"])
+
+    detector = AnomalyDetector(**job["detector_kwargs"])
+    detector.fit(frame[job["feature_columns"]])
+
+    series = pd.DataFrame({
+        "ds": frame[job["timestamp_column"]].to_numpy(),
+        "y": frame[job["target_column"]].to_numpy(),
+    })
+    forecaster = TimeSeriesForecaster(**job["forecaster_kwargs"])
+    forecaster.fit(series)
+
+    target.mkdir(parents=True)
+    detector.save(str(target / "detector"))
+    forecaster.save(str(target / "forecaster"))
+
+    return {
+        "key": job["key"],
+        "version": target.name,
+        "watermark": job["watermark"],
+        "dma_watermarks": job["dma_watermarks"],
+        "n_rows": int(len(frame)),
+        "trained_at": datetime.now().isoformat(),
+    }
+
+
+class ModelFleet:
+    """
+    Model fleet manager
+
+    Trains one detector and one forecaster per fleet key. The key is the
+    DMA id, or a cluster id when ``groups`` maps DMAs onto shared models.
+    Training runs across a process pool; retraining only touches keys whose
+    data watermark (latest reading timestamp) moved, and refits each of
+    them on the rows passed in, so callers pass every member DMA's full
+    training window rather than just the new batch. Loaded models are kept
+    in an LRU bounded by ``max_loaded`` so memory stays flat across
+    thousands of DMAs.
+
+    Layout::
+
+        <model_dir>/fleet/index.json
+        <model_dir>/fleet/<key>/<version>/detector/     artifact
+        <model_dir>/fleet/<key>/<version>/forecaster/   artifact
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(
+        self,
+        model_dir: str,
+        feature_columns: Optional[List[str]] = None,
+        target_column: str = "loss_volume",
+        timestamp_column: str = "timestamp",
+        dma_column: str = "dma_id",
+        groups: Optional[Dict[str, str]] = None,
+        max_loaded: int = 256,
+        max_workers: Optional[int] = None,
+        min_rows: int = 24,
+        detector_kwargs: Optional[Dict[str, Any]] = None,
+        forecaster_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.root = Path(model_dir) / "fleet"
+        self.feature_columns = feature_columns or ["flow_in", "flow_out", "pressure", "loss_percentage"]
+        self.target_column = target_column
+        self.timestamp_column = timestamp_column
+        self.dma_column = dma_column
+        self.groups = groups or {}
+        self.max_loaded = max_loaded
+        self.max_workers = max_workers
+        self.min_rows = min_rows
+        # One worker process per member: keep sklearn single-threaded inside it
+        self.detector_kwargs = detector_kwargs or {"approach": "isolation_forest", "n_jobs": 1}
+        self.forecaster_kwargs = forecaster_kwargs or {"approach": "moving_average"}
+
+        self.index: Dict[str, Dict[str, Any]] = self._read_index()
+        self._loaded: "OrderedDict[tuple, BaseModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        path = self.root / self.INDEX_NAME
+        if path.exists():
+            return json.loads(path.read_text())
+        return {}
+
+    def _write_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{self.INDEX_NAME}.tmp"
+        tmp.write_text(json.dumps(self.index, indent=2))
+        tmp.replace(self.root / self.INDEX_NAME)
+
+    def key_for(self, dma_id: str) -> str:
+        """Fleet key serving a DMA"""
+        return str(self.groups.get(dma_id, dma_id))
+
+    def train(self, readings: pd.DataFrame, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Train fleet members whose data moved since their last training
+
+        The watermark only decides which keys are retrained; each chosen key
+        is fitted on all of its rows in ``readings``. A key whose rows do not
+        reach back into the data it was last trained on for every member
+        DMA (e.g. only the new batch was passed) is skipped with a warning,
+        as is a member whose training fails.
+
+        Args:
+            readings: Full training window (dma_column, timestamp_column,
+                feature_columns and target_column) for any subset of keys
+            force: Retrain every key present in readings
+
+        Returns:
+            Index entries of the members that were (re)trained
+        """
+        frame = readings.copy()
+        frame[self.timestamp_column] = pd.to_datetime(frame[self.timestamp_column])
+        frame[self.dma_column] = frame[self.dma_column].astype(str)
+        frame["_fleet_key"] = frame[self.dma_column].map(self.key_for)
+
+        jobs = []
+        for key, group in frame.groupby("_fleet_key", sort=False):
+            watermark = group[self.timestamp_column].max().isoformat()
+            current = self.index.get(key)
+            if not force and current is not None and current["watermark"] >= watermark:
+                continue
+            if current is not None and not self._covers_history(current, group):
+                logger.warning(f"Skipping fleet member {key}: readings do not cover its previous training window")
+                continue
+            if len(group) < self.min_rows:
+                logger.info(f"Skipping fleet member {key}: {len(group)} rows < {self.min_rows}")
+                continue
+
+            version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            dma_watermarks = group.groupby(self.dma_column)[self.timestamp_column].max()
+            jobs.append({
+                "key": key,
+                "frame": group.sort_values(self.timestamp_column).drop(columns="_fleet_key"),
+                "target_dir": str(self.root / _safe_name(key) / version),
+                "watermark": watermark,
+                "dma_watermarks": {dma_id: ts.isoformat() for dma_id, ts in dma_watermarks.items()},
+                "feature_columns": self.feature_columns,
+                "target_column": self.target_column,
+                "timestamp_column": self.timestamp_column,
+                "detector_kwargs": self.detector_kwargs,
+                "forecaster_kwargs": self.forecaster_kwargs,
+            })
+
+        if not jobs:
+            return {}
+
+        if self.max_workers == 1 or len(jobs) == 1:
+            outcomes = []
+            for job in jobs:
+                try:
+                    outcomes.append((job, _train_fleet_member(job), None))
+                except Exception as e:
+                    outcomes.append((job, None, e))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [(job, pool.submit(_train_fleet_member, job)) for job in jobs]
+                outcomes = []
+                for job, future in futures:
+                    try:
+                        outcomes.append((job, future.result(), None))
+                    except Exception as e:
+                        outcomes.append((job, None, e))
+
+        trained = {}
+        for job, result, error in outcomes:
+            key = job["key"]
+            if error is not None:
+                logger.error(f"Training fleet member {key} failed: {error}")
+                shutil.rmtree(job["target_dir"], ignore_errors=True)
+                continue
+            previous = self.index.get(key)
+            self.index[key] = result
+            trained[key] = result
+            with self._lock:
+                for kind in ("detector", "forecaster"):
+                    self._loaded.pop((key, kind), None)
+            if previous is not None and previous["version"] != result["version"]:
+                shutil.rmtree(self.root / _safe_name(key) / previous["version"], ignore_errors=True)
+
+        if trained:
+            self._write_index()
+        logger.info(f"Trained {len(trained)} of {len(jobs)} fleet members")
+        return trained
+
+    def _covers_history(self, entry: Dict[str, Any], group: pd.DataFrame) -> bool:
+        """Whether group reaches back into the data each member DMA was last trained on"""
+        timestamps = group.groupby(self.dma_column)[self.timestamp_column].min()
+        for dma_id, watermark in entry.get("dma_watermarks", {}).items():
+            first = timestamps.get(dma_id)
+            if first is None or first > pd.Timestamp(watermark):
+                return False
+        return True
+
+    def _get(self, dma_id: str, kind: str) -> Optional[BaseModel]:
+        key = self.key_for(dma_id)
+        cache_key = (key, kind)
+
+        with self._lock:
+            model = self._loaded.get(cache_key)
+            if model is not None:
+                self._loaded.move_to_end(cache_key)
+                self.stats["hits"] += 1
+                return model
+
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        model_class = AnomalyDetector if kind == "detector" else TimeSeriesForecaster
+        model = model_class().load(str(self.root / _safe_name(key) / entry["version"] / kind))
+
+        with self._lock:
+            self.stats["misses"] += 1
+            self._loaded[cache_key] = model
+            self._loaded.move_to_end(cache_key)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+                self.stats["evictions"] += 1
+        return model
+
+    def get_detector(self, dma_id: str) -> Optional[AnomalyDetector]:
+        """Anomaly detector serving a DMA, or None if untrained"""
+        return self._get(dma_id, "detector")
+
+    def get_forecaster(self, dma_id: str) -> Optional[TimeSeriesForecaster]:
+        """Forecaster serving a DMA, or None if untrained"""
+        return self._get(dma_id, "forecaster")
+
+    def detect_anomaly(self, dma_id: str, reading: Dict) -> Dict:
+        """Detect an anomaly with the DMA's own detector"""
+        detector = self.get_detector(dma_id)
+        if detector is None:
+            return {"error": f"No fleet model for DMA {dma_id}"}
+        return detector.detect_single(reading)
+
+    def forecast(self, dma_id: str, days: int = 7) -> Dict:
+        """Forecast with the DMA's own forecaster"""
+        forecaster = self.get_forecaster(dma_id)
+        if forecaster is None:
+            return {"error": f"No fleet model for DMA {dma_id}"}
+        return forecaster.forecast_days(days)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fleet size and LRU statistics"""
+        return {
+            "members": len(self.index),
+            "loaded": len(self._loaded),
+            "max_loaded": self.max_loaded,
+            **self.stats,
+        }
+
+
+def _safe_name(key: str) -> str:
+    """Filesystem-safe directory name for a fleet key"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
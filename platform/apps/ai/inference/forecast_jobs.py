@@ -0,0 +1,267 @@
+"""
+Forecast Job Runner
+Nightly per-DMA Prophet fits with warm starts and a forecast cache
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+import json
+import logging
+import shutil
+import threading
+
+import pandas as pd
+
+from ..models.timeseries import ProphetForecaster
+
+logger = logging.getLogger(__name__)
+
+
+def _fit_forecast_member(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fit, save and forecast one DMA
+
+    Module-level so it can run in a worker process.
+    """
+    target = Path(job["target_dir"])
+    forecaster = ProphetForecaster(**job["forecaster_kwargs"])
+    forecaster.fit(job["series"], init=job["warm_start"])
+
+    target.mkdir(parents=True)
+    forecaster.save(str(target / "model"))
+
+    forecast = _forecast_dict(forecaster, job["horizon"])
+    return {
+        "dma_id": job["dma_id"],
+        "version": target.name,
+        "watermark": job["watermark"],
+        "n_rows": int(len(job["series"])),
+        "trained_at": datetime.now().isoformat(),
+        "warm_started": job["warm_start"] is not None,
+        "warm_start": forecaster.get_warm_start(),
+        "horizon": job["horizon"],
+        "forecast": forecast,
+    }
+
+
+def _forecast_dict(forecaster: ProphetForecaster, days: int) -> Dict[str, Any]:
+    """Forecast shaped like TimeSeriesForecaster.forecast_days()"""
+    result = forecaster.predict(pd.DataFrame({"periods": [days]}))
+    return {
+        "dates": result.details["dates"],
+        "predictions": [float(v) for v in result.predictions],
+        "lower_bound": [float(v) for v in result.details["lower_bound"]],
+        "upper_bound": [float(v) for v in result.details["upper_bound"]],
+        "confidence": result.confidence,
+    }
+
+
+class ForecastJobRunner:
+    """
+    Per-DMA Prophet forecasting job
+
+    ``run`` resamples each DMA's readings to a daily series and fits one
+    ProphetForecaster per DMA across a process pool. Each fit is
+    warm-started from the previous run's Stan parameters, so a nightly
+    refit on one more day of data converges in a fraction of a cold fit.
+    DMAs whose data watermark (latest reading timestamp) has not moved
+    are skipped.
+
+    Every run stores the fitted model and a forecast for ``horizon`` days.
+    ``get_forecast`` serves requests from that cache keyed by
+    (DMA, watermark, days), slicing the stored horizon; a longer horizon
+    is computed once from the saved model and cached, never refitted.
+
+    Layout::
+
+        <model_dir>/forecasts/index.json
+        <model_dir>/forecasts/<dma>/<version>/model/   artifact
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(
+        self,
+        model_dir: str,
+        target_column: str = "loss_volume",
+        timestamp_column: str = "timestamp",
+        dma_column: str = "dma_id",
+        freq: str = "D",
+        horizon: int = 30,
+        max_workers: Optional[int] = None,
+        min_periods: int = 14,
+        cache_size: int = 4096,
+        forecaster_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.root = Path(model_dir) / "forecasts"
+        self.target_column = target_column
+        self.timestamp_column = timestamp_column
+        self.dma_column = dma_column
+        self.freq = freq
+        self.horizon = horizon
+        self.max_workers = max_workers
+        self.min_periods = min_periods
+        self.cache_size = cache_size
+        self.forecaster_kwargs = forecaster_kwargs or {}
+
+        self.index: Dict[str, Dict[str, Any]] = self._read_index()
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "fits": 0, "warm_starts": 0}
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        path = self.root / self.INDEX_NAME
+        if path.exists():
+            return json.loads(path.read_text())
+        return {}
+
+    def _write_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{self.INDEX_NAME}.tmp"
+        tmp.write_text(json.dumps(self.index, indent=2))
+        tmp.replace(self.root / self.INDEX_NAME)
+
+    def _series(self, group: pd.DataFrame) -> pd.DataFrame:
+        """Readings resampled to one Prophet (ds, y) row per period"""
+        series = (
+            group.set_index(self.timestamp_column)[self.target_column]
+            .resample(self.freq)
+            .sum(min_count=1)
+            .dropna()
+        )
+        return pd.DataFrame({"ds": series.index, "y": series.to_numpy()})
+
+    def run(
+        self,
+        readings: pd.DataFrame,
+        dma_ids: Optional[Sequence[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Refit DMAs whose data moved and refresh their cached forecasts
+
+        Args:
+            readings: Rows with dma_column, timestamp_column and target_column
+            dma_ids: Restrict the run to these DMAs
+            force: Refit even if the watermark is unchanged
+
+        Returns:
+            Index entries of the DMAs that were refitted
+        """
+        frame = readings.copy()
+        frame[self.timestamp_column] = pd.to_datetime(frame[self.timestamp_column])
+        frame[self.dma_column] = frame[self.dma_column].astype(str)
+        if dma_ids is not None:
+            frame = frame[frame[self.dma_column].isin([str(d) for d in dma_ids])]
+
+        jobs = []
+        for dma_id, group in frame.groupby(self.dma_column, sort=False):
+            watermark = group[self.timestamp_column].max().isoformat()
+            current = self.index.get(dma_id)
+            if not force and current is not None and current["watermark"] >= watermark:
+                continue
+
+            series = self._series(group)
+            if len(series) < self.min_periods:
+                logger.info(f"Skipping forecast for {dma_id}: {len(series)} periods < {self.min_periods}")
+                continue
+
+            version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            jobs.append({
+                "dma_id": dma_id,
+                "series": series,
+                "target_dir": str(self.root / _safe_name(dma_id) / version),
+                "watermark": watermark,
+                "horizon": self.horizon,
+                "warm_start": current.get("warm_start") if current else None,
+                "forecaster_kwargs": self.forecaster_kwargs,
+            })
+
+        if not jobs:
+            return {}
+
+        if self.max_workers == 1 or len(jobs) == 1:
+            results = [_fit_forecast_member(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_fit_forecast_member, jobs))
+
+        fitted = {}
+        for result in results:
+            dma_id = result["dma_id"]
+            previous = self.index.get(dma_id)
+            forecast = result.pop("forecast")
+            self.index[dma_id] = result
+            fitted[dma_id] = result
+            self._store(dma_id, result["watermark"], result["horizon"], forecast)
+            self.stats["fits"] += 1
+            self.stats["warm_starts"] += int(result["warm_started"])
+            if previous is not None and previous["version"] != result["version"]:
+                shutil.rmtree(self.root / _safe_name(dma_id) / previous["version"], ignore_errors=True)
+
+        self._write_index()
+        logger.info(f"Fitted {len(fitted)} DMA forecasters ({self.stats['warm_starts']} warm-started so far)")
+        return fitted
+
+    def _store(self, dma_id: str, watermark: str, days: int, forecast: Dict[str, Any]) -> None:
+        with self._lock:
+            key = (dma_id, watermark, days)
+            self._cache[key] = forecast
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _lookup(self, dma_id: str, watermark: str, days: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            exact = self._cache.get((dma_id, watermark, days))
+            if exact is not None:
+                self._cache.move_to_end((dma_id, watermark, days))
+                return exact
+            # A longer cached horizon covers a shorter request
+            for (cached_dma, cached_mark, cached_days), forecast in self._cache.items():
+                if cached_dma == dma_id and cached_mark == watermark and cached_days > days:
+                    return {
+                        key: value[:days] if isinstance(value, list) else value
+                        for key, value in forecast.items()
+                    }
+        return None
+
+    def get_forecast(self, dma_id: str, days: int = 7) -> Dict[str, Any]:
+        """
+        Cached forecast for a DMA's latest fitted data
+
+        Never refits: horizons beyond the cached one are predicted from
+        the saved model once and cached.
+        """
+        entry = self.index.get(str(dma_id))
+        if entry is None:
+            return {"error": f"No forecast model for DMA {dma_id}"}
+
+        forecast = self._lookup(str(dma_id), entry["watermark"], days)
+        if forecast is not None:
+            self.stats["hits"] += 1
+            return forecast
+
+        self.stats["misses"] += 1
+        forecaster = ProphetForecaster().load(
+            str(self.root / _safe_name(str(dma_id)) / entry["version"] / "model")
+        )
+        forecast = _forecast_dict(forecaster, max(days, entry.get("horizon", days)))
+        self._store(str(dma_id), entry["watermark"], len(forecast["predictions"]), forecast)
+        return self._lookup(str(dma_id), entry["watermark"], days) or forecast
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fitted DMA count and cache statistics"""
+        return {
+            "dmas": len(self.index),
+            "cached": len(self._cache),
+            **self.stats,
+        }
+
+
+def _safe_name(key: str) -> str:
+    """Filesystem-safe directory name for a DMA id"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
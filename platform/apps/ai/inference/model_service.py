@@ -3,9 +3,11 @@ AI Model Service
 Unified service for AI model inference
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable
 from pathlib import Path
 import logging
+import os
+import threading
 import pandas as pd
 import numpy as np
 
@@ -15,7 +17,15 @@ from ..models import (
     WaterLossClassifier,
     TimeSeriesForecaster,
 )
+from ..models.anomaly import StreamingAnomalyMonitor
 from ..models.base import ModelMetrics
+from .batching import MicroBatcher
+from .executor import ModelExecutor, ModelTimeoutError
+from .registry import ModelRegistry, ModelRecord
+from .forecast_jobs import ForecastJobRunner
+from .feature_store import FeatureStore
+from .analysis_jobs import AnalysisJobRunner, generate_recommendations
+from .result_cache import ResultCache, frame_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +35,16 @@ class AIModelService:
     Unified AI Model Service
 
     Provides:
+    - Lazy model loading from a versioned registry
     - Model loading/training
     - Real-time inference
+    - Micro-batched inference for concurrent requests
+    - Streaming per-DMA anomaly detection on committed readings
+    - Cached per-DMA forecasts from the nightly forecast job
+    - Precomputed per-DMA features from the feature store
+    - Stored per-DMA analysis snapshots from the batch analysis job
+    - Result caching keyed by model version and data watermark
+    - Async wrappers that run model calls off the event loop
     - Batch predictions
     - Model management
     """
@@ -38,15 +56,43 @@ class AIModelService:
         "timeseries": TimeSeriesForecaster,
     }
 
-    def __init__(self, model_dir: Optional[str] = None):
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        batch_max_size: int = 32,
+        batch_max_latency_ms: float = 5.0,
+        executor: Optional[ModelExecutor] = None,
+        model_versions: Optional[Dict[str, str]] = None,
+        compact: bool = False,
+        result_cache: Optional[ResultCache] = None,
+    ):
         self.model_dir = Path(model_dir) if model_dir else Path("./models")
         self.models: Dict[str, Any] = {}
         self._initialized = False
+        self.registry = ModelRegistry(str(self.model_dir), self.MODEL_TYPES)
+        self.model_versions = model_versions or {}
+        self.compact = compact
+        self.records: Dict[str, ModelRecord] = {}
+        # Minibatch update counters of each model as it was loaded or published
+        self._saved_counters: Dict[str, Optional[tuple]] = {}
+        self._load_locks = {model_type: threading.Lock() for model_type in self.MODEL_TYPES}
+        self.batch_max_size = batch_max_size
+        self.batch_max_latency_ms = batch_max_latency_ms
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self.executor = executor or ModelExecutor()
+        self.streaming = StreamingAnomalyMonitor()
+        self.forecast_jobs = ForecastJobRunner(str(self.model_dir))
+        self.feature_store = FeatureStore(self.model_dir / "features")
+        self.analysis_jobs = AnalysisJobRunner(str(self.model_dir))
+        self.result_cache = result_cache or ResultCache()
 
     def initialize(self, use_demo_models: bool = True) -> None:
         """
         Initialize AI service with models
 
+        Not needed for serving: models are loaded lazily on first use. Use
+        this for offline training or to load every model eagerly.
+
         Args:
             use_demo_models: If True, create demo models with synthetic data
         """
@@ -103,7 +149,7 @@ class AIModelService:
 
         # Train Time Series Forecaster
         logger.info("Training Time Series model...")
-        dates = pd.date_range(start="2025-01-01", periods=n_samples, freq="H")
+        dates = pd.date_range(start="2025-01-01", periods=n_samples, freq="h")
         ts_df = pd.DataFrame({
             "ds": dates,
             "y": df["loss_volume"].values,
@@ -114,21 +160,89 @@ class AIModelService:
         logger.info("Demo models created successfully")
 
     def _load_models(self) -> None:
-        """Load pre-trained models from disk"""
-        for model_type, model_class in self.MODEL_TYPES.items():
-            model_path = self.model_dir / f"{model_type}_model.joblib"
-            if model_path.exists():
-                self.models[model_type] = model_class()
-                self.models[model_type].load(str(model_path))
-                logger.info(f"Loaded {model_type} model from {model_path}")
-
-    def save_models(self) -> None:
-        """Save all models to disk"""
-        self.model_dir.mkdir(parents=True, exist_ok=True)
+        """Load the published version of every model type"""
+        for model_type in self.MODEL_TYPES:
+            self.get_model(model_type)
+
+    def save_models(self) -> Dict[str, str]:
+        """
+        Publish all in-memory models as new registry versions
+
+        Returns:
+            Dict of model type to published version
+        """
+        published = {}
         for model_type, model in self.models.items():
-            model_path = self.model_dir / f"{model_type}_model.joblib"
-            model.save(str(model_path))
-            logger.info(f"Saved {model_type} model to {model_path}")
+            version = self.registry.publish(model_type, model)
+            self.records[model_type] = ModelRecord(
+                model_type=model_type,
+                version=version,
+                path=str(self.registry.version_dir(model_type, version)),
+                size_bytes=self.registry.artifact_size(model_type, version),
+                loaded=True,
+                meta=self.registry.read_meta(model_type, version),
+            )
+            self._saved_counters[model_type] = _update_counters(model)
+            published[model_type] = version
+        return published
+
+    def get_model(self, model_type: str) -> Optional[Any]:
+        """
+        Get a model, loading it from the registry on first use
+
+        Returns:
+            The model, or None if no version is published
+        """
+        model = self.models.get(model_type)
+        if model is not None:
+            return model
+
+        with self._load_locks[model_type]:
+            if model_type in self.models:
+                return self.models[model_type]
+
+            try:
+                model, record = self.registry.load(model_type, self.model_versions.get(model_type))
+            except Exception as e:
+                logger.error(f"Failed to load {model_type} model: {e}")
+                self.records[model_type] = ModelRecord(model_type=model_type, error=str(e))
+                return None
+
+            if self.compact:
+                model.set_compact()
+            self.records[model_type] = record
+            self._saved_counters[model_type] = _update_counters(model)
+            self.models[model_type] = model
+            return model
+
+    def prewarm(
+        self,
+        model_types: Optional[Iterable[str]] = None,
+        background: bool = True,
+    ) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            model_types: Model types to load (default: all)
+            background: Load in a daemon thread instead of blocking
+
+        Returns:
+            The loader thread when background is True
+        """
+        types = list(model_types) if model_types is not None else list(self.MODEL_TYPES)
+
+        def _load() -> None:
+            for model_type in types:
+                self.get_model(model_type)
+
+        if not background:
+            _load()
+            return None
+
+        thread = threading.Thread(target=_load, name="waris-model-prewarm", daemon=True)
+        thread.start()
+        return thread
 
     def detect_anomaly(self, reading: Dict) -> Dict:
         """
@@ -140,15 +254,111 @@ class AIModelService:
         Returns:
             Dict with is_anomaly, probability, confidence
         """
-        if "anomaly" not in self.models:
+        model = self.get_model("anomaly")
+        if model is None:
             return {"error": "Anomaly model not loaded"}
 
         try:
-            return self.models["anomaly"].detect_single(reading)
+            return model.detect_single(reading)
         except Exception as e:
             logger.error(f"Anomaly detection error: {e}")
             return {"error": str(e)}
 
+    def detect_anomaly_batch(self, readings: List[Dict]) -> List[Dict]:
+        """
+        Detect anomalies in a batch of readings with one model call
+
+        Args:
+            readings: List of dicts with flow_in, flow_out, pressure, etc.
+
+        Returns:
+            List of dicts with is_anomaly, probability, confidence
+        """
+        model = self.get_model("anomaly")
+        if model is None:
+            return [{"error": "Anomaly model not loaded"} for _ in readings]
+
+        try:
+            return model.detect_batch(readings)
+        except Exception as e:
+            logger.error(f"Anomaly detection error: {e}")
+            return [{"error": str(e)} for _ in readings]
+
+    async def detect_anomaly_batched(self, reading: Dict) -> Dict:
+        """
+        Detect anomaly in a single reading through the micro-batcher
+
+        Concurrent callers are coalesced into one batched prediction.
+        """
+        return await self._get_batcher("anomaly", self.detect_anomaly_batch).submit(reading)
+
+    def ingest_readings(self, readings: List[Dict]) -> List[Dict]:
+        """
+        Score committed readings with each DMA's streaming detector
+
+        Called as the ETL loader commits readings; every reading updates its
+        DMA's running statistics in constant time. Timestamped readings are
+        also added to the feature store.
+
+        Args:
+            readings: List of dicts with dma_id, flow_in, flow_out, pressure, etc.
+
+        Returns:
+            List of dicts with dma_id, is_anomaly, anomaly_score
+        """
+        self._update_pattern_model(readings)
+        self._update_feature_store(readings)
+        try:
+            return self.streaming.ingest_batch(readings)
+        except Exception as e:
+            logger.error(f"Streaming anomaly detection error: {e}")
+            return [{"error": str(e)} for _ in readings]
+
+    def _update_pattern_model(self, readings: List[Dict]) -> None:
+        """Fold readings into a minibatch pattern model; refit in the background on drift"""
+        model = self.models.get("pattern")
+        if not readings or model is None or getattr(model, "approach", None) != "minibatch":
+            return
+
+        try:
+            model.partial_fit_array(model.readings_to_array(readings))
+            # The update counters in _model_version already moved every key;
+            # drop the unreachable entries now rather than at TTL
+            self.result_cache.invalidate("patterns:")
+            self.result_cache.invalidate("analyze:")
+            if model.needs_refit:
+                model.start_refit()
+        except Exception as e:
+            logger.error(f"Pattern model update error: {e}")
+
+    def _update_feature_store(self, readings: List[Dict]) -> None:
+        """Append features for timestamped readings"""
+        timestamped = [r for r in readings if r.get("timestamp") is not None and r.get("dma_id") is not None]
+        if not timestamped:
+            return
+
+        try:
+            self.feature_store.update(timestamped)
+        except Exception as e:
+            logger.error(f"Feature store update error: {e}")
+
+    def get_dma_features(self, dma_id: str, hours: int = 168) -> pd.DataFrame:
+        """
+        Stored features for a DMA's latest readings
+
+        Args:
+            dma_id: DMA identifier
+            hours: Length of the window ending at the latest reading
+
+        Returns:
+            DataFrame of readings with derived features (empty if none)
+        """
+        latest = self.feature_store.get_latest(dma_id)
+        if latest is None:
+            return pd.DataFrame()
+        start = latest["timestamp"] - pd.Timedelta(hours=hours)
+        return self.feature_store.get_features(dma_id, start=start)
+
     def recognize_pattern(self, data: pd.DataFrame) -> Dict:
         """
         Recognize patterns in data
@@ -159,12 +369,37 @@ class AIModelService:
         Returns:
             Dict with patterns and summary
         """
-        if "pattern" not in self.models:
+        model = self.get_model("pattern")
+        if model is None:
             return {"error": "Pattern model not loaded"}
 
+        fingerprint = frame_fingerprint(data)
+        if fingerprint is None:
+            return self._recognize_pattern(model, data)
+        key = ResultCache.make_key("patterns", model_version=self._model_version(["pattern"]), data=fingerprint)
+        return self.result_cache.get_or_compute(key, lambda: self._recognize_pattern(model, data))
+
+    def get_dma_patterns(self, dma_id: str, hours: int = 168) -> Dict:
+        """
+        Recognize patterns in a DMA's latest readings from the feature store
+
+        Cached until the DMA's data watermark or the pattern model changes.
+        """
+        latest = self.feature_store.get_latest(dma_id)
+        if latest is None:
+            return {"error": f"No readings for DMA {dma_id}"}
+
+        key = ResultCache.make_key(
+            "patterns", dma_id, self._model_version(["pattern"]), latest["timestamp"].isoformat(), hours=hours,
+        )
+        return self.result_cache.get_or_compute(
+            key, lambda: self.recognize_pattern(self.get_dma_features(dma_id, hours))
+        )
+
+    def _recognize_pattern(self, model: Any, data: pd.DataFrame) -> Dict:
         try:
-            result = self.models["pattern"].predict(data)
-            summary = self.models["pattern"].get_pattern_summary(data)
+            result = model.predict(data)
+            summary = model.get_pattern_summary(data, result=result)
             return {
                 "patterns": result.details.get("pattern_labels_th", []),
                 "summary": summary.to_dict("records"),
@@ -184,52 +419,293 @@ class AIModelService:
         Returns:
             Dict with loss_type, probability
         """
-        if "classification" not in self.models:
+        model = self.get_model("classification")
+        if model is None:
             return {"error": "Classification model not loaded"}
 
         try:
-            return self.models["classification"].classify_single(reading)
+            return model.classify_single(reading)
         except Exception as e:
             logger.error(f"Classification error: {e}")
             return {"error": str(e)}
 
-    def forecast(self, days: int = 7) -> Dict:
+    def classify_loss_batch(self, readings: List[Dict]) -> List[Dict]:
+        """
+        Classify water loss type for a batch of readings with one model call
+
+        Args:
+            readings: List of dicts with features
+
+        Returns:
+            List of dicts with loss_type, probability
+        """
+        model = self.get_model("classification")
+        if model is None:
+            return [{"error": "Classification model not loaded"} for _ in readings]
+
+        try:
+            return model.classify_batch(readings)
+        except Exception as e:
+            logger.error(f"Classification error: {e}")
+            return [{"error": str(e)} for _ in readings]
+
+    async def classify_loss_batched(self, reading: Dict) -> Dict:
+        """
+        Classify water loss type through the micro-batcher
+
+        Concurrent callers are coalesced into one batched prediction.
+        """
+        return await self._get_batcher("classification", self.classify_loss_batch).submit(reading)
+
+    def _get_batcher(self, model_type: str, predict_batch) -> MicroBatcher:
+        """Get or create the micro-batcher for a model type"""
+        if model_type not in self._batchers:
+            self._batchers[model_type] = MicroBatcher(
+                predict_batch,
+                max_batch_size=self.batch_max_size,
+                max_latency_ms=self.batch_max_latency_ms,
+                executor=self.executor.pool,
+                name=f"{model_type}_batcher",
+            )
+        return self._batchers[model_type]
+
+    def get_batching_metrics(self) -> Dict[str, Dict]:
+        """Get batch fill rate and queue delay metrics per model type"""
+        return {
+            model_type: batcher.get_metrics()
+            for model_type, batcher in self._batchers.items()
+        }
+
+    def run_forecast_jobs(self, readings: pd.DataFrame, force: bool = False) -> Dict[str, Dict]:
+        """
+        Refit per-DMA forecasters whose data moved and refresh the forecast cache
+
+        Meant for the nightly job; see ForecastJobRunner.
+        """
+        return self.forecast_jobs.run(readings, force=force)
+
+    def forecast(self, days: int = 7, dma_id: Optional[str] = None) -> Dict:
         """
         Forecast water loss for future days
 
         Args:
             days: Number of days to forecast
+            dma_id: Serve the DMA's cached forecast when the forecast job
+                has fitted it; otherwise use the network-wide model
 
         Returns:
             Dict with dates, predictions, bounds
         """
-        if "timeseries" not in self.models:
+        entry = self.forecast_jobs.index.get(str(dma_id)) if dma_id is not None else None
+        if entry is not None:
+            key = ResultCache.make_key("forecast", dma_id, entry["version"], entry["watermark"], days=days)
+            return self.result_cache.get_or_compute(key, lambda: self._dma_forecast(dma_id, days))
+
+        model = self.get_model("timeseries")
+        if model is None:
             return {"error": "Time series model not loaded"}
 
+        # Forecast dates start tomorrow, so the day is part of the key
+        key = ResultCache.make_key(
+            "forecast", model_version=self._model_version(["timeseries"]),
+            days=days, date=pd.Timestamp.now().date().isoformat(),
+        )
+        return self.result_cache.get_or_compute(key, lambda: self._network_forecast(model, days))
+
+    def _dma_forecast(self, dma_id: str, days: int) -> Dict:
+        try:
+            return self.forecast_jobs.get_forecast(dma_id, days)
+        except Exception as e:
+            logger.error(f"Cached forecast error for {dma_id}: {e}")
+            return {"error": str(e)}
+
+    def _network_forecast(self, model: Any, days: int) -> Dict:
         try:
-            return self.models["timeseries"].forecast_days(days)
+            return model.forecast_days(days)
         except Exception as e:
             logger.error(f"Forecast error: {e}")
             return {"error": str(e)}
 
+    def run_analysis_jobs(
+        self,
+        data: Optional[pd.DataFrame] = None,
+        hours: int = 168,
+        force: bool = False,
+    ) -> Dict[str, Dict]:
+        """
+        Analyze every DMA whose data moved and store its snapshot
+
+        Meant for a scheduled job; see AnalysisJobRunner. Models loaded
+        from the registry are analyzed across a process pool.
+
+        Args:
+            data: Feature rows of all DMAs; defaults to the last ``hours``
+                of each DMA in the feature store
+            force: Re-analyze DMAs whose watermark is unchanged
+
+        Returns:
+            Snapshots of the DMAs that were analyzed
+        """
+        if data is None:
+            frames = [self.get_dma_features(dma_id, hours) for dma_id in self.feature_store.dma_ids()]
+            frames = [frame for frame in frames if len(frame)]
+            if not frames:
+                return {}
+            data = pd.concat(frames, ignore_index=True)
+
+        models = {}
+        for model_type in ("anomaly", "pattern", "classification"):
+            model = self.get_model(model_type)
+            if model is not None:
+                models[model_type] = model
+
+        forecasts = {}
+        network_forecast = None
+        for dma_id in data["dma_id"].astype(str).unique():
+            if dma_id in self.forecast_jobs.index:
+                forecasts[dma_id] = self.forecast(7, dma_id=dma_id)
+            elif self.get_model("timeseries") is not None:
+                # The network-wide model gives every DMA the same forecast
+                if network_forecast is None:
+                    network_forecast = self.forecast(7)
+                forecasts[dma_id] = network_forecast
+
+        versions = {dma_id: self._analysis_version(dma_id) for dma_id in data["dma_id"].astype(str).unique()}
+        return self.analysis_jobs.run(
+            data, models, forecasts, self._model_source(models), force=force, model_versions=versions,
+        )
+
+    def _model_source(self, models: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Registry versions of the given models, if all were loaded from it
+
+        None when a minibatch model was updated in memory since it was
+        loaded: workers would score with the older registry artifact while
+        the snapshots record the in-memory version, so the analysis runs
+        in-process on the updated model instead.
+        """
+        versions = {}
+        for model_type, model in models.items():
+            record = self.records.get(model_type)
+            if record is None or record.version is None or record.path is None:
+                return None
+            if _update_counters(model) != self._saved_counters.get(model_type):
+                return None
+            versions[model_type] = record.version
+        return {
+            "model_dir": str(self.model_dir),
+            "versions": versions,
+            "classes": {model_type: self.MODEL_TYPES[model_type] for model_type in versions},
+        }
+
+    def get_dma_ranking(self, limit: Optional[int] = None) -> List[Dict]:
+        """DMAs ordered by risk from the stored analysis snapshots"""
+        return self.analysis_jobs.get_ranking(limit)
+
     def get_model_info(self) -> Dict[str, Dict]:
-        """Get information about all loaded models"""
+        """
+        Get registry and runtime information for every model type
+
+        Includes version, load time and artifact size; does not trigger loading.
+        """
         info = {}
-        for model_type, model in self.models.items():
-            info[model_type] = model.get_info()
+        for model_type in self.MODEL_TYPES:
+            record = self.records.get(model_type)
+            if record is None:
+                version = self.model_versions.get(model_type) or self.registry.latest_version(model_type)
+                record = ModelRecord(
+                    model_type=model_type,
+                    version=version,
+                    size_bytes=self.registry.artifact_size(model_type, version) if version else 0,
+                )
+            entry = record.to_dict()
+            model = self.models.get(model_type)
+            if model is not None:
+                entry["loaded"] = True
+                entry["model"] = model.get_info()
+            info[model_type] = entry
         return info
 
-    def analyze_dma(self, dma_id: str, data: pd.DataFrame) -> Dict:
+    def analyze_dma(self, dma_id: str, data: Optional[pd.DataFrame] = None) -> Dict:
         """
         Comprehensive AI analysis for a DMA
 
+        Without data, serves the DMA's stored analysis snapshot; the
+        analysis is rerun (on the last week of features from the feature
+        store) only when the DMA's data watermark moved past the snapshot.
+
         Args:
             dma_id: DMA identifier
-            data: Historical data for the DMA
+            data: Historical data for the DMA; analyzed directly, no snapshot
 
         Returns:
             Comprehensive analysis results
         """
+        if data is not None:
+            fingerprint = frame_fingerprint(data)
+            if fingerprint is None:
+                return self._analyze(dma_id, data)
+            key = ResultCache.make_key("analyze", dma_id, self._analysis_version(dma_id), data=fingerprint)
+            return self.result_cache.get_or_compute(key, lambda: self._analyze(dma_id, data))
+
+        latest = self.feature_store.get_latest(dma_id)
+        if latest is None:
+            snapshot = self.analysis_jobs.get_snapshot(dma_id, model_version=self._analysis_version(dma_id))
+            return snapshot if snapshot is not None else self._analyze(dma_id, pd.DataFrame())
+
+        watermark = latest["timestamp"].isoformat()
+        key = ResultCache.make_key("analyze", dma_id, self._analysis_version(dma_id), watermark)
+        return self.result_cache.get_or_compute(key, lambda: self._analysis_snapshot(dma_id, watermark))
+
+    def _analysis_snapshot(self, dma_id: str, watermark: str) -> Dict:
+        """Stored snapshot at the watermark and model versions, or a fresh analysis stored as one"""
+        version = self._analysis_version(dma_id)
+        snapshot = self.analysis_jobs.get_snapshot(dma_id, watermark=watermark, model_version=version)
+        if snapshot is not None:
+            return snapshot
+        analysis = self._analyze(dma_id, self.get_dma_features(dma_id))
+        return self.analysis_jobs.store(dma_id, watermark, analysis, model_version=version)
+
+    def _analysis_version(self, dma_id: str) -> str:
+        """Versions of every model an analysis uses, the DMA's forecaster included"""
+        version = self._model_version(["anomaly", "pattern", "classification", "timeseries"])
+        entry = self.forecast_jobs.index.get(str(dma_id))
+        return f"{version},forecast={entry['version']}" if entry is not None else version
+
+    def _model_version(self, model_types: Iterable[str]) -> str:
+        """
+        Cache key part identifying the loaded models
+
+        Registry versions where known; models built in-process (demo,
+        tests) are told apart by identity, so replacing one changes the key.
+        Minibatch pattern models change in place (partial fits, background
+        refits), so their update counters are part of the version too: a
+        refit finishing between requests moves the key. The counters are
+        process-local, so the Redis tier does not see in-place updates
+        made by another process's model under the same registry version.
+        """
+        parts = []
+        for model_type in model_types:
+            model = self.get_model(model_type)
+            record = self.records.get(model_type)
+            if model is None:
+                version = "none"
+            elif record is not None and record.version:
+                version = record.version
+            else:
+                version = f"local{id(model):x}"
+            counters = _update_counters(model)
+            if counters is not None:
+                version += f"+{counters[0]}.{counters[1]}"
+            parts.append(f"{model_type}={version}")
+        return ",".join(parts)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Result cache size and hit/miss metrics"""
+        return self.result_cache.get_stats()
+
+    def _analyze(self, dma_id: str, data: pd.DataFrame) -> Dict:
+        """Run every model family on one DMA's data"""
         results = {
             "dma_id": dma_id,
             "analysis_timestamp": pd.Timestamp.now().isoformat(),
@@ -241,21 +717,23 @@ class AIModelService:
         }
 
         # Anomaly detection on recent data
-        if "anomaly" in self.models and len(data) > 0:
+        if self.get_model("anomaly") is not None and len(data) > 0:
             recent = data.tail(1).iloc[0].to_dict()
             results["anomalies"] = [self.detect_anomaly(recent)]
 
         # Pattern recognition
-        if "pattern" in self.models and len(data) >= 10:
+        if self.get_model("pattern") is not None and len(data) >= 10:
             results["patterns"] = self.recognize_pattern(data)
 
         # Classification of recent loss
-        if "classification" in self.models and len(data) > 0:
+        if self.get_model("classification") is not None and len(data) > 0:
             recent = data.tail(1).iloc[0].to_dict()
             results["classification"] = self.classify_loss(recent)
 
-        # Forecast
-        if "timeseries" in self.models:
+        # Forecast: the DMA's cached nightly forecast if there is one
+        if str(dma_id) in self.forecast_jobs.index:
+            results["forecast"] = self.forecast(7, dma_id=dma_id)
+        elif self.get_model("timeseries") is not None:
             results["forecast"] = self.forecast(7)
 
         # Generate recommendations based on analysis
@@ -263,56 +741,88 @@ class AIModelService:
 
         return results
 
+    async def _run_async(self, model_type: str, fn, *args) -> Any:
+        """Run a blocking service method in the model executor"""
+        try:
+            return await self.executor.run(model_type, fn, *args)
+        except ModelTimeoutError as e:
+            logger.error(f"{model_type} inference timed out: {e}")
+            return {"error": str(e)}
+
+    async def detect_anomaly_async(self, reading: Dict) -> Dict:
+        """Non-blocking detect_anomaly"""
+        return await self._run_async("anomaly", self.detect_anomaly, reading)
+
+    async def recognize_pattern_async(self, data: pd.DataFrame) -> Dict:
+        """Non-blocking recognize_pattern"""
+        return await self._run_async("pattern", self.recognize_pattern, data)
+
+    async def classify_loss_async(self, reading: Dict) -> Dict:
+        """Non-blocking classify_loss"""
+        return await self._run_async("classification", self.classify_loss, reading)
+
+    async def forecast_async(self, days: int = 7, dma_id: Optional[str] = None) -> Dict:
+        """Non-blocking forecast"""
+        if dma_id is None:
+            return await self._run_async("timeseries", self.forecast, days)
+        return await self._run_async("timeseries", self.forecast, days, dma_id)
+
+    async def analyze_dma_async(self, dma_id: str, data: Optional[pd.DataFrame] = None) -> Dict:
+        """Non-blocking analyze_dma"""
+        return await self._run_async("analysis", self.analyze_dma, dma_id, data)
+
+    def get_executor_stats(self) -> Dict[str, Dict]:
+        """Get per-model concurrency, timeout and latency statistics"""
+        return self.executor.get_stats()
+
     def _generate_recommendations(self, analysis: Dict) -> List[Dict]:
         """Generate recommendations based on analysis results"""
-        recommendations = []
-
-        # Check anomalies
-        anomalies = analysis.get("anomalies", [])
-        if anomalies and anomalies[0].get("is_anomaly"):
-            recommendations.append({
-                "type": "anomaly",
-                "priority": "high",
-                "message": "ตรวจพบความผิดปกติในข้อมูล",
-                "message_en": "Anomaly detected in recent data",
-                "action": "ตรวจสอบมิเตอร์และท่อในพื้นที่",
-            })
-
-        # Check classification
-        classification = analysis.get("classification", {})
-        if classification.get("loss_type") == "physical":
-            recommendations.append({
-                "type": "physical_loss",
-                "priority": "medium",
-                "message": "สงสัยน้ำสูญเสียทางกายภาพ",
-                "message_en": "Physical loss suspected",
-                "action": "ตรวจสอบท่อในพื้นที่เพื่อหารอยรั่ว",
-            })
-
-        # Check forecast trend
-        forecast = analysis.get("forecast", {})
-        if forecast.get("predictions"):
-            trend = forecast["predictions"]
-            if len(trend) > 1 and trend[-1] > trend[0] * 1.1:
-                recommendations.append({
-                    "type": "trend",
-                    "priority": "low",
-                    "message": "แนวโน้มน้ำสูญเสียเพิ่มขึ้น",
-                    "message_en": "Water loss trend increasing",
-                    "action": "วางแผนตรวจสอบเชิงป้องกัน",
-                })
-
-        return recommendations
+        return generate_recommendations(analysis)
 
 
 # Global service instance
 _service: Optional[AIModelService] = None
 
 
+def _update_counters(model: Any) -> Optional[tuple]:
+    """(n_batches_, n_refits_) of a minibatch pattern model, None for other models"""
+    recognizer = getattr(model, "recognizer", model)
+    if not hasattr(recognizer, "n_refits_"):
+        return None
+    return recognizer.n_batches_, recognizer.n_refits_
+
+
 def get_ai_service() -> AIModelService:
-    """Get or create the global AI service instance"""
+    """
+    Get or create the global AI service instance
+
+    Models load lazily from the registry in WARIS_MODEL_DIR. Set
+    WARIS_AI_PREWARM=1 to start loading them in the background at startup,
+    WARIS_AI_COMPACT=1 to score in float32 (see BaseModel.set_compact),
+    and WARIS_AI_CACHE_REDIS_URL to share cached results between workers.
+    """
     global _service
     if _service is None:
-        _service = AIModelService()
-        _service.initialize(use_demo_models=True)
+        _service = AIModelService(
+            model_dir=os.getenv("WARIS_MODEL_DIR"),
+            compact=os.getenv("WARIS_AI_COMPACT", "").lower() in ("1", "true", "yes"),
+            result_cache=ResultCache(
+                ttl_seconds=float(os.getenv("WARIS_AI_CACHE_TTL", "300")),
+                redis_url=os.getenv("WARIS_AI_CACHE_REDIS_URL"),
+            ),
+        )
+        if os.getenv("WARIS_AI_PREWARM", "").lower() in ("1", "true", "yes"):
+            _service.prewarm(background=True)
     return _service
+
+
+def publish_demo_models(model_dir: Optional[str] = None) -> Dict[str, str]:
+    """
+    Train demo models on synthetic data and publish them to the registry
+
+    Run offline (e.g. at image build or from a training job) so serving
+    workers only ever load artifacts.
+    """
+    service = AIModelService(model_dir=model_dir or os.getenv("WARIS_MODEL_DIR"))
+    service.initialize(use_demo_models=True)
+    return service.save_models()
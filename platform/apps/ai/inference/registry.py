@@ -0,0 +1,175 @@
+"""
+Model Registry
+Versioned model artifacts on disk with lazy, timed loading
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+import json
+import logging
+import time
+
+from ..models.base import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelRecord:
+    """Registry bookkeeping for one model type"""
+    model_type: str
+    version: Optional[str] = None
+    path: Optional[str] = None
+    size_bytes: int = 0
+    loaded: bool = False
+    load_time_ms: Optional[float] = None
+    loaded_at: Optional[datetime] = None
+    error: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary"""
+        return {
+            "model_type": self.model_type,
+            "version": self.version,
+            "path": self.path,
+            "size_bytes": self.size_bytes,
+            "loaded": self.loaded,
+            "load_time_ms": round(self.load_time_ms, 3) if self.load_time_ms is not None else None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "error": self.error,
+            "trained_at": self.meta.get("created_at"),
+        }
+
+
+class ModelRegistry:
+    """
+    Versioned model store
+
+    Layout::
+
+        <root>/<model_type>/<version>/model/      artifact (see models.artifacts)
+        <root>/<model_type>/<version>/meta.json
+        <root>/<model_type>/LATEST
+
+    Models are published offline (training jobs) and only loaded on the
+    request path, so workers never train at startup.
+    """
+
+    ARTIFACT_NAME = "model"
+    LEGACY_ARTIFACT_NAME = "model.joblib"
+    META_NAME = "meta.json"
+    LATEST_NAME = "LATEST"
+
+    def __init__(self, root_dir: str, model_classes: Dict[str, Type[BaseModel]]):
+        self.root_dir = Path(root_dir)
+        self.model_classes = model_classes
+
+    def _type_dir(self, model_type: str) -> Path:
+        if model_type not in self.model_classes:
+            raise ValueError(f"Unknown model type: {model_type}")
+        return self.root_dir / model_type
+
+    def version_dir(self, model_type: str, version: str) -> Path:
+        """Directory holding one published version"""
+        return self._type_dir(model_type) / version
+
+    def list_versions(self, model_type: str) -> List[str]:
+        """List published versions, oldest first"""
+        type_dir = self._type_dir(model_type)
+        if not type_dir.exists():
+            return []
+        return sorted(
+            p.name for p in type_dir.iterdir()
+            if p.is_dir() and (p / self.META_NAME).exists()
+        )
+
+    def latest_version(self, model_type: str) -> Optional[str]:
+        """Get the version the LATEST pointer refers to"""
+        latest = self._type_dir(model_type) / self.LATEST_NAME
+        if latest.exists():
+            version = latest.read_text().strip()
+            if version:
+                return version
+        versions = self.list_versions(model_type)
+        return versions[-1] if versions else None
+
+    def publish(self, model_type: str, model: BaseModel, version: Optional[str] = None) -> str:
+        """
+        Save a fitted model as a new version and point LATEST at it
+
+        Returns:
+            The published version string
+        """
+        if not model.is_fitted:
+            raise ValueError("Cannot publish an unfitted model")
+
+        version = version or datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        target = self.version_dir(model_type, version)
+        if target.exists():
+            raise ValueError(f"{model_type} version {version} already exists")
+        target.mkdir(parents=True)
+
+        model.save(str(target / self.ARTIFACT_NAME))
+        meta = {
+            "model_type": model_type,
+            "version": version,
+            "model_class": type(model).__name__,
+            "model_name": model.name,
+            "model_version": model.version,
+            "feature_names": model.feature_names,
+            "created_at": datetime.now().isoformat(),
+        }
+        (target / self.META_NAME).write_text(json.dumps(meta, indent=2))
+        (self._type_dir(model_type) / self.LATEST_NAME).write_text(version)
+
+        logger.info(f"Published {model_type} model version {version}")
+        return version
+
+    def read_meta(self, model_type: str, version: str) -> Dict[str, Any]:
+        """Read a version's metadata"""
+        return json.loads((self.version_dir(model_type, version) / self.META_NAME).read_text())
+
+    def artifact_size(self, model_type: str, version: str) -> int:
+        """Total size in bytes of a version's files"""
+        return sum(
+            p.stat().st_size for p in self.version_dir(model_type, version).rglob("*") if p.is_file()
+        )
+
+    def load(self, model_type: str, version: Optional[str] = None) -> tuple:
+        """
+        Load a model version
+
+        Returns:
+            Tuple of (model, ModelRecord)
+
+        Raises:
+            FileNotFoundError: If no version is published
+        """
+        version = version or self.latest_version(model_type)
+        if version is None:
+            raise FileNotFoundError(f"No published {model_type} model in {self.root_dir}")
+
+        path = self.version_dir(model_type, version)
+        started = time.perf_counter()
+        artifact = path / self.ARTIFACT_NAME
+        if not artifact.exists():
+            artifact = path / self.LEGACY_ARTIFACT_NAME
+        model = self.model_classes[model_type]()
+        model.load(str(artifact))
+        load_time_ms = (time.perf_counter() - started) * 1000
+
+        record = ModelRecord(
+            model_type=model_type,
+            version=version,
+            path=str(path),
+            size_bytes=self.artifact_size(model_type, version),
+            loaded=True,
+            load_time_ms=load_time_ms,
+            loaded_at=datetime.now(),
+            meta=self.read_meta(model_type, version),
+        )
+        logger.info(f"Loaded {model_type} model version {version} in {load_time_ms:.1f} ms")
+        return model, record
@@ -0,0 +1,285 @@
+"""
+Inference Result Cache
+LRU + TTL cache for service results with an optional Redis tier
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+
+import pandas as pd
+
+from .analysis_jobs import _json_default
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class CacheMetrics:
+    """Counters for a result cache"""
+    hits: int = 0
+    misses: int = 0
+    redis_hits: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    redis_errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served without computing (either tier)"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Convert to dictionary"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "redis_errors": self.redis_errors,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+def is_cacheable(value: Any) -> bool:
+    """Service results are cached unless they report an error"""
+    return not (isinstance(value, dict) and "error" in value)
+
+
+def frame_fingerprint(data: pd.DataFrame) -> Optional[str]:
+    """Short content hash of a DataFrame (values, index and columns), or None if unhashable"""
+    try:
+        hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.sha256(hashed.tobytes())
+    digest.update(",".join(map(str, data.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Result cache for AI service calls
+
+    Keys are built by ``make_key`` from the endpoint, DMA, model version,
+    data watermark and request parameters, so new readings or a new model
+    produce a new key rather than needing invalidation; stale entries age
+    out by TTL or LRU eviction.
+
+    Lookups check an in-process LRU first and then, when configured, a
+    shared Redis tier (JSON values, same TTL). Redis failures are logged
+    and treated as misses. ``get_or_compute`` is single-flight: concurrent
+    callers of a missing key wait for one computation instead of each
+    running it. Results reporting an ``error`` are not cached.
+
+    Cached values are shared between callers; treat them as read-only.
+    Models updated in place must show the update in the version part of
+    the key; ``invalidate`` only reaches the in-process tier.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        redis_url: Optional[str] = None,
+        redis_client: Optional[Any] = None,
+        namespace: str = "waris:ai",
+        cacheable: Callable[[Any], bool] = is_cacheable,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.cacheable = cacheable
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.metrics = CacheMetrics()
+
+        self.redis = redis_client
+        if self.redis is None and redis_url:
+            if HAS_REDIS:
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            else:
+                logger.warning("redis not installed; result cache is in-process only")
+
+    @staticmethod
+    def make_key(
+        endpoint: str,
+        dma_id: Optional[str] = None,
+        model_version: Optional[str] = None,
+        watermark: Optional[str] = None,
+        **params: Any,
+    ) -> str:
+        """Cache key; parameters are hashed so key length stays bounded"""
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        parts = (endpoint, dma_id, model_version, watermark)
+        return ":".join("-" if part is None else str(part) for part in parts) + f":{digest}"
+
+    def get(self, key: str) -> Any:
+        """Cached value, or None on a miss"""
+        with self._lock:
+            value = self._get_local(key)
+        if value is _MISSING:
+            value = self._get_redis(key)
+            if value is not _MISSING:
+                with self._lock:
+                    self._set_local(key, value, self.ttl_seconds)
+        if value is _MISSING:
+            self.metrics.misses += 1
+            return None
+        self.metrics.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value in every tier"""
+        ttl = ttl_seconds or self.ttl_seconds
+        with self._lock:
+            self._set_local(key, value, ttl)
+        self._set_redis(key, value, ttl)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        """
+        Cached value for key, computing it once on a miss
+
+        Callers arriving while the value is being computed wait for that
+        computation and share its result (or exception).
+        """
+        with self._lock:
+            value = self._get_local(key)
+            if value is not _MISSING:
+                self.metrics.hits += 1
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.metrics.coalesced += 1
+
+        if not leader:
+            self.metrics.hits += 1
+            return future.result()
+
+        try:
+            value = self._get_redis(key)
+            if value is not _MISSING:
+                self.metrics.hits += 1
+                with self._lock:
+                    self._set_local(key, value, ttl_seconds or self.ttl_seconds)
+            else:
+                self.metrics.misses += 1
+                value = compute()
+                if self.cacheable(value):
+                    self.set(key, value, ttl_seconds)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        Drop in-process entries whose key starts with prefix (all by default)
+
+        Redis entries are left to expire by TTL.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size, configuration and hit/miss metrics"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis": self.redis is not None,
+            **self.metrics.to_dict(),
+        }
+
+    def _get_local(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.metrics.expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.metrics.evictions += 1
+
+    def _get_redis(self, key: str) -> Any:
+        if self.redis is None:
+            return _MISSING
+        try:
+            raw = self.redis.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            self.metrics.redis_errors += 1
+            logger.warning(f"Result cache Redis get failed: {e}")
+            return _MISSING
+        if raw is None:
+            return _MISSING
+        self.metrics.redis_hits += 1
+        return json.loads(raw)
+
+    def _set_redis(self, key: str, value: Any, ttl: float) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(
+                f"{self.namespace}:{key}",
+                json.dumps(value, default=_json_default, ensure_ascii=False),
+                ex=max(1, math.ceil(ttl)),
+            )
+        except Exception as e:
+            self.metrics.redis_errors += 1
+            logger.warning(f"Result cache Redis set failed: {e}")
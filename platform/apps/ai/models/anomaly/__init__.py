@@ -13,10 +13,22 @@ Purpose: ตรวจจับค่าผิดปกติของ flow, pres
 from .detector import AnomalyDetector
 from .baseline import ZScoreDetector, IQRDetector
 from .isolation_forest import IsolationForestDetector
+from .seasonal import SeasonalBaselineDetector
+from .streaming import (
+    P2Quantile,
+    StreamingZScoreDetector,
+    StreamingIQRDetector,
+    StreamingAnomalyMonitor,
+)
 
 __all__ = [
     "AnomalyDetector",
     "ZScoreDetector",
     "IQRDetector",
     "IsolationForestDetector",
+    "SeasonalBaselineDetector",
+    "P2Quantile",
+    "StreamingZScoreDetector",
+    "StreamingIQRDetector",
+    "StreamingAnomalyMonitor",
 ]
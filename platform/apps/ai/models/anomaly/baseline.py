@@ -9,6 +9,12 @@ import pandas as pd
 from sklearn.metrics import precision_score, recall_score, f1_score
 
 from ..base import BaseModel, ModelResult, ModelMetrics
+from ..calibration import ScoreCalibrator
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
 
 class ZScoreDetector(BaseModel):
@@ -19,6 +25,7 @@ class ZScoreDetector(BaseModel):
         self.threshold = threshold
         self.means: Optional[pd.Series] = None
         self.stds: Optional[pd.Series] = None
+        self.calibrator: Optional[ScoreCalibrator] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "ZScoreDetector":
         """Calculate mean and std for each feature"""
@@ -28,30 +35,45 @@ class ZScoreDetector(BaseModel):
         self.stds = X.std()
         # Replace zero std with 1 to avoid division by zero
         self.stds = self.stds.replace(0, 1)
+        z_scores = self._z_scores(X.to_numpy(dtype=np.float64))
+        self.calibrator = ScoreCalibrator().fit(np.fmax.reduce(z_scores, axis=1))
         self.is_fitted = True
         return self
 
+    def _z_scores(self, values: np.ndarray) -> np.ndarray:
+        # One temporary in the input's dtype, then in place
+        z = values - self.means.to_numpy(dtype=values.dtype)
+        z /= self.stds.to_numpy(dtype=values.dtype)
+        return np.abs(z, out=z)
+
     def predict(self, X: pd.DataFrame) -> ModelResult:
         """Detect anomalies using Z-Score"""
         if not self.is_fitted:
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Detect anomalies in a feature array using Z-Score"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
 
         # Calculate Z-scores
-        z_scores = np.abs((X - self.means) / self.stds)
+        z_scores = self._z_scores(self._validate_array(values))
 
         # Anomaly if any feature exceeds threshold
         is_anomaly = (z_scores > self.threshold).any(axis=1).astype(int)
 
-        # Confidence based on max z-score
-        max_z = z_scores.max(axis=1)
-        confidence = (max_z / (max_z.max() + 1e-6)).mean()
+        # Probability from the training distribution of the max z-score
+        # (fmax skips NaN features like the DataFrame max did)
+        max_z = np.fmax.reduce(z_scores, axis=1)
+        probs = _calibrated(self, max_z)
 
         return ModelResult(
-            predictions=is_anomaly.values,
-            probabilities=max_z.values / (max_z.max() + 1e-6),
-            confidence=float(confidence),
+            predictions=is_anomaly,
+            probabilities=probs,
+            confidence=float(probs.mean()),
             details={
                 "threshold": self.threshold,
                 "max_z_scores": max_z.tolist(),
@@ -71,16 +93,25 @@ class ZScoreDetector(BaseModel):
 
 
 class IQRDetector(BaseModel):
-    """IQR (Interquartile Range) based anomaly detection"""
+    """
+    IQR (Interquartile Range) based anomaly detection
+
+    Scoring runs on contiguous float32 matrices broadcast against the bound
+    vectors, ``chunk_size`` rows at a time, so peak memory stays bounded
+    when scoring months of readings. numexpr is used when installed.
+    """
 
-    def __init__(self, multiplier: float = 1.5):
+    def __init__(self, multiplier: float = 1.5, chunk_size: int = 65_536, use_numexpr: bool = True):
         super().__init__(name="IQRDetector", version="1.0.0")
         self.multiplier = multiplier
+        self.chunk_size = chunk_size
+        self.use_numexpr = use_numexpr
         self.q1: Optional[pd.Series] = None
         self.q3: Optional[pd.Series] = None
         self.iqr: Optional[pd.Series] = None
         self.lower_bound: Optional[pd.Series] = None
         self.upper_bound: Optional[pd.Series] = None
+        self.calibrator: Optional[ScoreCalibrator] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "IQRDetector":
         """Calculate IQR bounds for each feature"""
@@ -94,36 +125,70 @@ class IQRDetector(BaseModel):
         self.lower_bound = self.q1 - self.multiplier * self.iqr
         self.upper_bound = self.q3 + self.multiplier * self.iqr
 
+        self.calibrator = ScoreCalibrator().fit(self._fence_score(self._as_matrix(X)))
         self.is_fitted = True
         return self
 
+    def _as_matrix(self, X: pd.DataFrame) -> np.ndarray:
+        # Column-major so each feature is one contiguous float32 vector
+        return np.asfortranarray(X[self.feature_names].to_numpy(dtype=np.float32))
+
+    def _fence_score(self, values: np.ndarray) -> np.ndarray:
+        """
+        Signed distance past the nearest fence in IQR units, per row
+
+        Negative inside the fences, positive iff some feature is outside.
+        """
+        lower = self.lower_bound[self.feature_names].to_numpy(dtype=np.float32)
+        upper = self.upper_bound[self.feature_names].to_numpy(dtype=np.float32)
+        scale = self.iqr[self.feature_names].replace(0, 1).to_numpy(dtype=np.float32)
+        use_numexpr = numexpr is not None and self.use_numexpr
+
+        scores = np.full(len(values), np.nan, dtype=np.float32)
+        for start in range(0, len(values), self.chunk_size):
+            out = scores[start:start + self.chunk_size]
+            block = values[start:start + self.chunk_size]
+            if use_numexpr:
+                dist = numexpr.evaluate(
+                    "where(lower - block > block - upper, lower - block, block - upper) / scale"
+                )
+                # fmax skips NaN features, like the DataFrame max it replaces
+                np.fmax(out, np.fmax.reduce(dist, axis=1), out=out)
+                continue
+            buffer = np.empty(len(block), dtype=np.float32)
+            for j in range(values.shape[1]):
+                column = block[:, j]
+                np.subtract(column, upper[j], out=buffer)
+                np.fmax(buffer, lower[j] - column, out=buffer)
+                buffer /= scale[j]
+                np.fmax(out, buffer, out=out)
+        return scores
+
     def predict(self, X: pd.DataFrame) -> ModelResult:
         """Detect anomalies using IQR"""
         if not self.is_fitted:
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._as_matrix(X))
 
-        # Check if values are outside bounds
-        below_lower = X < self.lower_bound
-        above_upper = X > self.upper_bound
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Detect anomalies in a feature array using IQR"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
 
-        # Anomaly if any feature is outside bounds
-        is_anomaly = (below_lower | above_upper).any(axis=1).astype(int)
+        values = self._validate_array(values, dtype=np.float32)
+        fence_scores = self._fence_score(np.asfortranarray(values))
 
-        # Calculate distance from nearest bound as probability
-        distances = pd.DataFrame(index=X.index)
-        for col in X.columns:
-            dist_lower = np.maximum(0, self.lower_bound[col] - X[col])
-            dist_upper = np.maximum(0, X[col] - self.upper_bound[col])
-            distances[col] = np.maximum(dist_lower, dist_upper)
+        # Anomaly if any feature is outside bounds
+        is_anomaly = (fence_scores > 0).astype(int)
 
-        max_dist = distances.max(axis=1)
-        probs = max_dist / (max_dist.max() + 1e-6)
+        # Probability from the training distribution of the fence score
+        probs = _calibrated(self, fence_scores)
 
         return ModelResult(
-            predictions=is_anomaly.values,
-            probabilities=probs.values,
+            predictions=is_anomaly,
+            probabilities=probs,
             confidence=float(probs.mean()),
             details={
                 "multiplier": self.multiplier,
@@ -142,3 +207,13 @@ class IQRDetector(BaseModel):
             recall=float(recall_score(y, predictions, zero_division=0)),
             f1_score=float(f1_score(y, predictions, zero_division=0)),
         )
+
+
+def _calibrated(detector: BaseModel, scores: np.ndarray) -> np.ndarray:
+    """Map raw scores through the detector's fitted calibrator"""
+    calibrator = getattr(detector, "calibrator", None)
+    if calibrator is None:
+        # Models saved before calibration: fall back to batch-relative scaling
+        scores = np.maximum(scores, 0)
+        return scores / (np.max(scores) + 1e-6)
+    return calibrator.transform(scores)
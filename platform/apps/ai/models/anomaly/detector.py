@@ -3,7 +3,10 @@ Unified Anomaly Detector
 Combines multiple detection approaches
 """
 
-from typing import Dict, List, Optional, Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Literal, Tuple
+import threading
+import time
 import pandas as pd
 import numpy as np
 
@@ -11,6 +14,18 @@ from ..base import BaseModel, ModelResult, ModelMetrics, ModelComparison
 from .baseline import ZScoreDetector, IQRDetector
 from .isolation_forest import IsolationForestDetector
 
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _ensemble_pool() -> ThreadPoolExecutor:
+    """Shared pool for ensemble members (NumPy and sklearn release the GIL)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="waris-ensemble")
+    return _pool
+
 
 class AnomalyDetector(BaseModel):
     """
@@ -20,6 +35,13 @@ class AnomalyDetector(BaseModel):
     - baseline: Z-Score or IQR (Statistical)
     - isolation_forest: Tree-based
     - ensemble: Combine multiple methods
+
+    Ensemble modes:
+    - parallel: run all members concurrently and vote
+    - sequential: run members one after another and vote
+    - cascade: Z-Score and IQR score every row; only rows whose mean
+      statistical probability falls inside ``cascade_thresholds`` are sent
+      to Isolation Forest
     """
 
     APPROACHES = {
@@ -31,10 +53,16 @@ class AnomalyDetector(BaseModel):
     def __init__(
         self,
         approach: Literal["zscore", "iqr", "isolation_forest", "ensemble"] = "isolation_forest",
+        ensemble_mode: Literal["parallel", "sequential", "cascade"] = "parallel",
+        cascade_thresholds: Tuple[float, float] = (0.5, 0.99),
         **kwargs
     ):
         super().__init__(name=f"AnomalyDetector_{approach}", version="1.0.0")
+        if ensemble_mode not in ("parallel", "sequential", "cascade"):
+            raise ValueError(f"Unknown ensemble mode: {ensemble_mode}")
         self.approach = approach
+        self.ensemble_mode = ensemble_mode
+        self.cascade_thresholds = tuple(cascade_thresholds)
         self.kwargs = kwargs
         self.detector: Optional[BaseModel] = None
         self.detectors: List[BaseModel] = []
@@ -57,8 +85,13 @@ class AnomalyDetector(BaseModel):
         self.feature_names = X.columns.tolist()
 
         if self.approach == "ensemble":
-            for detector in self.detectors:
-                detector.fit(X, y)
+            if self.ensemble_mode == "sequential":
+                for detector in self.detectors:
+                    detector.fit(X, y)
+            else:
+                futures = [_ensemble_pool().submit(detector.fit, X, y) for detector in self.detectors]
+                for future in futures:
+                    future.result()
         else:
             self.detector.fit(X, y)
 
@@ -71,21 +104,43 @@ class AnomalyDetector(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Detect anomalies in a feature array (columns in feature_names order)"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        values = self._validate_array(values)
         if self.approach == "ensemble":
-            return self._ensemble_predict(X)
+            return self._ensemble_predict(values)
+        else:
+            return self.detector.predict_array(values)
+
+    def _run_members(self, detectors: List[BaseModel], values: np.ndarray) -> Tuple[List[ModelResult], Dict[str, float]]:
+        """Run member detectors, concurrently unless mode is sequential"""
+        def timed(detector: BaseModel) -> Tuple[ModelResult, float]:
+            started = time.perf_counter()
+            result = detector.predict_array(values)
+            return result, (time.perf_counter() - started) * 1000
+
+        if self.ensemble_mode == "sequential" or len(detectors) == 1:
+            outcomes = [timed(detector) for detector in detectors]
         else:
-            return self.detector.predict(X)
+            futures = [_ensemble_pool().submit(timed, detector) for detector in detectors]
+            outcomes = [future.result() for future in futures]
+
+        latency = {det.name: round(ms, 3) for det, (_, ms) in zip(detectors, outcomes)}
+        return [result for result, _ in outcomes], latency
 
-    def _ensemble_predict(self, X: pd.DataFrame) -> ModelResult:
+    def _ensemble_predict(self, values: np.ndarray) -> ModelResult:
         """Combine predictions from multiple detectors"""
-        all_predictions = []
-        all_probabilities = []
+        if self.ensemble_mode == "cascade":
+            return self._cascade_predict(values)
 
-        for detector in self.detectors:
-            result = detector.predict(X)
-            all_predictions.append(result.predictions)
-            all_probabilities.append(result.probabilities)
+        results, latency = self._run_members(self.detectors, values)
+        all_predictions = [result.predictions for result in results]
+        all_probabilities = [result.probabilities for result in results]
 
         # Stack predictions
         pred_matrix = np.column_stack(all_predictions)
@@ -103,7 +158,9 @@ class AnomalyDetector(BaseModel):
             confidence=float(ensemble_probabilities.mean()),
             details={
                 "approach": "ensemble",
+                "mode": self.ensemble_mode,
                 "num_detectors": len(self.detectors),
+                "member_latency_ms": latency,
                 "individual_results": {
                     det.name: {
                         "anomaly_count": int(pred.sum()),
@@ -113,6 +170,51 @@ class AnomalyDetector(BaseModel):
             }
         )
 
+    def _cascade_predict(self, values: np.ndarray) -> ModelResult:
+        """
+        Statistical members prefilter; Isolation Forest sees ambiguous rows only
+
+        Rows whose mean Z-Score/IQR probability is below the low threshold
+        are normal, above the high threshold anomalous. Rows in between get
+        the full three-member vote.
+        """
+        statistical = [d for d in self.detectors if not isinstance(d, IsolationForestDetector)]
+        forest = [d for d in self.detectors if isinstance(d, IsolationForestDetector)]
+        low, high = self.cascade_thresholds
+
+        results, latency = self._run_members(statistical, values)
+        stat_probs = np.column_stack([result.probabilities for result in results])
+        stat_votes = np.column_stack([result.predictions for result in results]).sum(axis=1)
+
+        probabilities = stat_probs.mean(axis=1)
+        predictions = (probabilities > high).astype(int)
+        ambiguous = np.flatnonzero((probabilities >= low) & (probabilities <= high))
+
+        if len(ambiguous) and forest:
+            forest_results, forest_latency = self._run_members(forest, values[ambiguous])
+            latency.update(forest_latency)
+            forest_result = forest_results[0]
+            votes = stat_votes[ambiguous] + forest_result.predictions
+            predictions[ambiguous] = (votes >= len(self.detectors) / 2).astype(int)
+            probabilities[ambiguous] = (stat_probs[ambiguous].sum(axis=1) + forest_result.probabilities) / len(self.detectors)
+
+        return ModelResult(
+            predictions=predictions,
+            probabilities=probabilities,
+            confidence=float(probabilities.mean()),
+            details={
+                "approach": "ensemble",
+                "mode": "cascade",
+                "num_detectors": len(self.detectors),
+                "member_latency_ms": latency,
+                "cascade": {
+                    "thresholds": list(self.cascade_thresholds),
+                    "rows": int(len(values)),
+                    "forwarded": int(len(ambiguous)),
+                },
+            }
+        )
+
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> ModelMetrics:
         """Evaluate detection performance"""
         if self.approach == "ensemble":
@@ -155,25 +257,42 @@ class AnomalyDetector(BaseModel):
         Returns:
             Dictionary with is_anomaly, probability, details
         """
+        return self.detect_batch([reading])[0]
+
+    def detect_batch(self, readings: List[Dict]) -> List[Dict]:
+        """
+        Detect anomalies for a batch of readings with one predict call
+        Used by the micro-batching dispatcher
+
+        Args:
+            readings: List of dictionaries with flow_in, flow_out, pressure, etc.
+
+        Returns:
+            List of dictionaries shaped like detect_single results
+        """
         if not self.is_fitted:
             raise ValueError("Model not fitted")
 
-        # Convert to DataFrame
-        df = pd.DataFrame([reading])
+        # Missing features default to 0
+        result = self.predict_array(self.readings_to_array(readings))
+        n = len(readings)
 
-        # Ensure all features are present
-        for col in self.feature_names:
-            if col not in df.columns:
-                df[col] = 0  # Default value
+        outputs = []
+        for i in range(n):
+            probability = float(result.probabilities[i]) if result.probabilities is not None else None
+            outputs.append({
+                "is_anomaly": bool(result.predictions[i]),
+                "probability": probability,
+                # Detector confidence is the mean probability, i.e. the row's own for one row
+                "confidence": probability if probability is not None else result.confidence,
+                "details": _row_details(result.details, n, i),
+            })
+        return outputs
 
-        # Select only required features
-        df = df[self.feature_names]
 
-        result = self.predict(df)
-
-        return {
-            "is_anomaly": bool(result.predictions[0]),
-            "probability": float(result.probabilities[0]) if result.probabilities is not None else None,
-            "confidence": result.confidence,
-            "details": result.details,
-        }
+def _row_details(details: Dict, n: int, i: int) -> Dict:
+    """Slice per-row lists in a batch result's details down to row i"""
+    return {
+        key: [value[i]] if isinstance(value, list) and len(value) == n else value
+        for key, value in details.items()
+    }
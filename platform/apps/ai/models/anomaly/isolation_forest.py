@@ -10,6 +10,7 @@ from sklearn.ensemble import IsolationForest
 from sklearn.metrics import precision_score, recall_score, f1_score
 
 from ..base import BaseModel, ModelResult, ModelMetrics
+from ..calibration import ScoreCalibrator
 
 
 class IsolationForestDetector(BaseModel):
@@ -21,13 +22,16 @@ class IsolationForestDetector(BaseModel):
         n_estimators: int = 100,
         max_samples: str = "auto",
         random_state: int = 42,
+        n_jobs: int = -1,
     ):
         super().__init__(name="IsolationForestDetector", version="1.0.0")
         self.contamination = contamination
         self.n_estimators = n_estimators
         self.max_samples = max_samples
         self.random_state = random_state
+        self.n_jobs = n_jobs
         self.model: Optional[IsolationForest] = None
+        self.calibrator: Optional[ScoreCalibrator] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "IsolationForestDetector":
         """Train Isolation Forest model"""
@@ -39,10 +43,14 @@ class IsolationForestDetector(BaseModel):
             n_estimators=self.n_estimators,
             max_samples=self.max_samples,
             random_state=self.random_state,
-            n_jobs=-1,
+            n_jobs=self.n_jobs,
         )
 
-        self.model.fit(X)
+        # Fit on the bare array so predict_array needs no column names
+        values = X.to_numpy(dtype=np.float64)
+        self.model.fit(values)
+        # Higher = more anomalous, matching the probability direction
+        self.calibrator = ScoreCalibrator().fit(-self.model.decision_function(values))
         self.is_fitted = True
         return self
 
@@ -52,16 +60,24 @@ class IsolationForestDetector(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
-        # Get predictions (-1 for anomaly, 1 for normal)
-        raw_predictions = self.model.predict(X)
-        # Convert to 0 (normal) and 1 (anomaly)
-        predictions = (raw_predictions == -1).astype(int)
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Detect anomalies in a feature array using Isolation Forest"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
 
         # Get anomaly scores (negative scores are more anomalous)
-        scores = self.model.decision_function(X)
-        # Normalize to probabilities (higher = more anomalous)
-        probs = 1 - (scores - scores.min()) / (scores.max() - scores.min() + 1e-6)
+        scores = self.model.decision_function(self._validate_array(values))
+        # Same rule as IsolationForest.predict, without scoring twice
+        predictions = (scores < 0).astype(int)
+        # Probabilities from the training score distribution (higher = more anomalous)
+        calibrator = getattr(self, "calibrator", None)
+        if calibrator is not None:
+            probs = calibrator.transform(-scores)
+        else:
+            # Models saved before calibration: fall back to batch-relative scaling
+            probs = 1 - (scores - scores.min()) / (scores.max() - scores.min() + 1e-6)
 
         return ModelResult(
             predictions=predictions,
@@ -0,0 +1,309 @@
+"""
+Seasonal Anomaly Baselines
+Per-DMA × hour-of-week mean, std and quantile tables
+"""
+
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy.special import erf, ndtri
+from sklearn.metrics import precision_score, recall_score, f1_score
+
+from ..base import BaseModel, ModelResult, ModelMetrics
+
+HOURS_PER_WEEK = 168
+
+
+def hour_of_week(timestamps: pd.Series) -> np.ndarray:
+    """Hour-of-week index (Monday 00:00 = 0 ... Sunday 23:00 = 167)"""
+    ts = pd.to_datetime(timestamps)
+    return (ts.dt.dayofweek * 24 + ts.dt.hour).to_numpy(dtype=np.intp)
+
+
+class SeasonalBaselineDetector(BaseModel):
+    """
+    Seasonality-aware anomaly baseline
+
+    Keeps one (n_dmas, 168, n_features) table each for count, mean, M2
+    (sum of squared deviations) and the configured quantiles, so a night
+    reading is compared with that DMA's night-time history rather than one
+    global distribution. Tables are updated incrementally from hourly
+    rollups and scoring is a vectorized lookup plus comparison.
+
+    A reading is anomalous when its z-score against its cell exceeds
+    ``threshold`` or it falls outside the cell's IQR fence. Cells with
+    fewer than ``min_count`` observations are never flagged.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 3.0,
+        iqr_multiplier: float = 1.5,
+        quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        min_count: int = 3,
+        quantile_rate: float = 0.1,
+        dma_column: str = "dma_id",
+        timestamp_column: str = "timestamp",
+        feature_columns: Optional[List[str]] = None,
+    ):
+        super().__init__(name="SeasonalBaselineDetector", version="1.0.0")
+        quantiles = sorted(set(quantiles) | {0.25, 0.75})
+        self.threshold = threshold
+        self.iqr_multiplier = iqr_multiplier
+        self.quantiles = quantiles
+        self.min_count = min_count
+        self.quantile_rate = quantile_rate
+        self.dma_column = dma_column
+        self.timestamp_column = timestamp_column
+        self.feature_columns = feature_columns
+        self.dma_index: Dict[str, int] = {}
+        self.count: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.m2: Optional[np.ndarray] = None
+        self.quantile_table: Optional[np.ndarray] = None
+
+    def _set_state(self, state: Dict) -> None:
+        # Loaded tables may be read-only memory maps; updates need our own copy
+        super()._set_state(state)
+        for attr in ("count", "mean", "m2", "quantile_table"):
+            value = getattr(self, attr)
+            if value is not None:
+                setattr(self, attr, np.array(value))
+
+    def _features(self, X: pd.DataFrame) -> List[str]:
+        if self.feature_names:
+            return self.feature_names
+        if self.feature_columns:
+            return list(self.feature_columns)
+        return [
+            col for col in X.columns
+            if col not in (self.dma_column, self.timestamp_column) and pd.api.types.is_numeric_dtype(X[col])
+        ]
+
+    def _ensure_dmas(self, dma_ids: np.ndarray) -> np.ndarray:
+        """Map DMA ids to table rows, growing the tables for new DMAs"""
+        new = [d for d in pd.unique(dma_ids) if d not in self.dma_index]
+        if new:
+            for dma_id in new:
+                self.dma_index[dma_id] = len(self.dma_index)
+            n_features = len(self.feature_names)
+            extra = (len(new), HOURS_PER_WEEK, n_features)
+            self.count = np.concatenate([self.count, np.zeros(extra)])
+            self.mean = np.concatenate([self.mean, np.zeros(extra)])
+            self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+            self.quantile_table = np.concatenate([
+                self.quantile_table,
+                np.full((len(self.quantiles),) + extra, np.nan, dtype=np.float32),
+            ], axis=1)
+        return pd.Series(dma_ids).map(self.dma_index).to_numpy(dtype=np.intp)
+
+    def _cells(self, X: pd.DataFrame) -> tuple:
+        dma_ids = X[self.dma_column].astype(str).to_numpy()
+        hours = hour_of_week(X[self.timestamp_column])
+        values = X[self.feature_names].to_numpy(dtype=np.float64)
+        return dma_ids, hours, values
+
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "SeasonalBaselineDetector":
+        """Build the baseline tables from hourly history"""
+        self._validate_input(X)
+        self.feature_names = self._features(X)
+        n_features = len(self.feature_names)
+        self.dma_index = {}
+        self.count = np.zeros((0, HOURS_PER_WEEK, n_features))
+        self.mean = np.zeros((0, HOURS_PER_WEEK, n_features))
+        self.m2 = np.zeros((0, HOURS_PER_WEEK, n_features))
+        self.quantile_table = np.zeros((len(self.quantiles), 0, HOURS_PER_WEEK, n_features), dtype=np.float32)
+
+        dma_ids, hours, values = self._cells(X)
+        rows = self._ensure_dmas(dma_ids)
+
+        frame = pd.DataFrame(values, columns=self.feature_names)
+        frame["_dma"] = rows
+        frame["_how"] = hours
+        grouped = frame.groupby(["_dma", "_how"])
+        cells = grouped.size().index
+        d, h = cells.get_level_values(0).to_numpy(), cells.get_level_values(1).to_numpy()
+
+        counts = grouped.count().to_numpy(dtype=np.float64)
+        self.count[d, h] = counts
+        self.mean[d, h] = grouped.mean().to_numpy()
+        self.m2[d, h] = grouped.var(ddof=0).to_numpy() * counts
+        for i, q in enumerate(self.quantiles):
+            self.quantile_table[i, d, h] = grouped.quantile(q).to_numpy(dtype=np.float32)
+
+        self.is_fitted = True
+        return self
+
+    def update(self, rollups: pd.DataFrame) -> "SeasonalBaselineDetector":
+        """
+        Fold new hourly rollups into the tables
+
+        Mean and M2 are merged exactly (Chan et al. parallel update);
+        quantiles move by a stochastic-approximation step towards each
+        cell's new observations. Cells seen for the first time take their
+        quantiles from the new rows, and cells still short of ``min_count``
+        re-seed them from the merged mean and std. Cost is proportional to
+        the rollup rows, not the history.
+
+        Args:
+            rollups: Hourly rows with dma_column, timestamp_column and features
+        """
+        if not self.is_fitted:
+            return self.fit(rollups)
+
+        self._validate_input(rollups)
+        dma_ids, hours, values = self._cells(rollups)
+        rows = self._ensure_dmas(dma_ids)
+
+        frame = pd.DataFrame(values, columns=self.feature_names)
+        frame["_dma"] = rows
+        frame["_how"] = hours
+        grouped = frame.groupby(["_dma", "_how"])
+        cells = grouped.size().index
+        d, h = cells.get_level_values(0).to_numpy(), cells.get_level_values(1).to_numpy()
+
+        n_b = grouped.count().to_numpy(dtype=np.float64)
+        mean_b = grouped.mean().to_numpy()
+        m2_b = grouped.var(ddof=0).to_numpy() * n_b
+        # (cell, feature) pairs whose new rows are all missing keep their state
+        has_new = n_b > 0
+        mean_b, m2_b = np.where(has_new, mean_b, 0.0), np.where(has_new, m2_b, 0.0)
+
+        n_a, mean_a, m2_a = self.count[d, h], self.mean[d, h], self.m2[d, h]
+        n = n_a + n_b
+        safe_n = np.maximum(n, 1.0)
+        delta = mean_b - mean_a
+        self.count[d, h] = n
+        self.mean[d, h] = np.where(has_new, mean_a + delta * n_b / safe_n, mean_a)
+        self.m2[d, h] = np.where(has_new, m2_a + m2_b + delta ** 2 * n_a * n_b / safe_n, m2_a)
+
+        first_seen = has_new & (n_a == 0)
+        young = has_new & (n_a > 0) & (n_a < self.min_count)
+        warm = has_new & (n_a >= self.min_count)
+        sample_std = np.sqrt(self.m2[d, h] / np.maximum(n - 1, 1))
+
+        # Per-cell fraction of new observations below each current quantile
+        cell = rows * HOURS_PER_WEEK + hours
+        _, inverse = np.unique(cell, return_inverse=True)
+        inverse = inverse.ravel()
+        for i, q in enumerate(self.quantiles):
+            current = self.quantile_table[i, d, h].astype(np.float64)
+            below = values < current[inverse]
+            frac_below = np.zeros_like(current)
+            np.add.at(frac_below, inverse, below)
+            frac_below /= np.maximum(n_b, 1.0)
+            step = self.quantile_rate * np.sqrt(self.m2[d, h] / safe_n) * (q - frac_below)
+
+            updated = np.where(warm, current + step, current)
+            updated = np.where(young, self.mean[d, h] + ndtri(q) * sample_std, updated)
+            updated = np.where(first_seen, grouped.quantile(q).to_numpy(dtype=np.float64), updated)
+            self.quantile_table[i, d, h] = updated.astype(np.float32)
+
+        return self
+
+    @property
+    def std(self) -> np.ndarray:
+        """Per-cell standard deviation (zero or empty cells replaced by 1)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        std[(std == 0) | ~np.isfinite(std)] = 1.0
+        return std
+
+    def score(self, X: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Vectorized lookup of each row's cell and comparison against it
+
+        Returns:
+            Dict of z_scores (n, n_features), iqr_distance (n, n_features)
+            and known (n,) marking rows with enough cell history
+        """
+        dma_ids, hours, values = self._cells(X)
+        return self._score_cells(values, dma_ids, hours)
+
+    def _score_cells(self, values: np.ndarray, dma_ids: np.ndarray, hours: np.ndarray) -> Dict[str, np.ndarray]:
+        rows = pd.Series(dma_ids).map(self.dma_index)
+        known_dma = rows.notna().to_numpy()
+        rows = rows.fillna(0).to_numpy(dtype=np.intp)
+
+        counts = self.count[rows, hours]
+        means = self.mean[rows, hours]
+        z_scores = np.abs(values - means) / self.std[rows, hours]
+
+        q1 = self.quantile_table[self.quantiles.index(0.25), rows, hours]
+        q3 = self.quantile_table[self.quantiles.index(0.75), rows, hours]
+        fence = self.iqr_multiplier * (q3 - q1)
+        iqr_distance = np.maximum(np.maximum(q1 - fence - values, values - q3 - fence), 0.0)
+
+        known = known_dma & (counts.min(axis=1) >= self.min_count)
+        z_scores[~known] = 0.0
+        iqr_distance[~known] = 0.0
+        return {"z_scores": z_scores, "iqr_distance": iqr_distance, "known": known}
+
+    def predict(self, X: pd.DataFrame) -> ModelResult:
+        """Detect anomalies against each reading's DMA × hour-of-week baseline"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        self._validate_input(X)
+        dma_ids, hours, values = self._cells(X)
+        return self.predict_array(values, dma_ids=dma_ids, hours=hours)
+
+    def predict_array(
+        self,
+        values: np.ndarray,
+        dma_ids: Optional[np.ndarray] = None,
+        hours: Optional[np.ndarray] = None,
+    ) -> ModelResult:
+        """
+        Detect anomalies in a feature array
+
+        Args:
+            values: (n, n_features) array in feature_names order
+            dma_ids: DMA of each row
+            hours: Hour-of-week (0-167) of each row, see hour_of_week()
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+        if dma_ids is None or hours is None:
+            raise ValueError("dma_ids and hours are required for seasonal baselines")
+
+        values = self._validate_array(values)
+        dma_ids = np.asarray(dma_ids, dtype=str).reshape(-1)
+        hours = np.asarray(hours, dtype=np.intp).reshape(-1)
+        scores = self._score_cells(values, dma_ids, hours)
+        max_z = scores["z_scores"].max(axis=1)
+        outside = (scores["iqr_distance"] > 0).any(axis=1)
+        is_anomaly = ((max_z > self.threshold) | outside) & scores["known"]
+        # Two-sided normal tail mass below |z|: per-row, independent of the batch
+        probs = erf(max_z / np.sqrt(2))
+
+        return ModelResult(
+            predictions=is_anomaly.astype(int),
+            probabilities=probs,
+            confidence=float(probs.mean()),
+            details={
+                "threshold": self.threshold,
+                "max_z_scores": max_z.tolist(),
+                "insufficient_history": (~scores["known"]).tolist(),
+            }
+        )
+
+    def evaluate(self, X: pd.DataFrame, y: pd.Series) -> ModelMetrics:
+        """Evaluate detection performance"""
+        predictions = self.predict(X).predictions
+
+        return ModelMetrics(
+            precision=float(precision_score(y, predictions, zero_division=0)),
+            recall=float(recall_score(y, predictions, zero_division=0)),
+            f1_score=float(f1_score(y, predictions, zero_division=0)),
+        )
+
+    def get_baseline(self, dma_id: str) -> pd.DataFrame:
+        """Mean/std table of one DMA, indexed by hour-of-week"""
+        row = self.dma_index[dma_id]
+        std = self.std[row]
+        data = {}
+        for j, feature in enumerate(self.feature_names):
+            data[f"{feature}_mean"] = self.mean[row, :, j]
+            data[f"{feature}_std"] = std[:, j]
+        return pd.DataFrame(data, index=pd.RangeIndex(HOURS_PER_WEEK, name="hour_of_week"))
@@ -0,0 +1,456 @@
+"""
+Streaming Anomaly Detection Models
+Online Z-Score and IQR detectors with O(1) per-reading updates
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import math
+import numpy as np
+import pandas as pd
+from scipy.special import erf
+from sklearn.metrics import precision_score, recall_score, f1_score
+
+from ..base import BaseModel, ModelResult, ModelMetrics
+
+
+def _reading_vector(reading: Dict, feature_names: List[str]) -> np.ndarray:
+    """Feature vector of one reading; absent and None values become NaN"""
+    values = [reading.get(col) for col in feature_names]
+    return np.array([np.nan if value is None else float(value) for value in values])
+
+
+class P2Quantile:
+    """
+    P² streaming quantile estimator (Jain & Chlamtac, 1985)
+
+    Tracks one quantile with five markers, so memory and update cost are
+    constant regardless of how many observations have been seen. The first
+    five observations are kept exactly.
+    """
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError("p must be in (0, 1)")
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def update(self, x: float) -> None:
+        """Add one observation"""
+        x = float(x)
+        self.count += 1
+        q = self.heights
+
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1.0 if d > 0 else -1.0
+                candidate = self._parabolic(i, d)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    j = i + int(d)
+                    q[i] = q[i] + d * (q[j] - q[i]) / (n[j] - n[i])
+                n[i] += d
+
+    def _parabolic(self, i: int, d: float) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        """Current quantile estimate (NaN before any observation)"""
+        if self.count == 0:
+            return math.nan
+        if self.count <= 5:
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+
+class StreamingZScoreDetector(BaseModel):
+    """
+    Online Z-Score detector
+
+    Keeps a running mean and variance per feature (Welford's update,
+    weighted so older readings decay with ``half_life``). ``half_life=None``
+    gives the exact mean and sample std of everything seen, matching
+    ZScoreDetector fitted on the same rows.
+    """
+
+    def __init__(self, threshold: float = 3.0, half_life: Optional[float] = None, min_samples: int = 10):
+        super().__init__(name="StreamingZScoreDetector", version="1.0.0")
+        self.threshold = threshold
+        self.half_life = half_life
+        self.min_samples = min_samples
+        self.decay = 0.5 ** (1 / half_life) if half_life else 1.0
+        self.n_seen = 0
+        self.weight: Optional[np.ndarray] = None
+        self.weight_sq: Optional[np.ndarray] = None
+        self.counts: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.m2: Optional[np.ndarray] = None
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        # Loaded arrays may be read-only memory maps; updates need our own copy
+        super()._set_state(state)
+        if self.mean is not None:
+            n_features = len(self.mean)
+            self.mean = np.array(self.mean, dtype=float)
+            self.m2 = np.array(self.m2, dtype=float)
+            # Older artifacts kept one scalar weight shared by every feature
+            self.weight = np.broadcast_to(np.asarray(self.weight, dtype=float), n_features).copy()
+            self.weight_sq = np.broadcast_to(np.asarray(self.weight_sq, dtype=float), n_features).copy()
+            counts = state.get("counts", self.n_seen)
+            self.counts = np.broadcast_to(np.asarray(counts, dtype=np.int64), n_features).copy()
+
+    def _init_features(self, feature_names: List[str]) -> None:
+        self.feature_names = list(feature_names)
+        self.mean = np.zeros(len(feature_names))
+        self.m2 = np.zeros(len(feature_names))
+        self.n_seen = 0
+        self.weight = np.zeros(len(feature_names))
+        self.weight_sq = np.zeros(len(feature_names))
+        self.counts = np.zeros(len(feature_names), dtype=np.int64)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Current per-feature standard deviation (zero or unknown replaced by 1)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective = np.where(self.weight > 0, self.weight - self.weight_sq / self.weight, 0.0)
+            std = np.sqrt(np.maximum(self.m2 / effective, 0.0))
+        std[~(effective > 0) | (std == 0)] = 1.0
+        return std
+
+    def update(self, x: np.ndarray) -> None:
+        """
+        Fold one feature vector into the running statistics
+
+        Non-finite values are missing: that feature's mean, variance and
+        weight are left as they were.
+        """
+        seen = np.isfinite(x)
+        self.weight = np.where(seen, self.decay * self.weight + 1.0, self.weight)
+        self.weight_sq = np.where(seen, self.decay ** 2 * self.weight_sq + 1.0, self.weight_sq)
+        delta = np.where(seen, x - self.mean, 0.0)
+        self.mean = self.mean + delta / np.where(seen, self.weight, 1.0)
+        self.m2 = np.where(seen, self.decay * self.m2 + delta * (np.where(seen, x, 0.0) - self.mean), self.m2)
+        self.counts = self.counts + seen
+        self.n_seen += 1
+        self.is_fitted = True
+
+    def score(self, x: np.ndarray) -> np.ndarray:
+        """Absolute z-score against the current state (0 for missing or unseen features)"""
+        with np.errstate(invalid="ignore"):
+            z = np.abs((x - self.mean) / self.std)
+        return np.where(np.isfinite(z) & (self.counts > 0), z, 0.0)
+
+    def score_and_update(self, reading: Dict) -> Dict:
+        """
+        Score a reading against the current state, then learn from it
+
+        Args:
+            reading: Dictionary with one value per feature
+
+        Returns:
+            Detection result; readings seen during warm-up are never flagged
+        """
+        if self.mean is None:
+            self._init_features(list(reading.keys()))
+        x = _reading_vector(reading, self.feature_names)
+
+        warming_up = self.n_seen < self.min_samples
+        z_scores = self.score(x)
+        max_z = float(z_scores.max())
+        # A feature only votes once it has its own warm-up worth of values
+        is_anomaly = not warming_up and bool((z_scores[self.counts >= self.min_samples] > self.threshold).any())
+        self.update(x)
+
+        return {
+            "is_anomaly": bool(is_anomaly),
+            "anomaly_score": max_z,
+            "warming_up": warming_up,
+            "z_scores": dict(zip(self.feature_names, z_scores.round(4).tolist())),
+            "n_seen": self.n_seen,
+        }
+
+    def partial_fit(self, X: pd.DataFrame) -> "StreamingZScoreDetector":
+        """Update the running statistics with a frame of readings"""
+        self._validate_input(X)
+        if self.mean is None:
+            self._init_features(X.columns.tolist())
+        for row in X[self.feature_names].to_numpy(dtype=float):
+            self.update(row)
+        return self
+
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "StreamingZScoreDetector":
+        """Reset and learn the running statistics from X"""
+        self._validate_input(X)
+        self._init_features(X.columns.tolist())
+        return self.partial_fit(X)
+
+    def predict(self, X: pd.DataFrame) -> ModelResult:
+        """Score readings against the current state without updating it"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        self._validate_input(X)
+        return self.predict_array(X[self.feature_names].to_numpy(dtype=float))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Score a feature array against the current state without updating it"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        values = self._validate_array(values)
+        z_scores = self.score(values)
+        max_z = z_scores.max(axis=1)
+        # Two-sided normal probability of the row's own Z-Score, independent of the batch
+        probs = erf(max_z / np.sqrt(2))
+
+        return ModelResult(
+            predictions=(z_scores > self.threshold).any(axis=1).astype(int),
+            probabilities=probs,
+            confidence=float(probs.mean()),
+            details={
+                "threshold": self.threshold,
+                "max_z_scores": max_z.tolist(),
+                "n_seen": self.n_seen,
+            }
+        )
+
+    def evaluate(self, X: pd.DataFrame, y: pd.Series) -> ModelMetrics:
+        """Evaluate detection performance"""
+        predictions = self.predict(X).predictions
+
+        return ModelMetrics(
+            precision=float(precision_score(y, predictions, zero_division=0)),
+            recall=float(recall_score(y, predictions, zero_division=0)),
+            f1_score=float(f1_score(y, predictions, zero_division=0)),
+        )
+
+
+class StreamingIQRDetector(BaseModel):
+    """
+    Online IQR detector
+
+    Q1 and Q3 of each feature are tracked with P² sketches, so every
+    reading updates the bounds in constant time and memory.
+    """
+
+    def __init__(self, multiplier: float = 1.5, min_samples: int = 10):
+        super().__init__(name="StreamingIQRDetector", version="1.0.0")
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.n_seen = 0
+        self.q1_sketches: List[P2Quantile] = []
+        self.q3_sketches: List[P2Quantile] = []
+
+    def _init_features(self, feature_names: List[str]) -> None:
+        self.feature_names = list(feature_names)
+        self.q1_sketches = [P2Quantile(0.25) for _ in feature_names]
+        self.q3_sketches = [P2Quantile(0.75) for _ in feature_names]
+        self.n_seen = 0
+
+    def bounds(self) -> tuple:
+        """Current (lower, upper) bound arrays (NaN for features with no values yet)"""
+        q1 = np.array([s.value for s in self.q1_sketches])
+        q3 = np.array([s.value for s in self.q3_sketches])
+        iqr = q3 - q1
+        return q1 - self.multiplier * iqr, q3 + self.multiplier * iqr
+
+    def _robust_z(self, values: np.ndarray) -> np.ndarray:
+        """Distance from the quartile midpoint in normal-equivalent standard deviations"""
+        q1 = np.array([s.value for s in self.q1_sketches])
+        q3 = np.array([s.value for s in self.q3_sketches])
+        # IQR of a normal distribution is 1.349 sigma
+        sigma = np.where(q3 > q1, q3 - q1, 1.0) / 1.349
+        z = np.abs(values - (q1 + q3) / 2) / sigma
+        return np.where(np.isfinite(z), z, 0.0)
+
+    def _distance(self, values: np.ndarray) -> np.ndarray:
+        """Distance outside the bounds (0 inside them, or for missing values)"""
+        lower, upper = self.bounds()
+        distance = np.maximum(np.maximum(lower - values, values - upper), 0.0)
+        return np.where(np.isfinite(distance), distance, 0.0)
+
+    def update(self, x: np.ndarray) -> None:
+        """Fold one feature vector into the quantile sketches, skipping missing values"""
+        for value, q1, q3 in zip(x, self.q1_sketches, self.q3_sketches):
+            if np.isfinite(value):
+                q1.update(value)
+                q3.update(value)
+        self.n_seen += 1
+        self.is_fitted = True
+
+    def score_and_update(self, reading: Dict) -> Dict:
+        """
+        Score a reading against the current bounds, then learn from it
+
+        Args:
+            reading: Dictionary with one value per feature
+
+        Returns:
+            Detection result; readings seen during warm-up are never flagged
+        """
+        if not self.feature_names:
+            self._init_features(list(reading.keys()))
+        x = _reading_vector(reading, self.feature_names)
+
+        warming_up = self.n_seen < self.min_samples
+        if self.n_seen:
+            lower, upper = self.bounds()
+            distance = self._distance(x)
+        else:
+            lower = upper = distance = np.zeros(len(x))
+        counts = np.array([s.count for s in self.q1_sketches])
+        is_anomaly = not warming_up and bool((distance[counts >= self.min_samples] > 0).any())
+        self.update(x)
+
+        return {
+            "is_anomaly": bool(is_anomaly),
+            "anomaly_score": float(distance.max()),
+            "warming_up": warming_up,
+            "lower_bound": dict(zip(self.feature_names, lower.tolist())),
+            "upper_bound": dict(zip(self.feature_names, upper.tolist())),
+            "n_seen": self.n_seen,
+        }
+
+    def partial_fit(self, X: pd.DataFrame) -> "StreamingIQRDetector":
+        """Update the quantile sketches with a frame of readings"""
+        self._validate_input(X)
+        if not self.feature_names:
+            self._init_features(X.columns.tolist())
+        for row in X[self.feature_names].to_numpy(dtype=float):
+            self.update(row)
+        return self
+
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "StreamingIQRDetector":
+        """Reset and learn the quantile sketches from X"""
+        self._validate_input(X)
+        self._init_features(X.columns.tolist())
+        return self.partial_fit(X)
+
+    def predict(self, X: pd.DataFrame) -> ModelResult:
+        """Score readings against the current bounds without updating them"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        self._validate_input(X)
+        return self.predict_array(X[self.feature_names].to_numpy(dtype=float))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Score a feature array against the current bounds without updating them"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        values = self._validate_array(values)
+        lower, upper = self.bounds()
+        distances = self._distance(values)
+        probs = erf(self._robust_z(values).max(axis=1) / np.sqrt(2))
+
+        return ModelResult(
+            predictions=(distances > 0).any(axis=1).astype(int),
+            probabilities=probs,
+            confidence=float(probs.mean()),
+            details={
+                "multiplier": self.multiplier,
+                "lower_bound": dict(zip(self.feature_names, lower.tolist())),
+                "upper_bound": dict(zip(self.feature_names, upper.tolist())),
+            }
+        )
+
+    def evaluate(self, X: pd.DataFrame, y: pd.Series) -> ModelMetrics:
+        """Evaluate detection performance"""
+        predictions = self.predict(X).predictions
+
+        return ModelMetrics(
+            precision=float(precision_score(y, predictions, zero_division=0)),
+            recall=float(recall_score(y, predictions, zero_division=0)),
+            f1_score=float(f1_score(y, predictions, zero_division=0)),
+        )
+
+
+class StreamingAnomalyMonitor:
+    """
+    Per-DMA streaming detection
+
+    Holds one streaming detector per DMA. ``ingest`` scores each reading
+    as it is committed and folds it into that DMA's state, so there are no
+    batch refits and memory is constant per DMA.
+    """
+
+    APPROACHES = {
+        "zscore": StreamingZScoreDetector,
+        "iqr": StreamingIQRDetector,
+    }
+
+    def __init__(
+        self,
+        approach: str = "zscore",
+        feature_names: Optional[List[str]] = None,
+        detector_factory: Optional[Callable[[], BaseModel]] = None,
+        **kwargs,
+    ):
+        if detector_factory is None:
+            if approach not in self.APPROACHES:
+                raise ValueError(f"Unknown approach: {approach}")
+            detector_factory = lambda: self.APPROACHES[approach](**kwargs)
+        self.approach = approach
+        self.feature_names = feature_names or ["flow_in", "flow_out", "pressure", "loss_percentage"]
+        self.detector_factory = detector_factory
+        self.detectors: Dict[str, BaseModel] = {}
+
+    def get_detector(self, dma_id: str) -> BaseModel:
+        """Streaming detector for a DMA, created on first use"""
+        detector = self.detectors.get(dma_id)
+        if detector is None:
+            detector = self.detector_factory()
+            detector._init_features(self.feature_names)
+            self.detectors[dma_id] = detector
+        return detector
+
+    def ingest(self, dma_id: str, reading: Dict) -> Dict:
+        """Score one committed reading and update the DMA's detector"""
+        result = self.get_detector(dma_id).score_and_update(reading)
+        result["dma_id"] = dma_id
+        return result
+
+    def ingest_batch(self, readings: List[Dict], dma_key: str = "dma_id") -> List[Dict]:
+        """Ingest readings in commit order; each must carry its DMA id"""
+        return [self.ingest(str(reading[dma_key]), reading) for reading in readings]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Number of tracked DMAs and readings seen"""
+        return {
+            "approach": self.approach,
+            "dmas": len(self.detectors),
+            "readings": sum(d.n_seen for d in self.detectors.values()),
+        }
@@ -0,0 +1,408 @@
+"""
+Model Artifact Format
+Pickle-free model persistence: JSON manifest + memory-mappable .npy blobs
+
+Layout of an artifact directory::
+
+    manifest.json        class, encoded attribute tree, array index + checksums
+    arrays/a00000.npy    one blob per NumPy array (scaler stats, centroids,
+    arrays/a00001.npy    tree node tables, ...)
+
+Arrays are loaded with ``np.load(mmap_mode="r")`` so several worker
+processes share one page-cached copy. Only classes from an allowlist of
+modules (this package, scikit-learn, XGBoost) can be reconstructed, and
+no pickled bytes are ever read.
+"""
+
+from datetime import date, datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import importlib
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "waris-model-artifact"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAYS_DIR = "arrays"
+
+# Package that holds the model classes (``models`` or ``ai.models``);
+# stored class paths are relative to it so artifacts load under either name
+MODELS_PACKAGE = __name__.rsplit(".", 1)[0]
+
+ALLOWED_MODULE_PREFIXES = ("sklearn.", "xgboost.")
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is malformed, tampered with, or not allowed"""
+    pass
+
+
+def _class_path(cls: type) -> str:
+    module = cls.__module__
+    if module == MODELS_PACKAGE or module.startswith(MODELS_PACKAGE + "."):
+        module = module[len(MODELS_PACKAGE):]
+    return f"{module}:{cls.__qualname__}"
+
+
+def _resolve_class(path: str) -> type:
+    module_name, _, qualname = path.partition(":")
+    if module_name.startswith(".."):
+        raise ArtifactError(f"Class {path} is outside the models package")
+    if module_name.startswith(".") or module_name == "":
+        module = importlib.import_module(module_name or MODELS_PACKAGE, package=MODELS_PACKAGE)
+    elif module_name.startswith(ALLOWED_MODULE_PREFIXES):
+        module = importlib.import_module(module_name)
+    else:
+        raise ArtifactError(f"Class {path} is not from an allowed module")
+
+    obj: Any = module
+    for part in qualname.split("."):
+        obj = getattr(obj, part, None)
+        # Walking through a module (``sklearn.base:np.memmap``) would escape the allowlist
+        if obj is None or isinstance(obj, ModuleType):
+            raise ArtifactError(f"Class {path} is not defined in its module")
+    if not isinstance(obj, type):
+        raise ArtifactError(f"{path} is not a class")
+    if not _is_allowed_class(obj):
+        raise ArtifactError(f"Class {path} resolves to {obj.__module__}.{obj.__qualname__}, which is not allowed")
+    return obj
+
+
+def _is_allowed_class(cls: type) -> bool:
+    module = cls.__module__
+    return (
+        module == MODELS_PACKAGE
+        or module.startswith(MODELS_PACKAGE + ".")
+        or module.startswith(ALLOWED_MODULE_PREFIXES)
+    )
+
+
+def _is_new_obj(reduced: Any) -> bool:
+    """True for (newObj, (cls,), state) as returned by sklearn's Cython trees"""
+    return (
+        isinstance(reduced, tuple)
+        and len(reduced) >= 2
+        and getattr(reduced[0], "__name__", None) == "newObj"
+        and getattr(reduced[0], "__module__", "").startswith("sklearn.")
+        and len(reduced[1]) == 1
+        and isinstance(reduced[1][0], type)
+        and _is_allowed_class(reduced[1][0])
+    )
+
+
+class _Encoder:
+    """Turns an object graph into a JSON tree plus a list of arrays"""
+
+    def __init__(self) -> None:
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    def _add_array(self, array: np.ndarray) -> Dict[str, Any]:
+        name = f"a{len(self.arrays):05d}"
+        self.arrays[name] = np.ascontiguousarray(array)
+        return {"__type__": "ndarray", "ref": name}
+
+    def encode(self, value: Any) -> Any:
+        from .base import BaseModel
+
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, np.generic):
+            return value
+        if isinstance(value, np.generic):
+            return {"__type__": "npscalar", "dtype": value.dtype.str, "value": value.item()}
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                return {
+                    "__type__": "objarray",
+                    "shape": list(value.shape),
+                    "items": [self.encode(v) for v in value.ravel().tolist()],
+                }
+            return self._add_array(value)
+        if isinstance(value, (bytes, bytearray)):
+            return {
+                "__type__": "bytes",
+                "data": self._add_array(np.frombuffer(bytes(value), dtype=np.uint8)),
+            }
+        if isinstance(value, np.dtype):
+            return {"__type__": "dtype", "value": value.str}
+        if isinstance(value, pd.Series):
+            return {
+                "__type__": "series",
+                "name": self.encode(value.name),
+                "values": self.encode(value.to_numpy()),
+                "index": self.encode(value.index.to_numpy()),
+            }
+        if isinstance(value, pd.DataFrame):
+            return {
+                "__type__": "dataframe",
+                "columns": [self.encode(c) for c in value.columns],
+                "data": [self.encode(value[c].to_numpy()) for c in value.columns],
+                "index": self.encode(value.index.to_numpy()),
+            }
+        if isinstance(value, (pd.Timestamp, datetime, date)):
+            return {"__type__": "datetime", "value": pd.Timestamp(value).isoformat()}
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        if isinstance(value, tuple):
+            return {"__type__": "tuple", "items": [self.encode(v) for v in value]}
+        if isinstance(value, (set, frozenset)):
+            return {"__type__": "set", "items": [self.encode(v) for v in sorted(value, key=repr)]}
+        if isinstance(value, dict):
+            if all(isinstance(k, str) for k in value):
+                return {"__type__": "dict", "items": {k: self.encode(v) for k, v in value.items()}}
+            return {
+                "__type__": "kvdict",
+                "items": [[self.encode(k), self.encode(v)] for k, v in value.items()],
+            }
+        if isinstance(value, np.random.RandomState):
+            return {"__type__": "randomstate", "state": self.encode(value.get_state())}
+        if isinstance(value, BaseModel):
+            return {
+                "__type__": "model",
+                "class": _class_path(type(value)),
+                "state": self.encode(value._get_state()),
+            }
+
+        cls = type(value)
+        if not _is_allowed_class(cls):
+            raise ArtifactError(f"Cannot encode object of type {cls.__module__}.{cls.__qualname__}")
+
+        if cls.__reduce__ is not object.__reduce__:
+            # Extension types (e.g. sklearn's Cython Tree) describe themselves via __reduce__
+            reduced = value.__reduce__()
+            if _is_new_obj(reduced):
+                # sklearn's newObj(cls) helper (KDTree, BallTree, DistanceMetric)
+                return {
+                    "__type__": "newobj",
+                    "class": _class_path(reduced[1][0]),
+                    "state": self.encode(reduced[2]) if len(reduced) > 2 else None,
+                }
+            if not isinstance(reduced, tuple) or not isinstance(reduced[0], type):
+                raise ArtifactError(f"Unsupported __reduce__ for {cls.__qualname__}")
+            return {
+                "__type__": "reduce",
+                "class": _class_path(reduced[0]),
+                "args": self.encode(tuple(reduced[1])),
+                "state": self.encode(reduced[2]) if len(reduced) > 2 else None,
+            }
+
+        state = value.__getstate__()
+        if state is not None and not isinstance(state, dict):
+            raise ArtifactError(f"Unsupported state for {cls.__qualname__}")
+        return {"__type__": "object", "class": _class_path(cls), "state": self.encode(state)}
+
+
+class _Decoder:
+    """Rebuilds an object graph from a JSON tree and loaded arrays"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+
+    def decode(self, node: Any) -> Any:
+        if isinstance(node, list):
+            return [self.decode(v) for v in node]
+        if not isinstance(node, dict):
+            return node
+
+        kind = node.get("__type__")
+        if kind == "ndarray":
+            return self.arrays[node["ref"]]
+        if kind == "npscalar":
+            return np.array(node["value"], dtype=np.dtype(node["dtype"]))[()]
+        if kind == "objarray":
+            items = [self.decode(v) for v in node["items"]]
+            array = np.empty(len(items), dtype=object)
+            array[:] = items
+            return array.reshape(node["shape"])
+        if kind == "bytes":
+            return bytearray(np.asarray(self.decode(node["data"])).tobytes())
+        if kind == "dtype":
+            return np.dtype(node["value"])
+        if kind == "series":
+            return pd.Series(
+                np.asarray(self.decode(node["values"])),
+                index=pd.Index(self.decode(node["index"])),
+                name=self.decode(node["name"]),
+                copy=False,
+            )
+        if kind == "dataframe":
+            columns = [self.decode(c) for c in node["columns"]]
+            data = {c: np.asarray(self.decode(v)) for c, v in zip(columns, node["data"])}
+            return pd.DataFrame(
+                data, index=pd.Index(self.decode(node["index"])), columns=columns, copy=False
+            )
+        if kind == "datetime":
+            return pd.Timestamp(node["value"])
+        if kind == "tuple":
+            return tuple(self.decode(v) for v in node["items"])
+        if kind == "set":
+            return {self.decode(v) for v in node["items"]}
+        if kind == "dict":
+            return {k: self.decode(v) for k, v in node["items"].items()}
+        if kind == "kvdict":
+            return {self.decode(k): self.decode(v) for k, v in node["items"]}
+        if kind == "randomstate":
+            rs = np.random.RandomState()
+            rs.set_state(self.decode(node["state"]))
+            return rs
+        if kind == "model":
+            cls = _resolve_class(node["class"])
+            obj = cls.__new__(cls)
+            obj._set_state(self.decode(node["state"]))
+            return obj
+        if kind == "reduce":
+            cls = _resolve_class(node["class"])
+            obj = cls(*self.decode(node["args"]))
+            state = self.decode(node["state"])
+            if state is not None:
+                obj.__setstate__(state)
+            return obj
+        if kind == "newobj":
+            cls = _resolve_class(node["class"])
+            obj = cls.__new__(cls)
+            state = self.decode(node["state"])
+            if state is not None:
+                obj.__setstate__(state)
+            return obj
+        if kind == "object":
+            cls = _resolve_class(node["class"])
+            obj = cls.__new__(cls)
+            state = self.decode(node["state"])
+            if state is not None:
+                if hasattr(obj, "__setstate__"):
+                    obj.__setstate__(state)
+                else:
+                    obj.__dict__.update(state)
+            return obj
+
+        raise ArtifactError(f"Unknown node type: {kind}")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_artifact(obj: Any, path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Write an object as an artifact directory
+
+    Args:
+        obj: Object to persist (normally a BaseModel)
+        path: Target directory (created; must not contain an artifact)
+        metadata: Extra JSON-able fields for the manifest
+
+    Returns:
+        The manifest
+    """
+    target = Path(path)
+    if (target / MANIFEST_NAME).exists():
+        raise ArtifactError(f"Artifact already exists at {target}")
+
+    encoder = _Encoder()
+    tree = encoder.encode(obj)
+
+    arrays_dir = target / ARRAYS_DIR
+    arrays_dir.mkdir(parents=True, exist_ok=True)
+
+    index = {}
+    for name, array in encoder.arrays.items():
+        file = arrays_dir / f"{name}.npy"
+        np.save(file, array, allow_pickle=False)
+        index[name] = {
+            "file": f"{ARRAYS_DIR}/{name}.npy",
+            "dtype": array.dtype.str if not array.dtype.fields else str(array.dtype.descr),
+            "shape": list(array.shape),
+            "bytes": int(array.nbytes),
+            "sha256": _sha256(file),
+        }
+
+    manifest = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "class": tree.get("class") if isinstance(tree, dict) else None,
+        "created_at": datetime.now().isoformat(),
+        "metadata": metadata or {},
+        "arrays": index,
+        "state": tree,
+    }
+    # Manifest last: its presence marks a complete artifact
+    (target / MANIFEST_NAME).write_text(json.dumps(manifest))
+    return manifest
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """Read and check an artifact manifest"""
+    manifest_path = Path(path) / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise ArtifactError(f"No artifact manifest at {path}")
+
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != FORMAT_NAME:
+        raise ArtifactError(f"Not a model artifact: {path}")
+    if manifest.get("format_version", 0) > FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact version {manifest['format_version']}")
+    return manifest
+
+
+def load_arrays(path: str, manifest: Dict[str, Any], mmap: bool = True, verify: bool = True) -> Dict[str, np.ndarray]:
+    """Load (memory-map) an artifact's arrays, checking checksums"""
+    root = Path(path)
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        file = root / entry["file"]
+        if verify and _sha256(file) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {file}")
+        array = np.load(file, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if list(array.shape) != entry["shape"]:
+            raise ArtifactError(f"Shape mismatch for {file}")
+        arrays[name] = array
+    return arrays
+
+
+def load_artifact(path: str, mmap: bool = True, verify: bool = True) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Load an artifact directory
+
+    Args:
+        path: Artifact directory
+        mmap: Memory-map arrays read-only instead of reading them into memory
+        verify: Check SHA-256 checksums before loading
+
+    Returns:
+        Tuple of (object, manifest)
+    """
+    manifest = read_manifest(path)
+    arrays = load_arrays(path, manifest, mmap=mmap, verify=verify)
+    return _Decoder(arrays).decode(manifest["state"]), manifest
+
+
+def load_state(path: str, mmap: bool = True, verify: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Load only the root model's attribute state from an artifact
+
+    Returns:
+        Tuple of (state dict, manifest)
+    """
+    manifest = read_manifest(path)
+    root = manifest["state"]
+    if not isinstance(root, dict) or root.get("__type__") != "model":
+        raise ArtifactError(f"Artifact at {path} does not hold a model")
+    arrays = load_arrays(path, manifest, mmap=mmap, verify=verify)
+    return _Decoder(arrays).decode(root["state"]), manifest
+
+
+def is_artifact(path: str) -> bool:
+    """Check whether a path is an artifact directory"""
+    return (Path(path) / MANIFEST_NAME).exists()
@@ -61,6 +61,9 @@ class ModelResult:
 class BaseModel(ABC):
     """Abstract base class for all AI models"""
 
+    # Opt-in float32 scoring path; see set_compact()
+    compact: bool = False
+
     def __init__(self, name: str, version: str = "1.0.0"):
         self.name = name
         self.version = version
@@ -84,29 +87,120 @@ class BaseModel(ABC):
         """Evaluate model performance"""
         pass
 
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """
+        Make predictions from a (n_rows, n_features) array in feature_names order
+
+        Models override this with an array-native path; the default wraps
+        the array in a DataFrame and calls predict().
+        """
+        values = self._validate_array(values)
+        columns = self.feature_names or None
+        return self.predict(pd.DataFrame(values, columns=columns))
+
+    @property
+    def dtype(self) -> type:
+        """Scoring dtype: float32 in compact mode, float64 otherwise"""
+        from .compact import COMPACT_DTYPE
+        return COMPACT_DTYPE if self.compact else np.float64
+
+    def set_compact(self, enabled: bool = True) -> "BaseModel":
+        """
+        Switch scoring to contiguous float32 arrays (and back)
+
+        Applies to member models too. Fitting and fitted parameters are
+        unchanged; scoring casts them to float32 and avoids float64
+        copies of the input, roughly halving memory traffic at a small,
+        bounded numeric drift.
+        """
+        self.compact = enabled
+        for value in list(self.__dict__.values()):
+            members = value if isinstance(value, (list, tuple)) else [value]
+            for member in members:
+                if isinstance(member, BaseModel):
+                    member.set_compact(enabled)
+        return self
+
+    def _frame_to_array(self, X: pd.DataFrame) -> np.ndarray:
+        """The feature_names columns of X as a contiguous scoring-dtype array"""
+        from .compact import to_array
+        return to_array(X, self.feature_names, self.dtype)
+
+    @property
+    def feature_builder(self) -> "FeatureVectorBuilder":
+        """Reading-dict to array mapping for the fitted feature_names"""
+        from .features import FeatureVectorBuilder
+
+        builder = self.__dict__.get("_feature_builder")
+        if (
+            builder is None
+            or builder.feature_names != tuple(self.feature_names)
+            or builder.dtype != self.dtype
+        ):
+            builder = FeatureVectorBuilder(self.feature_names, dtype=self.dtype)
+            self.__dict__["_feature_builder"] = builder
+        return builder
+
+    def readings_to_array(self, readings: List[Dict[str, Any]]) -> np.ndarray:
+        """Assemble reading dicts into a feature array (missing features are 0)"""
+        if len(readings) == 1:
+            return self.feature_builder.build(readings[0])
+        return self.feature_builder.build_batch(readings)
+
+    def _get_state(self) -> Dict[str, Any]:
+        """Attribute state persisted by save(); override to convert attributes"""
+        state = dict(self.__dict__)
+        state.pop("_feature_builder", None)
+        return state
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        """Restore attribute state produced by _get_state()"""
+        self.__dict__.update(state)
+
     def save(self, path: str) -> None:
-        """Save model to disk"""
-        import joblib
-        joblib.dump({
-            "name": self.name,
-            "version": self.version,
-            "model": self.model,
-            "feature_names": self.feature_names,
-            "metadata": self.metadata,
-            "is_fitted": self.is_fitted,
-        }, path)
+        """
+        Save model to disk
+
+        Writes a pickle-free artifact directory (JSON manifest plus
+        memory-mappable .npy arrays, see models.artifacts).
+        """
+        from .artifacts import save_artifact
+        save_artifact(self, path, metadata={"name": self.name, "version": self.version})
         logger.info(f"Model saved to {path}")
 
-    def load(self, path: str) -> "BaseModel":
-        """Load model from disk"""
+    def load(self, path: str, mmap: bool = True) -> "BaseModel":
+        """
+        Load model from disk
+
+        Args:
+            path: Artifact directory, or a legacy joblib file
+            mmap: Memory-map artifact arrays read-only (shared page cache)
+        """
+        from .artifacts import ArtifactError, _class_path, is_artifact, load_state
+
+        if is_artifact(path):
+            state, manifest = load_state(path, mmap=mmap)
+            if manifest["class"] != _class_path(type(self)):
+                raise ArtifactError(
+                    f"Artifact holds {manifest['class']}, not {_class_path(type(self))}"
+                )
+            self._set_state(state)
+            logger.info(f"Model loaded from {path}")
+            return self
+
+        # Legacy joblib files are pickles: only load from trusted locations
         import joblib
+        logger.warning(f"Loading legacy pickled model from {path}")
         data = joblib.load(path)
-        self.name = data["name"]
-        self.version = data["version"]
-        self.model = data["model"]
-        self.feature_names = data["feature_names"]
-        self.metadata = data["metadata"]
-        self.is_fitted = data["is_fitted"]
+        if "state" in data:
+            self.__dict__.update(data["state"])
+        else:
+            self.name = data["name"]
+            self.version = data["version"]
+            self.model = data["model"]
+            self.feature_names = data["feature_names"]
+            self.metadata = data["metadata"]
+            self.is_fitted = data["is_fitted"]
         logger.info(f"Model loaded from {path}")
         return self
 
@@ -119,6 +213,19 @@ class BaseModel(ABC):
             if missing:
                 raise ValueError(f"Missing features: {missing}")
 
+    def _validate_array(self, values: np.ndarray, dtype: Optional[type] = None) -> np.ndarray:
+        """Validate a feature array, promoting a single row to 2-D (default dtype: self.dtype)"""
+        values = np.asarray(values, dtype=dtype or self.dtype)
+        if values.ndim == 1:
+            values = values.reshape(1, -1)
+        if values.shape[0] == 0:
+            raise ValueError("Input data is empty")
+        if self.feature_names and values.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected {len(self.feature_names)} features, got {values.shape[1]}"
+            )
+        return values
+
     def get_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -155,6 +262,27 @@ class ModelComparison:
 
         return self.results
 
+    def benchmark(
+        self,
+        X: pd.DataFrame,
+        y: Optional[pd.Series] = None,
+        n_splits: int = 5,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Cross-validated accuracy and inference cost of all models
+
+        Runs the models in parallel on time-series folds; see ModelBenchmark.
+
+        Returns:
+            Report with metrics, fit time, throughput, latency and memory
+        """
+        from .benchmark import ModelBenchmark
+
+        bench = ModelBenchmark(self.models, n_splits=n_splits, max_workers=max_workers)
+        bench.run(X, y)
+        return bench.generate_report()
+
     def get_best_model(self, metric: str = "f1_score") -> BaseModel:
         """Get the best model based on specified metric"""
         if not self.results:
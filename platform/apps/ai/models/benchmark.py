@@ -0,0 +1,320 @@
+"""
+Model Benchmark
+Time-series cross-validated comparison of accuracy and inference cost
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import copy
+import logging
+import multiprocessing
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from .base import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BenchmarkResult:
+    """Cross-validated quality and cost of one candidate model"""
+    model: str
+    metrics: Dict[str, float] = field(default_factory=dict)
+    fit_time_s: Optional[float] = None
+    predict_rows_per_sec: Optional[float] = None
+    latency_p50_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
+    peak_memory_mb: Optional[float] = None
+    n_folds: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dictionary: metrics next to the cost columns"""
+        return {
+            "model": self.model,
+            **self.metrics,
+            "fit_time_s": self.fit_time_s,
+            "predict_rows_per_sec": self.predict_rows_per_sec,
+            "latency_p50_ms": self.latency_p50_ms,
+            "latency_p99_ms": self.latency_p99_ms,
+            "peak_memory_mb": self.peak_memory_mb,
+            "n_folds": self.n_folds,
+            "error": self.error,
+        }
+
+
+def _benchmark_candidate(job: Dict[str, Any]) -> BenchmarkResult:
+    """
+    Cross-validate one candidate
+
+    Module-level so it can run in a worker process.
+    """
+    template: BaseModel = job["model"]
+    X: pd.DataFrame = job["X"]
+    y: Optional[pd.Series] = job["y"]
+    result = BenchmarkResult(model=job["label"])
+
+    def fold(train_idx, test_idx):
+        return (
+            X.iloc[train_idx], X.iloc[test_idx],
+            y.iloc[train_idx] if y is not None else None,
+            y.iloc[test_idx] if y is not None else None,
+        )
+
+    fold_metrics: List[Dict[str, float]] = []
+    fit_times, throughputs, latencies = [], [], []
+    try:
+        for train_idx, test_idx in job["splits"]:
+            model = copy.deepcopy(template)
+            X_train, X_test, y_train, y_test = fold(train_idx, test_idx)
+
+            started = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            model.predict(X_test)
+            throughputs.append(len(X_test) / max(time.perf_counter() - started, 1e-9))
+
+            # Single-row latency, the request path
+            rows = np.linspace(0, len(X_test) - 1, min(job["latency_samples"], len(X_test))).astype(int)
+            for i in rows:
+                started = time.perf_counter()
+                model.predict(X_test.iloc[i:i + 1])
+                latencies.append(time.perf_counter() - started)
+
+            if y_test is not None:
+                fold_metrics.append(model.evaluate(X_test, y_test).to_dict())
+
+        # Peak memory in a separate, untimed pass: tracing slows allocation.
+        # The last fold has the largest training set.
+        model = copy.deepcopy(template)
+        X_train, X_test, y_train, _ = fold(*job["splits"][-1])
+        tracemalloc.start()
+        model.fit(X_train, y_train)
+        model.predict(X_test)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        logger.error(f"Benchmark of {template.name} failed: {e}")
+        result.error = str(e)
+        return result
+
+    if fold_metrics:
+        keys = sorted({key for metrics in fold_metrics for key in metrics})
+        result.metrics = {
+            key: float(np.mean([m[key] for m in fold_metrics if key in m])) for key in keys
+        }
+    result.n_folds = len(fit_times)
+    result.fit_time_s = float(np.mean(fit_times))
+    result.predict_rows_per_sec = float(np.mean(throughputs))
+    result.latency_p50_ms = float(np.percentile(latencies, 50) * 1000)
+    result.latency_p99_ms = float(np.percentile(latencies, 99) * 1000)
+    result.peak_memory_mb = float(peak / 2**20)
+    return result
+
+
+class ModelBenchmark:
+    """
+    Accuracy/latency benchmark for candidate models
+
+    Each candidate is cross-validated on ``TimeSeriesSplit`` folds (train
+    on the past, test on the following block) in its own worker process.
+    Per candidate it records the fold-averaged evaluation metrics and:
+
+    - fit_time_s: mean fit time per fold
+    - predict_rows_per_sec: batch predict throughput on the test fold
+    - latency_p50_ms / latency_p99_ms: single-row predict latency
+    - peak_memory_mb: peak traced allocation during fit and predict on
+      the largest fold, measured in an extra pass outside the timings
+
+    Results are keyed by model name; repeated names get a " (2)", " (3)",
+    ... suffix in the order the candidates were given.
+
+    Candidates running in parallel share the machine; use
+    ``max_workers=1`` when absolute timings matter more than wall time.
+    """
+
+    def __init__(
+        self,
+        models: List[BaseModel],
+        n_splits: int = 5,
+        gap: int = 0,
+        latency_samples: int = 200,
+        max_workers: Optional[int] = None,
+    ):
+        self.models = models
+        self.n_splits = n_splits
+        self.gap = gap
+        self.latency_samples = latency_samples
+        self.max_workers = max_workers
+        self.results: Dict[str, BenchmarkResult] = {}
+
+    def _labels(self) -> List[str]:
+        """Model names, suffixed where several candidates share one"""
+        seen: Dict[str, int] = {}
+        labels = []
+        for model in self.models:
+            seen[model.name] = seen.get(model.name, 0) + 1
+            labels.append(model.name if seen[model.name] == 1 else f"{model.name} ({seen[model.name]})")
+        return labels
+
+    def run(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> Dict[str, BenchmarkResult]:
+        """
+        Benchmark every candidate
+
+        Args:
+            X: Features in time order
+            y: Labels or targets (metrics are skipped without them)
+
+        Returns:
+            BenchmarkResult per model name (suffixed if repeated)
+        """
+        splits = list(TimeSeriesSplit(n_splits=self.n_splits, gap=self.gap).split(X))
+        jobs = [{
+            "model": model,
+            "label": label,
+            "X": X,
+            "y": y,
+            "splits": splits,
+            "latency_samples": self.latency_samples,
+        } for model, label in zip(self.models, self._labels())]
+
+        if self.max_workers == 1 or len(jobs) == 1:
+            results = [_benchmark_candidate(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_benchmark_candidate, jobs))
+
+        self.results = {result.model: result for result in results}
+        return self.results
+
+    def generate_report(self, sort_by: str = "latency_p99_ms") -> pd.DataFrame:
+        """Benchmark report, one row per model"""
+        if not self.results:
+            raise ValueError("No benchmark results available")
+        report = pd.DataFrame([result.to_dict() for result in self.results.values()])
+        if sort_by in report.columns:
+            report = report.sort_values(sort_by, kind="stable").reset_index(drop=True)
+        return report
+
+    def pareto_front(
+        self,
+        metric: str = "f1_score",
+        cost: str = "latency_p99_ms",
+        higher_is_better: bool = True,
+    ) -> List[str]:
+        """
+        Models not beaten on both the metric and the cost by another model
+
+        Returns:
+            Model names ordered by cost
+        """
+        rows = [
+            (name, r.metrics[metric], getattr(r, cost))
+            for name, r in self.results.items()
+            if r.error is None and metric in r.metrics and getattr(r, cost) is not None
+        ]
+        sign = 1 if higher_is_better else -1
+        front = [
+            (name, c) for name, m, c in rows
+            if not any(
+                sign * m2 >= sign * m and c2 <= c and (sign * m2 > sign * m or c2 < c)
+                for _, m2, c2 in rows
+            )
+        ]
+        return [name for name, _ in sorted(front, key=lambda item: item[1])]
+
+
+def _peak_rss_worker(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score a year of synthetic hourly readings and report peak RSS
+
+    Runs in a fresh (spawned) process so the peak belongs to this run only.
+    """
+    import resource
+
+    model: BaseModel = job["model"]
+    model.set_compact(job["compact"])
+    n_rows = job["n_dmas"] * job["hours"]
+    n_features = len(model.feature_names)
+
+    # Same float64 draws in both modes, written in blocks into one
+    # scoring-dtype buffer so no full-size float64 copy exists
+    rng = np.random.default_rng(job["seed"])
+    loc, scale = np.asarray(job["loc"]), np.asarray(job["scale"])
+    values = np.empty((n_rows, n_features), dtype=model.dtype)
+    for start in range(0, n_rows, 65_536):
+        block = values[start:start + 65_536]
+        block[:] = rng.normal(loc, scale, block.shape)
+
+    started = time.perf_counter()
+    result = model.predict_array(values)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "dtype": np.dtype(model.dtype).name,
+        "rows": n_rows,
+        "input_mb": values.nbytes / 2**20,
+        "score_time_s": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2**20,
+        "anomalies": int(np.asarray(result.predictions).sum()),
+    }
+
+
+def memory_benchmark(
+    model: BaseModel,
+    n_dmas: int = 500,
+    hours: int = 24 * 365,
+    loc: Optional[Sequence[float]] = None,
+    scale: Optional[Sequence[float]] = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Peak RSS of scoring a year of hourly data for every DMA, float64 vs compact
+
+    Each mode runs in its own spawned process (Unix only, as it reads
+    ``ru_maxrss``), scoring one (n_dmas × hours, n_features) matrix of
+    normal readings with ``model.predict_array``.
+
+    Args:
+        model: Fitted model
+        n_dmas: Number of DMAs
+        hours: Hourly readings per DMA
+        loc: Per-feature mean of the synthetic readings (default 0)
+        scale: Per-feature std of the synthetic readings (default 1)
+        seed: Random seed; both modes score the same readings
+
+    Returns:
+        One row per dtype with rows, input_mb, score_time_s and peak_rss_mb
+    """
+    if not model.is_fitted:
+        raise ValueError("Model not fitted")
+    n_features = len(model.feature_names)
+    jobs = [{
+        "model": model,
+        "compact": compact,
+        "n_dmas": n_dmas,
+        "hours": hours,
+        "loc": loc if loc is not None else np.zeros(n_features),
+        "scale": scale if scale is not None else np.ones(n_features),
+        "seed": seed,
+    } for compact in (False, True)]
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for job in jobs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            rows.append(pool.submit(_peak_rss_worker, job).result())
+    return pd.DataFrame(rows)
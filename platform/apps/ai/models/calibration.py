@@ -0,0 +1,61 @@
+"""
+Score Calibration
+Maps raw anomaly scores to probabilities learned at fit time
+"""
+
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class ScoreCalibrator:
+    """
+    Empirical-CDF score calibrator
+
+    Stores a lookup table of training-score quantiles; a new score maps to
+    the fraction of training scores at or below it, interpolated linearly
+    between table entries. The mapping depends only on the score itself,
+    so a row gets the same probability alone, in any batch, or in any
+    chunk of a larger batch.
+    """
+
+    def __init__(self, n_quantiles: int = 1000):
+        self.n_quantiles = n_quantiles
+        self.references: Optional[np.ndarray] = None
+        self.levels: Optional[np.ndarray] = None
+
+    def fit(self, scores: np.ndarray) -> "ScoreCalibrator":
+        """Learn the score distribution (higher score = more anomalous)"""
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        scores = scores[np.isfinite(scores)]
+        if scores.size == 0:
+            raise ValueError("Cannot calibrate on empty scores")
+
+        levels = np.linspace(0, 1, min(self.n_quantiles, scores.size))
+        references = np.quantile(scores, levels)
+        # Keep the highest level per distinct score: right-continuous ECDF
+        references, first = np.unique(references[::-1], return_index=True)
+        self.references = references
+        self.levels = levels[::-1][first]
+        return self
+
+    def transform(self, scores: np.ndarray) -> np.ndarray:
+        """Map raw scores to probabilities in [0, 1]"""
+        if self.references is None:
+            raise ValueError("Calibrator not fitted")
+
+        scores = np.asarray(scores, dtype=np.float64)
+        if self.references.size == 1:
+            return (scores >= self.references[0]).astype(np.float64)
+        return np.interp(scores, self.references, self.levels, left=0.0, right=1.0)
+
+    def get_info(self) -> Dict[str, Any]:
+        """Get calibration table summary"""
+        if self.references is None:
+            return {"fitted": False}
+        return {
+            "fitted": True,
+            "table_size": int(self.references.size),
+            "score_min": float(self.references[0]),
+            "score_median": float(np.interp(0.5, self.levels, self.references)),
+            "score_max": float(self.references[-1]),
+        }
@@ -12,10 +12,13 @@ Purpose: แยกแยะประเภทน้ำสูญเสีย (Phy
 
 from .classifier import WaterLossClassifier
 from .tree_models import DecisionTreeClassifier, RandomForestClassifier, XGBoostClassifier
+from .compiled import CompiledTreeModel, compile_tree_model
 
 __all__ = [
     "WaterLossClassifier",
     "DecisionTreeClassifier",
     "RandomForestClassifier",
     "XGBoostClassifier",
+    "CompiledTreeModel",
+    "compile_tree_model",
 ]
@@ -66,6 +66,7 @@ class WaterLossClassifier(BaseModel):
             raise ValueError(f"Unknown approach: {approach}")
 
         self.classifier = self.APPROACHES[approach](**kwargs)
+        self.top_features: Dict[str, float] = {}
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "WaterLossClassifier":
         """Train the classifier"""
@@ -76,6 +77,8 @@ class WaterLossClassifier(BaseModel):
         self.feature_names = X.columns.tolist()
 
         self.classifier.fit(X, y)
+        # Static after fit: computed once rather than on every classify call
+        self.top_features = self.classifier.get_feature_importance().head(5).to_dict()
         self.is_fitted = True
         return self
 
@@ -85,7 +88,14 @@ class WaterLossClassifier(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
-        result = self.classifier.predict(X)
+        return self.predict_array(self._frame_to_array(X))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Classify a feature array (columns in feature_names order)"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        result = self.classifier.predict_array(values)
 
         # Add loss type labels
         predictions = result.predictions
@@ -135,30 +145,39 @@ class WaterLossClassifier(BaseModel):
         Returns:
             Dictionary with loss_type, probability, details
         """
-        if not self.is_fitted:
-            raise ValueError("Model not fitted")
+        return self.classify_batch([reading])[0]
 
-        # Convert to DataFrame
-        df = pd.DataFrame([reading])
+    def classify_batch(self, readings: List[Dict]) -> List[Dict]:
+        """
+        Classify a batch of readings with one predict call
+        Used by the micro-batching dispatcher
 
-        # Ensure all features are present
-        for col in self.feature_names:
-            if col not in df.columns:
-                df[col] = 0
+        Args:
+            readings: List of dictionaries with features
 
-        df = df[self.feature_names]
-        result = self.predict(df)
+        Returns:
+            List of dictionaries shaped like classify_single results
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
 
-        prediction = int(result.predictions[0])
-        loss_type = self.LOSS_TYPES.get(prediction, {"en": "unknown", "th": "ไม่ทราบ"})
-
-        return {
-            "loss_type": loss_type["en"],
-            "loss_type_th": loss_type["th"],
-            "probability": float(result.probabilities[0].max()) if result.probabilities is not None else None,
-            "confidence": result.confidence,
-            "feature_importance": self.get_feature_importance().head(5).to_dict(),
-        }
+        # Missing features default to 0
+        result = self.classifier.predict_array(self.readings_to_array(readings))
+        feature_importance = getattr(self, "top_features", None) or self.get_feature_importance().head(5).to_dict()
+
+        outputs = []
+        for i, prediction in enumerate(result.predictions):
+            loss_type = self.LOSS_TYPES.get(int(prediction), {"en": "unknown", "th": "ไม่ทราบ"})
+            probability = float(result.probabilities[i].max()) if result.probabilities is not None else None
+            outputs.append({
+                "loss_type": loss_type["en"],
+                "loss_type_th": loss_type["th"],
+                "probability": probability,
+                # Classifier confidence is the mean max-probability, i.e. the row's own for one row
+                "confidence": probability if probability is not None else result.confidence,
+                "feature_importance": feature_importance,
+            })
+        return outputs
 
     def get_classification_report(self, X: pd.DataFrame, y: pd.Series) -> pd.DataFrame:
         """Generate detailed classification report"""
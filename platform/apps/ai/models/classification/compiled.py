@@ -0,0 +1,325 @@
+"""
+Compiled Tree Inference
+Flat array representation of fitted tree ensembles with vectorized traversal
+"""
+
+from typing import Any, List, Optional
+import json
+import numpy as np
+from scipy.special import expit
+
+
+class CompiledTreeModel:
+    """
+    Tree ensemble compiled into flat node arrays
+
+    All trees are concatenated into one set of arrays indexed by node:
+    ``feature`` (-1 at leaves), ``threshold``, ``left``/``right`` child
+    indices (leaves point at themselves) and ``missing_left`` for NaN
+    routing. Prediction walks every tree for every row at once, one NumPy
+    step per tree level, so a single reading costs a few dozen array ops
+    instead of a pass through pandas, sklearn's input validation and its
+    per-tree thread dispatch. Large batches are still faster in the
+    native predictors, see ``COMPILED_MAX_ROWS`` in tree_models.
+
+    Kinds:
+    - forest: leaf ``value`` rows are class distributions, averaged over
+      trees (DecisionTree, RandomForest)
+    - boosting: leaf ``value`` is a margin contribution added to
+      ``init`` for output ``tree_output[t]`` (GradientBoosting, XGBoost)
+
+    Input is validated like the native predictor's: infinity is always
+    rejected, NaN unless ``allow_nan`` (sklearn's GradientBoosting does not
+    accept it), so a request fails or succeeds the same way on both paths.
+    """
+
+    # Artifacts compiled before the flag existed keep accepting NaN
+    allow_nan: bool = True
+
+    def __init__(
+        self,
+        kind: str,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        missing_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        classes: np.ndarray,
+        tree_output: Optional[np.ndarray] = None,
+        init: Optional[np.ndarray] = None,
+        strict: bool = False,
+        input_dtype: str = "float32",
+        allow_nan: bool = True,
+    ):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes = classes
+        self.tree_output = tree_output
+        self.init = init
+        # sklearn goes left on x <= threshold, XGBoost on x < threshold
+        self.strict = strict
+        self.input_dtype = input_dtype
+        self.allow_nan = allow_nan
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index of every row in every tree, shape (n_rows, n_trees)"""
+        # Trees compare in the dtype they were trained on
+        X = np.asarray(X, dtype=self.input_dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if not self.allow_nan and np.isnan(X).any():
+            raise ValueError("Input X contains NaN.")
+        if np.isinf(X).any():
+            raise ValueError(f"Input X contains infinity or a value too large for {X.dtype!r}.")
+        n_rows, n_features = X.shape
+
+        flat = np.ascontiguousarray(X).ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * n_features, self.n_trees)
+        # Walk all (row, tree) pairs one level at a time, dropping those at a leaf
+        active = np.arange(len(nodes))
+        while active.size:
+            current = nodes[active]
+            feature = self.feature[current]
+            split = feature >= 0
+            active, current, feature = active[split], current[split], feature[split]
+            if not active.size:
+                break
+
+            x = flat[row_offset[active] + feature]
+            if self.strict:
+                go_left = x < self.threshold[current]
+            else:
+                go_left = x <= self.threshold[current]
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.missing_left[current], go_left)
+            nodes[active] = np.where(go_left, self.left[current], self.right[current])
+        return nodes.reshape(n_rows, self.n_trees)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Raw margin per output (boosting models only)"""
+        if self.kind != "boosting":
+            raise ValueError("decision_function is only defined for boosting models")
+
+        leaves = self.apply(X)
+        raw = np.tile(self.init, (len(leaves), 1))
+        contributions = self.value[leaves]
+        for k in range(raw.shape[1]):
+            raw[:, k] += contributions[:, self.tree_output == k].sum(axis=1)
+        return raw
+
+    def predict_with_proba(self, X: np.ndarray) -> tuple:
+        """Class labels and probabilities from one traversal"""
+        if self.kind == "forest":
+            proba = self.value[self.apply(X)].sum(axis=1) / self.n_trees
+            return self.classes.take(proba.argmax(axis=1)), proba
+
+        raw = self.decision_function(X)
+        if raw.shape[1] == 1:
+            positive = expit(raw[:, 0])
+            proba = np.column_stack([1 - positive, positive])
+            return self.classes.take((raw[:, 0] >= 0).astype(int)), proba
+        shifted = np.exp(raw - raw.max(axis=1, keepdims=True))
+        proba = shifted / shifted.sum(axis=1, keepdims=True)
+        return self.classes.take(raw.argmax(axis=1)), proba
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, columns ordered as ``classes``"""
+        return self.predict_with_proba(X)[1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicted class labels"""
+        return self.predict_with_proba(X)[0]
+
+    def get_info(self) -> dict:
+        """Get compiled model summary"""
+        return {
+            "kind": self.kind,
+            "n_trees": self.n_trees,
+            "n_nodes": self.n_nodes,
+            "max_depth": self.max_depth,
+        }
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledTreeModel":
+        """Compile a fitted DecisionTree, RandomForest or GradientBoosting classifier"""
+        from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        if isinstance(model, DecisionTreeClassifier):
+            trees, kind = [model.tree_], "forest"
+        elif isinstance(model, RandomForestClassifier):
+            trees, kind = [est.tree_ for est in model.estimators_], "forest"
+        elif isinstance(model, GradientBoostingClassifier):
+            trees, kind = [est.tree_ for est in model.estimators_.ravel()], "boosting"
+        else:
+            raise TypeError(f"Cannot compile {type(model).__name__}")
+
+        builder = _Builder()
+        for tree in trees:
+            is_leaf = tree.children_left == -1
+            missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+            if kind == "forest":
+                # Same normalization as sklearn's tree predict_proba
+                value = tree.value[:, 0, :].copy()
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                value /= normalizer
+            else:
+                value = model.learning_rate * tree.value[:, 0, 0]
+            builder.add_tree(
+                feature=np.where(is_leaf, -1, tree.feature),
+                threshold=tree.threshold,
+                left=tree.children_left,
+                right=tree.children_right,
+                missing_left=missing_left.astype(bool),
+                value=value,
+                depth=tree.max_depth,
+            )
+
+        if kind == "forest":
+            return builder.build(kind, model.classes_, input_dtype="float32")
+
+        n_outputs = model.estimators_.shape[1]
+        init = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+        tree_output = np.tile(np.arange(n_outputs, dtype=np.int32), model.estimators_.shape[0])
+        return builder.build(
+            kind, model.classes_, tree_output=tree_output, init=init, input_dtype="float32", allow_nan=False,
+        )
+
+    @classmethod
+    def from_xgboost(cls, model: Any, feature_names: List[str]) -> "CompiledTreeModel":
+        """Compile a fitted XGBClassifier from its JSON tree dump"""
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        learner = config["learner"]
+        objective = learner["objective"]["name"]
+        # A scalar, or one entry per class from XGBoost >= 3.1 ("[5E-1,5E-1,5E-1]")
+        base_score = np.atleast_1d(np.asarray(
+            json.loads(str(learner["learner_model_param"]["base_score"])), dtype=np.float64
+        ))
+        n_classes = len(model.classes_)
+
+        builder = _Builder()
+        feature_index = {name: i for i, name in enumerate(feature_names)}
+        feature_index.update({f"f{i}": i for i in range(len(feature_names))})
+        for dump in booster.get_dump(dump_format="json"):
+            builder.add_xgboost_tree(json.loads(dump), feature_index)
+
+        if objective.startswith("binary:"):
+            if base_score.size != 1:
+                raise TypeError(f"Cannot compile binary base_score of size {base_score.size}")
+            init = np.log(base_score / (1 - base_score))
+            tree_output = np.zeros(builder.n_trees, dtype=np.int32)
+        elif objective.startswith("multi:"):
+            if base_score.size not in (1, n_classes):
+                raise TypeError(f"Cannot compile base_score of size {base_score.size} for {n_classes} classes")
+            init = np.broadcast_to(base_score, n_classes).copy()
+            tree_output = (np.arange(builder.n_trees) % n_classes).astype(np.int32)
+        else:
+            raise TypeError(f"Cannot compile XGBoost objective {objective}")
+
+        return builder.build(
+            "boosting", model.classes_, tree_output=tree_output, init=init,
+            strict=True, input_dtype="float32",
+        )
+
+
+class _Builder:
+    """Concatenates per-tree node arrays with offset child indices"""
+
+    def __init__(self) -> None:
+        self.parts: dict = {k: [] for k in ("feature", "threshold", "left", "right", "missing_left", "value")}
+        self.roots: List[int] = []
+        self.max_depth = 0
+        self.offset = 0
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def add_tree(self, feature, threshold, left, right, missing_left, value, depth) -> None:
+        index = np.arange(len(feature))
+        is_leaf = feature < 0
+        self.parts["feature"].append(np.asarray(feature, dtype=np.int32))
+        self.parts["threshold"].append(np.asarray(threshold, dtype=np.float64))
+        self.parts["left"].append((np.where(is_leaf, index, left) + self.offset).astype(np.int32))
+        self.parts["right"].append((np.where(is_leaf, index, right) + self.offset).astype(np.int32))
+        self.parts["missing_left"].append(np.asarray(missing_left, dtype=bool))
+        self.parts["value"].append(np.asarray(value, dtype=np.float64))
+        self.roots.append(self.offset)
+        self.max_depth = max(self.max_depth, int(depth))
+        self.offset += len(feature)
+
+    def add_xgboost_tree(self, root: dict, feature_index: dict) -> None:
+        nodes = {}
+        depth = 0
+        stack = [(root, 0)]
+        while stack:
+            node, level = stack.pop()
+            nodes[node["nodeid"]] = node
+            depth = max(depth, level)
+            for child in node.get("children", []):
+                stack.append((child, level + 1))
+
+        n = max(nodes) + 1
+        feature = np.full(n, -1, dtype=np.int32)
+        threshold = np.zeros(n, dtype=np.float64)
+        left = np.arange(n)
+        right = np.arange(n)
+        missing_left = np.zeros(n, dtype=bool)
+        value = np.zeros(n, dtype=np.float64)
+        for node_id, node in nodes.items():
+            if "leaf" in node:
+                value[node_id] = node["leaf"]
+                continue
+            if "split_condition" not in node:
+                raise TypeError("Cannot compile categorical XGBoost splits")
+            feature[node_id] = feature_index[node["split"]]
+            threshold[node_id] = np.float32(node["split_condition"])
+            left[node_id] = node["yes"]
+            right[node_id] = node["no"]
+            missing_left[node_id] = node["missing"] == node["yes"]
+        self.add_tree(feature, threshold, left, right, missing_left, value, depth)
+
+    def build(self, kind: str, classes: np.ndarray, **kwargs) -> CompiledTreeModel:
+        arrays = {k: np.concatenate(v) for k, v in self.parts.items()}
+        return CompiledTreeModel(
+            kind=kind,
+            roots=np.asarray(self.roots, dtype=np.int32),
+            max_depth=self.max_depth,
+            classes=np.asarray(classes),
+            **arrays,
+            **kwargs,
+        )
+
+
+def compile_tree_model(model: Any, feature_names: Optional[List[str]] = None) -> CompiledTreeModel:
+    """
+    Compile a fitted sklearn or XGBoost tree classifier
+
+    Raises:
+        TypeError: If the model type or one of its splits is unsupported
+    """
+    if type(model).__module__.startswith("xgboost"):
+        return CompiledTreeModel.from_xgboost(model, feature_names or [])
+    return CompiledTreeModel.from_sklearn(model)
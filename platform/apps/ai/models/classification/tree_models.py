@@ -4,6 +4,7 @@ Decision Tree, Random Forest, and XGBoost
 """
 
 from typing import Optional
+import logging
 import numpy as np
 import pandas as pd
 from sklearn.tree import DecisionTreeClassifier as SKDecisionTree
@@ -17,6 +18,12 @@ from sklearn.metrics import (
 )
 
 from ..base import BaseModel, ModelResult, ModelMetrics
+from .compiled import CompiledTreeModel, compile_tree_model
+
+logger = logging.getLogger(__name__)
+
+# Above this many rows the native sklearn/XGBoost predictors are faster
+COMPILED_MAX_ROWS = 256
 
 
 class DecisionTreeClassifier(BaseModel):
@@ -34,6 +41,7 @@ class DecisionTreeClassifier(BaseModel):
         self.random_state = random_state
         self.model: Optional[SKDecisionTree] = None
         self.classes_: Optional[np.ndarray] = None
+        self.compiled: Optional[CompiledTreeModel] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "DecisionTreeClassifier":
         """Train Decision Tree model"""
@@ -48,8 +56,9 @@ class DecisionTreeClassifier(BaseModel):
             min_samples_split=self.min_samples_split,
             random_state=self.random_state,
         )
-        self.model.fit(X, y)
+        self.model.fit(X.to_numpy(dtype=np.float64), y)
         self.classes_ = self.model.classes_
+        self.compiled = _compile(self.model, self.feature_names)
 
         self.is_fitted = True
         return self
@@ -60,9 +69,14 @@ class DecisionTreeClassifier(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Classify a feature array (columns in feature_names order)"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
 
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+        predictions, probabilities = _predict(self, self._validate_array(values))
 
         # Confidence is max probability
         confidence = probabilities.max(axis=1).mean()
@@ -124,6 +138,7 @@ class RandomForestClassifier(BaseModel):
         self.random_state = random_state
         self.model: Optional[SKRandomForest] = None
         self.classes_: Optional[np.ndarray] = None
+        self.compiled: Optional[CompiledTreeModel] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "RandomForestClassifier":
         """Train Random Forest model"""
@@ -140,8 +155,9 @@ class RandomForestClassifier(BaseModel):
             random_state=self.random_state,
             n_jobs=-1,
         )
-        self.model.fit(X, y)
+        self.model.fit(X.to_numpy(dtype=np.float64), y)
         self.classes_ = self.model.classes_
+        self.compiled = _compile(self.model, self.feature_names)
 
         self.is_fitted = True
         return self
@@ -152,9 +168,14 @@ class RandomForestClassifier(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Classify a feature array (columns in feature_names order)"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
 
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+        predictions, probabilities = _predict(self, self._validate_array(values))
         confidence = probabilities.max(axis=1).mean()
 
         return ModelResult(
@@ -213,6 +234,7 @@ class XGBoostClassifier(BaseModel):
         self.random_state = random_state
         self.model = None
         self.classes_: Optional[np.ndarray] = None
+        self.compiled: Optional[CompiledTreeModel] = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "XGBoostClassifier":
         """Train XGBoost model"""
@@ -233,7 +255,7 @@ class XGBoostClassifier(BaseModel):
                 eval_metric="logloss",
                 n_jobs=-1,
             )
-            self.model.fit(X, y)
+            self.model.fit(X.to_numpy(dtype=np.float64), y)
             self.classes_ = self.model.classes_
         except ImportError:
             # Fallback to sklearn if xgboost not available
@@ -244,8 +266,9 @@ class XGBoostClassifier(BaseModel):
                 learning_rate=self.learning_rate,
                 random_state=self.random_state,
             )
-            self.model.fit(X, y)
+            self.model.fit(X.to_numpy(dtype=np.float64), y)
             self.classes_ = self.model.classes_
+        self.compiled = _compile(self.model, self.feature_names)
 
         self.is_fitted = True
         return self
@@ -256,9 +279,14 @@ class XGBoostClassifier(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Classify a feature array (columns in feature_names order)"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
+
+        predictions, probabilities = _predict(self, self._validate_array(values))
         confidence = probabilities.max(axis=1).mean()
 
         return ModelResult(
@@ -299,3 +327,20 @@ class XGBoostClassifier(BaseModel):
             self.model.feature_importances_,
             index=self.feature_names,
         ).sort_values(ascending=False)
+
+
+def _compile(model, feature_names) -> Optional[CompiledTreeModel]:
+    """Compile fitted trees for fast inference; None if unsupported"""
+    try:
+        return compile_tree_model(model, feature_names)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Using {type(model).__name__} without compiled inference: {e}")
+        return None
+
+
+def _predict(classifier: BaseModel, values: np.ndarray) -> tuple:
+    """Labels and probabilities, through the compiled trees for small batches"""
+    compiled = getattr(classifier, "compiled", None)
+    if compiled is not None and len(values) <= COMPILED_MAX_ROWS:
+        return compiled.predict_with_proba(values)
+    return classifier.model.predict(values), classifier.model.predict_proba(values)
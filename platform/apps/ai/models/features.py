@@ -0,0 +1,61 @@
+"""
+Feature Vector Assembly
+Maps reading dicts straight into float arrays in feature order
+"""
+
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence
+import threading
+import numpy as np
+
+
+class FeatureVectorBuilder:
+    """
+    Precompiled reading-to-array mapping for one fitted model
+
+    ``build`` writes a single reading into a preallocated (1, n_features)
+    buffer owned by the calling thread and returns it; the buffer is
+    overwritten by that thread's next call, so callers must not keep it.
+    Missing features take ``default``, matching the DataFrame path it
+    replaces; None becomes NaN.
+    """
+
+    def __init__(self, feature_names: Sequence[str], default: float = 0.0, dtype: type = np.float64):
+        self.feature_names = tuple(feature_names)
+        self.default = default
+        self.dtype = dtype
+        self._getter = itemgetter(*self.feature_names) if self.feature_names else None
+        self._local = threading.local()
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def _values(self, reading: Dict[str, Any]) -> Sequence[Any]:
+        try:
+            values = self._getter(reading)
+        except KeyError:
+            return [reading.get(name, self.default) for name in self.feature_names]
+        return (values,) if self.n_features == 1 else values
+
+    def _fill(self, row: np.ndarray, reading: Dict[str, Any]) -> None:
+        values = self._values(reading)
+        try:
+            row[:] = values
+        except TypeError:
+            row[:] = [np.nan if value is None else value for value in values]
+
+    def build(self, reading: Dict[str, Any]) -> np.ndarray:
+        """Write one reading into this thread's reusable (1, n_features) buffer"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty((1, self.n_features), dtype=self.dtype)
+        self._fill(buffer[0], reading)
+        return buffer
+
+    def build_batch(self, readings: List[Dict[str, Any]]) -> np.ndarray:
+        """Assemble readings into a new (n_readings, n_features) array"""
+        out = np.empty((len(readings), self.n_features), dtype=self.dtype)
+        for row, reading in zip(out, readings):
+            self._fill(row, reading)
+        return out
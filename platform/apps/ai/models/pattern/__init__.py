@@ -12,9 +12,11 @@ Purpose: จดจำรูปแบบการใช้น้ำ, ฤดูก
 
 from .recognizer import PatternRecognizer
 from .clustering import KMeansRecognizer, DBSCANRecognizer
+from .streaming import MiniBatchKMeansRecognizer
 
 __all__ = [
     "PatternRecognizer",
     "KMeansRecognizer",
     "DBSCANRecognizer",
+    "MiniBatchKMeansRecognizer",
 ]
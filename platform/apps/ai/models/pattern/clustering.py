@@ -7,6 +7,7 @@ from typing import Optional, List
 import numpy as np
 import pandas as pd
 from sklearn.cluster import KMeans, DBSCAN
+from sklearn.neighbors import BallTree, KDTree
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import silhouette_score
 
@@ -38,7 +39,7 @@ class KMeansRecognizer(BaseModel):
 
         # Scale features
         self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        X_scaled = self.scaler.fit_transform(X.to_numpy(dtype=np.float64))
 
         # Train K-Means
         self.model = KMeans(
@@ -82,13 +83,17 @@ class KMeansRecognizer(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
-        # Scale and predict
-        X_scaled = self.scaler.transform(X)
-        clusters = self.model.predict(X_scaled)
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Assign patterns to a feature array (columns in feature_names order)"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
 
-        # Get distances to cluster centers for confidence
+        # Scale and take the nearest centre from one distance computation
+        X_scaled = self.scaler.transform(self._validate_array(values))
         distances = self.model.transform(X_scaled)
+        clusters = distances.argmin(axis=1).astype(np.int32)
         min_distances = distances.min(axis=1)
 
         # Convert distances to confidence (closer = higher confidence)
@@ -114,7 +119,7 @@ class KMeansRecognizer(BaseModel):
         if not self.is_fitted or self.model is None:
             raise ValueError("Model not fitted")
 
-        X_scaled = self.scaler.transform(X)
+        X_scaled = self.scaler.transform(X[self.feature_names].to_numpy(dtype=np.float64))
         labels = self.model.predict(X_scaled)
 
         # Calculate silhouette score
@@ -150,20 +155,37 @@ class KMeansRecognizer(BaseModel):
 
 
 class DBSCANRecognizer(BaseModel):
-    """DBSCAN clustering for pattern recognition"""
+    """
+    DBSCAN clustering for pattern recognition
+
+    New points take the cluster of their nearest core sample, or noise
+    (-1) if it is farther than ``eps``. The scaled core samples and a
+    KD-tree (or ball tree) over them are built once at fit and saved with
+    the model, so each prediction is an O(log n) tree query per point.
+    """
+
+    INDEXES = {"kd_tree": KDTree, "ball_tree": BallTree}
 
     def __init__(
         self,
         eps: float = 0.5,
         min_samples: int = 5,
+        index: str = "kd_tree",
+        leaf_size: int = 40,
     ):
         super().__init__(name="DBSCANRecognizer", version="1.0.0")
+        if index not in self.INDEXES:
+            raise ValueError(f"Unknown index: {index}")
         self.eps = eps
         self.min_samples = min_samples
+        self.index = index
+        self.leaf_size = leaf_size
         self.model: Optional[DBSCAN] = None
         self.scaler: Optional[StandardScaler] = None
         self.n_clusters_: int = 0
         self.n_noise_: int = 0
+        self.core_labels_: Optional[np.ndarray] = None
+        self.neighbor_index_ = None
 
     def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "DBSCANRecognizer":
         """Train DBSCAN clustering model"""
@@ -172,7 +194,7 @@ class DBSCANRecognizer(BaseModel):
 
         # Scale features
         self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        X_scaled = self.scaler.fit_transform(X.to_numpy(dtype=np.float64))
 
         # Train DBSCAN
         self.model = DBSCAN(
@@ -187,54 +209,56 @@ class DBSCANRecognizer(BaseModel):
         self.n_clusters_ = len(set(labels)) - (1 if -1 in labels else 0)
         self.n_noise_ = int((labels == -1).sum())
 
+        self._build_index()
         self.is_fitted = True
         return self
 
+    def _build_index(self) -> None:
+        """Index the scaled core samples (DBSCAN keeps them as components_)"""
+        core_samples = self.model.components_
+        self.core_labels_ = self.model.labels_[self.model.core_sample_indices_]
+        if len(core_samples) == 0:
+            self.neighbor_index_ = None
+            return
+        tree_class = self.INDEXES[getattr(self, "index", "kd_tree")]
+        self.neighbor_index_ = tree_class(core_samples, leaf_size=getattr(self, "leaf_size", 40))
+
     def predict(self, X: pd.DataFrame) -> ModelResult:
-        """
-        DBSCAN doesn't have predict method, but we can find nearest cluster
-        """
+        """Assign new points to the nearest core sample's cluster"""
         if not self.is_fitted or self.model is None:
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
-        # Scale data
-        X_scaled = self.scaler.transform(X)
-
-        # For DBSCAN, we need to refit or use core samples
-        # Here we use a simple approach: assign to nearest core sample's cluster
-        from sklearn.neighbors import NearestNeighbors
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Assign a feature array to the nearest core sample's cluster"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
 
-        core_mask = np.zeros(len(self.model.labels_), dtype=bool)
-        core_mask[self.model.core_sample_indices_] = True
+        # Models saved before the index was persisted build it on first use
+        if getattr(self, "core_labels_", None) is None:
+            self._build_index()
 
-        if hasattr(self, '_X_train_scaled'):
-            X_core = self._X_train_scaled[core_mask]
-            labels_core = self.model.labels_[core_mask]
-        else:
-            # Fallback: return -1 (noise) for new points
+        X_scaled = self.scaler.transform(self._validate_array(values))
+        if self.neighbor_index_ is None:
+            # No core samples: everything is noise
             return ModelResult(
-                predictions=np.full(len(X), -1),
-                probabilities=np.zeros(len(X)),
+                predictions=np.full(len(X_scaled), -1),
+                probabilities=np.zeros(len(X_scaled)),
                 confidence=0.0,
-                details={"note": "DBSCAN doesn't support predict on new data"}
+                details={"n_clusters": self.n_clusters_, "n_noise": len(X_scaled)},
             )
 
-        # Find nearest core sample for each new point
-        nn = NearestNeighbors(n_neighbors=1)
-        nn.fit(X_core)
-        distances, indices = nn.kneighbors(X_scaled)
-
-        # Assign cluster labels
-        predictions = labels_core[indices.flatten()]
+        distances, indices = self.neighbor_index_.query(X_scaled, k=1)
+        distances = distances[:, 0]
 
-        # Points far from core samples marked as noise
-        noise_mask = distances.flatten() > self.eps
-        predictions[noise_mask] = -1
+        # Assign cluster labels; points farther than eps from any core sample are noise
+        predictions = self.core_labels_[indices[:, 0]].copy()
+        predictions[distances > self.eps] = -1
 
         # Confidence based on distance
-        confidence = 1 - np.minimum(distances.flatten() / self.eps, 1)
+        confidence = 1 - np.minimum(distances / self.eps, 1)
 
         return ModelResult(
             predictions=predictions,
@@ -257,7 +281,7 @@ class DBSCANRecognizer(BaseModel):
         if self.n_clusters_ > 1:
             mask = labels != -1
             if mask.sum() > 1:
-                X_scaled = self.scaler.transform(X)
+                X_scaled = self.scaler.transform(X[self.feature_names].to_numpy(dtype=np.float64))
                 sil_score = float(silhouette_score(X_scaled[mask], labels[mask]))
             else:
                 sil_score = 0.0
@@ -9,6 +9,7 @@ import numpy as np
 
 from ..base import BaseModel, ModelResult, ModelMetrics, ModelComparison
 from .clustering import KMeansRecognizer, DBSCANRecognizer
+from .streaming import MiniBatchKMeansRecognizer
 
 
 class PatternRecognizer(BaseModel):
@@ -19,11 +20,13 @@ class PatternRecognizer(BaseModel):
     - kmeans: K-Means clustering
     - dbscan: Density-based clustering
     - hybrid: K-Means with DBSCAN for noise detection
+    - minibatch: Incremental mini-batch K-Means (supports partial_fit)
     """
 
     APPROACHES = {
         "kmeans": KMeansRecognizer,
         "dbscan": DBSCANRecognizer,
+        "minibatch": MiniBatchKMeansRecognizer,
     }
 
     # Predefined usage patterns (Thai labels)
@@ -41,7 +44,7 @@ class PatternRecognizer(BaseModel):
 
     def __init__(
         self,
-        approach: Literal["kmeans", "dbscan", "hybrid"] = "kmeans",
+        approach: Literal["kmeans", "dbscan", "hybrid", "minibatch"] = "kmeans",
         n_clusters: int = 5,
         **kwargs
     ):
@@ -54,13 +57,14 @@ class PatternRecognizer(BaseModel):
 
         if approach == "hybrid":
             # Use K-Means for main clusters, DBSCAN for noise
-            self.kmeans = KMeansRecognizer(n_clusters=n_clusters, **kwargs)
+            kmeans_kwargs = {k: v for k, v in kwargs.items() if k != "dbscan"}
+            self.kmeans = KMeansRecognizer(n_clusters=n_clusters, **kmeans_kwargs)
             self.dbscan = DBSCANRecognizer(**kwargs.get("dbscan", {}))
-        elif approach in self.APPROACHES:
-            self.recognizer = self.APPROACHES[approach](
-                n_clusters=n_clusters if approach == "kmeans" else None,
-                **kwargs
-            )
+        elif approach in ("kmeans", "minibatch"):
+            self.recognizer = self.APPROACHES[approach](n_clusters=n_clusters, **kwargs)
+        elif approach == "dbscan":
+            # DBSCAN finds its own number of clusters
+            self.recognizer = DBSCANRecognizer(**kwargs)
         else:
             raise ValueError(f"Unknown approach: {approach}")
 
@@ -80,6 +84,40 @@ class PatternRecognizer(BaseModel):
         self.is_fitted = True
         return self
 
+    def partial_fit(self, X: pd.DataFrame) -> "PatternRecognizer":
+        """
+        Update the minibatch recognizer with a batch of readings
+
+        The first batch fits the model. Pattern labels are kept: refits
+        preserve cluster ids.
+        """
+        if self.approach != "minibatch":
+            raise ValueError(f"partial_fit is not supported for approach {self.approach}")
+
+        self._validate_input(X)
+        if not self.is_fitted:
+            return self.fit(X)
+        self.recognizer.partial_fit(X)
+        return self
+
+    def partial_fit_array(self, values: np.ndarray) -> "PatternRecognizer":
+        """Update the fitted minibatch recognizer with a feature array"""
+        if self.approach != "minibatch":
+            raise ValueError(f"partial_fit is not supported for approach {self.approach}")
+        self.recognizer.partial_fit_array(values)
+        return self
+
+    @property
+    def needs_refit(self) -> bool:
+        """True when the minibatch recognizer is due a full refit"""
+        return bool(getattr(self.recognizer, "needs_refit", False))
+
+    def start_refit(self):
+        """Start a background full refit of the minibatch recognizer"""
+        if self.approach != "minibatch":
+            raise ValueError(f"Background refits are not supported for approach {self.approach}")
+        return self.recognizer.start_refit()
+
     def _create_pattern_mapping(self, X: pd.DataFrame) -> None:
         """Map cluster IDs to pattern labels based on characteristics"""
         if self.recognizer is None:
@@ -90,7 +128,7 @@ class PatternRecognizer(BaseModel):
         clusters = result.predictions
 
         # For each cluster, determine dominant pattern
-        for cluster_id in range(self.n_clusters):
+        for cluster_id in np.unique(clusters[clusters >= 0]).tolist():
             mask = clusters == cluster_id
             if mask.sum() == 0:
                 continue
@@ -115,6 +153,10 @@ class PatternRecognizer(BaseModel):
 
             self.pattern_mapping[cluster_id] = pattern
 
+        if self.approach == "dbscan":
+            # DBSCAN noise points
+            self.pattern_mapping[-1] = "anomalous"
+
     def _create_hybrid_mapping(self) -> None:
         """Create pattern mapping for hybrid approach"""
         # Use K-Means cluster labels
@@ -131,11 +173,18 @@ class PatternRecognizer(BaseModel):
             raise ValueError("Model not fitted")
 
         self._validate_input(X)
+        return self.predict_array(self._frame_to_array(X))
 
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Recognize patterns in a feature array (columns in feature_names order)"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        values = self._validate_array(values)
         if self.approach == "hybrid":
-            return self._hybrid_predict(X)
+            return self._hybrid_predict(values)
         else:
-            result = self.recognizer.predict(X)
+            result = self.recognizer.predict_array(values)
 
             # Add pattern labels
             pattern_labels = [
@@ -150,13 +199,13 @@ class PatternRecognizer(BaseModel):
 
             return result
 
-    def _hybrid_predict(self, X: pd.DataFrame) -> ModelResult:
+    def _hybrid_predict(self, values: np.ndarray) -> ModelResult:
         """Hybrid prediction using K-Means and DBSCAN"""
         # Get K-Means clusters
-        kmeans_result = self.kmeans.predict(X)
+        kmeans_result = self.kmeans.predict_array(values)
 
         # Get DBSCAN noise detection
-        dbscan_result = self.dbscan.predict(X)
+        dbscan_result = self.dbscan.predict_array(values)
 
         # Mark K-Means clusters as anomalous if DBSCAN says noise
         predictions = kmeans_result.predictions.copy()
@@ -205,35 +254,55 @@ class PatternRecognizer(BaseModel):
         comparison = ModelComparison(recognizers)
         return comparison.compare(X_train, y_train, X_test, y_test)
 
-    def get_pattern_summary(self, X: pd.DataFrame) -> pd.DataFrame:
+    def get_pattern_summary(
+        self,
+        X: pd.DataFrame,
+        result: Optional[ModelResult] = None,
+    ) -> pd.DataFrame:
         """
         Get summary of patterns in data
 
+        Pass the ``result`` of an earlier ``predict(X)`` to skip inference.
+        Means are reported for the numeric columns of X.
+
         Returns DataFrame with pattern counts and characteristics
         """
         if not self.is_fitted:
             raise ValueError("Model not fitted")
 
-        result = self.predict(X)
+        if result is None:
+            result = self.predict(X)
         patterns = result.details.get("pattern_labels", [])
-
-        # Count patterns
-        summary_data = []
-        for pattern in set(patterns):
-            mask = np.array(patterns) == pattern
-            count = mask.sum()
-            pct = count / len(patterns) * 100
-
-            # Get mean values for this pattern
-            pattern_data = X[mask]
-            means = pattern_data.mean()
-
-            summary_data.append({
-                "pattern": pattern,
-                "pattern_th": self.PATTERN_LABELS.get(pattern, pattern),
-                "count": count,
-                "percentage": round(pct, 1),
-                **{f"mean_{col}": means[col] for col in X.columns},
-            })
-
-        return pd.DataFrame(summary_data).sort_values("count", ascending=False)
+        if len(patterns) != len(X):
+            raise ValueError(f"Expected {len(X)} pattern labels, got {len(patterns)}")
+
+        # One pass: integer codes per pattern, then NaN-aware per-column sums
+        codes, uniques = pd.factorize(np.asarray(patterns, dtype=object))
+        n_patterns = len(uniques)
+        counts = np.bincount(codes, minlength=n_patterns)
+
+        numeric = X.select_dtypes("number")
+        values = numeric.to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        offsets = codes[:, None] + n_patterns * np.arange(values.shape[1])
+        sums = np.bincount(
+            offsets.ravel(order="F"),
+            weights=np.where(present, values, 0.0).ravel(order="F"),
+            minlength=n_patterns * values.shape[1],
+        ).reshape(values.shape[1], n_patterns)
+        non_null = np.bincount(
+            offsets.ravel(order="F"),
+            weights=present.ravel(order="F"),
+            minlength=n_patterns * values.shape[1],
+        ).reshape(values.shape[1], n_patterns)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / non_null
+
+        summary = pd.DataFrame({
+            "pattern": uniques,
+            "pattern_th": [self.PATTERN_LABELS.get(p, p) for p in uniques],
+            "count": counts,
+            "percentage": np.round(counts / len(patterns) * 100, 1),
+            **{f"mean_{col}": means[j] for j, col in enumerate(numeric.columns)},
+        })
+        return summary.sort_values("count", ascending=False, kind="stable")
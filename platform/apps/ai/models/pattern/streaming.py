@@ -0,0 +1,272 @@
+"""
+Streaming Pattern Recognition
+Mini-batch K-Means with incremental updates and stable full refits
+"""
+
+from typing import Any, Dict, Optional
+import copy
+import threading
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial.distance import cdist
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from ..base import ModelResult
+from .clustering import KMeansRecognizer
+
+
+def _cluster_radius(distances: np.ndarray, n_clusters: int, quantile: float = 0.95) -> np.ndarray:
+    """Per-cluster radius: the quantile of member distances to their centroid, in scaled units"""
+    clusters = distances.argmin(axis=1)
+    nearest = distances.min(axis=1)
+    radius = np.ones(n_clusters)
+    for k in range(n_clusters):
+        members = nearest[clusters == k]
+        if len(members):
+            radius[k] = max(float(np.quantile(members, quantile)), 1e-6)
+    return radius
+
+
+class MiniBatchKMeansRecognizer(KMeansRecognizer):
+    """
+    Incremental K-Means for network-scale pattern recognition
+
+    ``partial_fit`` folds each ETL batch into a MiniBatchKMeans model
+    (copy-on-write, so concurrent predictions never see a half-updated
+    model) and into a fixed-size reservoir sample of all readings seen.
+    The scaler is frozen between refits so centroids stay comparable.
+    Confidence is per reading: one minus its distance to the assigned
+    centroid over that cluster's radius (95th percentile member distance
+    at the last full fit), floored at 0.
+
+    Centroid drift since the last full refit is tracked per cluster in
+    scaled units; ``needs_refit`` turns true after ``refit_every`` batches
+    or when any centroid moved more than ``drift_threshold``. ``refit``
+    reruns full K-Means on the reservoir and matches the new centroids to
+    the old ones (Hungarian assignment), so cluster ids and pattern labels
+    stay the same across refits. ``start_refit`` runs it on a background
+    thread, off the request path.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int = 5,
+        random_state: int = 42,
+        max_iter: int = 300,
+        batch_size: int = 1024,
+        reservoir_size: int = 50_000,
+        refit_every: int = 500,
+        drift_threshold: float = 0.5,
+    ):
+        super().__init__(n_clusters=n_clusters, random_state=random_state, max_iter=max_iter)
+        self.name = "MiniBatchKMeansRecognizer"
+        self.batch_size = batch_size
+        self.reservoir_size = reservoir_size
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.model: Optional[MiniBatchKMeans] = None
+        self.reference_centers_: Optional[np.ndarray] = None
+        self.cluster_radius_: Optional[np.ndarray] = None
+        self.reservoir_: Optional[np.ndarray] = None
+        self.n_seen_: int = 0
+        self.n_batches_: int = 0
+        self.batches_since_refit_: int = 0
+        self.n_refits_: int = 0
+        self.rng_ = np.random.RandomState(random_state)
+
+    @property
+    def _lock(self) -> threading.Lock:
+        lock = self.__dict__.get("_swap_lock")
+        if lock is None:
+            lock = self.__dict__.setdefault("_swap_lock", threading.Lock())
+        return lock
+
+    def _get_state(self) -> Dict[str, Any]:
+        state = super()._get_state()
+        state.pop("_swap_lock", None)
+        state.pop("_refit_thread", None)
+        return state
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        super()._set_state(state)
+        # Loaded arrays may be read-only memory maps; the reservoir is written in place
+        if self.reservoir_ is not None:
+            self.reservoir_ = np.array(self.reservoir_)
+
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "MiniBatchKMeansRecognizer":
+        """Full K-Means fit; seeds the reservoir with a sample of X"""
+        self._validate_input(X)
+        self.feature_names = X.columns.tolist()
+        values = X.to_numpy(dtype=np.float64)
+
+        self.reservoir_ = None
+        self.n_seen_ = 0
+        self._sample(values)
+        self._install(values)
+        self._generate_cluster_labels(X)
+        self.is_fitted = True
+        return self
+
+    def partial_fit(self, X: pd.DataFrame) -> "MiniBatchKMeansRecognizer":
+        """Fold a batch of readings into the model"""
+        self._validate_input(X)
+        if not self.is_fitted:
+            return self.fit(X)
+        return self.partial_fit_array(X[self.feature_names].to_numpy(dtype=np.float64))
+
+    def partial_fit_array(self, values: np.ndarray) -> "MiniBatchKMeansRecognizer":
+        """Fold a feature array (columns in feature_names order) into the model"""
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        # Centroids are updated in float64 even in compact mode
+        values = self._validate_array(values, dtype=np.float64)
+        # The whole read-modify-write runs under the lock so concurrent batches
+        # each build on the other's centroids and counts instead of racing.
+        # The update goes to a copy: predictions in flight keep a consistent model.
+        with self._lock:
+            self._sample(values)
+            updated = copy.deepcopy(self.model)
+            updated.partial_fit(self.scaler.transform(values))
+            self.model = updated
+            self.cluster_centers_ = self.scaler.inverse_transform(updated.cluster_centers_)
+            self.n_batches_ += 1
+            self.batches_since_refit_ += 1
+        return self
+
+    def _sample(self, values: np.ndarray) -> None:
+        """Reservoir-sample rows so refits see the whole history at bounded memory"""
+        if self.reservoir_ is None:
+            self.reservoir_ = np.empty((self.reservoir_size, values.shape[1]))
+
+        positions = self.n_seen_ + np.arange(len(values))
+        slots = positions.copy()
+        full = positions >= self.reservoir_size
+        if full.any():
+            slots[full] = self.rng_.randint(0, positions[full] + 1)
+        keep = slots < self.reservoir_size
+        self.reservoir_[slots[keep]] = values[keep]
+        self.n_seen_ += len(values)
+
+    def _install(self, values: np.ndarray) -> None:
+        """Fit scaler and full K-Means on values, keeping cluster ids stable"""
+        scaler = StandardScaler().fit(values)
+        scaled = scaler.transform(values)
+        centers = KMeans(
+            n_clusters=self.n_clusters,
+            random_state=self.random_state,
+            max_iter=self.max_iter,
+            n_init=10,
+        ).fit(scaled).cluster_centers_
+
+        if self.cluster_centers_ is not None:
+            # Old centroid i keeps id i: match in the new scaled space
+            _, order = linear_sum_assignment(cdist(scaler.transform(self.cluster_centers_), centers))
+            centers = centers[order]
+
+        model = MiniBatchKMeans(
+            n_clusters=self.n_clusters,
+            init=centers,
+            n_init=1,
+            batch_size=self.batch_size,
+            random_state=self.random_state,
+            # Random reassignment of small clusters would break id stability
+            reassignment_ratio=0.0,
+        )
+        model.partial_fit(scaled)
+        radius = _cluster_radius(model.transform(scaled), self.n_clusters)
+
+        with self._lock:
+            self.scaler = scaler
+            self.model = model
+            self.cluster_centers_ = scaler.inverse_transform(model.cluster_centers_)
+            self.reference_centers_ = model.cluster_centers_.copy()
+            self.cluster_radius_ = radius
+            self.batches_since_refit_ = 0
+
+    @property
+    def centroid_drift(self) -> np.ndarray:
+        """Per-cluster centroid shift since the last full refit, in scaled units"""
+        if self.model is None or self.reference_centers_ is None:
+            return np.zeros(self.n_clusters)
+        return np.linalg.norm(self.model.cluster_centers_ - self.reference_centers_, axis=1)
+
+    @property
+    def needs_refit(self) -> bool:
+        """True when drift or the batch count calls for a full refit"""
+        if not self.is_fitted:
+            return False
+        return (
+            self.batches_since_refit_ >= self.refit_every
+            or bool(self.centroid_drift.max() > self.drift_threshold)
+        )
+
+    def refit(self, X: Optional[pd.DataFrame] = None) -> "MiniBatchKMeansRecognizer":
+        """
+        Full K-Means refit on X, or on the reservoir sample
+
+        Cluster ids (and so pattern labels) are matched to the previous centroids.
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        if X is not None:
+            values = X[self.feature_names].to_numpy(dtype=np.float64)
+        else:
+            with self._lock:
+                values = self.reservoir_[:min(self.n_seen_, self.reservoir_size)].copy()
+        self._install(values)
+        self.n_refits_ += 1
+        return self
+
+    def start_refit(self) -> threading.Thread:
+        """Run refit() on a background thread (at most one at a time)"""
+        thread = self.__dict__.get("_refit_thread")
+        if thread is not None and thread.is_alive():
+            return thread
+        thread = threading.Thread(target=self.refit, name="pattern-refit", daemon=True)
+        self.__dict__["_refit_thread"] = thread
+        thread.start()
+        return thread
+
+    def predict_array(self, values: np.ndarray) -> ModelResult:
+        """Assign patterns to a feature array (columns in feature_names order)"""
+        if not self.is_fitted or self.model is None:
+            raise ValueError("Model not fitted")
+
+        with self._lock:
+            model, scaler, radius = self.model, self.scaler, self.cluster_radius_
+        distances = model.transform(scaler.transform(self._validate_array(values)))
+        clusters = distances.argmin(axis=1).astype(np.int32)
+        min_distances = distances.min(axis=1)
+
+        # Per row: distance relative to the assigned cluster's fitted radius.
+        # Artifacts saved before radii were stored use one scaled unit.
+        scale = radius[clusters] if radius is not None else 1.0
+        confidence = 1 - np.minimum(min_distances / scale, 1)
+
+        return ModelResult(
+            predictions=clusters,
+            probabilities=confidence,
+            confidence=float(confidence.mean()),
+            details={
+                "pattern_labels": [self.cluster_labels_[c] for c in clusters],
+                "n_clusters": self.n_clusters,
+                "cluster_sizes": np.bincount(clusters, minlength=self.n_clusters).tolist(),
+            }
+        )
+
+    def get_drift_stats(self) -> Dict[str, Any]:
+        """Centroid drift and refit bookkeeping"""
+        drift = self.centroid_drift
+        return {
+            "n_seen": self.n_seen_,
+            "n_batches": self.n_batches_,
+            "batches_since_refit": self.batches_since_refit_,
+            "n_refits": self.n_refits_,
+            "max_drift": float(drift.max()) if len(drift) else 0.0,
+            "drift": drift.tolist(),
+            "needs_refit": self.needs_refit,
+        }
@@ -13,9 +13,12 @@ Purpose: พยากรณ์ปริมาณน้ำสูญเสีย
 from .forecaster import TimeSeriesForecaster
 from .baseline import MovingAverageForecaster
 from .prophet_model import ProphetForecaster
+from .holt_winters import BatchHoltWintersForecaster, holt_winters_grid_search
 
 __all__ = [
     "TimeSeriesForecaster",
     "MovingAverageForecaster",
     "ProphetForecaster",
+    "BatchHoltWintersForecaster",
+    "holt_winters_grid_search",
 ]
@@ -3,11 +3,13 @@ Baseline Time Series Forecasting
 Moving Average approach
 """
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import numpy as np
 import pandas as pd
 
 from ..base import BaseModel, ModelResult, ModelMetrics
+from ..compact import float_dtype
+from .holt_winters import holt_winters_filter
 
 
 class MovingAverageForecaster(BaseModel):
@@ -38,6 +40,10 @@ class MovingAverageForecaster(BaseModel):
         elif len(X.columns) == 1:
             self.history = X.iloc[:, 0].copy()
             self.target_col = X.columns[0]
+        elif "y" in X.columns:
+            # Prophet-style (ds, y) frame
+            self.history = X["y"].copy()
+            self.target_col = "y"
         else:
             raise ValueError("Must provide y or single-column X")
 
@@ -62,29 +68,18 @@ class MovingAverageForecaster(BaseModel):
         else:
             n_periods = len(X)
 
-        # Generate forecasts
-        predictions = []
-        history = self.history.copy()
-
-        for _ in range(n_periods):
-            # Calculate moving average
-            if self.weighted:
-                weights = np.arange(1, self.window + 1)
-                forecast = np.average(history.tail(self.window), weights=weights)
-            else:
-                forecast = history.tail(self.window).mean()
-
-            predictions.append(forecast)
-            # Add forecast to history for multi-step
-            history = pd.concat([history, pd.Series([forecast])])
+        values = self.history.to_numpy(dtype=np.float64)[-self.window * 3:]
+        predictions, std = moving_average_forecast(
+            values.reshape(1, -1), n_periods, self.window, self.weighted
+        )
+        predictions, std = predictions[0], std[0]
 
         # Calculate confidence interval (simple approach)
-        std = self.history.tail(self.window * 3).std()
-        lower = np.array(predictions) - 1.96 * std
-        upper = np.array(predictions) + 1.96 * std
+        lower = predictions - 1.96 * std
+        upper = predictions + 1.96 * std
 
         return ModelResult(
-            predictions=np.array(predictions),
+            predictions=predictions,
             probabilities=None,
             confidence=0.95,  # 95% confidence interval
             details={
@@ -95,6 +90,41 @@ class MovingAverageForecaster(BaseModel):
             }
         )
 
+    def predict_batch(self, histories: np.ndarray, n_periods: int) -> ModelResult:
+        """
+        Forecast many series at once, e.g. one row per DMA
+
+        Uses this forecaster's window settings; no fit is needed.
+
+        Args:
+            histories: (n_series, n_obs) array, oldest first. Shorter
+                series are left-padded with NaN.
+            n_periods: Number of periods to forecast
+
+        Returns:
+            ModelResult with (n_series, n_periods) predictions and
+            lower/upper bound arrays in details
+        """
+        histories = np.asarray(histories, dtype=self.dtype)
+        if histories.ndim != 2 or histories.shape[1] == 0:
+            raise ValueError("histories must be a non-empty 2-D array")
+
+        predictions, std = moving_average_forecast(histories, n_periods, self.window, self.weighted)
+        margin = 1.96 * std[:, None]
+
+        return ModelResult(
+            predictions=predictions,
+            probabilities=None,
+            confidence=0.95,
+            details={
+                "window": self.window,
+                "weighted": self.weighted,
+                "n_series": len(histories),
+                "lower_bound": predictions - margin,
+                "upper_bound": predictions + margin,
+            }
+        )
+
     def evaluate(self, X: pd.DataFrame, y: pd.Series) -> ModelMetrics:
         """Evaluate forecast accuracy"""
         result = self.predict(X)
@@ -128,9 +158,13 @@ class ExponentialSmoothingForecaster(BaseModel):
         trend: bool = False,
         seasonal: bool = False,
         seasonal_periods: int = 7,
+        beta: float = 0.1,
+        gamma: float = 0.1,
     ):
         super().__init__(name="ExponentialSmoothingForecaster", version="1.0.0")
         self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
         self.trend = trend
         self.seasonal = seasonal
         self.seasonal_periods = seasonal_periods
@@ -145,47 +179,29 @@ class ExponentialSmoothingForecaster(BaseModel):
             self.history = y.copy()
         elif len(X.columns) == 1:
             self.history = X.iloc[:, 0].copy()
+        elif "y" in X.columns:
+            # Prophet-style (ds, y) frame
+            self.history = X["y"].copy()
         else:
             raise ValueError("Must provide y or single-column X")
 
-        values = self.history.values
-
-        # Initialize level
-        self.level = values[0]
-
-        # Initialize trend if needed
-        if self.trend and len(values) > 1:
-            self.trend_value = values[1] - values[0]
-
-        # Initialize seasonals if needed
-        if self.seasonal and len(values) >= self.seasonal_periods:
-            self.seasonals = values[:self.seasonal_periods].tolist()
+        values = self.history.to_numpy(dtype=np.float64)
+        # Seasonality needs at least one full season to initialize
+        seasonal_periods = (
+            self.seasonal_periods if self.seasonal and len(values) >= self.seasonal_periods else None
+        )
+        state = holt_winters_filter(
+            values, self.alpha, self.beta, self.gamma,
+            trend=self.trend, seasonal_periods=seasonal_periods,
+        )
 
-        # Fit the model
-        for t in range(1, len(values)):
-            self._update(values[t], t)
+        self.level = float(state.level[0])
+        self.trend_value = float(state.trend[0]) if self.trend and len(values) > 1 else None
+        self.seasonals = state.seasonals[0].tolist() if seasonal_periods else None
 
         self.is_fitted = True
         return self
 
-    def _update(self, value: float, t: int) -> None:
-        """Update model state with new observation"""
-        if self.seasonal:
-            seasonal_idx = t % self.seasonal_periods
-            seasonal = self.seasonals[seasonal_idx] if self.seasonals else 0
-        else:
-            seasonal = 0
-
-        if self.trend:
-            old_level = self.level
-            self.level = self.alpha * (value - seasonal) + (1 - self.alpha) * (self.level + self.trend_value)
-            self.trend_value = 0.1 * (self.level - old_level) + 0.9 * self.trend_value
-        else:
-            self.level = self.alpha * (value - seasonal) + (1 - self.alpha) * self.level
-
-        if self.seasonal and self.seasonals:
-            self.seasonals[t % self.seasonal_periods] = 0.1 * (value - self.level) + 0.9 * seasonal
-
     def predict(self, X: pd.DataFrame) -> ModelResult:
         """Generate forecasts"""
         if not self.is_fitted:
@@ -211,6 +227,8 @@ class ExponentialSmoothingForecaster(BaseModel):
             confidence=0.95,
             details={
                 "alpha": self.alpha,
+                "beta": getattr(self, "beta", 0.1),
+                "gamma": getattr(self, "gamma", 0.1),
                 "trend": self.trend,
                 "seasonal": self.seasonal,
             }
@@ -232,3 +250,49 @@ class ExponentialSmoothingForecaster(BaseModel):
             mape = float("inf")
 
         return ModelMetrics(mae=mae, rmse=rmse, mape=mape)
+
+
+def moving_average_forecast(
+    histories: np.ndarray,
+    n_periods: int,
+    window: int,
+    weighted: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Recursive moving-average forecast of every row of a 2-D array
+
+    Each forecast is the (weighted) mean of the previous ``window`` values,
+    earlier forecasts included. All horizons are written into one
+    preallocated (n_series, window + n_periods) buffer and each step
+    reduces a single window-wide slice across all series, so the cost is
+    O(n_periods × window) vector ops regardless of history length. NaN
+    (missing or left padding) is skipped like pandas mean() does. float32
+    histories are forecast in float32.
+
+    Returns:
+        (n_series, n_periods) forecasts and the per-series std of the
+        last ``3 × window`` observations, for the interval
+    """
+    n_series = len(histories)
+    dtype = float_dtype(histories)
+    buffer = np.full((n_series, window + n_periods), np.nan, dtype=dtype)
+    tail = histories[:, -window:]
+    buffer[:, window - tail.shape[1]:window] = tail
+
+    weights = np.arange(1, window + 1, dtype=dtype) if weighted else np.ones(window, dtype=dtype)
+    for t in range(n_periods):
+        values = buffer[:, t:t + window]
+        present = ~np.isnan(values)
+        total = np.where(present, values, 0.0) @ weights
+        norm = present @ weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            buffer[:, window + t] = total / norm
+
+    recent = histories[:, -window * 3:]
+    counts = (~np.isnan(recent)).sum(axis=1)
+    std = np.full(n_series, np.nan, dtype=dtype)
+    enough = counts > 1
+    if enough.any():
+        with np.errstate(invalid="ignore"):
+            std[enough] = np.nanstd(recent[enough], axis=1, ddof=1)
+    return buffer[:, window:], std
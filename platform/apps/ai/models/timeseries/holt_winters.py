@@ -0,0 +1,377 @@
+"""
+Vectorized Holt-Winters Engine
+Additive exponential smoothing over many series at once
+"""
+
+from itertools import product
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import warnings
+import numpy as np
+import pandas as pd
+
+from ..base import BaseModel, ModelResult, ModelMetrics
+from ..compact import float_dtype
+
+# Default search grid for nightly refits
+DEFAULT_ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+DEFAULT_BETAS = (0.01, 0.05, 0.1, 0.2, 0.3)
+DEFAULT_GAMMAS = (0.01, 0.05, 0.1, 0.2, 0.3)
+
+
+class HoltWintersState(NamedTuple):
+    """Smoothing state after the last observation, one lane per series (and parameter set)"""
+    level: np.ndarray
+    trend: np.ndarray
+    seasonals: Optional[np.ndarray]
+    sse: np.ndarray
+    n_obs: np.ndarray
+    n_steps: int
+
+
+def _window(values: np.ndarray, first: np.ndarray, m: int) -> np.ndarray:
+    """``m`` steps of each row from its own ``first`` index, NaN past the end"""
+    index = first[:, None] + np.arange(m)
+    inside = index < values.shape[1]
+    window = np.take_along_axis(values, np.minimum(index, values.shape[1] - 1), axis=1)
+    return np.where(inside, window, np.nan)
+
+
+def holt_winters_filter(
+    values: np.ndarray,
+    alpha: Any,
+    beta: Any = 0.1,
+    gamma: Any = 0.1,
+    trend: bool = False,
+    seasonal_periods: Optional[int] = None,
+) -> HoltWintersState:
+    """
+    Run additive Holt-Winters smoothing over every row of ``values``
+
+    Time is stepped once for all series: each step is a handful of array
+    ops over the lanes, using the error-correction form of the level,
+    trend and seasonal updates. ``alpha``/``beta``/``gamma`` may be scalars
+    or arrays broadcastable against (n_series,), e.g. (n_params, 1) to
+    filter every parameter set for every series in the same pass.
+
+    Missing values (NaN) are replaced by the one-step forecast, so they
+    add no error and the state carries forward. Each series is initialized
+    from its own first readings, so leading gaps are allowed. float32
+    input keeps the level/trend/seasonal state in float32; the error
+    totals are float64.
+
+    Args:
+        values: (n_series, n_steps) array, oldest first
+        alpha: Level smoothing
+        beta: Trend smoothing (used when trend=True)
+        gamma: Seasonal smoothing (used when seasonal_periods is set)
+        trend: Include an additive trend
+        seasonal_periods: Season length, or None for no seasonality
+
+    Returns:
+        HoltWintersState with one-step-ahead squared error totals
+    """
+    dtype = float_dtype(values)
+    values = np.asarray(values, dtype=dtype)
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    n_series, n_steps = values.shape
+    if n_steps == 0:
+        raise ValueError("Input data is empty")
+
+    alpha, beta, gamma = (np.asarray(p, dtype=dtype) for p in (alpha, beta, gamma))
+    lanes = np.broadcast_shapes(alpha.shape, beta.shape, gamma.shape, (n_series,))
+    m = seasonal_periods or 0
+
+    valid = ~np.isnan(values)
+    rows = np.arange(n_series)
+    # Series may start late (wide DMA frames); each starts from its first reading
+    first = valid.argmax(axis=1)
+
+    if m:
+        if n_steps < m:
+            raise ValueError(f"Need at least one full season ({m} steps), got {n_steps}")
+        window = _window(values, first, m)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            level = np.nan_to_num(np.nanmean(window, axis=1))
+            if trend:
+                following = np.nanmean(_window(values, first + m, m), axis=1)
+                slope = np.nan_to_num((following - level) / m).astype(dtype)
+            else:
+                slope = np.zeros(n_series, dtype=dtype)
+        # Seasonal indices keep their phase; ones without a reading start at 0
+        phase = (first[:, None] + np.arange(m)) % m
+        initial = np.zeros((n_series, m), dtype=dtype)
+        initial[rows[:, None], phase] = np.nan_to_num(window - level[:, None])
+        seasonals = np.broadcast_to(initial, lanes + (m,)).copy()
+        start = 0
+    else:
+        seasonals = None
+        level = np.nan_to_num(values[rows, first])
+        slope = np.zeros(n_series, dtype=dtype)
+        if trend:
+            later = valid & (np.arange(n_steps) > first[:, None])
+            second = later.argmax(axis=1)
+            has_second = later.any(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                step = (values[rows, second] - level) / (second - first)
+            slope = np.where(has_second, step, 0).astype(dtype)
+        late = first > 0
+        if late.any():
+            # The first reading seeds the level, so it is not scored, as for t=0
+            values = values.copy()
+            values[rows[late], first[late]] = np.nan
+        start = 1
+
+    # Leading gaps are forecast steps: start far enough back to land on the first reading
+    level = level - first.astype(dtype) * slope
+    level = np.broadcast_to(level, lanes).copy()
+    slope = np.broadcast_to(slope, lanes).copy()
+    sse = np.zeros(lanes)
+    n_obs = np.zeros(lanes)
+    season_gain = gamma * (1 - alpha)
+    trend_gain = alpha * beta
+
+    for t in range(start, n_steps):
+        x = values[:, t]
+        forecast = level + slope
+        if m:
+            k = t % m
+            forecast += seasonals[..., k]
+        error = x - forecast
+        missing = np.isnan(x)
+        if missing.any():
+            error[..., missing] = 0.0
+        sse += error * error
+        n_obs += ~missing
+
+        level += slope
+        level += alpha * error
+        if trend:
+            slope += trend_gain * error
+        if m:
+            seasonals[..., k] += season_gain * error
+
+    return HoltWintersState(level, slope, seasonals, sse, n_obs, n_steps)
+
+
+def holt_winters_forecast(state: HoltWintersState, n_periods: int) -> np.ndarray:
+    """Forecast ``n_periods`` ahead from a filtered state, shape lanes + (n_periods,)"""
+    horizon = np.arange(1, n_periods + 1)
+    forecast = state.level[..., None] + state.trend[..., None] * horizon.astype(state.level.dtype)
+    if state.seasonals is not None:
+        m = state.seasonals.shape[-1]
+        forecast += state.seasonals[..., (state.n_steps + horizon - 1) % m]
+    return forecast
+
+
+def holt_winters_grid_search(
+    values: np.ndarray,
+    alphas: Sequence[float] = DEFAULT_ALPHAS,
+    betas: Sequence[float] = DEFAULT_BETAS,
+    gammas: Sequence[float] = DEFAULT_GAMMAS,
+    trend: bool = False,
+    seasonal_periods: Optional[int] = None,
+    chunk_size: int = 4096,
+) -> Dict[str, Any]:
+    """
+    Pick alpha/beta/gamma per series by one-step-ahead RMSE
+
+    Every parameter combination is a lane of the same vectorized filter
+    (shape (n_params, chunk_size)), so the grid costs one pass over time
+    per chunk of series rather than one fit per series and combination.
+    Betas are ignored without trend and gammas without seasonality.
+
+    Returns:
+        Dict with per-series ``alpha``, ``beta``, ``gamma`` and ``rmse``
+        arrays and the matching ``state``
+    """
+    values = np.asarray(values, dtype=float_dtype(values))
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    grid = np.array(list(product(
+        alphas,
+        betas if trend else betas[:1],
+        gammas if seasonal_periods else gammas[:1],
+    )), dtype=np.float64)
+
+    parts: Dict[str, List[np.ndarray]] = {k: [] for k in ("params", "rmse", "level", "trend", "seasonals")}
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        state = holt_winters_filter(
+            chunk, grid[:, 0, None], grid[:, 1, None], grid[:, 2, None],
+            trend=trend, seasonal_periods=seasonal_periods,
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rmse = np.sqrt(state.sse / state.n_obs)
+        best = np.nan_to_num(rmse, nan=np.inf).argmin(axis=0)
+        columns = np.arange(len(chunk))
+
+        parts["params"].append(grid[best])
+        parts["rmse"].append(rmse[best, columns])
+        parts["level"].append(state.level[best, columns])
+        parts["trend"].append(state.trend[best, columns])
+        if state.seasonals is not None:
+            parts["seasonals"].append(state.seasonals[best, columns])
+
+    params = np.concatenate(parts["params"])
+    rmse = np.concatenate(parts["rmse"])
+    state = HoltWintersState(
+        level=np.concatenate(parts["level"]),
+        trend=np.concatenate(parts["trend"]),
+        seasonals=np.concatenate(parts["seasonals"]) if parts["seasonals"] else None,
+        sse=rmse ** 2,
+        n_obs=np.full(len(values), np.nan),
+        n_steps=values.shape[1],
+    )
+    return {
+        "alpha": params[:, 0],
+        "beta": params[:, 1],
+        "gamma": params[:, 2],
+        "rmse": rmse,
+        "state": state,
+    }
+
+
+class BatchHoltWintersForecaster(BaseModel):
+    """
+    Holt-Winters forecasting for many DMAs at once
+
+    Fits a wide frame (one column per series, one row per period) with a
+    single vectorized pass, optionally grid-searching the smoothing
+    parameters per series. Fitting is always float64; compact mode only
+    forecasts from a float32 copy of the fitted state.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        beta: float = 0.1,
+        gamma: float = 0.1,
+        trend: bool = False,
+        seasonal: bool = False,
+        seasonal_periods: int = 7,
+        optimize: bool = False,
+        param_grid: Optional[Dict[str, Sequence[float]]] = None,
+    ):
+        super().__init__(name="BatchHoltWintersForecaster", version="1.0.0")
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.trend = trend
+        self.seasonal = seasonal
+        self.seasonal_periods = seasonal_periods
+        self.optimize = optimize
+        self.param_grid = param_grid or {}
+        self.params_: Optional[Dict[str, np.ndarray]] = None
+        self.rmse_: Optional[np.ndarray] = None
+        self.level_: Optional[np.ndarray] = None
+        self.trend_: Optional[np.ndarray] = None
+        self.seasonals_: Optional[np.ndarray] = None
+        self.n_steps_: int = 0
+
+    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "BatchHoltWintersForecaster":
+        """
+        Fit every series
+
+        Args:
+            X: Wide DataFrame, one column per series (e.g. DMA), rows in time order
+        """
+        self._validate_input(X)
+        self.feature_names = [str(c) for c in X.columns]
+        return self.fit_array(X.to_numpy(dtype=np.float64).T)
+
+    def fit_array(self, values: np.ndarray) -> "BatchHoltWintersForecaster":
+        """Fit an (n_series, n_steps) array, one row per series (always in float64)"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.size == 0:
+            raise ValueError("values must be a non-empty 2-D array")
+        seasonal_periods = self.seasonal_periods if self.seasonal else None
+
+        if self.optimize:
+            fitted = holt_winters_grid_search(
+                values,
+                alphas=self.param_grid.get("alpha", DEFAULT_ALPHAS),
+                betas=self.param_grid.get("beta", DEFAULT_BETAS),
+                gammas=self.param_grid.get("gamma", DEFAULT_GAMMAS),
+                trend=self.trend,
+                seasonal_periods=seasonal_periods,
+            )
+            state, rmse = fitted["state"], fitted["rmse"]
+            self.params_ = {k: fitted[k] for k in ("alpha", "beta", "gamma")}
+        else:
+            state = holt_winters_filter(
+                values, self.alpha, self.beta, self.gamma,
+                trend=self.trend, seasonal_periods=seasonal_periods,
+            )
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rmse = np.sqrt(state.sse / state.n_obs)
+            self.params_ = {
+                k: np.full(len(values), v)
+                for k, v in (("alpha", self.alpha), ("beta", self.beta), ("gamma", self.gamma))
+            }
+
+        if not self.feature_names or len(self.feature_names) != len(values):
+            self.feature_names = [str(i) for i in range(len(values))]
+        self.rmse_ = rmse
+        self.level_, self.trend_, self.seasonals_ = state.level, state.trend, state.seasonals
+        self.n_steps_ = state.n_steps
+        self.is_fitted = True
+        return self
+
+    def _state(self) -> HoltWintersState:
+        """Fitted state in the scoring dtype"""
+        level, trend = (np.asarray(a, dtype=self.dtype) for a in (self.level_, self.trend_))
+        seasonals = np.asarray(self.seasonals_, dtype=self.dtype) if self.seasonals_ is not None else None
+        return HoltWintersState(level, trend, seasonals, None, None, self.n_steps_)
+
+    def predict(self, X: pd.DataFrame) -> ModelResult:
+        """
+        Forecast every series
+
+        Args:
+            X: DataFrame with a 'periods' column, or one row per forecast period
+
+        Returns:
+            ModelResult with (n_series, n_periods) predictions
+        """
+        if not self.is_fitted:
+            raise ValueError("Model not fitted")
+
+        if "periods" in X.columns:
+            n_periods = int(X["periods"].iloc[0])
+        else:
+            n_periods = len(X)
+
+        return ModelResult(
+            predictions=holt_winters_forecast(self._state(), n_periods),
+            probabilities=None,
+            confidence=0.95,
+            details={
+                "series": self.feature_names,
+                "trend": self.trend,
+                "seasonal": self.seasonal,
+                "optimized": self.optimize,
+            }
+        )
+
+    def evaluate(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> ModelMetrics:
+        """
+        Evaluate forecast accuracy
+
+        Args:
+            X: Wide DataFrame of actuals for the periods after the fit, same columns
+        """
+        actuals = X[self.feature_names].to_numpy(dtype=np.float64).T
+        predictions = self.predict(X).predictions
+        errors = predictions - actuals
+
+        mae = float(np.nanmean(np.abs(errors)))
+        rmse = float(np.sqrt(np.nanmean(errors ** 2)))
+        mask = (actuals != 0) & ~np.isnan(actuals)
+        if mask.any():
+            mape = float(np.abs(errors[mask] / actuals[mask]).mean() * 100)
+        else:
+            mape = float("inf")
+
+        return ModelMetrics(mae=mae, rmse=rmse, mape=mape)
@@ -4,11 +4,14 @@ Facebook's Prophet model for time series with trend and seasonality
 """
 
 from typing import Optional, Dict, Any
+import logging
 import numpy as np
 import pandas as pd
 
 from ..base import BaseModel, ModelResult, ModelMetrics
 
+logger = logging.getLogger(__name__)
+
 
 class ProphetForecaster(BaseModel):
     """Prophet time series forecasting"""
@@ -37,7 +40,12 @@ class ProphetForecaster(BaseModel):
         except ImportError:
             self._prophet_available = False
 
-    def fit(self, X: pd.DataFrame, y: Optional[pd.Series] = None) -> "ProphetForecaster":
+    def fit(
+        self,
+        X: pd.DataFrame,
+        y: Optional[pd.Series] = None,
+        init: Optional[Dict[str, Any]] = None,
+    ) -> "ProphetForecaster":
         """
         Fit Prophet model
 
@@ -45,21 +53,24 @@ class ProphetForecaster(BaseModel):
             X: DataFrame with 'ds' (datetime) column
                or datetime index
             y: Series with values, or X must have 'y' column
+            init: Warm-start parameters from get_warm_start() of an
+                earlier fit; ignored if they no longer match the model
         """
         # Prepare data in Prophet format (ds, y)
         df = self._prepare_data(X, y)
 
         if self._prophet_available:
-            from prophet import Prophet
-
-            self.model = Prophet(
-                seasonality_mode=self.seasonality_mode,
-                yearly_seasonality=self.yearly_seasonality,
-                weekly_seasonality=self.weekly_seasonality,
-                daily_seasonality=self.daily_seasonality,
-                changepoint_prior_scale=self.changepoint_prior_scale,
-            )
-            self.model.fit(df)
+            self.model = self._build_model()
+            if init:
+                try:
+                    self.model.fit(df, init=init)
+                except Exception as e:
+                    # Changepoint or seasonality shapes changed since the previous fit
+                    logger.warning(f"Prophet warm start rejected, fitting cold: {e}")
+                    self.model = self._build_model()
+                    self.model.fit(df)
+            else:
+                self.model.fit(df)
         else:
             # Fallback to simple moving average if Prophet not available
             self._fallback_fit(df)
@@ -67,6 +78,51 @@ class ProphetForecaster(BaseModel):
         self.is_fitted = True
         return self
 
+    def _build_model(self):
+        from prophet import Prophet
+
+        return Prophet(
+            seasonality_mode=self.seasonality_mode,
+            yearly_seasonality=self.yearly_seasonality,
+            weekly_seasonality=self.weekly_seasonality,
+            daily_seasonality=self.daily_seasonality,
+            changepoint_prior_scale=self.changepoint_prior_scale,
+        )
+
+    def get_warm_start(self) -> Optional[Dict[str, Any]]:
+        """
+        Fitted Stan parameters to initialize the next fit
+
+        Returns None for the fallback model. Values are plain floats and
+        lists so they can be stored as JSON.
+        """
+        if not self.is_fitted or not self._prophet_available or self.model is None:
+            return None
+
+        params = self.model.params
+        init: Dict[str, Any] = {}
+        for name in ("k", "m", "sigma_obs"):
+            init[name] = float(np.mean(params[name]))
+        for name in ("delta", "beta"):
+            init[name] = np.mean(params[name], axis=0).tolist()
+        return init
+
+    def _get_state(self) -> Dict[str, Any]:
+        """Persist a fitted Prophet model through its JSON serializer"""
+        state = super()._get_state()
+        if self._prophet_available and self.model is not None:
+            from prophet.serialize import model_to_json
+            state["model"] = {"prophet_json": model_to_json(self.model)}
+        return state
+
+    def _set_state(self, state: Dict[str, Any]) -> None:
+        """Restore a Prophet model serialized by _get_state()"""
+        model = state.get("model")
+        if isinstance(model, dict) and "prophet_json" in model:
+            from prophet.serialize import model_from_json
+            state = {**state, "model": model_from_json(model["prophet_json"])}
+        super()._set_state(state)
+
     def _prepare_data(self, X: pd.DataFrame, y: Optional[pd.Series]) -> pd.DataFrame:
         """Prepare data in Prophet format"""
         if "ds" in X.columns and "y" in X.columns:
@@ -120,7 +176,7 @@ class ProphetForecaster(BaseModel):
         if "periods" in X.columns:
             periods = int(X["periods"].iloc[0])
             if self._prophet_available:
-                future = self.model.make_future_dataframe(periods=periods)
+                future = self.model.make_future_dataframe(periods=periods, include_history=False)
             else:
                 last_date = self._history["ds"].iloc[-1]
                 dates = pd.date_range(start=last_date, periods=periods + 1, freq="D")[1:]
@@ -0,0 +1,195 @@
+"""
+Tests for the network-wide batch analysis job
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.analysis_jobs import AnalysisJobRunner
+from ai.inference.feature_store import compute_features
+from ai.inference.model_service import AIModelService
+from ai.models.pattern import PatternRecognizer
+
+
+def make_features(dma_ids: list[str], days: int = 3, start: str = "2026-01-01") -> pd.DataFrame:
+    """Feature rows per DMA; later DMAs lose more water"""
+    rng = np.random.default_rng(3)
+    frames = []
+    for i, dma_id in enumerate(dma_ids):
+        index = pd.date_range(start, periods=days * 24, freq="h")
+        flow_in = rng.normal(1000, 50, len(index))
+        raw = pd.DataFrame({
+            "flow_in": flow_in,
+            "flow_out": flow_in * (0.9 - 0.1 * i),
+            "pressure": rng.normal(3.5, 0.1, len(index)),
+        }, index=index)
+        features = compute_features(raw).rename_axis("timestamp").reset_index()
+        features.insert(0, "dma_id", dma_id)
+        frames.append(features)
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def demo_service(tmp_path_factory) -> AIModelService:
+    """Service with demo models published to a registry"""
+    service = AIModelService(model_dir=str(tmp_path_factory.mktemp("models")))
+    service.initialize(use_demo_models=True)
+    return service
+
+
+def strip_timestamps(analysis: dict) -> dict:
+    """Analysis without the fields that differ between runs"""
+    return {k: v for k, v in analysis.items() if k not in ("analysis_timestamp", "watermark")}
+
+
+class TestAnalysisJobRunner:
+    """Batched analysis, snapshots and ranking"""
+
+    def test_matches_per_dma_analysis(self, demo_service):
+        """Batched sections match analyze_dma on each DMA's data"""
+        data = make_features(["DMA-A", "DMA-B"])
+        snapshots = demo_service.run_analysis_jobs(data)
+
+        assert set(snapshots) == {"DMA-A", "DMA-B"}
+        for dma_id, snapshot in snapshots.items():
+            expected = demo_service.analyze_dma(dma_id, data[data["dma_id"] == dma_id])
+            assert snapshot["anomalies"] == pytest.approx(expected["anomalies"])
+            assert snapshot["classification"] == expected["classification"]
+            assert snapshot["patterns"]["patterns"] == expected["patterns"]["patterns"]
+            assert snapshot["patterns"]["confidence"] == pytest.approx(expected["patterns"]["confidence"])
+            assert snapshot["recommendations"] == expected["recommendations"]
+            assert snapshot["watermark"] == "2026-01-03T23:00:00"
+
+    def test_one_model_call_per_chunk(self, demo_service, tmp_path):
+        """Each chunk makes one anomaly call, not one per DMA"""
+        runner = AnalysisJobRunner(str(tmp_path), chunk_size=2, max_workers=1)
+        models = {"anomaly": demo_service.get_model("anomaly")}
+        with patch.object(models["anomaly"], "detect_batch", wraps=models["anomaly"].detect_batch) as detect:
+            runner.run(make_features(["A", "B", "C"], days=1), models)
+        assert detect.call_count == 2
+
+    def test_skips_unchanged_watermark(self, demo_service, tmp_path):
+        """Only DMAs with newer data are re-analyzed"""
+        runner = AnalysisJobRunner(str(tmp_path))
+        models = {"anomaly": demo_service.get_model("anomaly")}
+        data = make_features(["DMA-A", "DMA-B"], days=1)
+        runner.run(data, models)
+
+        newer = make_features(["DMA-A"], days=1, start="2026-01-02")
+        analyzed = runner.run(pd.concat([newer, data[data["dma_id"] == "DMA-B"]]), models)
+        assert set(analyzed) == {"DMA-A"}
+        assert runner.get_stats()["skipped"] == 1
+
+    def test_pattern_confidence_independent_of_chunk(self, demo_service, tmp_path):
+        """A DMA's pattern confidence does not depend on its chunk mates"""
+        models = {"pattern": demo_service.get_model("pattern")}
+        data = make_features(["DMA-A", "DMA-B", "DMA-C"], days=1)
+        together = AnalysisJobRunner(str(tmp_path / "together")).run(data, models)
+        alone = AnalysisJobRunner(str(tmp_path / "alone")).run(data[data["dma_id"] == "DMA-B"], models)
+        assert together["DMA-B"]["patterns"] == alone["DMA-B"]["patterns"]
+
+    def test_new_model_version_is_stale(self, demo_service, tmp_path):
+        """Snapshots made with other model versions are re-analyzed"""
+        runner = AnalysisJobRunner(str(tmp_path))
+        models = {"anomaly": demo_service.get_model("anomaly")}
+        data = make_features(["DMA-A", "DMA-B"], days=1)
+        runner.run(data, models, model_versions={"DMA-A": "v1", "DMA-B": "v1"})
+
+        analyzed = runner.run(data, models, model_versions={"DMA-A": "v2", "DMA-B": "v1"})
+        assert set(analyzed) == {"DMA-A"}
+        assert runner.get_snapshot("DMA-A", model_version="v1") is None
+        assert runner.get_snapshot("DMA-A", model_version="v2")["model_version"] == "v2"
+
+    def test_snapshots_survive_restart(self, demo_service, tmp_path):
+        """A new runner serves stored snapshots and the ranking"""
+        runner = AnalysisJobRunner(str(tmp_path))
+        runner.run(make_features(["DMA-A", "DMA-B"], days=1), {"anomaly": demo_service.get_model("anomaly")})
+
+        restarted = AnalysisJobRunner(str(tmp_path))
+        assert restarted.get_snapshot("DMA-A") == runner.get_snapshot("DMA-A")
+        assert restarted.get_snapshot("DMA-A", watermark="2026-02-01T00:00:00") is None
+        assert {e["dma_id"] for e in restarted.get_ranking()} == {"DMA-A", "DMA-B"}
+
+    def test_ranking_orders_by_risk(self, tmp_path):
+        """DMAs with high-priority recommendations rank first"""
+        runner = AnalysisJobRunner(str(tmp_path))
+        runner.store("DMA-A", "2026-01-01T00:00:00", {"anomalies": [{"is_anomaly": False, "probability": 0.1}]})
+        runner.store("DMA-B", "2026-01-01T00:00:00", {
+            "anomalies": [{"is_anomaly": True, "probability": 0.9}],
+            "recommendations": [{"priority": "high"}],
+        })
+        assert [e["dma_id"] for e in runner.get_ranking()] == ["DMA-B", "DMA-A"]
+        assert len(runner.get_ranking(limit=1)) == 1
+
+    @pytest.mark.slow
+    def test_process_pool_with_registry_models(self, tmp_path):
+        """Registry models are analyzed across worker processes"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.initialize(use_demo_models=True)
+        service.save_models()
+        service.analysis_jobs = AnalysisJobRunner(str(tmp_path), chunk_size=1, max_workers=2)
+
+        snapshots = service.run_analysis_jobs(make_features(["DMA-A", "DMA-B"], days=1))
+        assert set(snapshots) == {"DMA-A", "DMA-B"}
+        assert all("error" not in s["anomalies"][0] for s in snapshots.values())
+
+    def test_updated_models_not_sent_to_workers(self, tmp_path):
+        """Workers only load registry artifacts that match the in-memory models"""
+        service = AIModelService(model_dir=str(tmp_path))
+        features = make_features(["DMA-A"], days=2)[["flow_in", "pressure"]]
+        service.models["pattern"] = PatternRecognizer(approach="minibatch", n_clusters=3).fit(features)
+        service.save_models()
+        assert service._model_source(service.models) is not None
+
+        service.models["pattern"].partial_fit(features.iloc[:24])
+        assert service._model_source(service.models) is None
+
+        reloaded = AIModelService(model_dir=str(tmp_path))
+        models = {"pattern": reloaded.get_model("pattern")}
+        assert reloaded._model_source(models)["versions"] == {"pattern": service.records["pattern"].version}
+
+
+class TestServiceSnapshots:
+    """analyze_dma serves snapshots until the watermark moves"""
+
+    def test_snapshot_then_refresh(self, demo_service, tmp_path):
+        """Unchanged data is a snapshot hit; new readings trigger a refresh"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.models = dict(demo_service.models)
+        raw = make_features(["DMA-A"], days=2)[["dma_id", "timestamp", "flow_in", "flow_out", "pressure"]]
+        service.feature_store.update(raw.iloc[:24])
+        service.run_analysis_jobs()
+
+        with patch.object(service, "_analyze", wraps=service._analyze) as analyze:
+            first = service.analyze_dma("DMA-A")
+            assert analyze.call_count == 0
+            assert first["watermark"] == "2026-01-01T23:00:00"
+
+            service.feature_store.update(raw.iloc[24:])
+            refreshed = service.analyze_dma("DMA-A")
+            assert analyze.call_count == 1
+            assert refreshed["watermark"] == "2026-01-02T23:00:00"
+
+            service.analyze_dma("DMA-A")
+            assert analyze.call_count == 1
+
+    def test_new_model_refreshes_snapshot(self, demo_service, tmp_path):
+        """Replacing a model invalidates snapshots at an unchanged watermark"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.models = dict(demo_service.models)
+        raw = make_features(["DMA-A"], days=1)[["dma_id", "timestamp", "flow_in", "flow_out", "pressure"]]
+        service.feature_store.update(raw)
+        service.run_analysis_jobs()
+
+        with patch.object(service, "_analyze", wraps=service._analyze) as analyze:
+            service.analyze_dma("DMA-A")
+            assert analyze.call_count == 0
+
+            service.models["anomaly"] = type(service.models["anomaly"])(approach="zscore").fit(
+                service.get_dma_features("DMA-A")[service.models["anomaly"].feature_names]
+            )
+            service.analyze_dma("DMA-A")
+            assert analyze.call_count == 1
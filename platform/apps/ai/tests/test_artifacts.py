@@ -0,0 +1,134 @@
+"""
+Tests for the pickle-free model artifact format
+"""
+
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly import AnomalyDetector, IQRDetector
+from ai.models.artifacts import ArtifactError, load_artifact
+from ai.models.classification import WaterLossClassifier
+from ai.models.pattern import KMeansRecognizer
+
+
+@pytest.fixture
+def training_data() -> tuple[pd.DataFrame, pd.Series]:
+    """Synthetic features and binary labels."""
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(size=(300, 4)), columns=["flow_in", "flow_out", "pressure", "hour"])
+    y = pd.Series((X["flow_in"] > 0).astype(int))
+    return X, y
+
+
+class TestArtifactRoundTrip:
+    """Test save/load through artifact directories"""
+
+    @pytest.mark.parametrize("model_factory", [
+        lambda: AnomalyDetector(approach="ensemble"),
+        lambda: KMeansRecognizer(n_clusters=3),
+        lambda: WaterLossClassifier(approach="random_forest", n_estimators=10),
+        lambda: WaterLossClassifier(approach="xgboost", n_estimators=10),
+    ])
+    def test_predictions_identical(self, tmp_path, training_data, model_factory):
+        """A loaded model predicts exactly like the saved one"""
+        X, y = training_data
+        model = model_factory().fit(X, y)
+        model.save(str(tmp_path / "model"))
+
+        loaded = type(model)().load(str(tmp_path / "model"))
+        before, after = model.predict(X), loaded.predict(X)
+
+        np.testing.assert_array_equal(before.predictions, after.predictions)
+        np.testing.assert_array_equal(before.probabilities, after.probabilities)
+
+    def test_no_pickle_files(self, tmp_path, training_data):
+        """Artifacts are a JSON manifest plus plain .npy arrays"""
+        X, y = training_data
+        WaterLossClassifier(approach="decision_tree").fit(X, y).save(str(tmp_path / "model"))
+
+        files = sorted(p.name for p in (tmp_path / "model").rglob("*") if p.is_file())
+        assert "manifest.json" in files
+        assert all(f == "manifest.json" or f.endswith(".npy") for f in files)
+
+    def test_arrays_are_memory_mapped(self, tmp_path, training_data):
+        """Large arrays load as read-only memory maps"""
+        X, _ = training_data
+        KMeansRecognizer(n_clusters=3).fit(X).save(str(tmp_path / "model"))
+
+        loaded, _ = load_artifact(str(tmp_path / "model"))
+        assert isinstance(loaded.cluster_centers_, np.memmap)
+        assert not loaded.cluster_centers_.flags.writeable
+
+    def test_legacy_joblib_still_loads(self, tmp_path, training_data):
+        """Models saved with the old joblib format can still be read"""
+        X, _ = training_data
+        model = IQRDetector().fit(X)
+        joblib.dump({"class": "IQRDetector", "state": model.__dict__}, tmp_path / "old.joblib")
+
+        loaded = IQRDetector().load(str(tmp_path / "old.joblib"))
+        np.testing.assert_array_equal(loaded.predict(X).predictions, model.predict(X).predictions)
+
+
+class TestArtifactSafety:
+    """Test integrity and allowlist checks"""
+
+    def test_checksum_mismatch_rejected(self, tmp_path, training_data):
+        """Modified array blobs fail verification"""
+        X, _ = training_data
+        IQRDetector().fit(X).save(str(tmp_path / "model"))
+
+        blob = next((tmp_path / "model" / "arrays").glob("*.npy"))
+        data = bytearray(blob.read_bytes())
+        data[-1] ^= 0xFF
+        blob.write_bytes(bytes(data))
+
+        with pytest.raises(ArtifactError):
+            IQRDetector().load(str(tmp_path / "model"))
+
+    def test_disallowed_class_rejected(self, tmp_path, training_data):
+        """Manifests cannot name classes outside the allowlist"""
+        X, _ = training_data
+        IQRDetector().fit(X).save(str(tmp_path / "model"))
+
+        manifest_path = tmp_path / "model" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["state"]["state"]["items"]["evil"] = {
+            "__type__": "object", "class": "subprocess:Popen", "state": None,
+        }
+        manifest_path.write_text(json.dumps(manifest))
+
+        with pytest.raises(ArtifactError):
+            IQRDetector().load(str(tmp_path / "model"))
+
+    def test_wrong_class_rejected(self, tmp_path, training_data):
+        """Loading an artifact into a different model class fails"""
+        X, _ = training_data
+        IQRDetector().fit(X).save(str(tmp_path / "model"))
+
+        with pytest.raises(ArtifactError):
+            KMeansRecognizer().load(str(tmp_path / "model"))
+
+    @pytest.mark.parametrize("kind", ["reduce", "newobj", "object"])
+    def test_qualname_cannot_leave_allowed_module(self, tmp_path, training_data, kind):
+        """Class paths cannot reach other modules through module attributes"""
+        X, _ = training_data
+        IQRDetector().fit(X).save(str(tmp_path / "model"))
+        target = tmp_path / "written.bin"
+
+        manifest_path = tmp_path / "model" / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["state"]["state"]["items"]["evil"] = {
+            "__type__": kind,
+            "class": "sklearn.base:np.memmap",
+            "args": [str(target), "uint8", "w+", 0, [4096]],
+            "state": None,
+        }
+        manifest_path.write_text(json.dumps(manifest))
+
+        with pytest.raises(ArtifactError):
+            load_artifact(str(tmp_path / "model"))
+        assert not target.exists()
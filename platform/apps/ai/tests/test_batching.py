@@ -0,0 +1,113 @@
+"""
+Tests for the micro-batching inference dispatcher
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.batching import MicroBatcher
+from ai.models.anomaly import AnomalyDetector
+
+
+@pytest.fixture
+def fitted_detector() -> AnomalyDetector:
+    """Z-Score anomaly detector fitted on synthetic readings."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "flow_in": rng.normal(1000, 200, 200),
+        "flow_out": rng.normal(850, 180, 200),
+        "pressure": rng.normal(3.5, 0.5, 200),
+    })
+    return AnomalyDetector(approach="zscore").fit(df)
+
+
+class TestMicroBatcher:
+    """Test MicroBatcher dispatch behaviour"""
+
+    async def test_concurrent_requests_share_batch(self):
+        """Concurrent submits are coalesced and results keep their order"""
+        calls = []
+
+        def predict_batch(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(predict_batch, max_batch_size=8, max_latency_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        assert results == [0, 2, 4, 6, 8]
+        assert len(calls) == 1
+        metrics = batcher.get_metrics()
+        assert metrics["batches"] == 1
+        assert metrics["rows"] == 5
+        assert metrics["fill_rate"] == pytest.approx(5 / 8)
+
+    async def test_full_batch_flushes_without_waiting(self):
+        """Reaching max_batch_size dispatches immediately"""
+        batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_latency_ms=10_000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=2
+        )
+
+        assert results == list(range(8))
+        assert batcher.metrics.batches == 2
+
+    async def test_batch_error_propagates_to_callers(self):
+        """A failing batch raises in every awaiting caller"""
+        def predict_batch(items):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(predict_batch, max_batch_size=4, max_latency_ms=1)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batcher.metrics.errors == 1
+
+    def test_invalid_config(self):
+        """Batch size must be positive"""
+        with pytest.raises(ValueError):
+            MicroBatcher(lambda items: items, max_batch_size=0)
+
+
+class TestBatchedDetection:
+    """Test batched anomaly detection entry points"""
+
+    def test_detect_batch_matches_shape_of_single(self, fitted_detector):
+        """detect_batch returns one detect_single-shaped dict per reading"""
+        readings = [
+            {"flow_in": 1000, "flow_out": 850, "pressure": 3.5},
+            {"flow_in": 5000, "flow_out": 850, "pressure": 0.5},
+        ]
+
+        results = fitted_detector.detect_batch(readings)
+        single = fitted_detector.detect_single(readings[0])
+
+        assert len(results) == 2
+        assert set(results[0]) == set(single)
+        assert results[1]["is_anomaly"] is True
+        assert len(results[1]["details"]["max_z_scores"]) == 1
+
+    def test_missing_features_default_to_zero(self, fitted_detector):
+        """Readings missing a feature are still scored"""
+        results = fitted_detector.detect_batch([{"flow_in": 1000}])
+        assert results[0]["is_anomaly"] is True
+
+    async def test_service_batched_entry_point(self, fitted_detector):
+        """AIModelService coalesces concurrent detect_anomaly_batched calls"""
+        from ai.inference.model_service import AIModelService
+
+        service = AIModelService(batch_max_size=16, batch_max_latency_ms=10)
+        service.models["anomaly"] = fitted_detector
+
+        readings = [{"flow_in": 1000 + i, "flow_out": 850, "pressure": 3.5} for i in range(6)]
+        results = await asyncio.gather(*(service.detect_anomaly_batched(r) for r in readings))
+
+        assert len(results) == 6
+        assert all("is_anomaly" in r for r in results)
+        assert service.get_batching_metrics()["anomaly"]["batches"] == 1
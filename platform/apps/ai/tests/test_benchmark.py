@@ -0,0 +1,135 @@
+"""
+Tests for the model benchmark harness
+"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.base import BaseModel, ModelComparison
+from ai.models.benchmark import BenchmarkResult, ModelBenchmark
+from ai.models.classification.tree_models import RandomForestClassifier
+
+
+def make_data(n: int = 600, seed: int = 0) -> tuple[pd.DataFrame, pd.Series]:
+    """Readings whose label depends on loss percentage and pressure"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "flow_in": rng.normal(1000, 100, n),
+        "loss_percentage": rng.uniform(0, 30, n),
+        "pressure": rng.normal(3.0, 0.4, n),
+    })
+    y = pd.Series(((X["loss_percentage"] > 15) & (X["pressure"] < 3.0)).astype(int))
+    return X, y
+
+
+def small_forest(name: str, n_estimators: int) -> RandomForestClassifier:
+    """Named random forest candidate"""
+    model = RandomForestClassifier(n_estimators=n_estimators)
+    model.name = name
+    return model
+
+
+class FailingModel(BaseModel):
+    """Candidate whose fit always fails"""
+
+    def __init__(self):
+        super().__init__(name="failing")
+
+    def fit(self, X, y=None):
+        raise RuntimeError("boom")
+
+    def predict(self, X):
+        raise RuntimeError("boom")
+
+    def evaluate(self, X, y):
+        raise RuntimeError("boom")
+
+
+class TracingProbe(RandomForestClassifier):
+    """Forest that records whether memory tracing was on during fit"""
+
+    tracing: list = []
+
+    def fit(self, X, y=None):
+        TracingProbe.tracing.append(tracemalloc.is_tracing())
+        return super().fit(X, y)
+
+
+class TestModelBenchmark:
+    """Cross-validated metrics and cost columns"""
+
+    def test_records_metrics_and_cost(self):
+        """Every candidate gets fold-averaged metrics and timings"""
+        X, y = make_data()
+        candidates = [small_forest("rf_10", 10), small_forest("rf_50", 50)]
+        bench = ModelBenchmark(candidates, n_splits=3, latency_samples=20, max_workers=1)
+        results = bench.run(X, y)
+
+        assert set(results) == {"rf_10", "rf_50"}
+        for result in results.values():
+            assert result.error is None
+            assert result.n_folds == 3
+            assert 0 <= result.metrics["f1_score"] <= 1
+            assert result.fit_time_s > 0
+            assert result.predict_rows_per_sec > 0
+            assert 0 < result.latency_p50_ms <= result.latency_p99_ms
+            assert result.peak_memory_mb > 0
+
+    def test_timed_fits_are_not_traced(self):
+        """Memory is traced in one extra pass, outside the timed fits"""
+        X, y = make_data(n=200)
+        TracingProbe.tracing = []
+        result = ModelBenchmark([TracingProbe(n_estimators=5)], n_splits=3, latency_samples=5).run(X, y)
+
+        assert TracingProbe.tracing == [False, False, False, True]
+        assert next(iter(result.values())).peak_memory_mb > 0
+
+    def test_repeated_names_are_suffixed(self):
+        """Candidates sharing a name do not overwrite each other"""
+        X, y = make_data(n=200)
+        candidates = [small_forest("rf", 5), small_forest("rf", 10), small_forest("rf", 15)]
+        results = ModelBenchmark(candidates, n_splits=2, latency_samples=5, max_workers=1).run(X, y)
+        assert list(results) == ["rf", "rf (2)", "rf (3)"]
+        assert all(r.error is None for r in results.values())
+
+    def test_parallel_matches_serial_metrics(self):
+        """Worker processes produce the same accuracy metrics"""
+        X, y = make_data()
+        candidates = [small_forest("rf_10", 10), small_forest("rf_20", 20)]
+        serial = ModelBenchmark(candidates, n_splits=3, latency_samples=5, max_workers=1).run(X, y)
+        parallel = ModelBenchmark(candidates, n_splits=3, latency_samples=5, max_workers=2).run(X, y)
+
+        for name in serial:
+            assert parallel[name].metrics == pytest.approx(serial[name].metrics)
+
+    def test_report_and_failures(self):
+        """A failing candidate is reported with its error"""
+        X, y = make_data(n=200)
+        candidates = [small_forest("rf", 5), FailingModel()]
+        bench = ModelBenchmark(candidates, n_splits=2, latency_samples=5, max_workers=1)
+        bench.run(X, y)
+        report = bench.generate_report()
+
+        assert list(report["model"])[0] == "rf"
+        failed = report[report["error"].notna()]
+        assert list(failed["model"]) == ["failing"]
+        assert failed["error"].iloc[0] == "boom"
+
+    def test_pareto_front(self):
+        """Dominated candidates are dropped from the front"""
+        bench = ModelBenchmark([])
+        bench.results = {
+            "fast": BenchmarkResult("fast", {"f1_score": 0.80}, latency_p99_ms=1.0),
+            "accurate": BenchmarkResult("accurate", {"f1_score": 0.90}, latency_p99_ms=5.0),
+            "dominated": BenchmarkResult("dominated", {"f1_score": 0.78}, latency_p99_ms=2.0),
+        }
+        assert bench.pareto_front() == ["fast", "accurate"]
+
+    def test_model_comparison_benchmark(self):
+        """ModelComparison.benchmark returns the report"""
+        X, y = make_data(n=300)
+        report = ModelComparison([small_forest("rf", 5)]).benchmark(X, y, n_splits=2, max_workers=1)
+        assert {"f1_score", "latency_p99_ms", "predict_rows_per_sec"} <= set(report.columns)
@@ -0,0 +1,182 @@
+"""
+Tests for the float32 compact scoring path
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly.baseline import IQRDetector, ZScoreDetector
+from ai.models.anomaly.detector import AnomalyDetector
+from ai.models.benchmark import memory_benchmark
+from ai.models.classification.classifier import WaterLossClassifier
+from ai.models.compact import to_array
+from ai.models.pattern.recognizer import PatternRecognizer
+from ai.models.timeseries import BatchHoltWintersForecaster
+from ai.models.timeseries.baseline import MovingAverageForecaster
+
+try:
+    import pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def make_readings(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Readings on the scale of real DMA flows and pressures"""
+    rng = np.random.default_rng(seed)
+    flow_in = rng.normal(1000, 200, n)
+    X = pd.DataFrame({
+        "flow_in": flow_in,
+        "flow_out": flow_in * rng.uniform(0.7, 0.95, n),
+        "pressure": rng.normal(3.5, 0.5, n),
+    })
+    X["loss_percentage"] = (X["flow_in"] - X["flow_out"]) / X["flow_in"] * 100
+    return X
+
+
+def compare(model, X: pd.DataFrame):
+    """Predictions of a fitted model in float64 and in compact mode"""
+    full = model.predict(X)
+    compact = model.set_compact().predict(X)
+    model.set_compact(False)
+    return full, compact
+
+
+class TestToArray:
+    """Frame and array conversion"""
+
+    def test_frame_columns_in_order(self):
+        """Selected columns land in order in a C-contiguous float32 array"""
+        X = make_readings(50)
+        values = to_array(X, ["pressure", "flow_in"])
+
+        assert values.dtype == np.float32
+        assert values.flags.c_contiguous
+        np.testing.assert_allclose(values, X[["pressure", "flow_in"]].to_numpy(), rtol=1e-6)
+
+    def test_missing_values_become_nan(self):
+        """Nullable columns convert with NaN for missing"""
+        X = pd.DataFrame({"a": pd.array([1.0, None, 3.0], dtype="Float64")})
+        values = to_array(X)
+        assert np.isnan(values[1, 0])
+        assert values[2, 0] == 3.0
+
+    def test_compact_array_is_not_copied(self):
+        """A contiguous float32 array is used as is"""
+        values = np.ones((10, 3), dtype=np.float32)
+        assert np.shares_memory(to_array(values), values)
+        assert not np.shares_memory(to_array(values, dtype=np.float64), values)
+
+    @pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow not installed")
+    def test_arrow_table(self):
+        """Arrow columns are read into the same float32 layout"""
+        X = make_readings(50)
+        table = pyarrow.Table.from_pandas(X, preserve_index=False)
+        np.testing.assert_array_equal(to_array(table, ["flow_in", "pressure"]), to_array(X, ["flow_in", "pressure"]))
+
+
+class TestCompactDrift:
+    """float32 results stay within a bounded distance of float64"""
+
+    def test_zscore(self):
+        """Z-scores agree to float32 precision"""
+        X = make_readings()
+        full, compact = compare(ZScoreDetector().fit(X), X)
+
+        np.testing.assert_allclose(compact.details["max_z_scores"], full.details["max_z_scores"], rtol=1e-5, atol=1e-5)
+        assert (compact.predictions != full.predictions).mean() < 0.001
+
+    def test_iqr(self):
+        """Fence decisions are unchanged"""
+        X = make_readings()
+        full, compact = compare(IQRDetector().fit(X), X)
+        np.testing.assert_array_equal(compact.predictions, full.predictions)
+
+    def test_isolation_forest(self):
+        """Isolation Forest scores barely move"""
+        X = make_readings()
+        full, compact = compare(AnomalyDetector(approach="isolation_forest").fit(X), X)
+
+        assert np.abs(compact.probabilities - full.probabilities).max() < 1e-3
+        assert (compact.predictions != full.predictions).mean() < 0.005
+
+    def test_kmeans(self):
+        """Cluster assignments match"""
+        X = make_readings()
+        full, compact = compare(PatternRecognizer(approach="kmeans", n_clusters=4).fit(X), X)
+        assert (compact.predictions != full.predictions).mean() < 0.001
+
+    def test_classifier(self):
+        """Random forest probabilities barely move"""
+        X = make_readings()
+        y = (X["loss_percentage"] > 18).astype(int)
+        full, compact = compare(WaterLossClassifier(approach="random_forest").fit(X, y), X)
+
+        assert np.abs(compact.probabilities - full.probabilities).max() < 0.05
+        assert (compact.predictions != full.predictions).mean() < 0.005
+
+    def test_holt_winters(self):
+        """Year-long seasonal filtering drifts by well under a unit of flow"""
+        rng = np.random.default_rng(1)
+        hours = np.arange(24 * 365)
+        wide = pd.DataFrame({
+            f"DMA-{i}": 1000 + 200 * np.sin(2 * np.pi * hours / 24) + rng.normal(0, 20, len(hours))
+            for i in range(5)
+        })
+        model = BatchHoltWintersForecaster(seasonal=True, seasonal_periods=24, optimize=True)
+        full = model.fit(wide).predict(pd.DataFrame({"periods": [48]})).predictions
+        params, rmse = model.params_, model.rmse_
+        compact = model.set_compact().fit(wide).predict(pd.DataFrame({"periods": [48]})).predictions
+
+        assert compact.dtype == np.float32
+        assert np.abs(compact - full).max() < 0.5
+        # Fitting is unchanged by compact mode
+        np.testing.assert_array_equal(model.rmse_, rmse)
+        for name in params:
+            np.testing.assert_array_equal(model.params_[name], params[name])
+
+    def test_moving_average_batch(self):
+        """Batch moving-average forecasts stay float32 and close"""
+        rng = np.random.default_rng(2)
+        histories = rng.normal(1000, 50, (20, 24 * 7))
+        model = MovingAverageForecaster(window=24)
+        full = model.predict_batch(histories, 24).predictions
+        compact = model.set_compact().predict_batch(histories, 24).predictions
+
+        assert compact.dtype == np.float32
+        np.testing.assert_allclose(compact, full, rtol=1e-5)
+
+
+class TestSetCompact:
+    """Compact mode propagates to member models"""
+
+    def test_ensemble_members(self):
+        """Ensemble detectors switch together"""
+        X = make_readings(300)
+        detector = AnomalyDetector(approach="ensemble").fit(X)
+        detector.set_compact()
+
+        assert detector.dtype == np.float32
+        assert all(member.compact for member in detector.detectors)
+        assert detector.feature_builder.build({"flow_in": 1.0}).dtype == np.float32
+
+        detector.set_compact(False)
+        assert not any(member.compact for member in detector.detectors)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(sys.platform == "win32", reason="needs ru_maxrss")
+def test_compact_lowers_peak_rss():
+    """Scoring a year of hourly data for many DMAs peaks lower in float32"""
+    X = make_readings()
+    model = ZScoreDetector().fit(X)
+    report = memory_benchmark(
+        model, n_dmas=200, loc=X.mean().to_numpy(), scale=X.std().to_numpy()
+    ).set_index("dtype")
+
+    assert report.loc["float32", "input_mb"] == pytest.approx(report.loc["float64", "input_mb"] / 2)
+    assert report.loc["float32", "peak_rss_mb"] < report.loc["float64", "peak_rss_mb"]
+    assert report.loc["float32", "anomalies"] == pytest.approx(report.loc["float64", "anomalies"], rel=0.01)
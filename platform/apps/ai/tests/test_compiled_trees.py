@@ -0,0 +1,185 @@
+"""
+Tests for compiled tree inference
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from ai.models.classification import WaterLossClassifier
+from ai.models.classification.compiled import CompiledTreeModel, compile_tree_model
+
+
+def make_data(n: int = 600, n_classes: int = 2, seed: int = 0):
+    """Classification data with a few NaN-free continuous features"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 5)), columns=[f"f{i}" for i in range(5)])
+    score = X["f0"] + 0.5 * X["f1"] - X["f2"] * X["f3"]
+    y = pd.Series(np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1])))
+    return X, y
+
+
+SKLEARN_MODELS = {
+    "decision_tree": lambda: DecisionTreeClassifier(max_depth=8, random_state=0),
+    "random_forest": lambda: RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0),
+    "gradient_boosting": lambda: GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+}
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("name", list(SKLEARN_MODELS))
+class TestCompiledSklearn:
+    """Compiled predictions match sklearn"""
+
+    def test_identical_predictions(self, name, n_classes):
+        """Labels are identical and probabilities agree to rounding"""
+        X, y = make_data(n_classes=n_classes)
+        model = SKLEARN_MODELS[name]().fit(X.to_numpy(), y)
+        compiled = compile_tree_model(model)
+        X_test = make_data(n=300, seed=1)[0].to_numpy()
+
+        labels, proba = compiled.predict_with_proba(X_test)
+        np.testing.assert_array_equal(labels, model.predict(X_test))
+        np.testing.assert_allclose(proba, model.predict_proba(X_test), rtol=0, atol=1e-12)
+
+    def test_leaves_match_apply(self, name, n_classes):
+        """Traversal ends in the same leaves as sklearn's apply"""
+        X, y = make_data(n_classes=n_classes)
+        model = SKLEARN_MODELS[name]().fit(X.to_numpy(), y)
+        compiled = compile_tree_model(model)
+
+        leaves = compiled.apply(X.to_numpy()) - compiled.roots
+        expected = model.apply(X.to_numpy()).reshape(len(X), -1)
+        if name == "decision_tree":
+            expected = expected.reshape(-1, 1)
+        np.testing.assert_array_equal(leaves, expected)
+
+
+class TestCompiledClassifier:
+    """WaterLossClassifier uses the compiled trees"""
+
+    @pytest.mark.parametrize("approach", ["decision_tree", "random_forest", "xgboost"])
+    def test_classifier_matches_sklearn(self, approach):
+        """Compiled classify_batch agrees with the underlying sklearn model"""
+        X, y = make_data()
+        classifier = WaterLossClassifier(approach=approach).fit(X, y)
+        assert isinstance(classifier.classifier.compiled, CompiledTreeModel)
+
+        sample = X.head(100)
+        result = classifier.predict(sample)
+        np.testing.assert_array_equal(result.predictions, classifier.classifier.model.predict(sample.to_numpy()))
+        np.testing.assert_allclose(
+            result.probabilities, classifier.classifier.model.predict_proba(sample.to_numpy()), rtol=0, atol=1e-12
+        )
+
+    @pytest.mark.parametrize("approach", ["decision_tree", "random_forest", "xgboost"])
+    @pytest.mark.parametrize("bad", [np.nan, np.inf])
+    def test_missing_values_same_on_both_paths(self, approach, bad, monkeypatch):
+        """NaN and infinity fail or succeed alike on the compiled and native paths"""
+        from ai.models.classification import tree_models
+
+        X, y = make_data()
+        classifier = WaterLossClassifier(approach=approach).fit(X, y)
+        sample = X.head(5).copy()
+        sample.iloc[2, 0] = bad
+
+        def outcome():
+            try:
+                result = classifier.predict(sample)
+            except ValueError:
+                return "error"
+            return result.predictions.tolist()
+
+        compiled = outcome()
+        monkeypatch.setattr(tree_models, "COMPILED_MAX_ROWS", 0)
+        assert outcome() == compiled
+
+    def test_compiled_survives_artifact_round_trip(self, tmp_path):
+        """Compiled arrays are saved with the model"""
+        X, y = make_data()
+        classifier = WaterLossClassifier(approach="random_forest").fit(X, y)
+        classifier.save(str(tmp_path / "clf"))
+
+        loaded = WaterLossClassifier(approach="random_forest").load(str(tmp_path / "clf"))
+        sample = X.head(100)
+        assert loaded.classifier.compiled.n_trees == 100
+        np.testing.assert_array_equal(loaded.predict(sample).probabilities, classifier.predict(sample).probabilities)
+
+    def test_xgboost_booster(self):
+        """XGBoost boosters compile from their JSON dump"""
+        xgb = pytest.importorskip("xgboost")
+        X, y = make_data(n_classes=3)
+        model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+        compiled = compile_tree_model(model, X.columns.tolist())
+
+        np.testing.assert_array_equal(compiled.predict(X.to_numpy()), model.predict(X))
+        np.testing.assert_allclose(compiled.predict_proba(X.to_numpy()), model.predict_proba(X), atol=1e-5)
+
+    def test_xgboost_classifier_multiclass(self):
+        """Multi-class XGBoost classifiers compile instead of falling back"""
+        pytest.importorskip("xgboost")
+        X, y = make_data(n_classes=3)
+        classifier = WaterLossClassifier(approach="xgboost").fit(X, y)
+        assert isinstance(classifier.classifier.compiled, CompiledTreeModel)
+
+        sample = X.head(100)
+        np.testing.assert_allclose(
+            classifier.predict(sample).probabilities,
+            classifier.classifier.model.predict_proba(sample.to_numpy()),
+            atol=1e-5,
+        )
+
+
+class FakeBooster:
+    """The XGBoost booster calls from_xgboost makes, with single-leaf trees"""
+
+    def __init__(self, objective: str, base_score: str, leaves: list):
+        self.config = {"learner": {
+            "objective": {"name": objective},
+            "learner_model_param": {"base_score": base_score},
+        }}
+        self.leaves = leaves
+
+    def save_config(self) -> str:
+        return json.dumps(self.config)
+
+    def get_dump(self, dump_format: str = "json") -> list:
+        return [json.dumps({"nodeid": 0, "leaf": leaf}) for leaf in self.leaves]
+
+
+class FakeXGBClassifier:
+    """Fitted-classifier surface of XGBClassifier"""
+
+    def __init__(self, booster: FakeBooster, n_classes: int):
+        self.booster = booster
+        self.classes_ = np.arange(n_classes)
+
+    def get_booster(self) -> FakeBooster:
+        return self.booster
+
+
+class TestXGBoostBaseScore:
+    """base_score parsing in from_xgboost"""
+
+    def test_vector_base_score(self):
+        """A per-class base_score vector becomes the per-class init margin"""
+        model = FakeXGBClassifier(FakeBooster("multi:softprob", "[1E-1,2E-1,3E-1]", [0.5, 0.0, 0.0]), 3)
+        compiled = CompiledTreeModel.from_xgboost(model, ["f0"])
+        np.testing.assert_allclose(compiled.decision_function(np.zeros((1, 1)))[0], [0.6, 0.2, 0.3])
+
+    @pytest.mark.parametrize("base_score", ["5E-1", "[5E-1]"])
+    def test_scalar_base_score(self, base_score):
+        """Scalar and one-element base_scores are accepted"""
+        model = FakeXGBClassifier(FakeBooster("binary:logistic", base_score, [0.25]), 2)
+        compiled = CompiledTreeModel.from_xgboost(model, ["f0"])
+        np.testing.assert_allclose(compiled.decision_function(np.zeros((1, 1)))[0], [0.25])
+
+    def test_mismatched_vector_rejected(self):
+        """A base_score vector of the wrong length is unsupported, not misread"""
+        model = FakeXGBClassifier(FakeBooster("multi:softprob", "[1E-1,2E-1]", [0.0, 0.0, 0.0]), 3)
+        with pytest.raises(TypeError):
+            CompiledTreeModel.from_xgboost(model, ["f0"])
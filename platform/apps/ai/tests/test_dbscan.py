@@ -0,0 +1,96 @@
+"""
+Tests for DBSCAN scoring of new data through a persisted neighbor index
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.neighbors import NearestNeighbors
+
+from ai.models.pattern import PatternRecognizer
+from ai.models.pattern.clustering import DBSCANRecognizer
+
+
+def make_blobs(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Three well-separated usage clusters"""
+    rng = np.random.default_rng(seed)
+    centers = np.array([[500.0, 3.0], [1000.0, 3.5], [1500.0, 2.5]])
+    labels = rng.integers(0, 3, n)
+    values = centers[labels] + rng.normal(0, [20.0, 0.05], (n, 2))
+    return pd.DataFrame(values, columns=["flow_in", "pressure"])
+
+
+class TestDBSCANRecognizer:
+    """New points are scored against the stored core samples"""
+
+    def test_scores_new_data(self):
+        """Points near a cluster get its label; far points are noise"""
+        X = make_blobs()
+        model = DBSCANRecognizer(eps=0.3, min_samples=5).fit(X)
+        assert model.n_clusters_ == 3
+
+        new = pd.DataFrame({"flow_in": [505.0, 1495.0, 4000.0], "pressure": [3.0, 2.5, 9.0]})
+        predictions = model.predict(new).predictions
+        assert predictions[0] != -1 and predictions[1] != -1
+        assert predictions[0] != predictions[1]
+        assert predictions[2] == -1
+
+    @pytest.mark.parametrize("index", ["kd_tree", "ball_tree"])
+    def test_matches_brute_force(self, index):
+        """Tree queries agree with a brute-force nearest core sample search"""
+        X = make_blobs()
+        model = DBSCANRecognizer(eps=0.3, index=index).fit(X)
+        new = make_blobs(n=100, seed=1)
+
+        scaled = model.scaler.transform(new.to_numpy())
+        nn = NearestNeighbors(n_neighbors=1, algorithm="brute").fit(model.model.components_)
+        distances, indices = nn.kneighbors(scaled)
+        expected = model.core_labels_[indices[:, 0]]
+        expected[distances[:, 0] > model.eps] = -1
+
+        np.testing.assert_array_equal(model.predict(new).predictions, expected)
+
+    def test_index_reused_across_calls(self):
+        """The neighbor index is built once at fit, not per predict"""
+        model = DBSCANRecognizer(eps=0.3).fit(make_blobs())
+        index = model.neighbor_index_
+        model.predict(make_blobs(n=10, seed=2))
+        model.predict(make_blobs(n=10, seed=3))
+        assert model.neighbor_index_ is index
+
+    def test_index_saved_with_model(self, tmp_path):
+        """A loaded model predicts identically without refitting the index"""
+        X = make_blobs()
+        model = DBSCANRecognizer(eps=0.3).fit(X)
+        model.save(str(tmp_path / "dbscan"))
+        loaded = DBSCANRecognizer().load(str(tmp_path / "dbscan"))
+
+        new = make_blobs(n=50, seed=4)
+        assert loaded.neighbor_index_ is not None
+        np.testing.assert_array_equal(loaded.predict(new).predictions, model.predict(new).predictions)
+
+    def test_all_noise_without_core_samples(self):
+        """With no core samples every point is noise"""
+        model = DBSCANRecognizer(eps=1e-6, min_samples=50).fit(make_blobs(n=40))
+        result = model.predict(make_blobs(n=5))
+        assert (result.predictions == -1).all()
+
+
+class TestPatternRecognizerDBSCAN:
+    """DBSCAN and hybrid pattern recognizers"""
+
+    def test_dbscan_approach(self):
+        """The dbscan approach constructs, fits and labels noise as anomalous"""
+        recognizer = PatternRecognizer(approach="dbscan", eps=0.3).fit(make_blobs())
+        result = recognizer.predict(pd.DataFrame({"flow_in": [4000.0], "pressure": [9.0]}))
+        assert result.details["pattern_labels"] == ["anomalous"]
+
+    def test_hybrid_passes_dbscan_kwargs(self):
+        """Hybrid routes the dbscan kwargs to DBSCAN only"""
+        recognizer = PatternRecognizer(approach="hybrid", n_clusters=3, dbscan={"eps": 0.3})
+        recognizer.fit(make_blobs())
+        assert recognizer.dbscan.eps == 0.3
+
+        result = recognizer.predict(pd.DataFrame({"flow_in": [505.0, 4000.0], "pressure": [3.0, 9.0]}))
+        assert result.predictions[0] != -1
+        assert result.predictions[1] == -1
@@ -0,0 +1,68 @@
+"""
+Tests for the ensemble anomaly detector modes
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly import AnomalyDetector
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    """Normal readings with a few spikes"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "flow_in": rng.normal(1000, 50, 1000),
+        "flow_out": rng.normal(850, 40, 1000),
+        "pressure": rng.normal(3.5, 0.2, 1000),
+        "loss_percentage": rng.normal(15, 3, 1000),
+    })
+    X.loc[:9, "flow_in"] = 2500
+    return X
+
+
+class TestEnsembleModes:
+    """Test parallel, sequential and cascade ensembles"""
+
+    def test_parallel_matches_sequential(self, data):
+        """Running members concurrently does not change results"""
+        parallel = AnomalyDetector(approach="ensemble").fit(data).predict(data)
+        sequential = AnomalyDetector(approach="ensemble", ensemble_mode="sequential").fit(data).predict(data)
+
+        np.testing.assert_array_equal(parallel.predictions, sequential.predictions)
+        np.testing.assert_allclose(parallel.probabilities, sequential.probabilities)
+
+    def test_reports_member_latency(self, data):
+        """Every member's latency is in details"""
+        result = AnomalyDetector(approach="ensemble").fit(data).predict(data)
+
+        assert set(result.details["member_latency_ms"]) == {
+            "ZScoreDetector", "IQRDetector", "IsolationForestDetector",
+        }
+
+    def test_cascade_forwards_only_ambiguous_rows(self, data):
+        """Isolation Forest only scores rows the statistical members cannot decide"""
+        detector = AnomalyDetector(approach="ensemble", ensemble_mode="cascade").fit(data)
+        result = detector.predict(data)
+
+        cascade = result.details["cascade"]
+        assert 0 < cascade["forwarded"] < cascade["rows"]
+        assert result.predictions[:10].all()
+
+    def test_cascade_without_prefilter_matches_full_vote(self, data):
+        """With thresholds (0, 1) every row is forwarded and the vote is unchanged"""
+        cascade = AnomalyDetector(
+            approach="ensemble", ensemble_mode="cascade", cascade_thresholds=(0.0, 1.0)
+        ).fit(data).predict(data)
+        full = AnomalyDetector(approach="ensemble").fit(data).predict(data)
+
+        assert cascade.details["cascade"]["forwarded"] == len(data)
+        np.testing.assert_array_equal(cascade.predictions, full.predictions)
+        np.testing.assert_allclose(cascade.probabilities, full.probabilities)
+
+    def test_unknown_mode(self):
+        """An unknown mode is rejected"""
+        with pytest.raises(ValueError):
+            AnomalyDetector(approach="ensemble", ensemble_mode="fastest")
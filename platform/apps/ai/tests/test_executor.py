@@ -0,0 +1,99 @@
+"""
+Tests for the model execution layer
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from ai.inference.executor import EventLoopLagMonitor, ModelExecutor, ModelTimeoutError
+from ai.inference.model_service import AIModelService
+
+
+def blocking_work(seconds: float) -> str:
+    """Simulate a CPU-bound model call."""
+    time.sleep(seconds)
+    return "done"
+
+
+class TestModelExecutor:
+    """Test ModelExecutor limits and timeouts"""
+
+    async def test_run_returns_result(self):
+        """Blocking calls run in the pool and return their result"""
+        executor = ModelExecutor(max_workers=2)
+        assert await executor.run("anomaly", blocking_work, 0.01) == "done"
+        assert executor.get_stats()["anomaly"]["completed"] == 1
+        executor.shutdown()
+
+    async def test_concurrency_limit(self):
+        """No more than the configured number of calls run at once"""
+        executor = ModelExecutor(max_workers=8, concurrency_limits={"timeseries": 1})
+        running = 0
+        peak = 0
+
+        def tracked() -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            time.sleep(0.02)
+            running -= 1
+
+        await asyncio.gather(*(executor.run("timeseries", tracked) for _ in range(4)))
+
+        assert peak == 1
+        executor.shutdown()
+
+    async def test_timeout(self):
+        """Slow calls raise ModelTimeoutError"""
+        executor = ModelExecutor(max_workers=1)
+
+        with pytest.raises(ModelTimeoutError):
+            await executor.run("anomaly", blocking_work, 0.3, timeout=0.05)
+
+        assert executor.get_stats()["anomaly"]["timeouts"] == 1
+        executor.shutdown()
+
+
+class TestEventLoopLag:
+    """Test event-loop lag instrumentation"""
+
+    async def test_blocking_call_shows_lag_and_executor_removes_it(self):
+        """A blocking call on the loop shows lag; the same call in the executor does not"""
+        monitor = EventLoopLagMonitor(interval_ms=5)
+        executor = ModelExecutor(max_workers=1)
+
+        monitor.start()
+        await asyncio.sleep(0.02)
+        blocking_work(0.15)
+        await asyncio.sleep(0.02)
+        before = monitor.get_stats()
+
+        monitor.reset()
+        await executor.run("anomaly", blocking_work, 0.15)
+        await asyncio.sleep(0.02)
+        after = monitor.get_stats()
+        await monitor.stop()
+        executor.shutdown()
+
+        assert before["max_ms"] >= 100
+        assert after["max_ms"] < before["max_ms"]
+
+
+class TestAsyncServiceWrappers:
+    """Test AIModelService async wrappers"""
+
+    async def test_missing_model_returns_error(self):
+        """Async wrappers keep the sync error contract"""
+        service = AIModelService()
+        result = await service.detect_anomaly_async({"flow_in": 1000})
+        assert result == {"error": "Anomaly model not loaded"}
+
+    async def test_timeout_returns_error(self):
+        """Timeouts are reported as error dicts"""
+        service = AIModelService(executor=ModelExecutor(timeouts={"timeseries": 0.05}))
+        service.forecast = lambda days: blocking_work(0.3)  # type: ignore[method-assign]
+
+        result = await service.forecast_async(7)
+        assert "timed out" in result["error"]
@@ -0,0 +1,167 @@
+"""
+Tests for the per-DMA feature store
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.feature_store import FeatureStore, HAS_PYARROW, compute_features
+from ai.inference.model_service import AIModelService
+
+
+def make_readings(dma_id: str = "DMA-A", days: int = 20, start: str = "2026-01-01", seed: int = 0) -> pd.DataFrame:
+    """Hourly readings with a daily cycle and a night-time minimum"""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, periods=days * 24, freq="h")
+    daily = 100 + 40 * np.sin((timestamps.hour.to_numpy() - 6) / 24 * 2 * np.pi)
+    flow_in = daily + rng.normal(0, 3, len(timestamps))
+    return pd.DataFrame({
+        "dma_id": dma_id,
+        "timestamp": timestamps,
+        "flow_in": flow_in,
+        "flow_out": flow_in * 0.85,
+        "pressure": 3.5 + rng.normal(0, 0.05, len(timestamps)),
+    })
+
+
+def feed_daily(store: FeatureStore, readings: pd.DataFrame) -> None:
+    """Update the store one day of readings at a time, like the ETL loader"""
+    for _, day in readings.groupby(readings["timestamp"].dt.date):
+        store.update(day)
+
+
+class TestComputeFeatures:
+    """Feature definitions"""
+
+    def test_features(self):
+        """Derived, lag and MNF features have the expected values"""
+        readings = make_readings(days=10).set_index("timestamp")
+        features = compute_features(readings)
+        ts = pd.Timestamp("2026-01-09 12:00")
+        row = features.loc[ts]
+
+        assert row["hour"] == 12 and row["day_of_week"] == ts.dayofweek
+        assert row["loss_percentage"] == pytest.approx(15.0)
+        assert row["flow_in_lag_24h"] == readings.loc[ts - pd.Timedelta(hours=24), "flow_in"]
+        assert row["flow_in_mean_24h"] == pytest.approx(
+            readings["flow_in"].loc[ts - pd.Timedelta(hours=23):ts].mean()
+        )
+        # MNF of the 02:00-04:00 window, published at 04:00
+        night = readings["flow_in"].loc["2026-01-09 02:00":"2026-01-09 03:00"].min()
+        assert row["mnf"] == night
+        previous = readings["flow_in"].loc["2026-01-08 02:00":"2026-01-08 03:00"].min()
+        assert features.loc["2026-01-09 03:00", "mnf"] == previous
+
+    def test_mnf_trend(self):
+        """A rising night flow gives a positive 7-day MNF trend"""
+        readings = make_readings(days=10).set_index("timestamp")
+        readings["flow_in"] += np.arange(len(readings)) / 24 * 2.0
+        features = compute_features(readings)
+        assert features["mnf_trend_7d"].iloc[-1] == pytest.approx(2.0, abs=1.0)
+
+
+class TestFeatureStore:
+    """Incremental updates, lookups and persistence"""
+
+    def test_incremental_matches_full_recompute(self, tmp_path):
+        """Daily updates produce the same features as one full computation"""
+        readings = make_readings()
+        store = FeatureStore(tmp_path)
+        feed_daily(store, readings)
+
+        expected = compute_features(readings.set_index("timestamp"))
+        stored = store.get_features("DMA-A").set_index("timestamp").drop(columns="dma_id")
+        pd.testing.assert_frame_equal(
+            stored, expected.rename_axis("timestamp"), check_freq=False, check_index_type=False
+        )
+
+    def test_lookup_window_and_latest(self, tmp_path):
+        """Lookups filter by time and return the latest row"""
+        store = FeatureStore(tmp_path)
+        feed_daily(store, make_readings())
+
+        window = store.get_features("DMA-A", start="2026-01-19", end="2026-01-19 23:00")
+        assert len(window) == 24
+        latest = store.get_latest("DMA-A")
+        assert latest["timestamp"] == pd.Timestamp("2026-01-20 23:00")
+        assert latest["dma_id"] == "DMA-A"
+        assert np.isfinite(latest["mnf"])
+        assert store.get_latest("DMA-X") is None
+
+    def test_hot_window_bounded(self, tmp_path):
+        """Only the hot window stays in memory; older rows come from disk"""
+        store = FeatureStore(tmp_path, hot_window="8D")
+        feed_daily(store, make_readings(days=20))
+
+        assert store._hot["DMA-A"].index[0] > pd.Timestamp("2026-01-12")
+        assert len(store.get_features("DMA-A", start="2026-01-01")) == 20 * 24
+
+    def test_late_readings_ignored(self, tmp_path):
+        """Readings at or before the stored watermark are skipped"""
+        store = FeatureStore(tmp_path)
+        readings = make_readings(days=3)
+        store.update(readings)
+        assert store.update(readings.iloc[:10]) == {}
+        assert store.stats["rows_skipped"] == 10
+
+    def test_survives_restart_and_compaction(self, tmp_path):
+        """A new store reloads its hot window and continues incrementally"""
+        readings = make_readings()
+        store = FeatureStore(tmp_path)
+        feed_daily(store, readings[readings["timestamp"] < "2026-01-15"])
+        assert store.compact() == 14
+
+        restarted = FeatureStore(tmp_path)
+        feed_daily(restarted, readings[readings["timestamp"] >= "2026-01-15"])
+        expected = compute_features(readings.set_index("timestamp"))
+        latest = restarted.get_latest("DMA-A")
+        assert latest["flow_in_mean_7d"] == pytest.approx(expected["flow_in_mean_7d"].iloc[-1])
+        assert latest["mnf_trend_7d"] == pytest.approx(expected["mnf_trend_7d"].iloc[-1])
+
+    def test_parts_bounded_by_auto_compaction(self, tmp_path):
+        """Small ETL batches never leave more than max_parts files per DMA"""
+        readings = make_readings()
+        store = FeatureStore(tmp_path, max_parts=8)
+        for start in range(0, len(readings), 7):
+            store.update(readings.iloc[start:start + 7])
+            assert len(store._parts("DMA-A")) <= 8
+
+        assert store.stats["compactions"] > 0
+        restarted = FeatureStore(tmp_path)
+        assert len(restarted.get_features("DMA-A")) == len(readings)
+        expected = compute_features(readings.set_index("timestamp"))
+        assert restarted.get_latest("DMA-A")["mnf_trend_7d"] == pytest.approx(expected["mnf_trend_7d"].iloc[-1])
+
+    def test_multiple_dmas(self, tmp_path):
+        """Each DMA is stored separately"""
+        store = FeatureStore(tmp_path)
+        added = store.update(pd.concat([make_readings("DMA-A", days=2), make_readings("DMA-B", days=2, seed=1)]))
+        assert added == {"DMA-A": 48, "DMA-B": 48}
+        assert store.dma_ids() == ["DMA-A", "DMA-B"]
+
+    @pytest.mark.skipif(not HAS_PYARROW, reason="pyarrow not installed")
+    def test_parquet_parts(self, tmp_path):
+        """With pyarrow, parts are Parquet files"""
+        store = FeatureStore(tmp_path, use_parquet=True)
+        store.update(make_readings(days=2))
+        assert store._parts("DMA-A")[0].suffix == ".parquet"
+        assert len(FeatureStore(tmp_path).get_features("DMA-A", start="2026-01-01")) == 48
+
+
+class TestServiceFeatureStore:
+    """AIModelService feeds and reads the feature store"""
+
+    def test_ingest_and_analyze(self, tmp_path):
+        """Ingested readings are stored and analyze_dma reads them without data"""
+        service = AIModelService(model_dir=str(tmp_path))
+        readings = make_readings(days=9)
+        readings["timestamp"] = readings["timestamp"].astype(str)
+        service.ingest_readings(readings.to_dict("records"))
+
+        features = service.get_dma_features("DMA-A", hours=24)
+        assert len(features) == 25
+        assert "flow_in_mean_7d" in features.columns
+
+        result = service.analyze_dma("DMA-A")
+        assert result["dma_id"] == "DMA-A"
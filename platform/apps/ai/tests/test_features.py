@@ -0,0 +1,146 @@
+"""
+Tests for array-native feature assembly and predict_array
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly import AnomalyDetector, StreamingZScoreDetector, StreamingIQRDetector
+from ai.models.classification import WaterLossClassifier
+from ai.models.features import FeatureVectorBuilder
+from ai.models.pattern import PatternRecognizer
+
+
+FEATURES = ["flow_in", "flow_out", "pressure"]
+
+
+def make_readings(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Readings with a few injected spikes"""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "flow_in": rng.normal(100, 10, n),
+        "flow_out": rng.normal(90, 10, n),
+        "pressure": rng.normal(3, 0.3, n),
+    })
+    X.loc[::50, "flow_in"] = 400
+    return X
+
+
+class TestFeatureVectorBuilder:
+    """Reading dicts map straight into feature-ordered arrays"""
+
+    def test_build_orders_features(self):
+        """Values land in feature_names order regardless of dict order"""
+        builder = FeatureVectorBuilder(FEATURES)
+        row = builder.build({"pressure": 3.0, "flow_out": 2.0, "flow_in": 1.0, "dma_id": "A"})
+        assert row.shape == (1, 3)
+        assert row.dtype == np.float64
+        assert row[0].tolist() == [1.0, 2.0, 3.0]
+
+    def test_missing_and_none(self):
+        """Missing features take the default and None becomes NaN"""
+        builder = FeatureVectorBuilder(FEATURES)
+        row = builder.build({"flow_in": None, "pressure": 3.0})
+        assert np.isnan(row[0, 0])
+        assert row[0, 1] == 0.0
+        assert row[0, 2] == 3.0
+
+    def test_buffer_reused_per_thread(self):
+        """build() reuses one buffer per thread and never shares it across threads"""
+        builder = FeatureVectorBuilder(FEATURES)
+        first = builder.build({"flow_in": 1.0})
+        second = builder.build({"flow_in": 2.0})
+        assert first is second
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(builder.build({"flow_in": 3.0})))
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+        assert first[0, 0] == 2.0
+
+    def test_build_batch(self):
+        """build_batch returns a fresh array with one row per reading"""
+        builder = FeatureVectorBuilder(FEATURES)
+        readings = [{"flow_in": float(i), "flow_out": 1.0, "pressure": 2.0} for i in range(4)]
+        values = builder.build_batch(readings)
+        assert values.shape == (4, 3)
+        assert values[:, 0].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+class TestPredictArray:
+    """predict_array matches predict for every model"""
+
+    @pytest.mark.parametrize("approach", ["zscore", "iqr", "isolation_forest", "ensemble"])
+    def test_anomaly_detector(self, approach):
+        """Anomaly predictions and probabilities are unchanged"""
+        X = make_readings()
+        detector = AnomalyDetector(approach=approach).fit(X)
+        expected = detector.predict(X)
+        result = detector.predict_array(X[FEATURES].to_numpy())
+        np.testing.assert_array_equal(result.predictions, expected.predictions)
+        np.testing.assert_allclose(result.probabilities, expected.probabilities)
+
+    @pytest.mark.parametrize("model", [StreamingZScoreDetector, StreamingIQRDetector])
+    def test_streaming_detector(self, model):
+        """Streaming detectors score arrays like DataFrames"""
+        X = make_readings()
+        detector = model().fit(X)
+        expected = detector.predict(X)
+        result = detector.predict_array(X.to_numpy())
+        np.testing.assert_array_equal(result.predictions, expected.predictions)
+
+    @pytest.mark.parametrize("approach", ["decision_tree", "random_forest", "xgboost"])
+    def test_classifier(self, approach):
+        """Classifier labels and probabilities are unchanged"""
+        X = make_readings()
+        y = pd.Series((X["flow_in"] - X["flow_out"] > 15).astype(int))
+        classifier = WaterLossClassifier(approach=approach).fit(X, y)
+        expected = classifier.predict(X.head(50))
+        result = classifier.predict_array(X.head(50).to_numpy())
+        np.testing.assert_array_equal(result.predictions, expected.predictions)
+        np.testing.assert_allclose(result.probabilities, expected.probabilities)
+        assert result.details["loss_types"] == expected.details["loss_types"]
+
+    @pytest.mark.parametrize("approach", ["kmeans", "hybrid"])
+    def test_pattern_recognizer(self, approach):
+        """Pattern labels are unchanged"""
+        X = make_readings()
+        recognizer = PatternRecognizer(approach=approach).fit(X)
+        expected = recognizer.predict(X)
+        result = recognizer.predict_array(X.to_numpy())
+        np.testing.assert_array_equal(result.predictions, expected.predictions)
+        assert result.details["pattern_labels"] == expected.details["pattern_labels"]
+
+    def test_wrong_width_rejected(self):
+        """Arrays with the wrong number of columns raise ValueError"""
+        detector = AnomalyDetector(approach="zscore").fit(make_readings())
+        with pytest.raises(ValueError, match="Expected 3 features"):
+            detector.predict_array(np.zeros((2, 4)))
+
+
+class TestSingleReading:
+    """Single-reading paths agree with batch scoring"""
+
+    def test_detect_single_matches_batch(self):
+        """detect_single gives the same result as the row inside a batch"""
+        X = make_readings()
+        detector = AnomalyDetector(approach="zscore").fit(X)
+        readings = X.head(10).to_dict("records")
+        batch = detector.detect_batch(readings)
+        for reading, expected in zip(readings, batch):
+            single = detector.detect_single(reading)
+            assert single["is_anomaly"] == expected["is_anomaly"]
+            assert single["probability"] == pytest.approx(expected["probability"])
+
+    def test_classify_single_uses_cached_importance(self):
+        """classify_single reports the top features computed at fit"""
+        X = make_readings()
+        y = pd.Series((X["flow_in"] - X["flow_out"] > 15).astype(int))
+        classifier = WaterLossClassifier(approach="decision_tree").fit(X, y)
+        result = classifier.classify_single({"flow_in": 120.0, "flow_out": 80.0})
+        assert result["loss_type"] in {"physical", "commercial"}
+        assert result["feature_importance"] == classifier.top_features
@@ -0,0 +1,147 @@
+"""
+Tests for the per-DMA model fleet
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.fleet import ModelFleet
+
+
+def make_readings(dma_ids: list[str], hours: int = 48, start: str = "2026-01-01") -> pd.DataFrame:
+    """Hourly readings with a different baseline flow per DMA."""
+    rng = np.random.default_rng(3)
+    frames = []
+    for i, dma_id in enumerate(dma_ids):
+        flow_in = rng.normal(500 * (i + 1), 20, hours)
+        flow_out = flow_in * 0.85
+        frames.append(pd.DataFrame({
+            "dma_id": dma_id,
+            "timestamp": pd.date_range(start, periods=hours, freq="h"),
+            "flow_in": flow_in,
+            "flow_out": flow_out,
+            "pressure": rng.normal(3.5, 0.1, hours),
+            "loss_percentage": 15.0,
+            "loss_volume": flow_in - flow_out,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def fleet(tmp_path) -> ModelFleet:
+    """Fleet with cheap Z-Score detectors."""
+    return ModelFleet(
+        str(tmp_path),
+        detector_kwargs={"approach": "zscore"},
+        max_workers=2,
+        max_loaded=2,
+    )
+
+
+class TestModelFleet:
+    """Test fleet training, incremental retraining and the LRU"""
+
+    def test_trains_one_member_per_dma(self, fleet):
+        """Each DMA gets its own detector calibrated to its baseline"""
+        trained = fleet.train(make_readings(["DMA-A", "DMA-B"]))
+
+        assert set(trained) == {"DMA-A", "DMA-B"}
+        reading = {"flow_in": 500, "flow_out": 425, "pressure": 3.5, "loss_percentage": 15.0}
+        assert fleet.detect_anomaly("DMA-A", reading)["is_anomaly"] is False
+        assert fleet.detect_anomaly("DMA-B", reading)["is_anomaly"] is True
+        assert len(fleet.forecast("DMA-A", 3)["predictions"]) == 3
+
+    def test_retrain_only_touches_new_data(self, fleet):
+        """Only DMAs whose watermark moved are retrained, on their full window"""
+        fleet.train(make_readings(["DMA-A", "DMA-B"]))
+
+        extended = make_readings(["DMA-A"], hours=96)
+        unchanged = make_readings(["DMA-B"])
+        trained = fleet.train(pd.concat([extended, unchanged]))
+
+        assert set(trained) == {"DMA-A"}
+        assert trained["DMA-A"]["n_rows"] == 96
+
+    def test_new_batch_alone_does_not_replace_history(self, fleet):
+        """Readings that skip the previously trained window leave the member as it was"""
+        fleet.train(make_readings(["DMA-A"]))
+        before = fleet.index["DMA-A"]["version"]
+
+        trained = fleet.train(make_readings(["DMA-A"], start="2026-01-03"))
+
+        assert trained == {}
+        assert fleet.index["DMA-A"]["version"] == before
+
+    def test_cluster_retrained_on_every_member(self, tmp_path):
+        """New data for one DMA of a cluster refits the shared model on all its DMAs"""
+        fleet = ModelFleet(
+            str(tmp_path),
+            detector_kwargs={"approach": "zscore"},
+            groups={"DMA-A": "cluster-1", "DMA-B": "cluster-1"},
+            max_workers=1,
+        )
+        fleet.train(make_readings(["DMA-A", "DMA-B"]))
+        reading_b = {"flow_in": 1000, "flow_out": 850, "pressure": 3.5, "loss_percentage": 15.0}
+        assert fleet.detect_anomaly("DMA-B", reading_b)["is_anomaly"] is False
+
+        assert fleet.train(make_readings(["DMA-A"], start="2026-01-03")) == {}
+
+        history = make_readings(["DMA-A", "DMA-B"])
+        newer_a = make_readings(["DMA-A"], start="2026-01-03")
+        trained = fleet.train(pd.concat([history, newer_a]))
+
+        assert trained["cluster-1"]["n_rows"] == 144
+        assert fleet.detect_anomaly("DMA-B", reading_b)["is_anomaly"] is False
+
+    def test_failed_member_does_not_abort_run(self, tmp_path, monkeypatch):
+        """A member that fails to train is skipped; the rest are saved and indexed"""
+        from ai.inference import fleet as fleet_module
+
+        train_member = fleet_module._train_fleet_member
+
+        def flaky(job):
+            if job["key"] == "DMA-B":
+                raise ValueError("bad data")
+            return train_member(job)
+
+        monkeypatch.setattr(fleet_module, "_train_fleet_member", flaky)
+        fleet = ModelFleet(str(tmp_path), detector_kwargs={"approach": "zscore"}, max_workers=1)
+        trained = fleet.train(make_readings(["DMA-A", "DMA-B", "DMA-C"]))
+
+        assert set(trained) == {"DMA-A", "DMA-C"}
+        reopened = ModelFleet(str(tmp_path), detector_kwargs={"approach": "zscore"})
+        assert set(reopened.index) == {"DMA-A", "DMA-C"}
+        assert not (tmp_path / "fleet" / "DMA-B").exists()
+
+    def test_groups_share_models(self, tmp_path):
+        """DMAs mapped to the same cluster share one fleet member"""
+        fleet = ModelFleet(
+            str(tmp_path),
+            detector_kwargs={"approach": "zscore"},
+            groups={"DMA-A": "cluster-1", "DMA-B": "cluster-1"},
+            max_workers=1,
+        )
+        trained = fleet.train(make_readings(["DMA-A", "DMA-B"]))
+
+        assert set(trained) == {"cluster-1"}
+        assert fleet.get_detector("DMA-A") is fleet.get_detector("DMA-B")
+
+    def test_lru_bounds_loaded_models(self, fleet):
+        """No more than max_loaded models stay in memory"""
+        fleet.train(make_readings(["DMA-A", "DMA-B", "DMA-C"]))
+
+        for dma_id in ["DMA-A", "DMA-B", "DMA-C"]:
+            fleet.get_detector(dma_id)
+
+        stats = fleet.get_stats()
+        assert stats["loaded"] == 2
+        assert stats["evictions"] == 1
+
+    def test_index_persists(self, fleet, tmp_path):
+        """A new fleet instance sees previously trained members"""
+        fleet.train(make_readings(["DMA-A"]))
+
+        reopened = ModelFleet(str(tmp_path), detector_kwargs={"approach": "zscore"})
+        assert reopened.get_detector("DMA-A") is not None
+        assert reopened.get_detector("DMA-Z") is None
@@ -0,0 +1,113 @@
+"""
+Tests for the per-DMA forecast job runner
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.forecast_jobs import ForecastJobRunner
+from ai.inference.model_service import AIModelService
+
+
+def make_readings(dma_ids: list[str], days: int = 30, start: str = "2026-01-01") -> pd.DataFrame:
+    """Hourly loss readings with a different level per DMA."""
+    rng = np.random.default_rng(7)
+    hours = days * 24
+    frames = []
+    for i, dma_id in enumerate(dma_ids):
+        frames.append(pd.DataFrame({
+            "dma_id": dma_id,
+            "timestamp": pd.date_range(start, periods=hours, freq="h"),
+            "loss_volume": rng.normal(10 * (i + 1), 1, hours),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def runner(tmp_path) -> ForecastJobRunner:
+    """Runner with a short horizon and two worker processes."""
+    return ForecastJobRunner(str(tmp_path), horizon=14, max_workers=2)
+
+
+class TestForecastJobRunner:
+    """Test per-DMA fitting, warm starts and the forecast cache"""
+
+    def test_fits_one_forecaster_per_dma(self, runner):
+        """Each DMA gets a daily forecast at its own level"""
+        fitted = runner.run(make_readings(["DMA-A", "DMA-B"]))
+
+        assert set(fitted) == {"DMA-A", "DMA-B"}
+        a = runner.get_forecast("DMA-A", 7)
+        b = runner.get_forecast("DMA-B", 7)
+        assert len(a["predictions"]) == 7
+        assert a["dates"][0] == "2026-01-31"
+        # Daily totals of ~10/h and ~20/h readings
+        assert np.mean(a["predictions"]) == pytest.approx(240, rel=0.1)
+        assert np.mean(b["predictions"]) == pytest.approx(480, rel=0.1)
+
+    def test_serves_from_cache(self, runner):
+        """Shorter horizons are sliced from the cached forecast"""
+        runner.run(make_readings(["DMA-A"]))
+        full = runner.get_forecast("DMA-A", 14)
+        short = runner.get_forecast("DMA-A", 5)
+
+        assert short["predictions"] == full["predictions"][:5]
+        assert runner.get_stats()["hits"] == 2
+        assert runner.get_stats()["misses"] == 0
+
+    def test_longer_horizon_uses_saved_model(self, runner):
+        """A horizon beyond the cache is predicted once, not refitted"""
+        runner.run(make_readings(["DMA-A"]))
+        fits = runner.get_stats()["fits"]
+
+        long = runner.get_forecast("DMA-A", 21)
+        again = runner.get_forecast("DMA-A", 21)
+
+        assert len(long["predictions"]) == 21
+        assert again == long
+        stats = runner.get_stats()
+        assert stats["fits"] == fits
+        assert stats["misses"] == 1
+
+    def test_rerun_skips_unchanged_and_warm_starts(self, runner):
+        """Only DMAs with new data refit, starting from the previous fit"""
+        runner.run(make_readings(["DMA-A", "DMA-B"]))
+        before = runner.get_forecast("DMA-A", 7)
+
+        newer = make_readings(["DMA-A"], start="2026-01-02")
+        unchanged = make_readings(["DMA-B"])
+        fitted = runner.run(pd.concat([newer, unchanged]))
+
+        assert set(fitted) == {"DMA-A"}
+        assert runner.get_forecast("DMA-A", 7)["dates"][0] == "2026-02-01"
+        assert before["dates"][0] == "2026-01-31"
+        # Warm starts only apply to real Prophet fits
+        if runner.index["DMA-A"]["warm_start"] is not None:
+            assert fitted["DMA-A"]["warm_started"]
+
+    def test_index_survives_restart(self, runner, tmp_path):
+        """A new runner serves the persisted models without refitting"""
+        runner.run(make_readings(["DMA-A"]))
+        expected = runner.get_forecast("DMA-A", 7)
+
+        restarted = ForecastJobRunner(str(tmp_path), horizon=14)
+        assert restarted.get_forecast("DMA-A", 7)["predictions"] == pytest.approx(expected["predictions"])
+        assert restarted.get_stats()["fits"] == 0
+
+    def test_unknown_dma(self, runner):
+        """Unfitted DMAs return an error dict"""
+        assert "error" in runner.get_forecast("DMA-X", 7)
+
+
+class TestServiceForecastCache:
+    """AIModelService serves per-DMA forecasts from the job cache"""
+
+    def test_forecast_by_dma(self, tmp_path):
+        """forecast(dma_id=...) reads the cache once the job has run"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.run_forecast_jobs(make_readings(["DMA-A"]))
+
+        result = service.forecast(7, dma_id="DMA-A")
+        assert len(result["predictions"]) == 7
+        assert service.forecast_jobs.get_stats()["hits"] == 1
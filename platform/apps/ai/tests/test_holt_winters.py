@@ -0,0 +1,193 @@
+"""
+Tests for the vectorized Holt-Winters engine
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.timeseries import BatchHoltWintersForecaster, holt_winters_grid_search
+from ai.models.timeseries.baseline import ExponentialSmoothingForecaster
+from ai.models.timeseries.holt_winters import holt_winters_filter, holt_winters_forecast
+
+
+def reference_filter(values, alpha, beta, gamma, trend, m):
+    """Scalar component-form Holt-Winters with the engine's initialization"""
+    if m:
+        level = values[:m].mean()
+        seasonals = list(values[:m] - level)
+        slope = (values[m:2 * m].mean() - level) / m if trend and len(values) >= 2 * m else 0.0
+        start = 0
+    else:
+        level, seasonals = values[0], []
+        slope = values[1] - values[0] if trend else 0.0
+        start = 1
+    sse = 0.0
+    for t in range(start, len(values)):
+        season = seasonals[t % m] if m else 0.0
+        sse += (values[t] - (level + slope + season)) ** 2
+        old_level = level
+        level = alpha * (values[t] - season) + (1 - alpha) * (level + slope)
+        if trend:
+            slope = beta * (level - old_level) + (1 - beta) * slope
+        if m:
+            seasonals[t % m] = gamma * (values[t] - level) + (1 - gamma) * season
+    return level, slope, seasonals, sse
+
+
+def make_series(n_series: int = 20, n_steps: int = 120, seed: int = 0) -> np.ndarray:
+    """Weekly-seasonal series with random trend and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_steps)
+    base = rng.uniform(50, 150, (n_series, 1))
+    slope = rng.normal(0, 0.2, (n_series, 1))
+    amplitude = rng.uniform(0, 20, (n_series, 1))
+    noise = rng.normal(0, 2, (n_series, n_steps))
+    return base + slope * t + amplitude * np.sin(2 * np.pi * t / 7) + noise
+
+
+class TestHoltWintersFilter:
+    """Vectorized recursion matches the scalar one"""
+
+    @pytest.mark.parametrize("trend", [False, True])
+    @pytest.mark.parametrize("m", [None, 7])
+    def test_matches_reference(self, trend, m):
+        """Final level, trend, seasonals and SSE agree for every series"""
+        values = make_series(n_series=5)
+        state = holt_winters_filter(values, 0.3, 0.2, 0.15, trend=trend, seasonal_periods=m)
+        for i, series in enumerate(values):
+            level, slope, seasonals, sse = reference_filter(series, 0.3, 0.2, 0.15, trend, m)
+            assert state.level[i] == pytest.approx(level)
+            assert state.trend[i] == pytest.approx(slope)
+            assert state.sse[i] == pytest.approx(sse)
+            if m:
+                np.testing.assert_allclose(state.seasonals[i], seasonals)
+
+    def test_parameter_lanes(self):
+        """A (n_params, 1) alpha filters every parameter set for every series"""
+        values = make_series(n_series=4)
+        alphas = np.array([0.1, 0.5, 0.9])
+        state = holt_winters_filter(values, alphas[:, None], seasonal_periods=7)
+        assert state.level.shape == (3, 4)
+        for j, alpha in enumerate(alphas):
+            single = holt_winters_filter(values, alpha, seasonal_periods=7)
+            np.testing.assert_allclose(state.level[j], single.level)
+
+    def test_missing_values_carry_forecast(self):
+        """NaN observations add no error and keep the state moving"""
+        values = make_series(n_series=1)
+        gappy = values.copy()
+        gappy[0, 50:55] = np.nan
+        state = holt_winters_filter(gappy, 0.3, seasonal_periods=7)
+        assert np.isfinite(state.level).all()
+        assert state.n_obs[0] == values.shape[1] - 5
+
+    @pytest.mark.parametrize("m", [None, 7])
+    def test_leading_gap_matches_trimmed_series(self, m):
+        """A series that starts late filters like the same series without the gap"""
+        values = make_series(n_series=2)
+        padded = np.vstack([values[0], np.r_[np.full(10, np.nan), values[1, :-10]]])
+        trimmed = values[1:, :-10]
+
+        state = holt_winters_filter(padded, 0.3, 0.1, 0.2, trend=True, seasonal_periods=m)
+        reference = holt_winters_filter(trimmed, 0.3, 0.1, 0.2, trend=True, seasonal_periods=m)
+
+        assert np.isfinite(state.sse).all()
+        assert state.n_obs[1] == reference.n_obs[0]
+        np.testing.assert_allclose(state.sse[1], reference.sse[0])
+        np.testing.assert_allclose(holt_winters_forecast(state, 14)[1], holt_winters_forecast(reference, 14)[0])
+
+    def test_seasonal_forecast_phase(self):
+        """Forecasts continue the seasonal cycle after the last observation"""
+        t = np.arange(70)
+        values = (100 + 10 * np.sin(2 * np.pi * t / 7)).reshape(1, -1)
+        state = holt_winters_filter(values, 0.2, gamma=0.3, seasonal_periods=7)
+        forecast = holt_winters_forecast(state, 14)
+        expected = 100 + 10 * np.sin(2 * np.pi * np.arange(70, 84) / 7)
+        np.testing.assert_allclose(forecast[0], expected, atol=0.5)
+
+
+class TestGridSearch:
+    """Per-series parameter selection"""
+
+    def test_matches_brute_force(self):
+        """The chosen parameters minimize each series' one-step RMSE"""
+        values = make_series(n_series=6)
+        alphas, gammas = (0.1, 0.3, 0.6), (0.05, 0.2)
+        fitted = holt_winters_grid_search(
+            values, alphas=alphas, gammas=gammas, seasonal_periods=7, chunk_size=4,
+        )
+        for i, series in enumerate(values):
+            errors = {
+                (a, g): reference_filter(series, a, 0.1, g, False, 7)[3]
+                for a in alphas for g in gammas
+            }
+            best = min(errors, key=errors.get)
+            assert (fitted["alpha"][i], fitted["gamma"][i]) == best
+            assert fitted["rmse"][i] == pytest.approx(np.sqrt(errors[best] / series.size))
+
+    def test_best_state_forecasts(self):
+        """The returned state is the one for the chosen parameters"""
+        values = make_series(n_series=3)
+        fitted = holt_winters_grid_search(values, alphas=(0.2, 0.7), trend=True, betas=(0.05, 0.3))
+        for i in range(3):
+            single = holt_winters_filter(
+                values[i], fitted["alpha"][i], fitted["beta"][i], trend=True,
+            )
+            assert fitted["state"].level[i] == pytest.approx(single.level[0])
+
+
+class TestBatchHoltWintersForecaster:
+    """Wide-frame forecaster for many DMAs"""
+
+    def test_fit_predict_wide_frame(self):
+        """One forecast row per DMA column"""
+        values = make_series(n_series=8)
+        X = pd.DataFrame(values.T, columns=[f"DMA-{i}" for i in range(8)])
+        model = BatchHoltWintersForecaster(seasonal=True, optimize=True).fit(X)
+        result = model.predict(pd.DataFrame({"periods": [14]}))
+        assert result.predictions.shape == (8, 14)
+        assert result.details["series"] == list(X.columns)
+        assert set(model.params_) == {"alpha", "beta", "gamma"}
+
+    def test_single_series_forecaster_agrees(self):
+        """ExponentialSmoothingForecaster gives the same forecast for one series"""
+        values = make_series(n_series=1)[0]
+        single = ExponentialSmoothingForecaster(alpha=0.4, trend=True, seasonal=True)
+        single.fit(pd.DataFrame({"value": values}))
+        batch = BatchHoltWintersForecaster(alpha=0.4, trend=True, seasonal=True)
+        batch.fit(pd.DataFrame({"value": values}))
+        periods = pd.DataFrame({"periods": [10]})
+        np.testing.assert_allclose(single.predict(periods).predictions, batch.predict(periods).predictions[0])
+
+    def test_evaluate(self):
+        """Evaluation compares forecasts with held-out wide actuals"""
+        values = make_series(n_series=5, n_steps=140)
+        X = pd.DataFrame(values.T)
+        model = BatchHoltWintersForecaster(seasonal=True).fit(X.iloc[:126])
+        metrics = model.evaluate(X.iloc[126:].rename(columns=str))
+        assert metrics.mae is not None and metrics.mae < 20
+
+
+@pytest.mark.slow
+class TestHoltWintersBenchmark:
+    """Network-wide nightly refit"""
+
+    def test_grid_search_speed(self):
+        """2,000 DMAs × 1 year × 90 parameter sets in seconds"""
+        values = make_series(n_series=2_000, n_steps=365)
+        start = time.perf_counter()
+        fitted = holt_winters_grid_search(
+            values,
+            alphas=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9),
+            betas=(0.01, 0.05, 0.1, 0.2, 0.3),
+            gammas=(0.05, 0.3),
+            trend=True,
+            seasonal_periods=7,
+        )
+        elapsed = time.perf_counter() - start
+        print(f"\ngrid search: {elapsed:.2f}s")
+        assert fitted["alpha"].shape == (2_000,)
+        assert elapsed < 30
@@ -0,0 +1,199 @@
+"""
+Tests for the incremental mini-batch K-Means pattern recognizer
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ai.inference.model_service import AIModelService
+from ai.models.pattern import MiniBatchKMeansRecognizer, PatternRecognizer
+
+CENTERS = np.array([[500.0, 3.0], [1000.0, 3.5], [1500.0, 2.5]])
+
+
+def make_blobs(n: int = 600, seed: int = 0, shift: float = 0.0) -> pd.DataFrame:
+    """Three well-separated usage clusters, optionally shifted in flow"""
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 3, n)
+    values = CENTERS[labels] + rng.normal(0, [20.0, 0.05], (n, 2))
+    values[:, 0] += shift
+    return pd.DataFrame(values, columns=["flow_in", "pressure"])
+
+
+def cluster_of(model: MiniBatchKMeansRecognizer, flow: float, pressure: float) -> int:
+    """Cluster id assigned to a single point"""
+    return int(model.predict_array(np.array([[flow, pressure]])).predictions[0])
+
+
+class TestMiniBatchKMeansRecognizer:
+    """partial_fit, drift tracking and id-stable refits"""
+
+    def test_partial_fit_updates_model_and_reservoir(self):
+        """Batches move the centroids and are sampled into the reservoir"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3, reservoir_size=1000).fit(make_blobs())
+        before = model.cluster_centers_.copy()
+
+        model.partial_fit(make_blobs(n=400, seed=1, shift=30.0))
+
+        assert model.n_seen_ == 1000
+        assert model.n_batches_ == 1
+        assert not np.allclose(model.cluster_centers_, before)
+        assert np.isfinite(model.reservoir_).all()
+
+    def test_reservoir_is_bounded(self):
+        """The reservoir keeps at most reservoir_size rows"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3, reservoir_size=200).fit(make_blobs())
+        for seed in range(5):
+            model.partial_fit(make_blobs(n=300, seed=seed))
+
+        assert model.reservoir_.shape == (200, 2)
+        assert model.n_seen_ == 2100
+
+    def test_drift_triggers_refit(self):
+        """A shifted stream raises drift past the threshold"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3, drift_threshold=0.2).fit(make_blobs())
+        assert not model.needs_refit
+
+        for seed in range(10):
+            model.partial_fit(make_blobs(n=500, seed=seed, shift=150.0))
+
+        stats = model.get_drift_stats()
+        assert stats["max_drift"] > 0.2
+        assert model.needs_refit
+
+    def test_batch_count_triggers_refit(self):
+        """needs_refit turns true after refit_every batches"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3, refit_every=2, drift_threshold=100.0)
+        model.fit(make_blobs())
+        model.partial_fit(make_blobs(n=50, seed=1))
+        assert not model.needs_refit
+        model.partial_fit(make_blobs(n=50, seed=2))
+        assert model.needs_refit
+
+    def test_refit_keeps_cluster_ids(self):
+        """A refit on reordered, shifted data keeps each cluster's id"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(make_blobs())
+        ids = [cluster_of(model, *center) for center in CENTERS]
+        labels = list(model.cluster_labels_)
+
+        shuffled = make_blobs(seed=5, shift=40.0).sample(frac=1.0, random_state=3)
+        model.refit(shuffled)
+
+        assert [cluster_of(model, *center) for center in CENTERS] == ids
+        assert model.cluster_labels_ == labels
+        assert model.n_refits_ == 1
+        assert model.batches_since_refit_ == 0
+        assert model.get_drift_stats()["max_drift"] == 0.0
+
+    def test_background_refit(self):
+        """start_refit runs a refit on the reservoir off the caller's thread"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(make_blobs())
+        ids = [cluster_of(model, *center) for center in CENTERS]
+
+        thread = model.start_refit()
+        assert isinstance(thread, threading.Thread)
+        thread.join(timeout=30)
+
+        assert model.n_refits_ == 1
+        assert [cluster_of(model, *center) for center in CENTERS] == ids
+
+    def test_predict_during_partial_fit(self):
+        """Predictions stay valid while another thread folds in batches"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(make_blobs())
+        new = make_blobs(n=50, seed=9).to_numpy()
+
+        def update():
+            for seed in range(20):
+                model.partial_fit(make_blobs(n=200, seed=seed))
+
+        thread = threading.Thread(target=update)
+        thread.start()
+        while thread.is_alive():
+            predictions = model.predict_array(new).predictions
+            assert predictions.min() >= 0 and predictions.max() < 3
+        thread.join()
+
+    def test_confidence_independent_of_batch(self):
+        """A reading's confidence does not depend on the other rows scored with it"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(make_blobs())
+        batch = make_blobs(n=50, seed=4).to_numpy().copy()
+        batch[10] = [5000.0, 0.5]
+
+        alone = model.predict_array(batch[:1]).probabilities[0]
+        together = model.predict_array(batch).probabilities
+        assert together[0] == alone
+        assert together[0] > 0
+        assert together[10] == 0.0
+
+    def test_concurrent_partial_fits_are_not_lost(self):
+        """Batches folded in from several threads all reach the model"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(make_blobs())
+        steps = model.model.n_steps_
+        batches = [make_blobs(n=200, seed=seed).to_numpy() for seed in range(16)]
+
+        threads = [threading.Thread(target=model.partial_fit_array, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert model.n_batches_ == 16
+        assert model.model.n_steps_ == steps + 16
+        assert model.n_seen_ == 600 + 16 * 200
+
+    def test_refit_during_partial_fit(self):
+        """Background refits read the reservoir consistently while batches stream in"""
+        model = MiniBatchKMeansRecognizer(n_clusters=3, reservoir_size=500).fit(make_blobs())
+        ids = [cluster_of(model, *center) for center in CENTERS]
+
+        for seed in range(10):
+            thread = model.start_refit()
+            model.partial_fit(make_blobs(n=300, seed=seed))
+            thread.join(timeout=30)
+
+        assert model.n_refits_ == 10
+        assert [cluster_of(model, *center) for center in CENTERS] == ids
+
+    def test_save_load_roundtrip(self, tmp_path):
+        """A loaded model predicts identically and keeps streaming"""
+        X = make_blobs()
+        model = MiniBatchKMeansRecognizer(n_clusters=3).fit(X)
+        model.partial_fit(make_blobs(n=200, seed=1))
+        model.save(str(tmp_path / "minibatch"))
+        loaded = MiniBatchKMeansRecognizer().load(str(tmp_path / "minibatch"))
+
+        np.testing.assert_array_equal(loaded.predict(X).predictions, model.predict(X).predictions)
+        np.testing.assert_array_equal(loaded.predict(X).probabilities, model.predict(X).probabilities)
+        loaded.partial_fit(make_blobs(n=200, seed=2))
+        loaded.refit()
+        assert loaded.n_refits_ == 1
+
+
+class TestPatternRecognizerMiniBatch:
+    """The minibatch approach and the service's ingest hook"""
+
+    def test_partial_fit_keeps_pattern_labels(self):
+        """Pattern labels for the same points survive updates and refits"""
+        recognizer = PatternRecognizer(approach="minibatch", n_clusters=3)
+        recognizer.partial_fit(make_blobs())
+        points = pd.DataFrame(CENTERS, columns=["flow_in", "pressure"])
+        labels = recognizer.predict(points).details["pattern_labels"]
+
+        recognizer.partial_fit(make_blobs(n=300, seed=1, shift=20.0))
+        recognizer.recognizer.refit()
+
+        assert recognizer.predict(points).details["pattern_labels"] == labels
+
+    def test_ingest_readings_updates_pattern_model(self, tmp_path):
+        """ETL readings are folded into a minibatch pattern model"""
+        service = AIModelService(model_dir=str(tmp_path))
+        recognizer = PatternRecognizer(approach="minibatch", n_clusters=3).fit(make_blobs())
+        service.models["pattern"] = recognizer
+
+        readings = make_blobs(n=20, seed=2).assign(dma_id="DMA-A").to_dict("records")
+        service.ingest_readings(readings)
+
+        assert recognizer.recognizer.n_batches_ == 1
+        assert recognizer.recognizer.n_seen_ == 620
@@ -0,0 +1,99 @@
+"""
+Tests for the single-pass pattern summary
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.model_service import AIModelService
+from ai.models.pattern import PatternRecognizer
+
+
+def make_readings(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    """Flow readings with three usage levels"""
+    rng = np.random.default_rng(seed)
+    levels = rng.choice([500.0, 1000.0, 1500.0], n)
+    return pd.DataFrame({
+        "flow_in": levels + rng.normal(0, 20, n),
+        "flow_out": levels * 0.8 + rng.normal(0, 20, n),
+        "hour": rng.integers(0, 24, n).astype(float),
+        "day_of_week": rng.integers(0, 7, n).astype(float),
+    })
+
+
+def reference_summary(X: pd.DataFrame, patterns: list) -> pd.DataFrame:
+    """Per-pattern counts and means via a pandas groupby"""
+    grouped = X.assign(pattern=patterns).groupby("pattern")
+    means = grouped.mean().add_prefix("mean_")
+    return means.assign(count=grouped.size())
+
+
+@pytest.fixture(scope="module")
+def recognizer() -> PatternRecognizer:
+    """Fitted K-Means pattern recognizer"""
+    return PatternRecognizer(approach="kmeans", n_clusters=5).fit(make_readings())
+
+
+class TestPatternSummary:
+    """get_pattern_summary computes all patterns in one pass"""
+
+    def test_matches_groupby(self, recognizer):
+        """Counts, percentages and means agree with a pandas groupby"""
+        X = make_readings(seed=1)
+        summary = recognizer.get_pattern_summary(X).set_index("pattern")
+        patterns = recognizer.predict(X).details["pattern_labels"]
+        expected = reference_summary(X, patterns)
+
+        assert summary["count"].sum() == len(X)
+        assert summary["count"].is_monotonic_decreasing
+        for pattern, row in expected.iterrows():
+            assert summary.loc[pattern, "count"] == row["count"]
+            assert summary.loc[pattern, "percentage"] == round(row["count"] / len(X) * 100, 1)
+            for col in X.columns:
+                assert summary.loc[pattern, f"mean_{col}"] == pytest.approx(row[f"mean_{col}"])
+
+    def test_skips_missing_values(self, recognizer):
+        """Means ignore NaN like DataFrame.mean"""
+        X = make_readings(n=50, seed=2)
+        patterns = recognizer.predict(X).details["pattern_labels"]
+        X.loc[::3, "hour"] = np.nan
+
+        summary = recognizer.get_pattern_summary(X, result=recognizer.predict(X.fillna(0)))
+        expected = reference_summary(X, patterns)
+        for pattern, row in expected.iterrows():
+            actual = summary.set_index("pattern").loc[pattern, "mean_hour"]
+            assert actual == pytest.approx(row["mean_hour"], nan_ok=True)
+
+    def test_reuses_result(self, recognizer):
+        """A precomputed result skips inference"""
+        X = make_readings(n=50, seed=3)
+        result = recognizer.predict(X)
+        with patch.object(recognizer, "predict", wraps=recognizer.predict) as predict:
+            recognizer.get_pattern_summary(X, result=result)
+        predict.assert_not_called()
+
+    def test_rejects_mismatched_result(self, recognizer):
+        """A result for other rows is rejected"""
+        result = recognizer.predict(make_readings(n=10))
+        with pytest.raises(ValueError):
+            recognizer.get_pattern_summary(make_readings(n=20), result=result)
+
+
+class TestServiceRecognizePattern:
+    """AIModelService.recognize_pattern predicts once"""
+
+    def test_predicts_once(self, recognizer, tmp_path):
+        """Patterns and summary come from a single predict call"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.models["pattern"] = recognizer
+        X = make_readings(n=100, seed=4)
+
+        with patch.object(recognizer, "predict", wraps=recognizer.predict) as predict:
+            response = service.recognize_pattern(X)
+
+        assert predict.call_count == 1
+        assert len(response["patterns"]) == 100
+        assert sum(row["count"] for row in response["summary"]) == 100
@@ -0,0 +1,97 @@
+"""
+Tests for the versioned model registry and lazy loading
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.model_service import AIModelService
+from ai.models.anomaly import AnomalyDetector
+
+
+@pytest.fixture
+def anomaly_model() -> AnomalyDetector:
+    """Fitted Z-Score anomaly detector."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "flow_in": rng.normal(1000, 200, 100),
+        "flow_out": rng.normal(850, 180, 100),
+    })
+    return AnomalyDetector(approach="zscore").fit(df)
+
+
+class TestModelRegistry:
+    """Test publishing and loading model versions"""
+
+    def test_publish_and_load_latest(self, tmp_path, anomaly_model):
+        """Published models load back with identical predictions"""
+        service = AIModelService(model_dir=str(tmp_path))
+        first = service.registry.publish("anomaly", anomaly_model, version="v1")
+        second = service.registry.publish("anomaly", anomaly_model, version="v2")
+
+        assert service.registry.list_versions("anomaly") == [first, second]
+        assert service.registry.latest_version("anomaly") == "v2"
+
+        model, record = service.registry.load("anomaly")
+        reading = {"flow_in": 1000, "flow_out": 850}
+        assert model.detect_single(reading) == anomaly_model.detect_single(reading)
+        assert record.version == "v2"
+        assert record.size_bytes > 0
+        assert record.load_time_ms is not None
+
+    def test_duplicate_version_rejected(self, tmp_path, anomaly_model):
+        """A version can only be published once"""
+        service = AIModelService(model_dir=str(tmp_path))
+        service.registry.publish("anomaly", anomaly_model, version="v1")
+
+        with pytest.raises(ValueError):
+            service.registry.publish("anomaly", anomaly_model, version="v1")
+
+
+class TestLazyLoading:
+    """Test lazy model loading in AIModelService"""
+
+    def test_models_load_on_first_use(self, tmp_path, anomaly_model):
+        """Constructing the service loads nothing; the first call loads one model"""
+        AIModelService(model_dir=str(tmp_path)).registry.publish("anomaly", anomaly_model)
+
+        service = AIModelService(model_dir=str(tmp_path))
+        assert service.models == {}
+
+        result = service.detect_anomaly({"flow_in": 1000, "flow_out": 850})
+        assert "is_anomaly" in result
+        assert list(service.models) == ["anomaly"]
+
+        info = service.get_model_info()
+        assert info["anomaly"]["loaded"] is True
+        assert info["anomaly"]["load_time_ms"] is not None
+        assert info["classification"]["loaded"] is False
+
+    def test_missing_model_is_not_trained(self, tmp_path):
+        """Without a published artifact the service reports the model as not loaded"""
+        service = AIModelService(model_dir=str(tmp_path))
+
+        assert service.forecast(7) == {"error": "Time series model not loaded"}
+        assert "timeseries" not in service.models
+
+    def test_prewarm(self, tmp_path, anomaly_model):
+        """Background prewarm loads published models"""
+        AIModelService(model_dir=str(tmp_path)).registry.publish("anomaly", anomaly_model)
+        service = AIModelService(model_dir=str(tmp_path))
+
+        thread = service.prewarm(["anomaly"])
+        thread.join(timeout=10)
+
+        assert "anomaly" in service.models
+
+    def test_pinned_version(self, tmp_path, anomaly_model):
+        """model_versions pins a specific published version"""
+        registry = AIModelService(model_dir=str(tmp_path)).registry
+        registry.publish("anomaly", anomaly_model, version="v1")
+        registry.publish("anomaly", anomaly_model, version="v2")
+
+        service = AIModelService(model_dir=str(tmp_path), model_versions={"anomaly": "v1"})
+        service.get_model("anomaly")
+
+        assert service.records["anomaly"].version == "v1"
@@ -0,0 +1,239 @@
+"""
+Tests for the inference result cache
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.inference.model_service import AIModelService
+from ai.inference.result_cache import ResultCache, frame_fingerprint
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis get/set calls the cache makes"""
+
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self.fail = fail
+
+    def get(self, name):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[name] = value
+
+
+class TestResultCache:
+    """LRU, TTL, tiers and single-flight"""
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first"""
+        cache = ResultCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.metrics.evictions == 1
+
+    def test_ttl_expiry(self):
+        """Entries expire after their TTL"""
+        clock = FakeClock()
+        cache = ResultCache(ttl_seconds=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.metrics.expirations == 1
+
+    def test_make_key_ignores_param_order(self):
+        """Parameters hash the same regardless of order"""
+        first = ResultCache.make_key("forecast", "DMA-1", "v1", "2026-01-01T00:00:00", days=7, hours=24)
+        second = ResultCache.make_key("forecast", "DMA-1", "v1", "2026-01-01T00:00:00", hours=24, days=7)
+        assert first == second
+        assert first.startswith("forecast:DMA-1:v1:")
+        assert ResultCache.make_key("forecast", "DMA-1", "v2", days=7) != ResultCache.make_key("forecast", "DMA-1", "v1", days=7)
+
+    def test_single_flight(self):
+        """Concurrent misses for one key compute once"""
+        cache = ResultCache()
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(cache.get_or_compute, "key", compute) for _ in range(8)]
+            while cache.metrics.coalesced < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert len(calls) == 1
+        assert all(r == {"value": 42} for r in results)
+        assert cache.get_stats()["misses"] == 1
+
+    def test_errors_are_not_cached(self):
+        """Error results and exceptions are recomputed next time"""
+        cache = ResultCache()
+        assert cache.get_or_compute("key", lambda: {"error": "not loaded"}) == {"error": "not loaded"}
+        assert cache.get_or_compute("key", lambda: {"value": 1}) == {"value": 1}
+
+        def boom():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("other", boom)
+        assert cache.get_or_compute("other", lambda: 2) == 2
+
+    def test_redis_tier_shared(self):
+        """A second process-local cache is filled from Redis"""
+        redis = FakeRedis()
+        ResultCache(redis_client=redis).get_or_compute("key", lambda: {"values": np.arange(3)})
+
+        other = ResultCache(redis_client=redis)
+        assert other.get_or_compute("key", lambda: pytest.fail("recomputed")) == {"values": [0, 1, 2]}
+        assert other.metrics.redis_hits == 1
+
+    def test_redis_failure_degrades(self):
+        """Redis errors are counted and the value is still computed"""
+        cache = ResultCache(redis_client=FakeRedis(fail=True))
+        assert cache.get_or_compute("key", lambda: 1) == 1
+        assert cache.get_or_compute("key", lambda: 2) == 1
+        assert cache.metrics.redis_errors == 2
+
+    def test_frame_fingerprint(self):
+        """Equal frames share a fingerprint; any change alters it"""
+        frame = pd.DataFrame({"a": [1.0, 2.0], "b": [3, 4]})
+        assert frame_fingerprint(frame) == frame_fingerprint(frame.copy())
+        changed = frame.copy()
+        changed.loc[1, "a"] = 2.5
+        assert frame_fingerprint(changed) != frame_fingerprint(frame)
+        assert frame_fingerprint(frame.rename(columns={"b": "c"})) != frame_fingerprint(frame)
+
+
+@pytest.fixture(scope="module")
+def demo_models(tmp_path_factory):
+    """Demo models shared by the service tests"""
+    service = AIModelService(model_dir=str(tmp_path_factory.mktemp("models")))
+    service.initialize(use_demo_models=True)
+    return service.models
+
+
+def make_readings(hours: int, start: str = "2026-01-01") -> pd.DataFrame:
+    """Hourly raw readings for one DMA"""
+    rng = np.random.default_rng(0)
+    flow_in = rng.normal(1000, 50, hours)
+    return pd.DataFrame({
+        "dma_id": "DMA-A",
+        "timestamp": pd.date_range(start, periods=hours, freq="h"),
+        "flow_in": flow_in,
+        "flow_out": flow_in * 0.85,
+        "pressure": rng.normal(3.5, 0.1, hours),
+    })
+
+
+class TestServiceCaching:
+    """AIModelService results are cached by model version and watermark"""
+
+    def make_service(self, demo_models, tmp_path) -> AIModelService:
+        service = AIModelService(model_dir=str(tmp_path))
+        service.models = dict(demo_models)
+        return service
+
+    def test_forecast_cached_until_model_changes(self, demo_models, tmp_path):
+        """Repeated forecasts hit the cache; a new model misses"""
+        service = self.make_service(demo_models, tmp_path)
+        model = service.models["timeseries"]
+        with patch.object(model, "forecast_days", wraps=model.forecast_days) as forecast_days:
+            assert service.forecast(7) == service.forecast(7)
+            assert forecast_days.call_count == 1
+            service.forecast(14)
+            assert forecast_days.call_count == 2
+
+        service.models["timeseries"] = type(model)(approach="moving_average")
+        assert "error" in service.forecast(7)
+        assert service.get_cache_stats()["hits"] == 1
+
+    def test_patterns_follow_watermark(self, demo_models, tmp_path):
+        """DMA patterns are recomputed only when new readings arrive"""
+        service = self.make_service(demo_models, tmp_path)
+        readings = make_readings(48)
+        service.feature_store.update(readings.iloc[:24])
+
+        with patch.object(service, "_recognize_pattern", wraps=service._recognize_pattern) as recognize:
+            first = service.get_dma_patterns("DMA-A")
+            assert service.get_dma_patterns("DMA-A") is first
+            assert recognize.call_count == 1
+
+            service.feature_store.update(readings.iloc[24:])
+            service.get_dma_patterns("DMA-A")
+            assert recognize.call_count == 2
+
+    def test_analyze_with_data_keyed_by_content(self, demo_models, tmp_path):
+        """Explicit data is cached by its content hash"""
+        service = self.make_service(demo_models, tmp_path)
+        data = make_readings(24)
+        data["loss_percentage"] = 15.0
+
+        with patch.object(service, "_analyze", wraps=service._analyze) as analyze:
+            service.analyze_dma("DMA-A", data)
+            service.analyze_dma("DMA-A", data.copy())
+            assert analyze.call_count == 1
+
+            data.loc[0, "flow_in"] += 1
+            service.analyze_dma("DMA-A", data)
+            assert analyze.call_count == 2
+
+    def test_background_refit_moves_key(self, demo_models, tmp_path):
+        """Results cached before a minibatch refit are not served after it"""
+        from ai.models.pattern import PatternRecognizer
+
+        service = self.make_service(demo_models, tmp_path)
+        readings = make_readings(48)
+        service.feature_store.update(readings)
+        features = service.get_dma_features("DMA-A")
+        model = PatternRecognizer(approach="minibatch", n_clusters=3)
+        service.models["pattern"] = model.fit(features[demo_models["pattern"].feature_names])
+
+        with patch.object(service, "_recognize_pattern", wraps=service._recognize_pattern) as recognize:
+            service.get_dma_patterns("DMA-A")
+            service.get_dma_patterns("DMA-A")
+            assert recognize.call_count == 1
+
+            # Same object, new centroids, no explicit invalidation
+            model.start_refit().join()
+            service.get_dma_patterns("DMA-A")
+            assert recognize.call_count == 2
+
+    def test_unknown_dma_not_cached(self, demo_models, tmp_path):
+        """Errors for DMAs without readings are not cached"""
+        service = self.make_service(demo_models, tmp_path)
+        assert "error" in service.get_dma_patterns("DMA-X")
+        assert service.get_cache_stats()["entries"] == 0
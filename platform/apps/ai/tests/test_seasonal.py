@@ -0,0 +1,140 @@
+"""
+Tests for the seasonal (hour-of-week) anomaly baseline
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly import SeasonalBaselineDetector
+
+
+def make_history(dma_ids=("DMA-A", "DMA-B"), weeks: int = 4, start: str = "2026-01-05") -> pd.DataFrame:
+    """Hourly flow with a strong daily cycle: low at night, high by day"""
+    rng = np.random.default_rng(0)
+    hours = weeks * 168
+    timestamps = pd.date_range(start, periods=hours, freq="h")
+    daily = 400 + 300 * np.sin((timestamps.hour.to_numpy() - 6) / 24 * 2 * np.pi)
+    frames = []
+    for i, dma_id in enumerate(dma_ids):
+        frames.append(pd.DataFrame({
+            "dma_id": dma_id,
+            "timestamp": timestamps,
+            "flow_in": daily * (i + 1) + rng.normal(0, 10, hours),
+            "pressure": 3.5 + rng.normal(0, 0.05, hours),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def history() -> pd.DataFrame:
+    return make_history()
+
+
+class TestSeasonalBaselineDetector:
+    """Test per-DMA × hour-of-week baselines"""
+
+    def test_tables_are_per_cell(self, history):
+        """Each DMA × hour-of-week cell holds its own statistics"""
+        detector = SeasonalBaselineDetector().fit(history)
+
+        assert detector.count.shape == (2, 168, 2)
+        assert (detector.count == 4).all()
+        cell = history[
+            (history["dma_id"] == "DMA-A")
+            & (history["timestamp"].dt.dayofweek == 0)
+            & (history["timestamp"].dt.hour == 3)
+        ]
+        assert detector.mean[0, 3, 0] == pytest.approx(cell["flow_in"].mean())
+        assert detector.std[0, 3, 0] == pytest.approx(cell["flow_in"].std())
+
+    def test_night_flow_compared_with_night_history(self, history):
+        """Daytime-level flow at night is flagged; the same flow by day is not"""
+        detector = SeasonalBaselineDetector().fit(history)
+        day_level = history.loc[(history["dma_id"] == "DMA-A") & (history["timestamp"].dt.hour == 12), "flow_in"].mean()
+
+        readings = pd.DataFrame({
+            "dma_id": ["DMA-A", "DMA-A"],
+            "timestamp": pd.to_datetime(["2026-03-02 00:00", "2026-03-02 12:00"]),
+            "flow_in": [day_level, day_level],
+            "pressure": [3.5, 3.5],
+        })
+        result = detector.predict(readings)
+
+        assert result.predictions.tolist() == [1, 0]
+
+    def test_single_row_matches_batch(self, history):
+        """Scores do not depend on batch composition"""
+        detector = SeasonalBaselineDetector().fit(history)
+        sample = history.sample(20, random_state=1)
+
+        batch = detector.predict(sample).probabilities
+        single = [detector.predict(sample.iloc[[i]]).probabilities[0] for i in range(len(sample))]
+        np.testing.assert_allclose(batch, single)
+
+    def test_incremental_update_matches_refit(self, history):
+        """Merging rollups gives the same mean/std as fitting on everything"""
+        newer = make_history(weeks=2, start="2026-02-02")
+        incremental = SeasonalBaselineDetector().fit(history).update(newer)
+        refit = SeasonalBaselineDetector().fit(pd.concat([history, newer]))
+
+        np.testing.assert_allclose(incremental.count, refit.count)
+        np.testing.assert_allclose(incremental.mean, refit.mean)
+        np.testing.assert_allclose(incremental.std, refit.std)
+
+    def test_update_adds_new_dma(self, history):
+        """Rollups for an unseen DMA grow the tables"""
+        detector = SeasonalBaselineDetector(min_count=1).fit(history)
+        detector.update(make_history(dma_ids=("DMA-C",), weeks=1))
+
+        assert detector.count.shape[0] == 3
+        assert not np.isnan(detector.quantile_table[:, 2]).any()
+
+    def test_dma_added_by_update_scores_like_fit(self, history):
+        """A DMA first seen in update() gets the same quantiles and flag rate as one fitted"""
+        added = SeasonalBaselineDetector().fit(history[history["dma_id"] == "DMA-A"])
+        added.update(history[history["dma_id"] == "DMA-B"])
+        fitted = SeasonalBaselineDetector().fit(history)
+
+        np.testing.assert_allclose(added.quantile_table[:, 1], fitted.quantile_table[:, 1])
+        normal = make_history(weeks=1, start="2026-02-02")
+        normal = normal[normal["dma_id"] == "DMA-B"]
+        assert added.predict(normal).predictions.mean() == fitted.predict(normal).predictions.mean()
+
+    def test_streamed_cells_get_quantile_spread(self, history):
+        """Cells grown one row per update still get an IQR wide enough for normal readings"""
+        detector = SeasonalBaselineDetector().fit(history[history["dma_id"] == "DMA-A"])
+        streamed = history[history["dma_id"] == "DMA-B"]
+        for week in range(4):
+            detector.update(streamed.iloc[week * 168:(week + 1) * 168])
+        fitted = SeasonalBaselineDetector().fit(history)
+
+        normal = make_history(weeks=1, start="2026-02-02")
+        normal = normal[normal["dma_id"] == "DMA-B"]
+        rate = detector.predict(normal).predictions.mean()
+        assert rate <= fitted.predict(normal).predictions.mean() + 0.05
+
+    def test_all_missing_cell_keeps_state(self, history):
+        """New rows that are all NaN for a feature leave that feature's cell untouched"""
+        detector = SeasonalBaselineDetector().fit(history)
+        before = detector.mean.copy(), detector.m2.copy(), detector.count.copy()
+        newer = make_history(weeks=1, start="2026-02-02")
+        newer["pressure"] = np.nan
+        detector.update(newer)
+
+        assert np.isfinite(detector.mean).all() and np.isfinite(detector.m2).all()
+        np.testing.assert_array_equal(detector.mean[..., 1], before[0][..., 1])
+        np.testing.assert_array_equal(detector.count[..., 1], before[2][..., 1])
+        assert (detector.count[..., 0] == before[2][..., 0] + 1).all()
+
+    def test_unknown_dma_not_flagged(self, history):
+        """Rows without enough cell history are never flagged"""
+        detector = SeasonalBaselineDetector().fit(history)
+        reading = pd.DataFrame({
+            "dma_id": ["DMA-Z"], "timestamp": [pd.Timestamp("2026-03-02")],
+            "flow_in": [1e6], "pressure": [0.0],
+        })
+        result = detector.predict(reading)
+
+        assert result.predictions.tolist() == [0]
+        assert result.details["insufficient_history"] == [True]
@@ -0,0 +1,200 @@
+"""
+Tests for the streaming anomaly detectors
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai.models.anomaly import (
+    IQRDetector,
+    P2Quantile,
+    StreamingAnomalyMonitor,
+    StreamingIQRDetector,
+    StreamingZScoreDetector,
+    ZScoreDetector,
+)
+
+FEATURES = ["flow_in", "flow_out", "pressure", "loss_percentage"]
+
+
+def make_frame(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    """Normal operating readings"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "flow_in": rng.normal(1000, 50, n),
+        "flow_out": rng.normal(850, 40, n),
+        "pressure": rng.normal(3.5, 0.2, n),
+        "loss_percentage": rng.normal(15, 3, n),
+    })
+
+
+class TestP2Quantile:
+    """Test the P² quantile sketch"""
+
+    def test_exact_for_first_five(self):
+        """Up to five observations the quantile is exact"""
+        sketch = P2Quantile(0.5)
+        for x in [5, 1, 4, 2, 3]:
+            sketch.update(x)
+        assert sketch.value == 3.0
+
+    @pytest.mark.parametrize("p", [0.25, 0.5, 0.75])
+    def test_tracks_quantile(self, p):
+        """Estimate converges to the sample quantile"""
+        values = np.random.default_rng(1).normal(0, 1, 5000)
+        sketch = P2Quantile(p)
+        for x in values:
+            sketch.update(x)
+        assert sketch.value == pytest.approx(np.quantile(values, p), abs=0.05)
+
+
+class TestStreamingZScoreDetector:
+    """Test the online Z-Score detector"""
+
+    def test_matches_batch_detector_without_decay(self):
+        """Without decay the running stats equal the batch mean/std"""
+        X = make_frame()
+        streaming = StreamingZScoreDetector().fit(X)
+        batch = ZScoreDetector().fit(X)
+
+        np.testing.assert_allclose(streaming.mean, batch.means.values)
+        np.testing.assert_allclose(streaming.std, batch.stds.values)
+        np.testing.assert_array_equal(
+            streaming.predict(X).predictions, batch.predict(X).predictions
+        )
+
+    def test_decay_follows_level_shift(self):
+        """With a half-life the mean moves to the new operating level"""
+        detector = StreamingZScoreDetector(half_life=20)
+        detector.fit(make_frame(200))
+        shifted = make_frame(200, seed=1)
+        shifted["flow_in"] += 500
+        detector.partial_fit(shifted)
+
+        assert detector.mean[0] == pytest.approx(1500, abs=30)
+
+    def test_score_and_update(self):
+        """Warm-up readings are not flagged; spikes after warm-up are"""
+        detector = StreamingZScoreDetector(min_samples=50)
+        readings = make_frame(100).to_dict("records")
+        results = [detector.score_and_update(r) for r in readings]
+
+        assert all(r["warming_up"] for r in results[:50])
+        assert not any(r["is_anomaly"] for r in results[:50])
+
+        spike = dict(readings[0], flow_in=5000)
+        assert detector.score_and_update(spike)["is_anomaly"] is True
+        assert detector.n_seen == 101
+
+    def test_nan_reading_does_not_poison_state(self):
+        """A NaN feature is skipped, and later spikes are still flagged"""
+        detector = StreamingZScoreDetector(min_samples=20)
+        readings = make_frame(100).to_dict("records")
+        for reading in readings:
+            detector.score_and_update(reading)
+
+        detector.score_and_update(dict(readings[0], flow_in=float("nan")))
+        assert np.isfinite(detector.mean).all() and np.isfinite(detector.m2).all()
+        assert detector.counts.tolist() == [100, 101, 101, 101]
+
+        spike = dict(readings[0], flow_in=99999)
+        assert detector.score_and_update(spike)["is_anomaly"] is True
+
+    def test_none_value_is_missing(self):
+        """None and absent values are treated as missing, not as errors or zeros"""
+        detector = StreamingZScoreDetector().fit(make_frame())
+        mean = detector.mean.copy()
+
+        result = detector.score_and_update({"flow_in": None, "flow_out": 850, "pressure": 3.5})
+        assert result["is_anomaly"] is False
+        assert result["z_scores"]["flow_in"] == 0.0
+        assert detector.mean[0] == mean[0]
+        assert detector.mean[3] == mean[3]
+
+
+class TestStreamingIQRDetector:
+    """Test the online IQR detector"""
+
+    def test_bounds_close_to_batch(self):
+        """Sketch bounds approximate the batch IQR bounds"""
+        X = make_frame(2000)
+        streaming = StreamingIQRDetector().fit(X)
+        batch = IQRDetector().fit(X)
+
+        lower, upper = streaming.bounds()
+        np.testing.assert_allclose(lower, batch.lower_bound.values, rtol=0.02)
+        np.testing.assert_allclose(upper, batch.upper_bound.values, rtol=0.02)
+
+    def test_flags_outlier(self):
+        """An out-of-range reading is flagged after warm-up"""
+        detector = StreamingIQRDetector()
+        for reading in make_frame(100).to_dict("records"):
+            detector.score_and_update(reading)
+
+        result = detector.score_and_update({"flow_in": 1000, "flow_out": 850, "pressure": 0.5, "loss_percentage": 15})
+        assert result["is_anomaly"] is True
+
+    def test_missing_values_skipped(self):
+        """NaN and None values leave the sketches untouched"""
+        detector = StreamingIQRDetector().fit(make_frame())
+        lower, upper = detector.bounds()
+
+        result = detector.score_and_update({"flow_in": None, "flow_out": float("nan"), "pressure": 3.5, "loss_percentage": 15})
+        assert result["is_anomaly"] is False
+        new_lower, new_upper = detector.bounds()
+        assert np.isfinite(new_lower).all() and np.isfinite(new_upper).all()
+        assert new_lower[:2].tolist() == lower[:2].tolist()
+
+
+class TestStreamingProbabilities:
+    """Streaming probabilities are per row"""
+
+    @pytest.mark.parametrize("detector_class", [StreamingZScoreDetector, StreamingIQRDetector])
+    def test_score_independent_of_batch(self, detector_class):
+        """A row scores the same alone and inside a batch with outliers"""
+        detector = detector_class().fit(make_frame())
+        batch = make_frame(50, seed=1)
+        batch.loc[10, "pressure"] = 0.5
+
+        alone = detector.predict(batch.iloc[[0]]).probabilities[0]
+        together = detector.predict(batch).probabilities
+        assert together[0] == pytest.approx(alone)
+        assert together[10] > 0.99
+
+
+class TestStreamingAnomalyMonitor:
+    """Test per-DMA streaming detection"""
+
+    def test_keeps_separate_state_per_dma(self):
+        """Each DMA learns its own baseline"""
+        monitor = StreamingAnomalyMonitor(min_samples=20)
+        rows = []
+        for record in make_frame(100).to_dict("records"):
+            rows.append({"dma_id": "DMA-A", **record})
+            rows.append({"dma_id": "DMA-B", **record, "flow_in": record["flow_in"] * 3})
+        monitor.ingest_batch(rows)
+
+        reading = {"flow_in": 3000, "flow_out": 850, "pressure": 3.5, "loss_percentage": 15}
+        assert monitor.ingest("DMA-A", reading)["is_anomaly"] is True
+        assert monitor.ingest("DMA-B", reading)["is_anomaly"] is False
+        assert monitor.get_stats() == {"approach": "zscore", "dmas": 2, "readings": 202}
+
+    def test_batch_with_missing_values(self):
+        """Readings with None values do not fail the batch"""
+        monitor = StreamingAnomalyMonitor(min_samples=20)
+        rows = [{"dma_id": "DMA-A", **record} for record in make_frame(50).to_dict("records")]
+        rows[10]["pressure"] = None
+        results = monitor.ingest_batch(rows)
+
+        assert len(results) == 50
+        assert monitor.detectors["DMA-A"].counts.tolist() == [50, 50, 49, 50]
+
+    def test_state_round_trips_through_artifact(self, tmp_path):
+        """Saved detectors keep updating after a memory-mapped load"""
+        detector = StreamingZScoreDetector().fit(make_frame())
+        detector.save(str(tmp_path / "zscore"))
+
+        loaded = StreamingZScoreDetector().load(str(tmp_path / "zscore"))
+        loaded.score_and_update(dict(zip(FEATURES, [1000, 850, 3.5, 15])))
+        assert loaded.n_seen == detector.n_seen + 1
@@ -0,0 +1,29 @@
+"""Alert rule id
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rule that raised the alert; rule state (open/cooling down) is read from it
+    op.add_column('alerts', sa.Column('rule_id', sa.String(50), nullable=True))
+    op.create_index('ix_alerts_dma_id_rule_id', 'alerts', ['dma_id', 'rule_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_dma_id_rule_id', table_name='alerts')
+    op.drop_column('alerts', 'rule_id')
@@ -125,7 +125,7 @@ class MockAIService:
             }
         }
 
-    def forecast(self, days: int) -> Dict:
+    def forecast(self, days: int, dma_id: Optional[str] = None) -> Dict:
         import random
         base_loss = 150
         predictions = [base_loss + random.uniform(-20, 30) + i * 2 for i in range(days)]
@@ -169,6 +169,15 @@ class MockAIService:
             ],
         }
 
+    def get_dma_ranking(self, limit: Optional[int] = None) -> List[Dict]:
+        ranking = [
+            {"dma_id": "DMA-003", "is_anomaly": True, "anomaly_probability": 0.91,
+             "loss_type": "physical", "n_high_priority": 1, "n_recommendations": 2},
+            {"dma_id": "DMA-001", "is_anomaly": False, "anomaly_probability": 0.12,
+             "loss_type": "commercial", "n_high_priority": 0, "n_recommendations": 1},
+        ]
+        return ranking[:limit] if limit is not None else ranking
+
 
 # Create mock service instance
 ai_service = MockAIService()
@@ -245,14 +254,19 @@ async def classify_loss(reading: ReadingInput):
 
 
 @router.get("/forecast", response_model=ForecastResponse)
-async def get_forecast(days: int = Query(7, ge=1, le=30, description="Number of days to forecast")):
+async def get_forecast(
+    days: int = Query(7, ge=1, le=30, description="Number of days to forecast"),
+    dma_id: Optional[str] = Query(None, description="DMA to forecast (served from the nightly forecast cache)"),
+):
     """
     Forecast water loss for future days
 
-    Uses time series analysis to predict water loss trends.
+    Uses time series analysis to predict water loss trends. With a DMA,
+    the forecast comes from the nightly per-DMA job's cache rather than
+    a refit.
     """
     try:
-        result = ai_service.forecast(days)
+        result = ai_service.forecast(days, dma_id=dma_id)
 
         return ForecastResponse(
             dates=result["dates"],
@@ -266,6 +280,19 @@ async def get_forecast(days: int = Query(7, ge=1, le=30, description="Number of
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/analysis/ranking")
+async def get_dma_ranking(
+    limit: Optional[int] = Query(None, ge=1, description="Number of DMAs to return"),
+):
+    """DMAs ranked by risk from the scheduled batch analysis"""
+    return {
+        "success": True,
+        "data": ai_service.get_dma_ranking(limit),
+        "message": "Success",
+        "message_th": "สำเร็จ",
+    }
+
+
 @router.get("/analyze/{dma_id}", response_model=AnalysisResponse)
 async def analyze_dma(dma_id: str):
     """
@@ -273,7 +300,8 @@ async def analyze_dma(dma_id: str):
 
     Combines anomaly detection, pattern recognition, classification,
     and forecasting to provide a complete analysis of water loss
-    for a specific DMA.
+    for a specific DMA. Served from the DMA's batch analysis snapshot;
+    it is recomputed only when the DMA has newer readings.
     """
     try:
         result = ai_service.analyze_dma(dma_id)
@@ -0,0 +1,406 @@
+"""
+Alert Rules Engine
+Set-wise alert evaluation over each committed reading batch
+TOR Reference: Section 4.6
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+import uuid
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.websocket import notify_alert_update, notify_new_alert
+from models.alert import AlertSeverity, AlertStatus, AlertType
+
+logger = logging.getLogger(__name__)
+
+# Per-DMA values a rule can watch; larger is always worse
+METRICS = ("loss_percentage", "loss_change", "pressure_drop", "anomaly_score")
+
+
+@dataclass
+class AlertRule:
+    """
+    One alert condition with hysteresis
+
+    The alert is raised when the metric reaches ``raise_at`` and resolved
+    only once it falls below ``clear_at``, so a DMA hovering around the
+    threshold does not flap.
+    """
+    id: str
+    metric: str
+    raise_at: float
+    clear_at: float
+    type: AlertType
+    severity: AlertSeverity
+    title_th: str
+    title_en: str
+
+    def __post_init__(self):
+        if self.metric not in METRICS:
+            raise ValueError(f"Unknown metric: {self.metric}")
+        if self.clear_at > self.raise_at:
+            raise ValueError(f"Rule {self.id}: clear_at must not exceed raise_at")
+
+
+@dataclass
+class ThresholdOverride:
+    """Thresholds of one rule for a region or a single DMA (DMA wins)"""
+    rule_id: str
+    raise_at: float
+    clear_at: float
+    dma_id: Optional[str] = None
+    region_id: Optional[str] = None
+
+    def __post_init__(self):
+        if (self.dma_id is None) == (self.region_id is None):
+            raise ValueError("Set exactly one of dma_id and region_id")
+        if self.clear_at > self.raise_at:
+            raise ValueError(f"Override of {self.rule_id}: clear_at must not exceed raise_at")
+
+
+DEFAULT_RULES = [
+    AlertRule(
+        id="loss_warning", metric="loss_percentage", raise_at=15.0, clear_at=13.0,
+        type=AlertType.THRESHOLD_BREACH, severity=AlertSeverity.HIGH,
+        title_th="น้ำสูญเสียเกินเกณฑ์เฝ้าระวัง", title_en="Water Loss Exceeds Warning Threshold",
+    ),
+    AlertRule(
+        id="loss_critical", metric="loss_percentage", raise_at=20.0, clear_at=18.0,
+        type=AlertType.HIGH_LOSS, severity=AlertSeverity.CRITICAL,
+        title_th="น้ำสูญเสียสูงผิดปกติ", title_en="Abnormally High Water Loss",
+    ),
+    AlertRule(
+        id="loss_rise", metric="loss_change", raise_at=5.0, clear_at=2.0,
+        type=AlertType.FLOW_ANOMALY, severity=AlertSeverity.MEDIUM,
+        title_th="น้ำสูญเสียเพิ่มขึ้นรวดเร็ว", title_en="Rapid Rise in Water Loss",
+    ),
+    AlertRule(
+        id="pressure_drop", metric="pressure_drop", raise_at=0.3, clear_at=0.15,
+        type=AlertType.PRESSURE_ANOMALY, severity=AlertSeverity.MEDIUM,
+        title_th="แรงดันน้ำผิดปกติ", title_en="Abnormal Pressure Detected",
+    ),
+]
+
+# Not a default: readings carry no anomaly score, so this rule only
+# applies when the caller passes scores to AlertRuleEngine.evaluate
+ANOMALY_SCORE_RULE = AlertRule(
+    id="anomaly_score", metric="anomaly_score", raise_at=0.8, clear_at=0.6,
+    type=AlertType.FLOW_ANOMALY, severity=AlertSeverity.HIGH,
+    title_th="ตรวจพบความผิดปกติจากโมเดล AI", title_en="AI Model Detected an Anomaly",
+)
+
+# Latest reading per DMA in the batch and its change against the
+# preceding window, for every DMA in one statement
+METRICS_QUERY = text("""
+    WITH latest AS (
+        SELECT DISTINCT ON (r.dma_id)
+            r.dma_id, r.reading_date, r.loss_percentage, r.pressure
+        FROM dma_readings r
+        WHERE r.dma_id = ANY(:dma_ids)
+        ORDER BY r.dma_id, r.reading_date DESC
+    ),
+    history AS (
+        SELECT
+            r.dma_id,
+            AVG(r.loss_percentage) AS loss_baseline,
+            AVG(r.pressure) AS pressure_baseline
+        FROM dma_readings r
+        JOIN latest l ON l.dma_id = r.dma_id
+        WHERE r.reading_date < l.reading_date
+          AND r.reading_date >= l.reading_date - make_interval(hours => :window_hours)
+        GROUP BY r.dma_id
+    )
+    SELECT
+        l.dma_id,
+        d.region_id,
+        d.name_th,
+        l.reading_date,
+        l.loss_percentage,
+        l.loss_percentage - h.loss_baseline AS loss_change,
+        h.pressure_baseline - l.pressure AS pressure_drop
+    FROM latest l
+    JOIN dmas d ON d.id = l.dma_id
+    LEFT JOIN history h ON h.dma_id = l.dma_id
+""")
+
+# Rule state per (DMA, rule): every open alert and the last resolution
+RULE_STATE_QUERY = text("""
+    SELECT
+        dma_id,
+        rule_id,
+        ARRAY_AGG(id) FILTER (WHERE status <> CAST(:resolved AS alert_status)) AS open_ids,
+        MAX(resolved_at) AS last_resolved_at
+    FROM alerts
+    WHERE rule_id IS NOT NULL AND dma_id = ANY(:dma_ids)
+    GROUP BY dma_id, rule_id
+""")
+
+INSERT_ALERT = text("""
+    INSERT INTO alerts (
+        id, dma_id, rule_id, type, severity, status,
+        title_th, title_en, description_th, description_en, triggered_at
+    )
+    VALUES (
+        :id, :dma_id, :rule_id, CAST(:type AS alert_type), CAST(:severity AS alert_severity),
+        CAST(:status AS alert_status), :title_th, :title_en, :description_th, :description_en, :triggered_at
+    )
+""")
+
+RESOLVE_ALERTS = text("""
+    UPDATE alerts
+    SET status = CAST(:resolved AS alert_status), resolved_at = :now, updated_at = :now
+    WHERE id = ANY(:ids)
+""")
+
+METRIC_LABELS = {
+    "loss_percentage": ("น้ำสูญเสีย {value:.1f}% (เกณฑ์ {limit:g}%)", "Water loss {value:.1f}% (threshold {limit:g}%)"),
+    "loss_change": (
+        "น้ำสูญเสียเพิ่มขึ้น {value:.1f} จุด จากค่าเฉลี่ยช่วงก่อนหน้า (เกณฑ์ {limit:g})",
+        "Water loss up {value:.1f} points on the preceding window (threshold {limit:g})",
+    ),
+    "pressure_drop": (
+        "แรงดันน้ำลดลง {value:.2f} บาร์ จากค่าเฉลี่ย (เกณฑ์ {limit:g})",
+        "Pressure {value:.2f} bar below its recent average (threshold {limit:g})",
+    ),
+    "anomaly_score": (
+        "คะแนนความผิดปกติ {value:.2f} (เกณฑ์ {limit:g})",
+        "Anomaly score {value:.2f} (threshold {limit:g})",
+    ),
+}
+
+
+def resolve_thresholds(
+    rules: List[AlertRule],
+    overrides: Iterable[ThresholdOverride],
+    dma_ids: np.ndarray,
+    region_ids: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (n_dmas, n_rules) raise and clear thresholds
+
+    Rule defaults, then region overrides, then DMA overrides; each
+    override is one masked assignment over all DMAs.
+    """
+    raise_at = np.tile([rule.raise_at for rule in rules], (len(dma_ids), 1)).astype(float)
+    clear_at = np.tile([rule.clear_at for rule in rules], (len(dma_ids), 1)).astype(float)
+    columns = {rule.id: j for j, rule in enumerate(rules)}
+
+    overrides = sorted(overrides, key=lambda o: o.dma_id is not None)
+    for override in overrides:
+        j = columns.get(override.rule_id)
+        if j is None:
+            continue
+        rows = dma_ids == override.dma_id if override.dma_id is not None else region_ids == override.region_id
+        raise_at[rows, j] = override.raise_at
+        clear_at[rows, j] = override.clear_at
+    return raise_at, clear_at
+
+
+def evaluate_rules(
+    values: np.ndarray,
+    raise_at: np.ndarray,
+    clear_at: np.ndarray,
+    is_open: np.ndarray,
+    cooling: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hysteresis transitions for every (DMA, rule) cell
+
+    Args:
+        values: (n_dmas, n_rules) metric per cell, NaN when unknown
+        raise_at, clear_at: Thresholds per cell
+        is_open: Cell has an unresolved alert
+        cooling: Cell's last alert was resolved within the cooldown
+
+    Returns:
+        (raise, resolve) boolean masks; unknown values change nothing
+    """
+    known = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        to_raise = known & ~is_open & ~cooling & (values >= raise_at)
+        to_resolve = known & is_open & (values < clear_at)
+    return to_raise, to_resolve
+
+
+class AlertRuleEngine:
+    """
+    Alert rules evaluated set-wise after each ETL load
+
+    One query computes every metric for the DMAs in the batch and one
+    reads the rules' state (open alert, last resolution) from the alerts
+    table; the decisions are array operations over the (DMA, rule) grid.
+    A (DMA, rule) pair has at most one open alert (deduplication), is
+    resolved only below its clear threshold (hysteresis), and is not
+    raised again within ``cooldown_minutes`` of being resolved.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        rules: Optional[List[AlertRule]] = None,
+        overrides: Optional[List[ThresholdOverride]] = None,
+        window_hours: int = 24,
+        cooldown_minutes: int = 60,
+    ):
+        self.db = db
+        self.rules = rules or DEFAULT_RULES
+        self.overrides = overrides or []
+        self.window_hours = window_hours
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+
+    async def evaluate(
+        self,
+        dma_ids: Iterable[str],
+        anomaly_scores: Optional[Dict[str, float]] = None,
+        notify: bool = True,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Evaluate every rule for the DMAs of a committed batch
+
+        Args:
+            dma_ids: DMAs with newly committed readings
+            anomaly_scores: Latest anomaly score per DMA (e.g. from the
+                streaming detector) for rules on the anomaly_score metric,
+                such as ANOMALY_SCORE_RULE; DMAs without one skip them
+            notify: Push raised and resolved alerts over the websocket
+
+        Returns:
+            Dict with the raised and resolved alerts
+        """
+        dma_ids = sorted({str(d) for d in dma_ids})
+        if not dma_ids:
+            return {"raised": [], "resolved": []}
+
+        # A failed read aborts the transaction; roll back so callers can keep using the session
+        try:
+            result = await self.db.execute(METRICS_QUERY, {"dma_ids": dma_ids, "window_hours": self.window_hours})
+            rows = [dict(row) for row in result.mappings().all()]
+            if not rows:
+                return {"raised": [], "resolved": []}
+
+            ids = np.array([row["dma_id"] for row in rows], dtype=object)
+            now = datetime.now(timezone.utc)
+            is_open, cooling, open_ids = await self._rule_state(dma_ids, ids, now)
+        except Exception as e:
+            logger.error(f"Alert rule state query failed: {e}")
+            await self.db.rollback()
+            raise
+
+        region_ids = np.array([row["region_id"] for row in rows], dtype=object)
+        scores = anomaly_scores or {}
+        metrics = {
+            name: np.array([np.nan if row.get(name) is None else float(row[name]) for row in rows])
+            for name in ("loss_percentage", "loss_change", "pressure_drop")
+        }
+        metrics["anomaly_score"] = np.array([float(scores.get(d, np.nan)) for d in ids])
+        values = np.column_stack([metrics[rule.metric] for rule in self.rules])
+
+        raise_at, clear_at = resolve_thresholds(self.rules, self.overrides, ids, region_ids)
+        to_raise, to_resolve = evaluate_rules(values, raise_at, clear_at, is_open, cooling)
+
+        raised = [
+            self._alert(rows[i], self.rules[j], values[i, j], raise_at[i, j], now)
+            for i, j in zip(*np.nonzero(to_raise))
+        ]
+        # Every open alert of a clearing pair, older duplicates included
+        resolved = [
+            {"id": alert_id, "dma_id": ids[i], "rule_id": self.rules[j].id, "status": AlertStatus.RESOLVED.value,
+             "resolved_at": now.isoformat()}
+            for i, j in zip(*np.nonzero(to_resolve))
+            for alert_id in open_ids[i, j]
+        ]
+        if not raised and not resolved:
+            return {"raised": [], "resolved": []}
+
+        try:
+            if raised:
+                await self.db.execute(INSERT_ALERT, [alert["row"] for alert in raised])
+            if resolved:
+                await self.db.execute(RESOLVE_ALERTS, {
+                    "resolved": AlertStatus.RESOLVED.value,
+                    "now": now,
+                    "ids": [alert["id"] for alert in resolved],
+                })
+            await self.db.commit()
+        except Exception as e:
+            logger.error(f"Alert rule update failed: {e}")
+            await self.db.rollback()
+            raise
+
+        messages = [alert["message"] for alert in raised]
+        if notify:
+            for alert in messages:
+                await notify_new_alert(alert)
+            for alert in resolved:
+                await notify_alert_update(alert, "resolve")
+
+        logger.info(f"Alert rules: {len(messages)} raised, {len(resolved)} resolved over {len(rows)} DMAs")
+        return {"raised": messages, "resolved": resolved}
+
+    async def _rule_state(
+        self,
+        dma_ids: List[str],
+        ids: np.ndarray,
+        now: datetime,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Open and cooling-down masks plus the open alert ids on the (DMA, rule) grid"""
+        shape = (len(ids), len(self.rules))
+        is_open = np.zeros(shape, dtype=bool)
+        cooling = np.zeros(shape, dtype=bool)
+        open_ids = np.full(shape, None, dtype=object)
+
+        result = await self.db.execute(RULE_STATE_QUERY, {
+            "dma_ids": dma_ids,
+            "resolved": AlertStatus.RESOLVED.value,
+        })
+        positions = {dma_id: i for i, dma_id in enumerate(ids)}
+        columns = {rule.id: j for j, rule in enumerate(self.rules)}
+        for state in result.mappings().all():
+            i, j = positions.get(state["dma_id"]), columns.get(state["rule_id"])
+            if i is None or j is None:
+                continue
+            if state["open_ids"]:
+                is_open[i, j] = True
+                open_ids[i, j] = list(state["open_ids"])
+            last = state["last_resolved_at"]
+            if last is not None and now - last < self.cooldown:
+                cooling[i, j] = True
+        return is_open, cooling, open_ids
+
+    def _alert(
+        self,
+        row: Dict[str, Any],
+        rule: AlertRule,
+        value: float,
+        limit: float,
+        now: datetime,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Insert row and websocket payload for one raised alert"""
+        label_th, label_en = METRIC_LABELS[rule.metric]
+        record = {
+            "id": str(uuid.uuid4()),
+            "dma_id": row["dma_id"],
+            "rule_id": rule.id,
+            "type": rule.type.value,
+            "severity": rule.severity.value,
+            "status": AlertStatus.ACTIVE.value,
+            "title_th": rule.title_th,
+            "title_en": rule.title_en,
+            "description_th": label_th.format(value=value, limit=limit),
+            "description_en": label_en.format(value=value, limit=limit),
+            "triggered_at": now,
+        }
+        message = {
+            **record,
+            "dma_name": row.get("name_th"),
+            "triggered_at": now.isoformat(),
+            "acknowledged_at": None,
+            "resolved_at": None,
+        }
+        return {"row": record, "message": message}
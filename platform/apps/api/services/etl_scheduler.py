@@ -371,6 +371,8 @@ class ETLScheduler:
                 transformed = await etl.transform_dma_readings(readings)
                 loaded = await etl.load_dma_readings(transformed)
                 await etl.update_dma_current_values()
+                await etl.evaluate_alert_rules()
+                await etl.detect_leaks()
 
                 job.records_processed = loaded
                 job.records_failed = etl.stats.get("errors", 0)
@@ -398,6 +400,8 @@ class ETLScheduler:
                 transformed = await etl.transform_dma_readings(readings)
                 loaded = await etl.load_dma_readings(transformed)
                 await etl.update_dma_current_values()
+                await etl.evaluate_alert_rules()
+                await etl.detect_leaks()
 
                 job.records_processed = loaded
                 job.records_failed = etl.stats.get("errors", 0)
@@ -27,12 +27,15 @@ class ETLService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.loaded_dma_ids: set[str] = set()
         self.stats = {
             "extracted": 0,
             "transformed": 0,
             "loaded": 0,
             "errors": 0,
             "warnings": 0,
+            "leak_alerts": 0,
+            "alerts_raised": 0,
         }
 
     async def extract_from_csv(self, content: str) -> List[Dict[str, Any]]:
@@ -161,6 +164,7 @@ class ETLService:
                 self.stats["loaded"] += 1
 
             await self.db.commit()
+            self.loaded_dma_ids.update(record["dma_id"] for record in data)
             logger.info(f"Loaded {loaded} records to database")
 
         except Exception as e:
@@ -171,8 +175,17 @@ class ETLService:
 
         return loaded
 
-    async def update_dma_current_values(self) -> int:
-        """Update DMA current values from latest readings"""
+    async def update_dma_current_values(
+        self,
+        warning_threshold: float = 15.0,
+        critical_threshold: float = 20.0,
+    ) -> int:
+        """
+        Update DMA current values from latest readings
+
+        The status column is a coarse loss-percentage band; alerts come
+        from the rules engine (see evaluate_alert_rules).
+        """
         stmt = text("""
             UPDATE dmas d
             SET
@@ -184,8 +197,8 @@ class ETLService:
                 last_reading_at = r.reading_date,
                 updated_at = NOW(),
                 status = CASE
-                    WHEN r.loss_percentage >= 20 THEN 'critical'
-                    WHEN r.loss_percentage >= 15 THEN 'warning'
+                    WHEN r.loss_percentage >= :critical THEN 'critical'
+                    WHEN r.loss_percentage >= :warning THEN 'warning'
                     ELSE 'normal'
                 END
             FROM (
@@ -197,13 +210,67 @@ class ETLService:
             WHERE d.id = r.dma_id
         """)
 
-        result = await self.db.execute(stmt)
+        result = await self.db.execute(stmt, {"warning": warning_threshold, "critical": critical_threshold})
         await self.db.commit()
 
         updated = result.rowcount
         logger.info(f"Updated {updated} DMAs with latest readings")
         return updated
 
+    async def detect_leaks(self, notify: bool = True) -> int:
+        """
+        Run the network-wide minimum night flow analysis after a load
+
+        Failures are logged and do not fail the load.
+
+        Returns:
+            Number of leak alerts raised
+        """
+        from services.leak_service import LeakDetectionService
+
+        try:
+            result = await LeakDetectionService(self.db).run(notify=notify)
+        except Exception as e:
+            logger.error(f"Leak detection failed: {e}")
+            self.stats["warnings"] += 1
+            return 0
+
+        raised = len(result["alerts"])
+        self.stats["leak_alerts"] += raised
+        return raised
+
+    async def evaluate_alert_rules(
+        self,
+        anomaly_scores: Optional[Dict[str, float]] = None,
+        notify: bool = True,
+    ) -> int:
+        """
+        Evaluate the alert rules for the DMAs loaded by this service
+
+        The anomaly score rule is added only when scores are given.
+        Failures are logged and do not fail the load.
+
+        Returns:
+            Number of alerts raised
+        """
+        from services.alert_rules import ANOMALY_SCORE_RULE, DEFAULT_RULES, AlertRuleEngine
+
+        if not self.loaded_dma_ids:
+            return 0
+        rules = DEFAULT_RULES + [ANOMALY_SCORE_RULE] if anomaly_scores else DEFAULT_RULES
+        try:
+            result = await AlertRuleEngine(self.db, rules=rules).evaluate(
+                self.loaded_dma_ids, anomaly_scores=anomaly_scores, notify=notify
+            )
+        except Exception as e:
+            logger.error(f"Alert rule evaluation failed: {e}")
+            self.stats["warnings"] += 1
+            return 0
+
+        raised = len(result["raised"])
+        self.stats["alerts_raised"] += raised
+        return raised
+
     async def run_full_etl(
         self,
         source_type: str,
@@ -211,12 +278,15 @@ class ETLService:
         **kwargs
     ) -> Dict[str, int]:
         """Run complete ETL pipeline"""
+        self.loaded_dma_ids = set()
         self.stats = {
             "extracted": 0,
             "transformed": 0,
             "loaded": 0,
             "errors": 0,
             "warnings": 0,
+            "leak_alerts": 0,
+            "alerts_raised": 0,
         }
 
         try:
@@ -241,6 +311,10 @@ class ETLService:
             # Update DMA current values
             await self.update_dma_current_values()
 
+            # Alert rules for the loaded DMAs, then the night flow leak analysis
+            await self.evaluate_alert_rules()
+            await self.detect_leaks()
+
             logger.info(f"ETL completed: {self.stats}")
             return self.stats
 
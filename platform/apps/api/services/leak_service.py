@@ -0,0 +1,454 @@
+"""
+Leak Localization Service
+Minimum night flow (MNF) analysis across the DMA hierarchy
+TOR Reference: Section 4.5
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import logging
+import uuid
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.websocket import notify_new_alert
+from models.alert import AlertSeverity, AlertStatus, AlertType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LeakSettings:
+    """
+    MNF analysis parameters
+
+    Flows are in m³/h: readings are hourly, so an hourly inflow volume is
+    the average flow rate over that hour. Background leakage follows the
+    BABE component approach (per km of mains plus per service connection
+    at a reference pressure), scaled to the observed night pressure with
+    the FAVAD N1 exponent.
+    """
+    night_start_hour: int = 2
+    night_end_hour: int = 4
+    timezone: str = "Asia/Bangkok"
+    lookback_days: int = 14
+    min_nights: int = 3
+
+    # Legitimate night use, m³/h per connection (1.7 L/h)
+    night_use_per_connection: float = 0.0017
+    # Background leakage at reference pressure, m³/h
+    background_per_km: float = 0.02
+    background_per_connection: float = 0.00125
+    reference_pressure: float = 5.0
+    n1_exponent: float = 1.5
+
+    # Burst: last night's MNF above the baseline (median of earlier nights)
+    burst_ratio: float = 0.3
+    burst_min_flow: float = 1.0
+    # Rising: MNF trend in share of baseline per night
+    trend_threshold: float = 0.02
+    # Elevated: leakage beyond background as a share of MNF
+    excess_ratio: float = 0.25
+
+
+# One pass over the lookback window: nightly MNF per DMA, then the last
+# night, the baseline of the earlier nights and the trend per DMA
+MNF_QUERY = text("""
+    WITH nights AS (
+        SELECT
+            r.dma_id,
+            date_trunc('day', r.reading_date AT TIME ZONE :tz) AS night,
+            MIN(r.inflow) AS mnf,
+            AVG(r.pressure) AS pressure
+        FROM dma_readings r
+        WHERE r.reading_date >= :since
+          AND r.reading_date < :until
+          AND EXTRACT(HOUR FROM r.reading_date AT TIME ZONE :tz) >= :start_hour
+          AND EXTRACT(HOUR FROM r.reading_date AT TIME ZONE :tz) < :end_hour
+        GROUP BY r.dma_id, night
+    ),
+    ranked AS (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY dma_id ORDER BY night DESC) AS age
+        FROM nights
+    )
+    SELECT
+        d.id AS dma_id,
+        d.code,
+        d.name_th,
+        d.name_en,
+        d.branch_id,
+        d.region_id,
+        d.connections,
+        d.pipe_length_km,
+        MAX(n.night) AS last_night,
+        MAX(n.night) = :last_closed_night AS is_current,
+        MAX(n.mnf) FILTER (WHERE n.age = 1) AS mnf,
+        MAX(n.pressure) FILTER (WHERE n.age = 1) AS night_pressure,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY n.mnf) FILTER (WHERE n.age > 1) AS baseline_mnf,
+        regr_slope(n.mnf, EXTRACT(EPOCH FROM n.night) / 86400) AS mnf_trend,
+        COUNT(*) AS n_nights
+    FROM ranked n
+    JOIN dmas d ON d.id = n.dma_id
+    GROUP BY d.id, d.code, d.name_th, d.name_en, d.branch_id, d.region_id, d.connections, d.pipe_length_km
+""")
+
+OPEN_LEAK_ALERTS_QUERY = text("""
+    SELECT DISTINCT dma_id, severity FROM alerts
+    WHERE type = CAST(:type AS alert_type) AND status <> CAST(:resolved AS alert_status)
+""")
+
+INSERT_ALERT = text("""
+    INSERT INTO alerts (
+        id, dma_id, type, severity, status,
+        title_th, title_en, description_th, description_en, triggered_at
+    )
+    VALUES (
+        :id, :dma_id, CAST(:type AS alert_type), CAST(:severity AS alert_severity),
+        CAST(:status AS alert_status), :title_th, :title_en, :description_th, :description_en, :triggered_at
+    )
+""")
+
+NUMERIC_COLUMNS = (
+    "connections", "pipe_length_km", "mnf", "night_pressure", "baseline_mnf", "mnf_trend", "n_nights",
+)
+
+SEVERITY_RANK = {severity.value: rank for rank, severity in enumerate(AlertSeverity)}
+
+LEAK_CLASSES = {
+    "burst": {
+        "title_th": "สงสัยท่อแตก: อัตราการไหลต่ำสุดกลางคืนเพิ่มขึ้นฉับพลัน",
+        "title_en": "Suspected Burst: Minimum Night Flow Jumped",
+    },
+    "rising": {
+        "title_th": "อัตราการไหลต่ำสุดกลางคืนเพิ่มขึ้นต่อเนื่อง",
+        "title_en": "Minimum Night Flow Rising",
+    },
+    "elevated": {
+        "title_th": "น้ำรั่วไหลเกินระดับพื้นฐาน",
+        "title_en": "Leakage Above Background Level",
+    },
+}
+
+
+def night_window(as_of: datetime, settings: LeakSettings) -> tuple[datetime, datetime]:
+    """
+    (since, until) bounds covering only nights whose window has closed
+
+    ``until`` is the end of the latest night window at or before ``as_of``
+    in the settings' time zone, so a night still being loaded is never
+    taken as the last night. Naive datetimes are taken as UTC.
+    """
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    local = as_of.astimezone(ZoneInfo(settings.timezone))
+    until = local.replace(hour=settings.night_end_hour, minute=0, second=0, microsecond=0)
+    if until > local:
+        until -= timedelta(days=1)
+    return until - timedelta(days=settings.lookback_days), until
+
+
+def _columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Row mappings as column arrays; numeric columns as float with NULL as NaN"""
+    columns = {}
+    for name in rows[0].keys() if rows else ():
+        values = [row[name] for row in rows]
+        if name in NUMERIC_COLUMNS:
+            columns[name] = np.array([np.nan if v is None else float(v) for v in values])
+        else:
+            columns[name] = np.array(values, dtype=object)
+    return columns
+
+
+def estimate_leakage(columns: Dict[str, np.ndarray], settings: LeakSettings) -> Dict[str, np.ndarray]:
+    """
+    Split each DMA's MNF into night use, background leakage and excess
+
+    Vectorized over all DMAs. Adds to the columns:
+
+    - night_use: legitimate night consumption
+    - background: background leakage at the observed night pressure
+    - excess: MNF not explained by night use or background (unreported leaks)
+    - burst_flow: rise of last night's MNF over the baseline
+    - trend_ratio: MNF trend per night as a share of the baseline
+    - leak_class: "burst", "rising", "elevated", "normal" or "insufficient"
+    - severity: alert severity, or "" when no alert is due
+
+    DMAs are "insufficient" without enough nights, a baseline, data for
+    the latest closed night, or infrastructure data (connections and pipe
+    length both 0 or NULL), since night use and background are then unknown.
+    """
+    s = settings
+    connections = np.nan_to_num(columns["connections"])
+    pipe_km = np.nan_to_num(columns["pipe_length_km"])
+    mnf = columns["mnf"]
+    baseline = columns["baseline_mnf"]
+
+    pressure = np.where(np.isnan(columns["night_pressure"]), s.reference_pressure, columns["night_pressure"])
+    pressure_factor = (np.clip(pressure, 0, None) / s.reference_pressure) ** s.n1_exponent
+
+    night_use = connections * s.night_use_per_connection
+    background = (pipe_km * s.background_per_km + connections * s.background_per_connection) * pressure_factor
+    excess = mnf - night_use - background
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        burst_flow = np.clip(mnf - baseline, 0, None)
+        burst_share = burst_flow / baseline
+        trend_ratio = columns["mnf_trend"] / baseline
+        excess_share = excess / mnf
+
+    current = np.asarray(columns["is_current"], dtype=object).astype(bool)
+    has_assets = (connections > 0) | (pipe_km > 0)
+    enough = (columns["n_nights"] >= s.min_nights) & ~np.isnan(mnf) & (baseline > 0) & current & has_assets
+    burst = enough & (burst_flow >= s.burst_min_flow) & (burst_share >= s.burst_ratio)
+    rising = enough & (trend_ratio >= s.trend_threshold) & (excess > 0)
+    elevated = enough & (excess_share >= s.excess_ratio)
+
+    leak_class = np.select(
+        [~enough, burst, rising, elevated],
+        ["insufficient", "burst", "rising", "elevated"],
+        default="normal",
+    )
+    severity = np.select(
+        [burst & (burst_share >= 1.0), burst, rising | (elevated & (excess_share >= 2 * s.excess_ratio)), elevated],
+        [AlertSeverity.CRITICAL.value, AlertSeverity.HIGH.value, AlertSeverity.MEDIUM.value, AlertSeverity.LOW.value],
+        default="",
+    )
+
+    return {
+        **columns,
+        "night_use": night_use,
+        "background": background,
+        "excess": excess,
+        "burst_flow": burst_flow,
+        "trend_ratio": trend_ratio,
+        "leak_class": leak_class,
+        "severity": severity,
+    }
+
+
+def aggregate_hierarchy(estimates: Dict[str, np.ndarray], level: str) -> List[Dict[str, Any]]:
+    """
+    Roll DMA estimates up to branches or regions
+
+    Sums flows per group with one bincount each and names the DMA with
+    the largest excess flow, i.e. where to look first.
+
+    Args:
+        estimates: Output of estimate_leakage
+        level: "branch" or "region"
+    """
+    keys = estimates[f"{level}_id"]
+    if len(keys) == 0:
+        return []
+    groups, inverse = np.unique(keys.astype(str), return_inverse=True)
+    n = len(groups)
+
+    excess = np.nan_to_num(np.clip(estimates["excess"], 0, None))
+    totals = {
+        name: np.bincount(inverse, weights=np.nan_to_num(estimates[name]), minlength=n)
+        for name in ("mnf", "night_use", "background")
+    }
+    total_excess = np.bincount(inverse, weights=excess, minlength=n)
+    n_dmas = np.bincount(inverse, minlength=n)
+    n_leaks = np.bincount(inverse, weights=estimates["severity"] != "", minlength=n)
+
+    # Largest excess per group: sort by (group, -excess) and take each group's first row
+    order = np.lexsort((-excess, inverse))
+    first = order[np.r_[0, np.flatnonzero(np.diff(inverse[order])) + 1]]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(total_excess > 0, excess[first] / total_excess, 0.0)
+
+    return [
+        {
+            "level": level,
+            "id": groups[g],
+            "n_dmas": int(n_dmas[g]),
+            "n_leaks": int(n_leaks[g]),
+            "mnf": round(float(totals["mnf"][g]), 3),
+            "night_use": round(float(totals["night_use"][g]), 3),
+            "background": round(float(totals["background"][g]), 3),
+            "excess": round(float(total_excess[g]), 3),
+            "top_dma_id": estimates["dma_id"][first[g]] if total_excess[g] > 0 else None,
+            "top_dma_share": round(float(share[g]), 4),
+        }
+        for g in np.argsort(-total_excess, kind="stable")
+    ]
+
+
+class LeakDetectionService:
+    """
+    Network-wide leak localization from minimum night flow
+
+    Run after each nightly load. One SQL pass computes every DMA's last
+    MNF, baseline and trend; the estimates, hierarchy roll-up and alert
+    decisions are array operations over all DMAs at once. DMAs with an
+    open leak alert are only alerted again at a higher severity.
+    """
+
+    def __init__(self, db: AsyncSession, settings: Optional[LeakSettings] = None):
+        self.db = db
+        self.settings = settings or LeakSettings()
+
+    async def analyze(self, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        MNF estimates per DMA with branch and region roll-ups
+
+        Args:
+            as_of: End of the lookback window (default: now); nights whose
+                window has not closed by then are left out
+        """
+        s = self.settings
+        since, until = night_window(as_of or datetime.now(timezone.utc), s)
+        result = await self.db.execute(MNF_QUERY, {
+            "tz": s.timezone,
+            "since": since,
+            "until": until,
+            # Nights are keyed by their local date, so the last closed one is until's date
+            "last_closed_night": until.replace(hour=0, tzinfo=None),
+            "start_hour": s.night_start_hour,
+            "end_hour": s.night_end_hour,
+        })
+        rows = [dict(row) for row in result.mappings().all()]
+        if not rows:
+            return {"dmas": [], "branches": [], "regions": []}
+
+        estimates = estimate_leakage(_columns(rows), s)
+        return {
+            "dmas": self._dma_records(estimates),
+            "branches": aggregate_hierarchy(estimates, "branch"),
+            "regions": aggregate_hierarchy(estimates, "region"),
+        }
+
+    async def raise_alerts(self, analysis: Dict[str, Any], notify: bool = True) -> List[Dict[str, Any]]:
+        """
+        Create LEAK_DETECTED alerts for flagged DMAs
+
+        A DMA with an open leak alert is skipped unless the new severity is
+        higher, so an open LOW "elevated" alert does not hide a burst.
+
+        Returns:
+            The created alerts
+        """
+        flagged = [dma for dma in analysis["dmas"] if dma["severity"]]
+        if not flagged:
+            return []
+
+        result = await self.db.execute(OPEN_LEAK_ALERTS_QUERY, {
+            "type": AlertType.LEAK_DETECTED.value,
+            "resolved": AlertStatus.RESOLVED.value,
+        })
+        open_rank: Dict[str, int] = {}
+        for row in result.mappings().all():
+            open_rank[row["dma_id"]] = max(SEVERITY_RANK[row["severity"]], open_rank.get(row["dma_id"], -1))
+
+        now = datetime.now(timezone.utc)
+        alerts = [
+            self._alert(dma, now) for dma in flagged
+            if SEVERITY_RANK[dma["severity"]] > open_rank.get(dma["dma_id"], -1)
+        ]
+        if not alerts:
+            return []
+
+        try:
+            await self.db.execute(INSERT_ALERT, [alert["row"] for alert in alerts])
+            await self.db.commit()
+        except Exception as e:
+            logger.error(f"Leak alert insert failed: {e}")
+            await self.db.rollback()
+            raise
+
+        created = [alert["message"] for alert in alerts]
+        if notify:
+            for alert in created:
+                await notify_new_alert(alert)
+        logger.info(f"Raised {len(created)} leak alerts")
+        return created
+
+    async def run(self, notify: bool = True) -> Dict[str, Any]:
+        """Analyze the network and raise alerts for new leaks"""
+        analysis = await self.analyze()
+        analysis["alerts"] = await self.raise_alerts(analysis, notify=notify)
+        return analysis
+
+    def _dma_records(self, estimates: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Per-DMA results, largest excess first"""
+        def number(value: float) -> Optional[float]:
+            return None if np.isnan(value) else round(float(value), 4)
+
+        order = np.argsort(-np.nan_to_num(estimates["excess"], nan=-np.inf), kind="stable")
+        return [
+            {
+                "dma_id": estimates["dma_id"][i],
+                "code": estimates["code"][i],
+                "name_th": estimates["name_th"][i],
+                "name_en": estimates["name_en"][i],
+                "branch_id": estimates["branch_id"][i],
+                "region_id": estimates["region_id"][i],
+                "last_night": estimates["last_night"][i],
+                "mnf": number(estimates["mnf"][i]),
+                "baseline_mnf": number(estimates["baseline_mnf"][i]),
+                "mnf_trend": number(estimates["mnf_trend"][i]),
+                "night_use": number(estimates["night_use"][i]),
+                "background": number(estimates["background"][i]),
+                "excess": number(estimates["excess"][i]),
+                "burst_flow": number(estimates["burst_flow"][i]),
+                "leak_class": str(estimates["leak_class"][i]),
+                "severity": str(estimates["severity"][i]),
+            }
+            for i in order
+        ]
+
+    def _alert(self, dma: Dict[str, Any], now: datetime) -> Dict[str, Dict[str, Any]]:
+        """Insert row and websocket payload for one flagged DMA"""
+        titles = LEAK_CLASSES[dma["leak_class"]]
+        if dma["leak_class"] == "burst":
+            description_th = (
+                f"อัตราการไหลต่ำสุดกลางคืน {dma['mnf']:.1f} ลบ.ม./ชม. "
+                f"สูงกว่าค่าปกติ {dma['burst_flow']:.1f} ลบ.ม./ชม."
+            )
+            description_en = (
+                f"Minimum night flow {dma['mnf']:.1f} m³/h, "
+                f"{dma['burst_flow']:.1f} m³/h above its baseline of {dma['baseline_mnf']:.1f} m³/h"
+            )
+        elif dma["leak_class"] == "rising":
+            description_th = f"อัตราการไหลต่ำสุดกลางคืนเพิ่มขึ้น {dma['mnf_trend']:.2f} ลบ.ม./ชม. ต่อคืน"
+            description_en = f"Minimum night flow rising by {dma['mnf_trend']:.2f} m³/h per night"
+        else:
+            description_th = (
+                f"น้ำรั่วไหลส่วนเกิน {dma['excess']:.1f} ลบ.ม./ชม. "
+                f"จากอัตราการไหลต่ำสุดกลางคืน {dma['mnf']:.1f} ลบ.ม./ชม."
+            )
+            description_en = (
+                f"Leakage {dma['excess']:.1f} m³/h above night use and background "
+                f"out of a minimum night flow of {dma['mnf']:.1f} m³/h"
+            )
+
+        row = {
+            "id": str(uuid.uuid4()),
+            "dma_id": dma["dma_id"],
+            "type": AlertType.LEAK_DETECTED.value,
+            "severity": dma["severity"],
+            "status": AlertStatus.ACTIVE.value,
+            "title_th": titles["title_th"],
+            "title_en": titles["title_en"],
+            "description_th": description_th,
+            "description_en": description_en,
+            "triggered_at": now,
+        }
+        message = {
+            **row,
+            "dma_name": dma["name_th"],
+            "triggered_at": now.isoformat(),
+            "acknowledged_at": None,
+            "resolved_at": None,
+            "details": {
+                key: dma[key]
+                for key in ("leak_class", "mnf", "baseline_mnf", "mnf_trend", "background", "excess", "burst_flow")
+            },
+        }
+        return {"row": row, "message": message}
@@ -0,0 +1,217 @@
+"""
+Tests for Alert Rules Engine
+Tests thresholds, hysteresis, deduplication and notifications
+"""
+
+import pytest
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.alert_rules import (
+    ANOMALY_SCORE_RULE,
+    DEFAULT_RULES,
+    AlertRule,
+    AlertRuleEngine,
+    ThresholdOverride,
+    evaluate_rules,
+    resolve_thresholds,
+)
+from models.alert import AlertSeverity, AlertType
+
+
+def metrics_row(dma_id, region_id="reg-1", loss=10.0, loss_change=0.0, pressure_drop=0.0):
+    """One row of the metrics query"""
+    return {
+        "dma_id": dma_id,
+        "region_id": region_id,
+        "name_th": f"ดีเอ็มเอ {dma_id}",
+        "reading_date": datetime(2026, 1, 15, 8, tzinfo=timezone.utc),
+        "loss_percentage": loss,
+        "loss_change": loss_change,
+        "pressure_drop": pressure_drop,
+    }
+
+
+def make_session(rows, state=()):
+    """Async session stand-in answering the metrics and rule state queries"""
+    session = MagicMock()
+    metrics_result = MagicMock()
+    metrics_result.mappings.return_value.all.return_value = rows
+    state_result = MagicMock()
+    state_result.mappings.return_value.all.return_value = list(state)
+
+    async def execute(stmt, params=None):
+        sql = str(stmt)
+        if "WITH latest" in sql:
+            return metrics_result
+        if "open_id" in sql:
+            return state_result
+        return MagicMock()
+
+    session.execute = AsyncMock(side_effect=execute)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def executed(session, keyword):
+    """Parameters of the statements containing keyword"""
+    return [call.args[1] for call in session.execute.await_args_list if keyword in str(call.args[0])]
+
+
+class TestAlertRule:
+    """Test rule validation"""
+
+    def test_clear_above_raise_rejected(self):
+        """Hysteresis needs clear_at <= raise_at"""
+        with pytest.raises(ValueError):
+            AlertRule(
+                id="bad", metric="loss_percentage", raise_at=10, clear_at=12,
+                type=AlertType.HIGH_LOSS, severity=AlertSeverity.HIGH, title_th="", title_en="",
+            )
+
+    def test_override_needs_one_scope(self):
+        """Overrides target either a DMA or a region"""
+        with pytest.raises(ValueError):
+            ThresholdOverride(rule_id="loss_warning", raise_at=10, clear_at=8)
+
+
+class TestVectorizedEvaluation:
+    """Test threshold resolution and hysteresis masks"""
+
+    def test_override_precedence(self):
+        """DMA overrides win over region overrides"""
+        rules = DEFAULT_RULES[:1]
+        overrides = [
+            ThresholdOverride("loss_warning", 30, 25, dma_id="a"),
+            ThresholdOverride("loss_warning", 25, 20, region_id="reg-2"),
+        ]
+        raise_at, clear_at = resolve_thresholds(
+            rules, overrides, np.array(["a", "b", "c"], dtype=object), np.array(["reg-2", "reg-2", "reg-1"], dtype=object)
+        )
+        assert raise_at[:, 0].tolist() == [30, 25, 15]
+        assert clear_at[:, 0].tolist() == [25, 20, 13]
+
+    def test_hysteresis(self):
+        """Values between the thresholds keep the current state"""
+        values = np.array([[16.0], [14.0], [14.0], [12.0], [np.nan]])
+        raise_at = np.full((5, 1), 15.0)
+        clear_at = np.full((5, 1), 13.0)
+        is_open = np.array([[False], [False], [True], [True], [True]])
+        cooling = np.zeros((5, 1), dtype=bool)
+
+        to_raise, to_resolve = evaluate_rules(values, raise_at, clear_at, is_open, cooling)
+        assert to_raise[:, 0].tolist() == [True, False, False, False, False]
+        assert to_resolve[:, 0].tolist() == [False, False, False, True, False]
+
+    def test_cooldown_blocks_raise(self):
+        """A recently resolved pair is not raised again"""
+        to_raise, _ = evaluate_rules(
+            np.array([[20.0]]), np.array([[15.0]]), np.array([[13.0]]),
+            np.array([[False]]), np.array([[True]]),
+        )
+        assert not to_raise.any()
+
+
+class TestAlertRuleEngine:
+    """Test evaluation against the database"""
+
+    async def test_raises_and_notifies(self):
+        """Each breached rule raises one alert and pushes it"""
+        rows = [metrics_row("a", loss=22.0, pressure_drop=0.4), metrics_row("b", loss=10.0)]
+        session = make_session(rows)
+
+        rules = DEFAULT_RULES + [ANOMALY_SCORE_RULE]
+        with patch("services.alert_rules.notify_new_alert", new=AsyncMock()) as notify:
+            result = await AlertRuleEngine(session, rules=rules).evaluate(["a", "b"], anomaly_scores={"b": 0.9})
+
+        raised = {(a["dma_id"], a["rule_id"]) for a in result["raised"]}
+        assert raised == {("a", "loss_warning"), ("a", "loss_critical"), ("a", "pressure_drop"), ("b", "anomaly_score")}
+        assert notify.await_count == 4
+        inserted = executed(session, "INSERT INTO alerts")[0]
+        assert {row["rule_id"] for row in inserted} == {r for _, r in raised}
+        session.commit.assert_awaited_once()
+
+    async def test_open_alert_not_duplicated(self):
+        """A pair with an open alert is not raised again"""
+        session = make_session(
+            [metrics_row("a", loss=16.0)],
+            state=[{"dma_id": "a", "rule_id": "loss_warning", "open_ids": ["alert-1"], "last_resolved_at": None}],
+        )
+        with patch("services.alert_rules.notify_new_alert", new=AsyncMock()) as notify:
+            result = await AlertRuleEngine(session).evaluate(["a"])
+
+        assert result == {"raised": [], "resolved": []}
+        notify.assert_not_awaited()
+        session.commit.assert_not_awaited()
+
+    async def test_resolves_below_clear_threshold(self):
+        """Open alerts resolve once the value falls below clear_at"""
+        session = make_session(
+            [metrics_row("a", loss=12.0)],
+            state=[{"dma_id": "a", "rule_id": "loss_warning", "open_ids": ["alert-1"], "last_resolved_at": None}],
+        )
+        with patch("services.alert_rules.notify_alert_update", new=AsyncMock()) as update:
+            result = await AlertRuleEngine(session).evaluate(["a"])
+
+        assert [a["id"] for a in result["resolved"]] == ["alert-1"]
+        assert executed(session, "UPDATE alerts")[0]["ids"] == ["alert-1"]
+        update.assert_awaited_once_with(result["resolved"][0], "resolve")
+
+    async def test_resolves_every_open_duplicate(self):
+        """All open alerts of a clearing pair are resolved, not just the newest"""
+        session = make_session(
+            [metrics_row("a", loss=12.0)],
+            state=[{"dma_id": "a", "rule_id": "loss_warning", "open_ids": ["alert-1", "alert-2"], "last_resolved_at": None}],
+        )
+        result = await AlertRuleEngine(session).evaluate(["a"], notify=False)
+
+        assert sorted(a["id"] for a in result["resolved"]) == ["alert-1", "alert-2"]
+        assert sorted(executed(session, "UPDATE alerts")[0]["ids"]) == ["alert-1", "alert-2"]
+
+    async def test_anomaly_rule_not_default(self):
+        """Without an anomaly score source the default rules ignore scores"""
+        assert "anomaly_score" not in {rule.id for rule in DEFAULT_RULES}
+        session = make_session([metrics_row("a")])
+        result = await AlertRuleEngine(session).evaluate(["a"], anomaly_scores={"a": 0.99}, notify=False)
+        assert result["raised"] == []
+
+    async def test_cooldown_after_resolution(self):
+        """A pair resolved minutes ago does not re-raise"""
+        recently = datetime.now(timezone.utc) - timedelta(minutes=5)
+        session = make_session(
+            [metrics_row("a", loss=16.0)],
+            state=[{"dma_id": "a", "rule_id": "loss_warning", "open_ids": None, "last_resolved_at": recently}],
+        )
+        result = await AlertRuleEngine(session, cooldown_minutes=30).evaluate(["a"], notify=False)
+        assert result["raised"] == []
+
+        session = make_session(
+            [metrics_row("a", loss=16.0)],
+            state=[{"dma_id": "a", "rule_id": "loss_warning", "open_ids": None, "last_resolved_at": recently}],
+        )
+        result = await AlertRuleEngine(session, cooldown_minutes=1).evaluate(["a"], notify=False)
+        assert [a["rule_id"] for a in result["raised"]] == ["loss_warning"]
+
+    async def test_failed_read_rolls_back(self):
+        """A failing state query rolls the session back before the error propagates"""
+        session = make_session([metrics_row("a", loss=16.0)])
+        metrics = session.execute.side_effect
+
+        async def execute(stmt, params=None):
+            if "open_id" in str(stmt):
+                raise RuntimeError("relation does not exist")
+            return await metrics(stmt, params)
+
+        session.execute.side_effect = execute
+        with pytest.raises(RuntimeError):
+            await AlertRuleEngine(session).evaluate(["a"], notify=False)
+        session.rollback.assert_awaited_once()
+        session.commit.assert_not_awaited()
+
+    async def test_no_dmas(self):
+        """An empty batch makes no queries"""
+        session = make_session([])
+        assert await AlertRuleEngine(session).evaluate([]) == {"raised": [], "resolved": []}
+        session.execute.assert_not_awaited()
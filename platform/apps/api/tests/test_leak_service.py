@@ -0,0 +1,209 @@
+"""
+Tests for Leak Localization Service
+Tests MNF leakage estimates, hierarchy roll-up and leak alerts
+"""
+
+import pytest
+import numpy as np
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.leak_service import (
+    LeakDetectionService,
+    LeakSettings,
+    _columns,
+    aggregate_hierarchy,
+    estimate_leakage,
+    night_window,
+)
+
+
+def mnf_row(dma_id, branch_id="brn-1", region_id="reg-1", mnf=10.0, baseline=10.0, trend=0.0,
+            connections=2000, pipe_km=50.0, pressure=3.0, n_nights=14, is_current=True):
+    """One row of the MNF query"""
+    return {
+        "dma_id": dma_id,
+        "code": dma_id.upper(),
+        "name_th": f"ดีเอ็มเอ {dma_id}",
+        "name_en": f"DMA {dma_id}",
+        "branch_id": branch_id,
+        "region_id": region_id,
+        "connections": connections,
+        "pipe_length_km": pipe_km,
+        "last_night": datetime(2026, 1, 15),
+        "is_current": is_current,
+        "mnf": mnf,
+        "night_pressure": pressure,
+        "baseline_mnf": baseline,
+        "mnf_trend": trend,
+        "n_nights": n_nights,
+    }
+
+
+def make_session(rows, open_alerts=()):
+    """Async session stand-in answering the MNF and open-alert queries"""
+    session = MagicMock()
+    mnf_result = MagicMock()
+    mnf_result.mappings.return_value.all.return_value = rows
+    open_result = MagicMock()
+    open_result.mappings.return_value.all.return_value = [
+        {"dma_id": dma_id, "severity": severity} for dma_id, severity in open_alerts
+    ]
+
+    async def execute(stmt, params=None):
+        sql = str(stmt)
+        if "WITH nights" in sql:
+            return mnf_result
+        if "SELECT DISTINCT dma_id, severity FROM alerts" in sql:
+            return open_result
+        return MagicMock()
+
+    session.execute = AsyncMock(side_effect=execute)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+class TestEstimateLeakage:
+    """Test vectorized MNF decomposition"""
+
+    def test_normal_dma(self):
+        """MNF explained by night use and background is not flagged"""
+        estimates = estimate_leakage(_columns([mnf_row("a", mnf=4.0, baseline=4.0)]), LeakSettings())
+
+        assert estimates["leak_class"][0] == "normal"
+        assert estimates["severity"][0] == ""
+        # 2000 × 1.7 L/h night use
+        assert estimates["night_use"][0] == pytest.approx(3.4)
+
+    def test_burst(self):
+        """A jump over the baseline is a burst; doubling is critical"""
+        rows = [mnf_row("a", mnf=15.0, baseline=10.0), mnf_row("b", mnf=25.0, baseline=10.0)]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+
+        assert list(estimates["leak_class"]) == ["burst", "burst"]
+        assert list(estimates["severity"]) == ["high", "critical"]
+        assert estimates["burst_flow"][0] == pytest.approx(5.0)
+
+    def test_rising_and_elevated(self):
+        """A rising trend and persistent excess are flagged separately"""
+        rows = [
+            mnf_row("a", mnf=10.0, baseline=9.5, trend=0.5),
+            mnf_row("b", mnf=10.0, baseline=10.0, trend=0.0),
+        ]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+        assert list(estimates["leak_class"]) == ["rising", "elevated"]
+
+    def test_pressure_scales_background(self):
+        """Background leakage follows night pressure with the N1 exponent"""
+        rows = [mnf_row("a", pressure=5.0), mnf_row("b", pressure=2.5)]
+        background = estimate_leakage(_columns(rows), LeakSettings())["background"]
+        assert background[1] == pytest.approx(background[0] * 0.5 ** 1.5)
+
+    def test_insufficient_history(self):
+        """DMAs without enough nights or a baseline are not judged"""
+        rows = [mnf_row("a", n_nights=2), mnf_row("b", baseline=None)]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+        assert list(estimates["leak_class"]) == ["insufficient", "insufficient"]
+        assert list(estimates["severity"]) == ["", ""]
+
+    def test_missing_infrastructure_data(self):
+        """Without connections or pipe length, night use and background are unknown"""
+        rows = [mnf_row("a", connections=0, pipe_km=0.0), mnf_row("b", connections=None, pipe_km=None)]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+        assert list(estimates["leak_class"]) == ["insufficient", "insufficient"]
+        assert list(estimates["severity"]) == ["", ""]
+
+    def test_stale_last_night(self):
+        """A DMA without data for the latest closed night is not judged on an older one"""
+        rows = [mnf_row("a", mnf=25.0, baseline=10.0, is_current=False)]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+        assert estimates["leak_class"][0] == "insufficient"
+        assert estimates["severity"][0] == ""
+
+
+class TestNightWindow:
+    """Test the lookback bounds"""
+
+    def test_open_night_excluded(self):
+        """During tonight's window the bound stops at the previous night"""
+        settings = LeakSettings()
+        # 03:00 Bangkok, inside the 02:00-04:00 window
+        since, until = night_window(datetime(2026, 1, 15, 20, tzinfo=timezone.utc), settings)
+        assert until == datetime(2026, 1, 14, 21, tzinfo=timezone.utc)
+        assert (until - since).days == settings.lookback_days
+
+    def test_closed_night_included(self):
+        """Once the window closes, tonight is the last night"""
+        _, until = night_window(datetime(2026, 1, 15, 22), LeakSettings())
+        assert until == datetime(2026, 1, 15, 21, tzinfo=timezone.utc)
+
+
+class TestAggregateHierarchy:
+    """Test branch/region roll-up"""
+
+    def test_branch_totals_and_top_dma(self):
+        """Excess is summed per branch and the largest contributor named"""
+        rows = [
+            mnf_row("a", branch_id="brn-1", mnf=20.0, baseline=20.0),
+            mnf_row("b", branch_id="brn-1", mnf=12.0, baseline=12.0),
+            mnf_row("c", branch_id="brn-2", mnf=4.0, baseline=4.0),
+        ]
+        estimates = estimate_leakage(_columns(rows), LeakSettings())
+        branches = aggregate_hierarchy(estimates, "branch")
+
+        assert [b["id"] for b in branches] == ["brn-1", "brn-2"]
+        assert branches[0]["n_dmas"] == 2
+        assert branches[0]["top_dma_id"] == "a"
+        expected = np.clip(estimates["excess"][:2], 0, None).sum()
+        assert branches[0]["excess"] == pytest.approx(expected, abs=1e-3)
+        assert branches[1]["top_dma_id"] is None
+
+
+class TestLeakDetectionService:
+    """Test analysis and alerting against the database"""
+
+    async def test_run_raises_and_notifies(self):
+        """Flagged DMAs get one LEAK_DETECTED alert each"""
+        rows = [mnf_row("a", mnf=25.0, baseline=10.0), mnf_row("b", mnf=4.0, baseline=4.0)]
+        session = make_session(rows)
+
+        with patch("services.leak_service.notify_new_alert", new=AsyncMock()) as notify:
+            result = await LeakDetectionService(session).run()
+
+        assert [a["dma_id"] for a in result["alerts"]] == ["a"]
+        alert = result["alerts"][0]
+        assert alert["type"] == "leak_detected"
+        assert alert["severity"] == "critical"
+        assert alert["details"]["leak_class"] == "burst"
+        notify.assert_awaited_once_with(alert)
+        session.commit.assert_awaited_once()
+        assert result["regions"][0]["n_leaks"] == 1
+        params = session.execute.await_args_list[0].args[1]
+        assert params["since"] < params["until"] <= datetime.now(timezone.utc)
+        assert params["last_closed_night"] == params["until"].replace(hour=0, tzinfo=None)
+
+    async def test_open_alerts_are_not_repeated(self):
+        """DMAs with an unresolved leak alert are skipped"""
+        session = make_session([mnf_row("a", mnf=25.0, baseline=10.0)], open_alerts=[("a", "critical")])
+
+        with patch("services.leak_service.notify_new_alert", new=AsyncMock()) as notify:
+            result = await LeakDetectionService(session).run()
+
+        assert result["alerts"] == []
+        notify.assert_not_awaited()
+        session.commit.assert_not_awaited()
+
+    async def test_higher_severity_gets_through(self):
+        """An open low-severity leak alert does not hide a burst"""
+        rows = [mnf_row("a", mnf=25.0, baseline=10.0), mnf_row("b", mnf=10.0, baseline=10.0)]
+        session = make_session(rows, open_alerts=[("a", "low"), ("b", "low")])
+
+        result = await LeakDetectionService(session).run(notify=False)
+
+        assert [(a["dma_id"], a["severity"]) for a in result["alerts"]] == [("a", "critical")]
+
+    async def test_no_readings(self):
+        """An empty night window produces an empty analysis"""
+        result = await LeakDetectionService(make_session([])).run()
+        assert result == {"dmas": [], "branches": [], "regions": [], "alerts": []}